@@ -23,6 +23,7 @@ from ..tools import filesystem as fs
 from .configuration import find_command
 from .log import log
 from ..tools.utils import lazyproperty
+from ..tools.profiling import profile_span
 
 # -----------------------------------------------------------------
 
@@ -235,13 +236,13 @@ class Configurable(object):
         """
 
         # 1. Call the setup function
-        self.setup(**kwargs)
+        with profile_span(self.class_name + ".setup", "setup"): self.setup(**kwargs)
 
         # 2. Call the implementation
-        self._run(**kwargs)
+        with profile_span(self.class_name + ".run", "run"): self._run(**kwargs)
 
         # 3. Finish
-        self.finish()
+        with profile_span(self.class_name + ".finish", "finish"): self.finish()
 
     # -----------------------------------------------------------------
 
@@ -9,6 +9,7 @@
 #
 # The class in this module implements the modified black body function representing the idealized radiation emitted by
 # a body of dust at long wavelengths, and allows fitting the dust temperature and mass to a number of flux data points.
+# The fitgreybodies() function fits the temperatures and masses for many sets of flux data points at once.
 
 # -----------------------------------------------------------------
 
@@ -75,3 +76,79 @@ class GreyBody:
             return (0,0)
 
 # ----------------------------------------------------------------------
+
+## This function returns the temperatures \em T (K) and the dust masses \em M (Msun) for the best grey body fits with
+# many sets of flux data points at once, for the given power-law exponent \em beta and opacity \em kappa at 350
+# micron (m2/kg). The observer distance \em D (pc) has one value per set, \em fluxes (Jy) is a two-dimensional array
+# with one set of flux data points per row at the wavelengths \em lambdav (micron), and \em sigmav contains the
+# uncertainties (relative weights) for these wavelengths. The result corresponds to calling GreyBody.fit for each
+# set, and sets with non-positive fluxes also get a temperature and mass of zero.
+#
+# For a given temperature, the flux is linear in the dust mass, so that the best mass and the corresponding
+# chi-squared follow from a linear least-squares step. These are calculated for all sets on a grid of temperatures
+# between \em Tmin and \em Tmax at once, after which the minimum of each set is refined with a vectorised
+# golden-section search between the neighbouring grid temperatures.
+def fitgreybodies(D, beta, kappa350, lambdav, fluxes, sigmav, Tmin=2., Tmax=5000., numT=400, tolerance=1e-10):
+    D = np.asarray(D, dtype=float)
+    fluxes = np.asarray(fluxes, dtype=float)
+    shape = fluxes.shape[:-1]
+    fluxes = fluxes.reshape(-1, fluxes.shape[-1])
+    D = np.broadcast_to(D, shape).ravel()
+    lambdav = np.asarray(lambdav, dtype=float)
+    weights = 1. / np.asarray(sigmav, dtype=float)**2
+
+    # only fit the sets with positive fluxes
+    valid = np.all(fluxes>0, axis=1)
+    f = fluxes[valid]
+
+    # the flux per unit dust mass at a distance of 1 pc as a function of temperature, for the given wavelengths
+    def unitflux(T):
+        return greybody(1., beta, kappa350, lambdav, T[...,np.newaxis], 1.)
+
+    # the best mass (at a distance of 1 pc) and the chi-squared for the given temperatures, one for each set
+    def bestmass(T):
+        a = unitflux(T)
+        fa = np.sum(weights * f * a, axis=-1)
+        aa = np.sum(weights * a * a, axis=-1)
+        M = fa / aa
+        return M, np.sum(weights * f * f, axis=-1) - M * fa
+
+    # evaluate the chi-squared on the temperature grid for all sets
+    Tgrid = np.logspace(np.log10(Tmin), np.log10(Tmax), numT)
+    a = unitflux(Tgrid)                                             # (numT, nwaves)
+    fa = np.dot(f * weights, a.T)                                   # (nsets, numT)
+    aa = np.sum(weights * a * a, axis=-1)                           # (numT,)
+    chi2grid = np.sum(weights * f * f, axis=-1)[:,np.newaxis] - fa**2 / aa
+    best = np.argmin(chi2grid, axis=1)
+
+    # refine with a golden-section search in log(T) between the neighbouring grid points
+    lower = np.log(Tgrid[np.maximum(best-1, 0)])
+    upper = np.log(Tgrid[np.minimum(best+1, numT-1)])
+    ratio = (np.sqrt(5.) - 1.) / 2.
+    x1 = upper - ratio*(upper-lower)
+    x2 = lower + ratio*(upper-lower)
+    chi1 = bestmass(np.exp(x1))[1]
+    chi2 = bestmass(np.exp(x2))[1]
+    while np.any(upper-lower > tolerance):
+        # shrink the interval to the side of the lowest chi-squared, keeping one of the interior points
+        left = chi1 < chi2
+        upper = np.where(left, x2, upper)
+        lower = np.where(left, lower, x1)
+        keptx = np.where(left, x1, x2)
+        keptchi = np.where(left, chi1, chi2)
+
+        # evaluate the new interior point
+        newx = np.where(left, upper - ratio*(upper-lower), lower + ratio*(upper-lower))
+        newchi = bestmass(np.exp(newx))[1]
+        x1, chi1 = np.where(left, newx, keptx), np.where(left, newchi, keptchi)
+        x2, chi2 = np.where(left, keptx, newx), np.where(left, keptchi, newchi)
+    T = np.exp(0.5*(lower+upper))
+
+    # store the results, converting the masses to the actual distances
+    Tv = np.zeros(len(fluxes))
+    Mv = np.zeros(len(fluxes))
+    Tv[valid] = T
+    Mv[valid] = bestmass(T)[0] * D[valid]**2
+    return Tv.reshape(shape), Mv.reshape(shape)
+
+# ----------------------------------------------------------------------
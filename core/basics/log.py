@@ -15,6 +15,7 @@ from __future__ import absolute_import, division, print_function
 # Import standard modules
 import os
 import sys
+import time
 import logging
 import warnings
 import inspect
@@ -101,7 +102,7 @@ def _init_log(level=None):
 
 # -----------------------------------------------------------------
 
-def setup_log(level="INFO", path=None, memory=False, show_origins=False):
+def setup_log(level="INFO", path=None, memory=False, show_origins=False, profile=False):
 
     """
     This function ...
@@ -109,6 +110,7 @@ def setup_log(level="INFO", path=None, memory=False, show_origins=False):
     :param path:
     :param memory:
     :param show_origins:
+    :param profile: keep statistics of the suppressed messages (see PTSLogger.profile_suppressed)
     :return:
     """
 
@@ -124,6 +126,9 @@ def setup_log(level="INFO", path=None, memory=False, show_origins=False):
     # Show origin
     if show_origins: log.show_origins()
 
+    # Profile suppressed messages
+    if profile: log.profile_suppressed()
+
     # Return the logger
     return log
 
@@ -339,6 +344,7 @@ class Conf(object):
         self.log_file_format = "%(asctime)r, %(origin)r, %(levelname)r, %(message)r"
         self.show_origin = False
         self.memory = False
+        self.profile = False
 
 # -----------------------------------------------------------------
 
@@ -452,6 +458,61 @@ except NameError:
 
 # -----------------------------------------------------------------
 
+class LazyString(object):
+
+    """
+    This class defers the creation of (a part of) a log message until the message is actually emitted. Use it as an
+    argument of a message with %-style formatting, e.g.
+    log.debug("Making clip mask for sigma levels [%s] ...", LazyString(tostr, levels_dict))
+    """
+
+    def __init__(self, function, *args, **kwargs):
+
+        """
+        The constructor ...
+        :param function: the function that creates the string
+        :param args: the positional arguments for the function
+        :param kwargs: the keyword arguments for the function
+        """
+
+        self.function = function
+        self.args = args
+        self.kwargs = kwargs
+
+    # -----------------------------------------------------------------
+
+    def __str__(self):
+        return str(self.function(*self.args, **self.kwargs))
+
+    # -----------------------------------------------------------------
+
+    def __repr__(self):
+        return repr(self.function(*self.args, **self.kwargs))
+
+# -----------------------------------------------------------------
+
+def format_message(msg, args):
+
+    """
+    This function creates the message string of a log message: the message can be a string, or a function without
+    arguments that returns the string, and the arguments are merged with %-style formatting
+    :param msg:
+    :param args:
+    :return:
+    """
+
+    if callable(msg): msg = msg()
+    if args: msg = str(msg) % args
+    return msg
+
+# -----------------------------------------------------------------
+
+# The statistics of the suppressed messages (when profiling), for each call site (filename, line number):
+# [number of messages, number of messages created before the call, their total length, time of creating the deferred messages]
+suppressed_messages = dict()
+
+# -----------------------------------------------------------------
+
 class PTSLogRecord(logging.LogRecord):
 
     """
@@ -466,6 +527,9 @@ class PTSLogRecord(logging.LogRecord):
         arguments with the message.
         """
 
+        # Create the message if it is deferred (only once, for all handlers)
+        if callable(self.msg): self.msg = self.msg()
+
         if not _unicode: #if no unicode support...
             msg = str(self.msg)
 
@@ -882,6 +946,100 @@ class PTSLogger(Logger):
 
     # -----------------------------------------------------------------
 
+    def debug(self, msg, *args, **kwargs):
+
+        """
+        This function logs a message with the DEBUG level. To avoid the cost of creating messages that are not
+        emitted, the message can be a string with %-style arguments (only merged when the message is emitted), or a
+        function without arguments that returns the message (only called when the message is emitted).
+        :param msg:
+        :param args:
+        :param kwargs:
+        :return:
+        """
+
+        if self.isEnabledFor(logging.DEBUG): self._log(logging.DEBUG, msg, args, **kwargs)
+        elif conf.profile: self._profile_suppressed(msg, args)
+
+    # -----------------------------------------------------------------
+
+    def info(self, msg, *args, **kwargs):
+
+        """
+        This function logs a message with the INFO level (see debug for deferred messages)
+        :param msg:
+        :param args:
+        :param kwargs:
+        :return:
+        """
+
+        if self.isEnabledFor(logging.INFO): self._log(logging.INFO, msg, args, **kwargs)
+        elif conf.profile: self._profile_suppressed(msg, args)
+
+    # -----------------------------------------------------------------
+
+    def _profile_suppressed(self, msg, args):
+
+        """
+        This function adds a suppressed message to the statistics of its call site. The time spent in creating
+        messages before the call cannot be measured here: for those, the number and total length is recorded. For
+        deferred messages, the time that creating them would have taken is measured.
+        :param msg:
+        :param args:
+        :return:
+        """
+
+        # Get the call site (the caller of debug or info)
+        frame = sys._getframe(2)
+        site = (frame.f_code.co_filename, frame.f_lineno)
+        if site not in suppressed_messages: suppressed_messages[site] = [0, 0, 0, 0.]
+        statistics = suppressed_messages[site]
+        statistics[0] += 1
+
+        # Message created before the call
+        if not callable(msg) and not args:
+            statistics[1] += 1
+            statistics[2] += len(msg) if isinstance(msg, str) else 0
+
+        # Deferred message: measure the time of creating it
+        else:
+            start = time.time()
+            try: format_message(msg, args)
+            except Exception: pass
+            statistics[3] += time.time() - start
+
+    # -----------------------------------------------------------------
+
+    def profile_suppressed(self, enable=True):
+
+        """
+        This function enables (or disables) keeping statistics of the suppressed messages per call site
+        :param enable:
+        :return:
+        """
+
+        conf.profile = enable
+
+    # -----------------------------------------------------------------
+
+    def show_suppressed(self, nsites=20):
+
+        """
+        This function shows the call sites with the most suppressed messages
+        :param nsites:
+        :return:
+        """
+
+        sites = sorted(suppressed_messages.items(), key=lambda item: item[1][0], reverse=True)[:nsites]
+        if len(sites) == 0: return
+        self.warning("Call sites with the most suppressed log messages:")
+        for (filename, lineno), (ncalls, neager, nchars, seconds) in sites:
+            self.warning(" - " + filename + ":" + str(lineno) + ": " + str(ncalls) + " messages (" + str(neager) +
+                         " created before the call, " + str(nchars) + " characters), " + "{:.6f}".format(seconds) +
+                         " s for the deferred messages")
+
+    # -----------------------------------------------------------------
+
     def welcome(self):
 
         """
@@ -898,7 +1056,8 @@ class PTSLogger(Logger):
     def is_debug(self):
 
         """
-        This function ...
+        This function returns whether debug messages are emitted (a fast guard for code that only creates debugging
+        output)
         :return:
         """
 
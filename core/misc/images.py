@@ -1851,6 +1851,8 @@ class ObservedImageMaker(DatacubesMiscMaker):
         :return:
         """
 
+        from ...magic.core.frame import Frame
+
         # Inform the user
         log.info("Convolving the images ...")
 
@@ -1878,8 +1880,10 @@ class ObservedImageMaker(DatacubesMiscMaker):
                 # Convert to remote frame if necessary
                 self.check_remote_convolution(instr_name, filter_name)
 
-                # Convolve the frame
-                self.images[instr_name][filter_name].convolve(kernel)
+                # Convolve the frame (reusing prepared kernels and kernel transforms across instruments)
+                frame = self.images[instr_name][filter_name]
+                if isinstance(frame, Frame): frame.convolve(kernel, cache=True)
+                else: frame.convolve(kernel)
 
                 # If intermediate results have to be written
                 if self.config.write_intermediate: self.write_intermediate_convolved(instr_name, filter_name)
@@ -43,9 +43,7 @@ def makegrid(coords, cmin, cmax, gridsize):
     # determine the particle distribution at a decent resolution
     nbins = gridsize*100
     binwidth = (cmax-cmin)/nbins
-    bins = np.zeros(nbins, 'int')
-    for coord in coords:
-        bins[int( (coord-cmin)/binwidth )] += 1
+    bins = np.bincount(((coords-cmin)/binwidth).astype('int'), minlength=nbins)
 
     # determine grid separation points based on the cumulative distribution
     grid = np.zeros(gridsize+1)
@@ -104,6 +102,25 @@ def getindexrange(grid, center, radius):
 
 # -----------------------------------------------------------------
 
+## Determine the ranges of indices in a one-dimensional grid affected by
+#  each of a number of particles. This function does the same as getindexrange
+#  for all particles at once (assuming that the grid separation points are increasing).
+#
+# parameters:
+# - grid: the separation points of the grid; length gridsize+1
+# - centers: array with the positions of the centers of the particles
+# - radii: array with the radii of the particles
+#
+# returns: a tuple (i1,i2) of integer arrays with the index ranges, see getindexrange
+#
+def getindexranges(grid, centers, radii):
+    gridsize = len(grid)-1
+    i1 = np.searchsorted(grid[1:], centers - radii, side='right')
+    i2 = np.minimum(np.searchsorted(grid[1:], centers + radii, side='right') + 1, gridsize)
+    return (i1,i2)
+
+# -----------------------------------------------------------------
+
 ## Determine whether an axis-aligned bounding box intersects with a sphere.
 #  Algorithm due to Jim Arvo in "Graphics Gems" (1990).
 #
@@ -133,6 +150,81 @@ def intersects(xmin, xmax, ymin, ymax, zmin, zmax,  xc, yc, zc, r):
 
 # -----------------------------------------------------------------
 
+## Count the number of particles affecting each cell of a three-dimensional grid,
+#  and the number of cells affected by each particle, for all particles at once.
+#
+# parameters:
+# - xgrid, ygrid, zgrid: the separation points of the grid in each direction
+# - x, y, z, r: arrays with the centers and radii of the particles
+# - accurate: if false, a particle is considered to affect all cells that
+#             intersect the particle's enclosing rectangle;
+#             if true, only cells that effectively intersect the particle's
+#             sphere are counted (see intersects)
+# - maxpairs: the maximum number of (particle, cell) pairs tested at once
+#             when accurate is true, which limits the memory usage
+#
+# returns: a tuple (partsincell, cellsbypart) with an integer array of shape
+#          (nx,ny,nz) containing the number of particles affecting each cell,
+#          and an integer array containing the number of cells affected by each particle
+#
+def countoverlaps(xgrid, ygrid, zgrid, x, y, z, r, accurate=False, maxpairs=10000000):
+    nx, ny, nz = len(xgrid)-1, len(ygrid)-1, len(zgrid)-1
+
+    # get the index ranges for all particles
+    xi1,xi2 = getindexranges(xgrid, x, r)
+    yi1,yi2 = getindexranges(ygrid, y, r)
+    zi1,zi2 = getindexranges(zgrid, z, r)
+    xn, yn, zn = xi2-xi1, yi2-yi1, zi2-zi1
+    ncandidates = xn*yn*zn
+
+    if not accurate:
+        # count all cells intersecting the enclosing rectangle:
+        # add one to each rectangle in a difference array and integrate it along each axis
+        diff = np.zeros((nx+1,ny+1,nz+1),'int')
+        for cx,sx in ((xi1,1),(xi2,-1)):
+            for cy,sy in ((yi1,1),(yi2,-1)):
+                for cz,sz in ((zi1,1),(zi2,-1)):
+                    np.add.at(diff, (cx,cy,cz), sx*sy*sz)
+        partsincell = diff.cumsum(axis=0).cumsum(axis=1).cumsum(axis=2)[:nx,:ny,:nz]
+        return partsincell, ncandidates
+
+    # perform an accurate intersection test for all candidate (particle, cell) pairs,
+    # in chunks of particles so that the number of pairs in a chunk remains limited
+    partsincell = np.zeros(nx*ny*nz,'int')
+    cellsbypart = np.zeros(len(r),'int')
+    cumulative = np.cumsum(ncandidates)
+    start = 0
+    while start < len(r):
+        offset = cumulative[start-1] if start > 0 else 0
+        end = max(start+1, np.searchsorted(cumulative, offset+maxpairs, side='right'))
+
+        # list the pairs: the particle index and the index of the cell within the particle's index ranges
+        counts = ncandidates[start:end]
+        part = np.repeat(np.arange(start,end), counts)
+        local = np.arange(len(part)) - np.repeat(cumulative[start:end]-counts-offset, counts)
+        local, zi = np.divmod(local, zn[part])
+        xi, yi = np.divmod(local, yn[part])
+        xi += xi1[part]
+        yi += yi1[part]
+        zi += zi1[part]
+
+        # perform the intersection test as in the intersects function
+        squaredist = r[part]*r[part]
+        for c,grid,i in ((x[part],xgrid,xi),(y[part],ygrid,yi),(z[part],zgrid,zi)):
+            cmin = grid[i]
+            cmax = grid[i+1]
+            squaredist -= np.where(c < cmin, (c-cmin)**2, np.where(c > cmax, (c-cmax)**2, 0.))
+        hit = squaredist > 0.
+
+        # perform the counting
+        partsincell += np.bincount(((xi*ny+yi)*nz+zi)[hit], minlength=nx*ny*nz)
+        cellsbypart[start:end] = np.bincount(part[hit]-start, minlength=end-start)
+        start = end
+
+    return partsincell.reshape((nx,ny,nz)), cellsbypart
+
+# -----------------------------------------------------------------
+
 ## Analyze the specified data file
 #
 # parameters:
@@ -150,7 +242,7 @@ def intersects(xmin, xmax, ymin, ymax, zmin, zmax,  xc, yc, zc, r):
 # - accurate: if false, a particle is considered to affect all cells that
 #             intersect the particle's enclosing rectangle;
 #             if true, only cells that effectively intersect the particle's
-#             sphere are counted - but this is A LOT SLOWER
+#             sphere are counted - which is slower
 #
 def analyze(filename, columns=(0,1,2,3), scale=1, supfac=1, gridsize=9, plotfile=None,
             basicplot=False, circleplot=False, cellplot=False, accurate=False):
@@ -245,36 +337,8 @@ def analyze(filename, columns=(0,1,2,3), scale=1, supfac=1, gridsize=9, plotfile
         ygrid = makegrid(y, ymin, ymax, gridsize)
         zgrid = makegrid(z, zmin, zmax, gridsize)
 
-        # create array to count number of particles affecting each cell
-        partsincell = np.zeros((gridsize,gridsize,gridsize),'int')
-        # create array to count number of cells affected by each particle
-        cellsbypart = np.zeros(len(r),'int')
-
         # count cells (potentially) affected by each particle, and vice versa
-        for index in range(len(r)):
-            # get the overall index range
-            xi1,xi2 = getindexrange(xgrid, x[index], r[index])
-            yi1,yi2 = getindexrange(ygrid, y[index], r[index])
-            zi1,zi2 = getindexrange(zgrid, z[index], r[index])
-
-            # perform the counting
-            if (accurate):
-                # perform an accurate intersection test for each cell
-                for xi in range(xi1,xi2):
-                    for yi in range(yi1,yi2):
-                        for zi in range(zi1,zi2):
-                            if (intersects(xgrid[xi], xgrid[xi+1], ygrid[yi], ygrid[yi+1], zgrid[zi], zgrid[zi+1],  \
-                                           x[index], y[index], z[index], r[index]) ):
-                                partsincell[xi,yi,zi] += 1
-                                cellsbypart[index] += 1
-            else:
-                # count all cells intersecting the enclosing rectangle
-                partsincell[xi1:xi2,yi1:yi2,zi1:zi2] += 1
-                cellsbypart[index] += (xi2-xi1)*(yi2-yi1)*(zi2-zi1)
-
-            # report progress
-            if index%50000==0:
-                print " .. processed {0} particles".format(index)
+        partsincell, cellsbypart = countoverlaps(xgrid, ygrid, zgrid, x, y, z, r, accurate)
 
         # print basic statistic
         print "Maximum {0} particles affecting a single cell".format( max(partsincell.flatten()) )
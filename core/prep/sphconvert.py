@@ -17,13 +17,107 @@
 # The arguments for each function are:
 #  - infile: the name of the input file in foreign format
 #  - outfile: the name of the output file in SKIRT6 format (file is overwritten)
+#  - chunksize: the number of particles (rows) that are converted at once (optional)
+#  - nprocesses: the number of processes used to parse the chunks of the input file (optional)
+#
+# All conversions are performed by the convert function, which streams the input file
+# in chunks of rows, so that files with more particles than fit in memory can be converted.
 
 # -----------------------------------------------------------------
 
 # Import standard modules
 import math as math
+import itertools
 import numpy as np
 
+# -----------------------------------------------------------------
+
+# the default number of rows in a chunk
+default_chunksize = 1000000
+
+# -----------------------------------------------------------------
+#  Streaming conversion
+# -----------------------------------------------------------------
+
+## This function parses the specified text (the data lines of a chunk of a column text file)
+# and returns the requested columns as a 2D array with one row per particle.
+# All data lines are assumed to have the same number of columns. If that is not the case,
+# the text is parsed with np.loadtxt instead.
+def parsechunk(text, usecols):
+    lines = text.split('\n', 1)
+    ncols = len(lines[0].split())
+    values = np.fromstring(text, sep=' ')
+    if ncols == 0 or values.size % ncols != 0 or values.size // ncols != text.count('\n'):
+        return np.loadtxt(text.splitlines(), usecols=usecols, ndmin=2)
+    return values.reshape((-1, ncols))[:,usecols]
+
+## This generator function returns the data lines of the specified column text file (skipping empty lines
+# and comment lines starting with #), joined in text chunks of the specified number of lines.
+def readtextchunks(infile, chunksize):
+    with open(infile, 'r') as fid:
+        lines = (line for line in fid if line.strip() and not line.lstrip().startswith('#'))
+        while True:
+            chunk = list(itertools.islice(lines, chunksize))
+            if len(chunk) == 0: break
+            yield ''.join(line if line.endswith('\n') else line+'\n' for line in chunk)
+
+## This generator function returns the requested columns of the specified input file as 2D arrays of
+# (at most) the specified number of rows. The input file is either a column text file, or a binary
+# numpy file (with extension .npy) containing a 2D array with one row per particle, which is memory mapped.
+# The text chunks are parsed by the specified number of processes.
+def readchunks(infile, usecols, chunksize=default_chunksize, nprocesses=1):
+    usecols = list(usecols)
+
+    # binary numpy file
+    if infile.endswith('.npy'):
+        data = np.load(infile, mmap_mode='r')
+        for start in range(0, data.shape[0], chunksize):
+            yield np.array(data[start:start+chunksize,usecols], dtype=np.float64)
+
+    # column text file, parsed serially
+    elif nprocesses <= 1:
+        for text in readtextchunks(infile, chunksize):
+            yield parsechunk(text, usecols)
+
+    # column text file, parsed in parallel (keeping a limited number of chunks in flight)
+    else:
+        from ..tools.parallelization import ParallelTarget
+        with ParallelTarget(parsechunk, nprocesses) as target:
+            pending = [ ]
+            for text in readtextchunks(infile, chunksize):
+                pending.append(target(text, usecols))
+                if len(pending) > 2*nprocesses:
+                    output = pending.pop(0)
+                    output.request()
+                    yield output.output
+            for output in pending:
+                output.request()
+                yield output.output
+
+## This function writes the specified columns (1D arrays of the same length) to the open output file,
+# with one row per particle, in the same way as np.savetxt.
+def writechunk(fid, columns, fmt="%1.9g"):
+    data = np.column_stack(columns)
+    if len(data) == 0: return
+    rowformat = ' '.join([fmt]*data.shape[1]) + '\n'
+    fid.write((rowformat*data.shape[0]) % tuple(data.ravel()))
+
+## This function converts the specified input file to a SKIRT column text file, in chunks of rows.
+# - infile: the name of the input file (column text file or binary numpy file, see readchunks)
+# - outfile: the name of the output file (file is overwritten)
+# - usecols: the indices of the input columns that are passed to the transform function
+# - transform: a function that takes the input columns (1D arrays, in the order of usecols) and returns
+#              the output columns as a sequence of 1D arrays (pure array expressions)
+# - header: the lines of the header of the output file (without the leading '# ')
+# - chunksize: the number of rows that are converted at once
+# - nprocesses: the number of processes used to parse the chunks of the input file
+# - fmt: the format of the output values
+def convert(infile, outfile, usecols, transform, header, chunksize=default_chunksize, nprocesses=1, fmt="%1.9g"):
+    with open(outfile, 'w') as fid:
+        for line in header: fid.write('# ' + line + '\n')
+        for data in readchunks(infile, usecols, chunksize, nprocesses):
+            writechunk(fid, transform(*data.T), fmt)
+
 # -----------------------------------------------------------------
 #  EAGLE column text format
 # -----------------------------------------------------------------
@@ -31,26 +125,22 @@ import numpy as np
 ## EAGLE star particles:
 # - incoming:  x(kpc) y(kpc) z(kpc) t(yr) h(kpc) Z(0-1) M(Msun)
 # - outgoing:  x(pc) y(pc) z(pc) h(pc) M(Msun) Z(0-1) t(yr)
-def convert_stars_EAGLE(infile, outfile):
-    x,y,z,t,h,Z,M = np.loadtxt(infile, unpack=True)
-    fid = open(outfile, 'w')
-    fid.write('# SPH Star Particles\n')
-    fid.write('# Converted from EAGLE SKIRT5 output format into SKIRT6 format\n')
-    fid.write('# Columns contain: x(pc) y(pc) z(pc) h(pc) M(Msun) Z(0-1) t(yr)\n')
-    np.savetxt(fid, np.transpose((x*1e3,y*1e3,z*1e3,h*1e3,M,Z,t)), fmt="%1.9g")
-    fid.close()
+def convert_stars_EAGLE(infile, outfile, chunksize=default_chunksize, nprocesses=1):
+    convert(infile, outfile, (0,1,2,3,4,5,6),
+            lambda x,y,z,t,h,Z,M: (x*1e3,y*1e3,z*1e3,h*1e3,M,Z,t),
+            ('SPH Star Particles',
+             'Converted from EAGLE SKIRT5 output format into SKIRT6 format',
+             'Columns contain: x(pc) y(pc) z(pc) h(pc) M(Msun) Z(0-1) t(yr)'), chunksize, nprocesses)
 
 ## EAGLE gas particles:
 # - incoming:  x(kpc) y(kpc) z(kpc) SFR(?) h(kpc) Z(0-1) M(Msun)
 # - outgoing:  x(pc) y(pc) z(pc) h(pc) M(Msun) Z(0-1)
-def convert_gas_EAGLE(infile, outfile):
-    x,y,z,SFR,h,Z,M = np.loadtxt(infile, unpack=True)
-    fid = open(outfile, 'w')
-    fid.write('# SPH Gas Particles\n')
-    fid.write('# Converted from EAGLE SKIRT5 output format into SKIRT6 format\n')
-    fid.write('# Columns contain: x(pc) y(pc) z(pc) h(pc) M(Msun) Z(0-1)\n')
-    np.savetxt(fid, np.transpose((x*1e3,y*1e3,z*1e3,h*1e3,M,Z)), fmt="%1.9g")
-    fid.close()
+def convert_gas_EAGLE(infile, outfile, chunksize=default_chunksize, nprocesses=1):
+    convert(infile, outfile, (0,1,2,3,4,5,6),
+            lambda x,y,z,SFR,h,Z,M: (x*1e3,y*1e3,z*1e3,h*1e3,M,Z),
+            ('SPH Gas Particles',
+             'Converted from EAGLE SKIRT5 output format into SKIRT6 format',
+             'Columns contain: x(pc) y(pc) z(pc) h(pc) M(Msun) Z(0-1)'), chunksize, nprocesses)
 
 # -----------------------------------------------------------------
 #  AWAT column text format
@@ -60,34 +150,29 @@ def convert_gas_EAGLE(infile, outfile):
 # - incoming:  x y z vx vy vz M ms0 mzHe mzC mzN mzO mzNe mzMg mzSi mzFe mzZ Z ts id flagfd rho h ...
 # -    units:  x,y,z,h (100kpc); M (1e12 Msun); ts(0.471Gyr) with t = (1Gyr-ts)
 # - outgoing:  x(pc) y(pc) z(pc) h(pc) M(Msun) Z(0-1) t(yr)
-def convert_stars_AWAT(infile, outfile):
-    x,y,z,M,Z,ts,h = np.loadtxt(infile, usecols=(0,1,2,6,17,18,22), unpack=True)
-    fid = open(outfile, 'w')
-    fid.write('# SPH Star Particles\n')
-    fid.write('# Converted from AWAT output format into SKIRT6 format\n')
-    fid.write('# Columns contain: x(pc) y(pc) z(pc) h(pc) M(Msun) Z(0-1) t(yr)\n')
-    np.savetxt(fid, np.transpose((x*1e5,y*1e5,z*1e5,h*1e5,M*1e12,Z,1e9-ts*0.471e9)), fmt="%1.9g")
-    fid.close()
+def convert_stars_AWAT(infile, outfile, chunksize=default_chunksize, nprocesses=1):
+    convert(infile, outfile, (0,1,2,6,17,18,22),
+            lambda x,y,z,M,Z,ts,h: (x*1e5,y*1e5,z*1e5,h*1e5,M*1e12,Z,1e9-ts*0.471e9),
+            ('SPH Star Particles',
+             'Converted from AWAT output format into SKIRT6 format',
+             'Columns contain: x(pc) y(pc) z(pc) h(pc) M(Msun) Z(0-1) t(yr)'), chunksize, nprocesses)
 
 ## AWAT gas particles:
 # - incoming:  x y z vx vy vz M rho u mzHe mzC mzN mzO mzNe mzMg mzSi mzFe mzZ id flagfd h myu nhp Temp ...
 # -    units:  x,y,z,h (100kpc); M (1e12 Msun); mzZ (Msun) so that Z=mzZ/(M*1e12)
 # - outgoing:  x(pc) y(pc) z(pc) h(pc) M(Msun) Z(0-1)
-def convert_gas_AWAT(infile, outfile):
-    x,y,z,M,mzZ,h = np.loadtxt(infile, usecols=(0,1,2,6,17,20), unpack=True)
-    fid = open(outfile, 'w')
-    fid.write('# SPH Gas Particles\n')
-    fid.write('# Converted from AWAT output format into SKIRT6 format\n')
-    fid.write('# Columns contain: x(pc) y(pc) z(pc) h(pc) M(Msun) Z(0-1)\n')
-    np.savetxt(fid, np.transpose((x*1e5,y*1e5,z*1e5,h*1e5,M*1e12,mzZ/(M*1e12))), fmt="%1.9g")
-    fid.close()
+def convert_gas_AWAT(infile, outfile, chunksize=default_chunksize, nprocesses=1):
+    convert(infile, outfile, (0,1,2,6,17,20),
+            lambda x,y,z,M,mzZ,h: (x*1e5,y*1e5,z*1e5,h*1e5,M*1e12,mzZ/(M*1e12)),
+            ('SPH Gas Particles',
+             'Converted from AWAT output format into SKIRT6 format',
+             'Columns contain: x(pc) y(pc) z(pc) h(pc) M(Msun) Z(0-1)'), chunksize, nprocesses)
 
 # -----------------------------------------------------------------
 #  DOLAG column text format
 # -----------------------------------------------------------------
 
 # return the age of a star (in yr) given the universe expansion factor when the star was born (in range 0-1)
-@np.vectorize
 def age(R):
     H0 = 2.3e-18
     OmegaM0 = 0.27
@@ -96,7 +181,6 @@ def age(R):
     return T0 - (2./3./H0/np.sqrt(1-OmegaM0)) * np.arcsinh(np.sqrt( (1/OmegaM0-1)*R**3 )) / yr
 
 # return the radius of a particle (in kpc) given its mass (in Msun) and density (in Msun/kpc3)
-@np.vectorize
 def radius(M,rho):
     return (M/rho*3/4/math.pi*64)**(1./3.)
 
@@ -104,27 +188,23 @@ def radius(M,rho):
 # - incoming:  id x y z vx vy vz M R
 # -    units:  x,y,z (kpc); M (Msun); R (0-1); assume Z=0.02 & h=1kpc; calculate t(R)
 # - outgoing:  x(pc) y(pc) z(pc) h(pc) M(Msun) Z(0-1) t(yr)
-def convert_stars_DOLAG(infile, outfile):
-    x,y,z,M,R = np.loadtxt(infile, usecols=(1,2,3,7,8), unpack=True)
-    fid = open(outfile, 'w')
-    fid.write('# SPH Star Particles\n')
-    fid.write('# Converted from DOLAG output format into SKIRT6 format\n')
-    fid.write('# Columns contain: x(pc) y(pc) z(pc) h(pc) M(Msun) Z(0-1) t(yr)\n')
-    np.savetxt(fid, np.transpose((x*1e3,y*1e3,z*1e3,np.ones_like(x)*1e3,M,np.ones_like(x)*0.02,age(R))), fmt="%1.9g")
-    fid.close()
+def convert_stars_DOLAG(infile, outfile, chunksize=default_chunksize, nprocesses=1):
+    convert(infile, outfile, (1,2,3,7,8),
+            lambda x,y,z,M,R: (x*1e3,y*1e3,z*1e3,np.ones_like(x)*1e3,M,np.ones_like(x)*0.02,age(R)),
+            ('SPH Star Particles',
+             'Converted from DOLAG output format into SKIRT6 format',
+             'Columns contain: x(pc) y(pc) z(pc) h(pc) M(Msun) Z(0-1) t(yr)'), chunksize, nprocesses)
 
 ## DOLAG gas particles:
 # - incoming:  id x y z vx vy vz M rho T cf u sfr
 # -    units:  x,y,z (kpc); M (Msun); assume Z=0.02; calculate h(M,rho)
 # - outgoing:  x(pc) y(pc) z(pc) h(pc) M(Msun) Z(0-1)
-def convert_gas_DOLAG(infile, outfile):
-    x,y,z,M,rho = np.loadtxt(infile, usecols=(1,2,3,7,8), unpack=True)
-    fid = open(outfile, 'w')
-    fid.write('# SPH Gas Particles\n')
-    fid.write('# Converted from DOLAG output format into SKIRT6 format\n')
-    fid.write('# Columns contain: x(pc) y(pc) z(pc) h(pc) M(Msun) Z(0-1)\n')
-    np.savetxt(fid, np.transpose((x*1e3,y*1e3,z*1e3,radius(M,rho)*1e3,M,np.ones_like(x)*0.02)), fmt="%1.9g")
-    fid.close()
+def convert_gas_DOLAG(infile, outfile, chunksize=default_chunksize, nprocesses=1):
+    convert(infile, outfile, (1,2,3,7,8),
+            lambda x,y,z,M,rho: (x*1e3,y*1e3,z*1e3,radius(M,rho)*1e3,M,np.ones_like(x)*0.02),
+            ('SPH Gas Particles',
+             'Converted from DOLAG output format into SKIRT6 format',
+             'Columns contain: x(pc) y(pc) z(pc) h(pc) M(Msun) Z(0-1)'), chunksize, nprocesses)
 
 # -----------------------------------------------------------------
 #  ULB column text format
@@ -134,16 +214,14 @@ def convert_gas_DOLAG(infile, outfile):
 # - incoming:  x y z M h rho vx vy vz ...
 # -    units:  x,y,z,h (100AU); M (Msun)
 # - outgoing:  x(pc) y(pc) z(pc) h(pc) M(Msun) Z(0-1)
-def convert_gas_ULB(infile, outfile):
+def convert_gas_ULB(infile, outfile, chunksize=default_chunksize, nprocesses=1):
     PARSEC = 3.08568e16   # 1 parsec (in m)
     AU = 1.496e11         # 1 AU (in m)
     CONV = (100. * AU) / PARSEC
-    x,y,z,M,h = np.loadtxt(infile, usecols=(0,1,2,3,4), unpack=True)
-    fid = open(outfile, 'w')
-    fid.write('# SPH Gas Particles\n')
-    fid.write('# Converted from ULB output format into SKIRT6 format\n')
-    fid.write('# Columns contain: x(pc) y(pc) z(pc) h(pc) M(Msun) Z(0-1)\n')
-    np.savetxt(fid, np.transpose((x*CONV,y*CONV,z*CONV,5*h*CONV,M,np.zeros_like(M)+0.02)), fmt="%1.9g")  # inflated h!
-    fid.close()
+    convert(infile, outfile, (0,1,2,3,4),
+            lambda x,y,z,M,h: (x*CONV,y*CONV,z*CONV,5*h*CONV,M,np.zeros_like(M)+0.02),  # inflated h!
+            ('SPH Gas Particles',
+             'Converted from ULB output format into SKIRT6 format',
+             'Columns contain: x(pc) y(pc) z(pc) h(pc) M(Msun) Z(0-1)'), chunksize, nprocesses)
 
 # -----------------------------------------------------------------
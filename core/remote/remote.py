@@ -39,6 +39,7 @@ from ..basics.map import Map
 from ..tools import strings, types
 from ..tools.utils import lazyproperty
 from ..tools.utils import memoize_method
+from ..tools.profiling import count
 
 # -----------------------------------------------------------------
 
@@ -2736,6 +2737,7 @@ class Remote(object):
 
         # Send the command
         self.ssh.sendline(command)
+        count("ssh round trips")
 
         # Add the command to the list of commands
         self.add_command(command)
@@ -4434,6 +4436,7 @@ class Remote(object):
 
         # Create the pexpect child instance
         child = pexpect.spawn(copy_command, timeout=timeout)
+        count("scp downloads")
         if self.host.password is not None:
             index = child.expect(['password: ', pexpect.EOF])
             if index == 0: child.sendline(self.host.password)
@@ -4705,6 +4708,7 @@ class Remote(object):
 
         # Create the pexpect child instance
         child = pexpect.spawn(copy_command, timeout=timeout)
+        count("scp uploads")
         if self.host.password is not None:
             index = child.expect(['password: ', pexpect.EOF])
             if index == 0: child.sendline(self.host.password)
@@ -22,6 +22,7 @@ from pts.core.basics.log import log
 from pts.core.units.unit import PhotometricUnit
 from pts.core.units.parsing import parse_unit as u
 from pts.core.units.parsing import parse_quantity
+from pts.core.units.quantity import multiply_with_units, divide_with_units
 from pts.core.tools import filesystem as fs
 from pts.core.data.sed import SED, ObservedSED
 from pts.core.plot.sed import SEDPlotter
@@ -150,6 +151,9 @@ class UnitsTest(TestImplementation):
         # Test flux conversions
         self.test_fluxes()
 
+        # Test that parsed units are not changed by calculations
+        self.test_scaled_units()
+
     # -----------------------------------------------------------------
 
     def test_names(self):
@@ -171,6 +175,26 @@ class UnitsTest(TestImplementation):
 
     # -----------------------------------------------------------------
 
+    def test_scaled_units(self):
+
+        """
+        This function tests that multiplying or dividing by a scaled unit does not change the (cached) parsed unit
+        :return:
+        """
+
+        # Twice, with the same parsed unit
+        for _ in range(2):
+
+            value, unit = multiply_with_units(2., None, u("1e3 pc"))
+            assert np.isclose(value, 2e3) and unit == u("pc")
+
+            value, unit = divide_with_units(2., None, u("1e3 pc"))
+            assert np.isclose(value, 2e-3) and unit == u("pc")**-1
+
+        assert u("1e3 pc").scale == 1e3
+
+    # -----------------------------------------------------------------
+
     def test_fluxes(self):
 
         """
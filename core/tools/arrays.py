@@ -19,6 +19,7 @@ import numpy as np
 # Import the relevant PTS classes and modules
 from ..units.parsing import parse_unit
 from ..units.quantity import PhotometricQuantity
+from ..units.unit import PhotometricUnit
 
 # -----------------------------------------------------------------
 
@@ -263,7 +264,9 @@ def plain_array(column, unit=None, array_unit=None, conversion_info=None, densit
         # Same unit as column?
         if unit == array_unit: return _column_to_array(column, mask=mask)
 
-        #elif TODO: CAN THERE BE ONE CONVERSION FACTOR FOR THE ENTIRE ARRAY?
+        # Photometric units: convert with one conversion factor for the entire array, or one for each wavelength
+        elif isinstance(unit, PhotometricUnit) and isinstance(array_unit, PhotometricUnit) and equivalencies is None:
+            return _converted_array_from_column(column, unit, array_unit, conversion_info=conversion_info, mask=mask)
 
         else: return _plain_array_from_column(column, unit=unit, array_unit=array_unit, conversion_info=conversion_info,
                                               equivalencies=equivalencies, mask=mask)
@@ -292,6 +295,39 @@ def _column_to_array(column, mask=None):
 
 # -----------------------------------------------------------------
 
+def _converted_array_from_column(column, unit, array_unit, conversion_info=None, mask=None):
+
+    """
+    This function converts the values of a column from one photometric unit to another, all at once
+    :param column:
+    :param unit:
+    :param array_unit:
+    :param conversion_info:
+    :param mask:
+    :return:
+    """
+
+    # Get the conversion info
+    conversion_info = copy.copy(conversion_info) if conversion_info is not None else dict()
+    wavelengths = conversion_info.pop("wavelengths", None)
+    if "filter" in conversion_info: conversion_info["fltr"] = conversion_info.pop("filter")
+
+    # Get the values, with NaN for masked values
+    values = np.array(column, dtype=float)
+    if hasattr(column, "mask"): values[np.asarray(column.mask, dtype=bool)] = float('nan')
+
+    # Convert
+    if wavelengths is not None:
+        conversion_info.pop("wavelength", None)
+        values *= array_unit.conversion_factors(unit, wavelengths, **conversion_info)
+    else: values *= array_unit.conversion_factor(unit, **conversion_info)
+
+    # Return
+    if mask is not None: values = values[np.logical_not(mask)]
+    return values
+
+# -----------------------------------------------------------------
+
 def _plain_array_from_column(column, unit=None, array_unit=None, conversion_info=None, density=False, brightness=False,
                             equivalencies=None, mask=None):
 
@@ -27,6 +27,7 @@ from itertools import takewhile
 
 # Import the relevant PTS classes and modules
 from . import time
+from .profiling import profiler, count
 from . import types
 from . import sequences
 from . import strings
@@ -2020,6 +2021,22 @@ def get_lines_filehandle(fh, newlines=False):
 
 # -----------------------------------------------------------------
 
+def _count_bytes(name, fh):
+
+    """
+    This function adds the position of a file handle (the number of bytes read or written) to a counter of the profiler
+    :param name:
+    :param fh:
+    :return:
+    """
+
+    # The file can be a pipe or another stream without position
+    try: position = fh.tell()
+    except (IOError, OSError, ValueError): return
+    count(name, position)
+
+# -----------------------------------------------------------------
+
 def read_lines(path, newlines=False):
 
     """
@@ -2035,6 +2052,7 @@ def read_lines(path, newlines=False):
     # Open the file
     with open(path, 'r') as fh:
         for line in read_lines_filehandle(fh, newlines=newlines): yield line
+        if profiler.enabled: _count_bytes("bytes read", fh)
 
 # -----------------------------------------------------------------
 
@@ -2671,7 +2689,9 @@ def write_line(filepath, line):
     :return:
     """
 
-    with open(filepath, 'w') as fh: fh.write(line + "\n")
+    with open(filepath, 'w') as fh:
+        fh.write(line + "\n")
+        if profiler.enabled: _count_bytes("bytes written", fh)
 
 # -----------------------------------------------------------------
 
@@ -2686,6 +2706,7 @@ def write_lines(filepath, lines):
 
     with open(filepath, 'w') as fh:
         for line in lines: fh.write(line + "\n")
+        if profiler.enabled: _count_bytes("bytes written", fh)
 
 # -----------------------------------------------------------------
 
@@ -2720,7 +2741,9 @@ def write_text(filepath, text):
     :return:
     """
 
-    with open(filepath, 'w') as fh: fh.write(text + "\n")
+    with open(filepath, 'w') as fh:
+        fh.write(text + "\n")
+        if profiler.enabled: _count_bytes("bytes written", fh)
 
 # -----------------------------------------------------------------
 
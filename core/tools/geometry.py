@@ -133,14 +133,40 @@ class Transform:
         return (P[0,0], P[0,1], P[0,2], P[0,3])
 
     ## This function returns the transformed coordinates for the specified sets input coordinates,
-    # specified as numpy arrays.
-    # TODO: improve efficiencey via either np.vectorize or explicit elementwise matrix multiplication
-    def transform_vec(self, x, y, z, w):
+    # specified as numpy arrays. The coordinates are transformed with one matrix multiplication per chunk
+    # of at most \em chunksize points.
+    def transform_vec(self, x, y, z, w, chunksize=1000000):
         n = x.size
-        crds = np.zeros((n, 4))
-        for i in range(n):
-            P = np.matrix(( x[i], y[i], z[i], w[i] )) * self.T
-            crds[i] = np.asarray(P)[0,:]
+        T = np.asarray(self.T)
+        crds = np.empty((n, 4))
+        for start in range(0, n, chunksize):
+            s = slice(start, start+chunksize)
+            crds[s] = np.dot(np.column_stack((x[s], y[s], z[s], w[s])), T)
         return crds[:,:3], crds[:,3]
 
+    ## This function returns the transformed coordinates for the specified homogeneous coordinates, given as
+    # a numpy array of shape (N,4). The coordinates are transformed with one matrix multiplication per chunk
+    # of at most \em chunksize points. If an output array of shape (N,4) is specified, the result is stored
+    # in that array, which may be the input array itself (i.e. the coordinates can be transformed in place).
+    def transform_array(self, crds, out=None, chunksize=1000000):
+        T = np.asarray(self.T)
+        if out is None: out = np.empty(crds.shape)
+        for start in range(0, crds.shape[0], chunksize):
+            s = slice(start, start+chunksize)
+            out[s] = np.dot(crds[s], T)
+        return out
+
+    ## This function returns the transformed positions for the specified positions, given as a numpy array of
+    # shape (N,3), assuming a w coordinate of one for all positions. The transformed w coordinate is dropped,
+    # so this function is intended for affine transforms (without perspective). The positions are transformed
+    # per chunk of at most \em chunksize points. If an output array of shape (N,3) is specified, the result is
+    # stored in that array, which may be the input array itself (i.e. the positions can be transformed in place).
+    def transform_positions(self, r, out=None, chunksize=1000000):
+        T = np.asarray(self.T)
+        if out is None: out = np.empty(r.shape)
+        for start in range(0, r.shape[0], chunksize):
+            s = slice(start, start+chunksize)
+            out[s] = np.dot(r[s], T[:3,:3]) + T[3,:3]
+        return out
+
 # -----------------------------------------------------------------
@@ -14,6 +14,7 @@
 from __future__ import absolute_import, division, print_function
 
 # Import standard modules
+import os
 import getpass
 import traceback
 from os import devnull
@@ -30,6 +31,10 @@ from distutils.spawn import find_executable
 from importlib import import_module
 from collections import OrderedDict
 
+# Import the C implementation of pickle (the pure-Python pickle of Python 2 is too slow for reading the command index)
+try: import cPickle as pickle
+except ImportError: import pickle
+
 # Import the relevant PTS classes and modules
 from . import filesystem as fs
 from ..basics.map import Map
@@ -2265,6 +2270,73 @@ def get_arguments_tables():
 
 # -----------------------------------------------------------------
 
+# The path of the command index file
+command_index_path = fs.join(pts_user_dir, "commands.index")
+
+# -----------------------------------------------------------------
+
+def command_index_sources():
+
+    """
+    This function returns the modification times of the files and directories from which the command index is
+    created: the commands.dat file of each subproject, and the (subproject) directories of the 'do' subpackage
+    :return:
+    """
+
+    paths = [fs.join(pts_subproject_dir(subproject), "commands.dat") for subproject in subprojects]
+    paths.append(pts_do_dir)
+    paths += [fs.join(pts_do_dir, name) for name in sorted(os.listdir(pts_do_dir))]
+    return dict((path, os.path.getmtime(path) if os.path.exists(path) else None) for path in paths)
+
+# -----------------------------------------------------------------
+
+def create_command_index():
+
+    """
+    This function creates the command index: the do scripts and the argument tables of the subprojects
+    :return:
+    """
+
+    return Map(scripts=get_scripts(), tables=get_arguments_tables())
+
+# -----------------------------------------------------------------
+
+def load_command_index():
+
+    """
+    This function returns the command index (see create_command_index). The index is read from its file in the PTS
+    user directory, unless one of the commands.dat files or 'do' directories has changed since the file was written:
+    then the index is created again (and written).
+    :return:
+    """
+
+    # Get the current modification times
+    sources = command_index_sources()
+
+    # Read the index file (the scripts and tables are stored as plain lists and dictionaries)
+    if fs.is_file(command_index_path):
+
+        try:
+            with open(command_index_path, "rb") as fh: index_sources, scripts, tables = pickle.load(fh)
+            if index_sources == sources: return Map(scripts=scripts, tables=tables)
+        except Exception: pass # invalid or incompatible index file: create it again
+
+    # Create the index
+    index = create_command_index()
+
+    # Write the index file (to a temporary file first, for concurrent invocations)
+    temp_path = command_index_path + "." + str(os.getpid())
+    try:
+        with open(temp_path, "wb") as fh: pickle.dump((sources, index.scripts, dict(index.tables)), fh, pickle.HIGHEST_PROTOCOL)
+        os.rename(temp_path, command_index_path)
+    except (IOError, OSError):
+        if fs.is_file(temp_path): fs.remove_file(temp_path)
+
+    # Return the index
+    return index
+
+# -----------------------------------------------------------------
+
 def skip_module(name, path=None):
 
     """
@@ -245,6 +245,56 @@ def resample_log_log(xresv, xoriv, yoriv):
 
 # -----------------------------------------------------------------
 
+def resample_log_log_array(xresv, xoriv, yoriv):
+
+    """
+    This function does the same as resample_log_log, but for all new grid points at once, and for a 2D array of
+    function values (one row per function) as well
+    :param xresv:
+    :param xoriv:
+    :param yoriv: array of shape (..., len(xoriv))
+    :return: array of shape (..., len(xresv))
+    """
+
+    xresv = np.asarray(xresv, dtype=np.float64)
+    xoriv = np.asarray(xoriv, dtype=np.float64)
+    yoriv = np.asarray(yoriv, dtype=np.float64)
+    Nori = len(xoriv)
+    xmin = xoriv[0]
+    xmax = xoriv[Nori-1]
+
+    # Determine the kind of each new grid point
+    at_min = np.abs(1.0 - xresv/xmin) < 1e-5
+    at_max = np.logical_not(at_min) & (np.abs(1.0 - xresv/xmax) < 1e-5)
+    inside = np.logical_not(at_min | at_max) & (xresv >= xmin) & (xresv <= xmax)
+
+    # Locate the new grid points in the original grid (as locate)
+    k = np.clip(np.searchsorted(xoriv, xresv, side="right") - 1, 0, Nori-2)
+    k[xresv == xmax] = Nori-2
+
+    # Interpolate, logarithmically in the function values only where both values are positive
+    x = np.log10(xresv)
+    x1 = np.log10(xoriv[k])
+    x2 = np.log10(xoriv[k+1])
+    f1 = yoriv[..., k]
+    f2 = yoriv[..., k+1]
+    logf = (f1 > 0) & (f2 > 0)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        h = (x-x1) / (x2-x1)
+        linear = f1 + h * (f2-f1)
+        logarithmic = np.power(10., np.log10(f1) + h * (np.log10(f2) - np.log10(f1)))
+    yresv = np.where(logf, logarithmic, linear)
+
+    # Set the values at the borders and beyond the original grid
+    yresv = np.where(inside, yresv, 0.0)
+    yresv = np.where(at_min, yoriv[..., :1], yresv)
+    yresv = np.where(at_max, yoriv[..., -1:], yresv)
+
+    # Return the interpolated values
+    return yresv
+
+# -----------------------------------------------------------------
+
 def interpolate(x, x1, x2, f1, f2):
 
     """
@@ -0,0 +1,448 @@
+#!/usr/bin/env python
+# -*- coding: utf8 -*-
+# *****************************************************************
+# **       PTS -- Python Toolkit for working with SKIRT          **
+# **       © Astronomical Observatory, Ghent University          **
+# *****************************************************************
+
+## \package pts.core.tools.profiling Provides opt-in, hierarchical timing instrumentation for PTS commands: nested
+#  spans with their duration, the growth of the peak memory usage and counters (e.g. bytes written or SSH round trips),
+#  which can be shown as a table or written as a trace file for the Chrome trace viewer (chrome://tracing, Perfetto,
+#  speedscope).
+
+# -----------------------------------------------------------------
+
+# Ensure Python 3 compatibility
+from __future__ import absolute_import, division, print_function
+
+# Import standard modules
+import os
+import sys
+import json
+import time
+from functools import wraps
+from contextlib import contextmanager
+from collections import OrderedDict
+
+# Import the resource module (not available on Windows)
+try: import resource
+except ImportError: resource = None
+
+# -----------------------------------------------------------------
+
+def peak_memory():
+
+    """
+    This function returns the peak memory usage (resident set size) of the current process, in bytes
+    :return:
+    """
+
+    if resource is None: return None
+    maxrss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss # kilobytes on Linux, bytes on OS X
+    if sys.platform == "darwin": return maxrss
+    else: return maxrss * 1024
+
+# -----------------------------------------------------------------
+
+class Span(object):
+
+    """
+    This class represents a timed block of code, with nested spans, the growth of the peak memory usage and counters
+    """
+
+    def __init__(self, name, category=None, parent=None):
+
+        """
+        The constructor ...
+        :param name:
+        :param category:
+        :param parent:
+        """
+
+        self.name = name
+        self.category = category
+        self.parent = parent
+        self.children = []
+        self.counters = OrderedDict()
+
+        # The start and end time, the peak memory usage at the start and end
+        self.start = None
+        self.end = None
+        self.start_memory = None
+        self.end_memory = None
+
+    # -----------------------------------------------------------------
+
+    def open(self):
+
+        """
+        This function ...
+        :return:
+        """
+
+        self.start_memory = peak_memory()
+        self.start = time.time()
+
+    # -----------------------------------------------------------------
+
+    def close(self):
+
+        """
+        This function ...
+        :return:
+        """
+
+        self.end = time.time()
+        self.end_memory = peak_memory()
+
+    # -----------------------------------------------------------------
+
+    @property
+    def closed(self):
+        return self.end is not None
+
+    # -----------------------------------------------------------------
+
+    @property
+    def duration(self):
+
+        """
+        This function returns the duration in seconds (up to now for a span that is not closed)
+        :return:
+        """
+
+        end = self.end if self.closed else time.time()
+        return end - self.start
+
+    # -----------------------------------------------------------------
+
+    @property
+    def self_duration(self):
+
+        """
+        This function returns the duration that is not spent in nested spans
+        :return:
+        """
+
+        return self.duration - sum(child.duration for child in self.children)
+
+    # -----------------------------------------------------------------
+
+    @property
+    def memory_increase(self):
+
+        """
+        This function returns the increase of the peak memory usage during the span, in bytes
+        :return:
+        """
+
+        if self.start_memory is None: return None
+        end_memory = self.end_memory if self.closed else peak_memory()
+        return end_memory - self.start_memory
+
+    # -----------------------------------------------------------------
+
+    def add_count(self, name, amount=1):
+
+        """
+        This function ...
+        :param name:
+        :param amount:
+        :return:
+        """
+
+        if name in self.counters: self.counters[name] += amount
+        else: self.counters[name] = amount
+
+    # -----------------------------------------------------------------
+
+    def total_counters(self):
+
+        """
+        This function returns the counters of this span and its nested spans
+        :return:
+        """
+
+        counters = OrderedDict(self.counters)
+        for child in self.children:
+            for name, amount in child.total_counters().items():
+                counters[name] = counters.get(name, 0) + amount
+        return counters
+
+# -----------------------------------------------------------------
+
+class Profiler(object):
+
+    """
+    This class keeps the tree of spans of a PTS command. When the profiler is not enabled, spans and counters have
+    (almost) no cost.
+    """
+
+    def __init__(self):
+
+        """
+        The constructor ...
+        """
+
+        self.enabled = False
+        self.root = None
+        self.stack = []
+
+    # -----------------------------------------------------------------
+
+    def enable(self, name="pts"):
+
+        """
+        This function enables the profiler and opens the root span
+        :param name:
+        :return:
+        """
+
+        self.root = Span(name, category="command")
+        self.root.open()
+        self.stack = [self.root]
+        self.enabled = True
+
+    # -----------------------------------------------------------------
+
+    def disable(self):
+
+        """
+        This function closes all open spans and disables the profiler (the collected spans are kept)
+        :return:
+        """
+
+        while self.stack: self.stack.pop().close()
+        self.enabled = False
+
+    # -----------------------------------------------------------------
+
+    @contextmanager
+    def span(self, name, category=None):
+
+        """
+        This function times the enclosed block as a span nested in the current span
+        :param name:
+        :param category:
+        :return:
+        """
+
+        # Not enabled
+        if not self.enabled:
+            yield None
+            return
+
+        # Create and open the span
+        parent = self.stack[-1]
+        span = Span(name, category=category, parent=parent)
+        parent.children.append(span)
+        self.stack.append(span)
+        span.open()
+
+        # Close the span, also when an exception occurs
+        try: yield span
+        finally:
+            span.close()
+            if self.stack and self.stack[-1] is span: self.stack.pop()
+
+    # -----------------------------------------------------------------
+
+    def count(self, name, amount=1):
+
+        """
+        This function adds to a counter of the current span
+        :param name:
+        :param amount:
+        :return:
+        """
+
+        if self.enabled and self.stack: self.stack[-1].add_count(name, amount)
+
+    # -----------------------------------------------------------------
+
+    def rows(self):
+
+        """
+        This function returns the rows of the profile table: the spans with the same name in the same parent are
+        combined, with their number of calls
+        :return:
+        """
+
+        rows = []
+
+        def add_rows(spans, depth):
+
+            # Combine the spans with the same name, in the order of their first occurence
+            combined = OrderedDict()
+            for span in spans: combined.setdefault(span.name, []).append(span)
+
+            for name, group in combined.items():
+
+                counters = OrderedDict()
+                for span in group:
+                    for key, amount in span.counters.items(): counters[key] = counters.get(key, 0) + amount
+
+                memory = [span.memory_increase for span in group if span.memory_increase is not None]
+                rows.append((depth, name, len(group), sum(span.duration for span in group),
+                             sum(span.self_duration for span in group), max(memory) if memory else None, counters))
+                add_rows([child for span in group for child in span.children], depth + 1)
+
+        if self.root is not None: add_rows([self.root], 0)
+        return rows
+
+    # -----------------------------------------------------------------
+
+    def show(self):
+
+        """
+        This function shows the profile table
+        :return:
+        """
+
+        from ..basics.log import log
+
+        if self.root is None: return
+
+        log.info("Profile of " + self.root.name + " (total time, self time, growth of the peak memory usage, counters):")
+        for depth, name, ncalls, total, self_total, memory, counters in self.rows():
+
+            line = "  " * depth + name
+            if ncalls > 1: line += " (" + str(ncalls) + "x)"
+            line = line.ljust(60) + "{:10.3f} s {:10.3f} s".format(total, self_total)
+            if memory is not None: line += "{:10.1f} MB".format(memory / 1e6)
+            if counters: line += "   " + ", ".join(key + ": " + str(amount) for key, amount in counters.items())
+            log.info(line)
+
+        if resource is not None: log.info("Peak memory usage: " + "{:.1f}".format(peak_memory() / 1e6) + " MB")
+
+    # -----------------------------------------------------------------
+
+    def trace_events(self):
+
+        """
+        This function returns the spans as 'complete' events of the Chrome trace event format
+        :return:
+        """
+
+        events = []
+        if self.root is None: return events
+        pid = os.getpid()
+        origin = self.root.start
+
+        def add_events(span):
+
+            args = OrderedDict(span.counters)
+            if span.memory_increase is not None: args["peak memory increase [MB]"] = span.memory_increase / 1e6
+            events.append({"name": span.name, "cat": span.category if span.category is not None else "block", "ph": "X",
+                           "ts": (span.start - origin) * 1e6, "dur": span.duration * 1e6, "pid": pid, "tid": 0, "args": args})
+            for child in span.children: add_events(child)
+
+        add_events(self.root)
+        return events
+
+    # -----------------------------------------------------------------
+
+    def write_trace(self, path):
+
+        """
+        This function writes the spans as a Chrome trace file (JSON)
+        :param path:
+        :return:
+        """
+
+        with open(path, 'w') as fh: json.dump({"traceEvents": self.trace_events(), "displayTimeUnit": "ms"}, fh)
+
+# -----------------------------------------------------------------
+
+# The profiler of the PTS process
+profiler = Profiler()
+
+# -----------------------------------------------------------------
+
+def profile_span(name, category=None):
+
+    """
+    This function times a block of code as a span of the profiler, e.g.
+    with profile_span("Loading the images"): ...
+    :param name:
+    :param category:
+    :return:
+    """
+
+    return profiler.span(name, category=category)
+
+# -----------------------------------------------------------------
+
+def profiled(name=None, category=None):
+
+    """
+    This function is a decorator that times every call of the decorated function as a span of the profiler
+    :param name: the name of the spans (the qualified name of the function by default)
+    :param category:
+    :return:
+    """
+
+    def decorator(function):
+
+        span_name = name if name is not None else function.__module__ + "." + function.__name__
+
+        @wraps(function)
+        def wrapper(*args, **kwargs):
+            if not profiler.enabled: return function(*args, **kwargs)
+            with profiler.span(span_name, category=category): return function(*args, **kwargs)
+
+        return wrapper
+
+    return decorator
+
+# -----------------------------------------------------------------
+
+def count(name, amount=1):
+
+    """
+    This function adds to a counter of the current span of the profiler (if enabled)
+    :param name:
+    :param amount:
+    :return:
+    """
+
+    if profiler.enabled: profiler.count(name, amount)
+
+# -----------------------------------------------------------------
+
+def start_profiling(name="pts"):
+
+    """
+    This function enables the profiler, and the statistics of the suppressed log messages per call site
+    :param name:
+    :return:
+    """
+
+    from ..basics.log import log
+
+    profiler.enable(name)
+    log.profile_suppressed()
+
+# -----------------------------------------------------------------
+
+def finish_profiling(path=None):
+
+    """
+    This function stops the profiler, shows the profile table and the call sites with the most suppressed log
+    messages, and writes the trace file
+    :param path: the path of the trace file (none: not written)
+    :return:
+    """
+
+    from ..basics.log import log
+
+    if profiler.root is None: return
+    profiler.disable()
+    profiler.show()
+    log.profile_suppressed(False)
+    log.show_suppressed()
+    if path is not None:
+        profiler.write_trace(path)
+        log.info("The profile trace has been written to '" + path + "'")
+
+# -----------------------------------------------------------------
@@ -15,6 +15,11 @@ from __future__ import absolute_import, division, print_function
 # Import standard modules
 import os
 import copy
+import time
+import pickle
+import shutil
+import hashlib
+import numbers
 from collections import OrderedDict, Set
 from functools import wraps, partial
 
@@ -297,6 +302,430 @@ class lazyproperty(property):
 
 # -----------------------------------------------------------------
 
+def data_arrays(value, arrays=None):
+
+    """
+    This function collects the distinct data arrays held by a (data) product: numpy arrays, frames, images and data
+    cubes (by their frames), tables (by their columns), and dictionaries or lists of these. Views are traced back to the
+    array that owns the data, so that an array that is shared by several products (or several frames of a product) is
+    only counted once.
+    :param value:
+    :param arrays: dictionary of the arrays that have already been collected (id -> number of bytes)
+    :return: dictionary with the id and the size (in bytes) of each array
+    """
+
+    if arrays is None: arrays = OrderedDict()
+    if value is None: return arrays
+
+    # Numpy array (or other object with a byte count)
+    nbytes = getattr(value, "nbytes", None)
+    if isinstance(nbytes, numbers.Integral):
+
+        # Find the array that owns the data
+        while isinstance(getattr(getattr(value, "base", None), "nbytes", None), numbers.Integral): value = value.base
+        arrays.setdefault(id(value), int(value.nbytes))
+        return arrays
+
+    # Dictionary or sequence of products
+    if isinstance(value, dict): items = value.values()
+    elif isinstance(value, (list, tuple)): items = value
+
+    # Table, image or data cube, frame
+    else: items = product_items(value)
+
+    for item in items: data_arrays(item, arrays)
+    return arrays
+
+# -----------------------------------------------------------------
+
+def product_items(value):
+
+    """
+    This function returns the parts of a (data) product that hold its data: the columns of a table, the frames of an
+    image or data cube, or the data of a frame
+    :param value:
+    :return:
+    """
+
+    # Table
+    columns = getattr(value, "columns", None)
+    if columns is not None and hasattr(columns, "values"): return columns.values()
+
+    # Image or data cube
+    frames = getattr(value, "frames", None)
+    if frames is not None and hasattr(frames, "values"): return frames.values()
+
+    # Frame
+    data = getattr(value, "data", None)
+    if data is not None and data is not value: return [data]
+
+    # Unknown
+    return []
+
+# -----------------------------------------------------------------
+
+def estimate_nbytes(value):
+
+    """
+    This function estimates the memory size (in bytes) of the data held by a (data) product (see data_arrays)
+    :param value:
+    :return:
+    """
+
+    return sum(data_arrays(value).values())
+
+# -----------------------------------------------------------------
+
+# The statistics of the product caches, by name (summed over the caches with the same name, also after they are gone)
+product_cache_registry = OrderedDict()
+
+# -----------------------------------------------------------------
+
+class ProductCache(object):
+
+    """
+    This class keeps the (data) products of an object within a memory budget. When adding a product makes the total
+    estimated size exceed the budget, the least recently used products are evicted. Evicted products that can be
+    written to and read from file (having a 'saveto' method and a 'from_file' class method) are written to a temporary
+    directory and are transparently reloaded when they are accessed again; other evicted products are recomputed.
+    Data arrays that are shared by several products are counted once.
+    """
+
+    def __init__(self, budget=None, spill=True, spill_path=None, name=None):
+
+        """
+        The constructor ...
+        :param budget: the memory budget in bytes (None means no limit)
+        :param spill: write evicted products to file so that they can be reloaded instead of recomputed
+        :param spill_path: the directory for the evicted products (a temporary directory is created if None)
+        :param name: the name under which the statistics are added to the registry (None means not registered)
+        """
+
+        # The memory budget
+        self.budget = budget
+
+        # Spilling
+        self.spill = spill
+        self._spill_path = spill_path
+        self._temporary_spill_path = False
+
+        # The products, from least to most recently used, and the ids of their data arrays
+        self.products = OrderedDict()
+        self.product_arrays = dict()
+
+        # The data arrays of the products in memory: id -> [number of bytes, number of products]
+        self.arrays = dict()
+
+        # The paths of the evicted products that have been written to file
+        self.spilled = dict()
+
+        # The statistics
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.reloads = 0
+
+        # Register
+        self.name = name
+        if name is not None and name not in product_cache_registry:
+            product_cache_registry[name] = OrderedDict([("hits", 0), ("misses", 0), ("evictions", 0), ("reloads", 0)])
+
+    # -----------------------------------------------------------------
+
+    def count(self, event):
+
+        """
+        This function counts a hit, miss, eviction or reload, also in the registry
+        :param event:
+        :return:
+        """
+
+        setattr(self, event, getattr(self, event) + 1)
+        if self.name is not None: product_cache_registry[self.name][event] += 1
+
+    # -----------------------------------------------------------------
+
+    @property
+    def nbytes(self):
+
+        """
+        This function returns the total estimated size of the products in memory
+        :return:
+        """
+
+        return sum(nbytes for nbytes, _ in self.arrays.values())
+
+    # -----------------------------------------------------------------
+
+    @property
+    def nproducts(self):
+
+        """
+        This function ...
+        :return:
+        """
+
+        return len(self.products)
+
+    # -----------------------------------------------------------------
+
+    @property
+    def spill_path(self):
+
+        """
+        This function ...
+        :return:
+        """
+
+        if self._spill_path is None:
+            from . import introspection
+            self._spill_path = introspection.create_unique_temp_dir("product_cache")
+            self._temporary_spill_path = True
+        return self._spill_path
+
+    # -----------------------------------------------------------------
+
+    def __contains__(self, key):
+
+        """
+        This function ...
+        :param key:
+        :return:
+        """
+
+        return key in self.products
+
+    # -----------------------------------------------------------------
+
+    def get(self, key, compute):
+
+        """
+        This function returns the product with the specified key: from memory, by reloading it from file if it was
+        evicted, or by calling the compute function
+        :param key:
+        :param compute: function without arguments that creates the product
+        :return:
+        """
+
+        # In memory: mark as most recently used
+        if key in self.products:
+
+            self.count("hits")
+            value = self.products.pop(key)
+            self.products[key] = value
+            return value
+
+        # Reload or compute
+        self.count("misses")
+        if key in self.spilled:
+
+            path, cls = self.spilled.pop(key)
+            try:
+                value = cls.from_file(path)
+                self.count("reloads")
+            except Exception: value = compute() # the product could not be reloaded
+            finally: os.remove(path)
+
+        else: value = compute()
+
+        # Add
+        self.put(key, value)
+        return value
+
+    # -----------------------------------------------------------------
+
+    def put(self, key, value):
+
+        """
+        This function adds (or replaces) a product
+        :param key:
+        :param value:
+        :return:
+        """
+
+        self.remove(key)
+        self.products[key] = value
+        self.add_arrays(key, value)
+        self.shrink(keep=key)
+
+    # -----------------------------------------------------------------
+
+    def add_arrays(self, key, value):
+
+        """
+        This function registers the data arrays of a product
+        :param key:
+        :param value:
+        :return:
+        """
+
+        arrays = data_arrays(value)
+        for array_id, nbytes in arrays.items():
+            if array_id in self.arrays: self.arrays[array_id][1] += 1
+            else: self.arrays[array_id] = [nbytes, 1]
+        self.product_arrays[key] = list(arrays.keys())
+
+    # -----------------------------------------------------------------
+
+    def remove_arrays(self, key):
+
+        """
+        This function unregisters the data arrays of a product
+        :param key:
+        :return:
+        """
+
+        for array_id in self.product_arrays.pop(key):
+            self.arrays[array_id][1] -= 1
+            if self.arrays[array_id][1] == 0: del self.arrays[array_id]
+
+    # -----------------------------------------------------------------
+
+    def remove(self, key):
+
+        """
+        This function removes a product, without writing it to file
+        :param key:
+        :return:
+        """
+
+        if key in self.products:
+            del self.products[key]
+            self.remove_arrays(key)
+        if key in self.spilled:
+            path = self.spilled.pop(key)[0]
+            if os.path.isfile(path): os.remove(path)
+
+    # -----------------------------------------------------------------
+
+    def shrink(self, keep=None):
+
+        """
+        This function evicts the least recently used products until the memory budget is respected
+        :param keep: the key of a product that should not be evicted (e.g. the one that was just added)
+        :return:
+        """
+
+        if self.budget is None: return
+        for key in list(self.products.keys()):
+            if self.nbytes <= self.budget: break
+            if key == keep: continue
+            self.evict(key)
+
+    # -----------------------------------------------------------------
+
+    def evict(self, key):
+
+        """
+        This function removes a product from memory, writing it to file if possible
+        :param key:
+        :return:
+        """
+
+        value = self.products.pop(key)
+        self.remove_arrays(key)
+        self.count("evictions")
+
+        # Write to file
+        cls = type(value)
+        if self.spill and hasattr(value, "saveto") and hasattr(cls, "from_file"):
+
+            extension = getattr(cls, "default_extension", "dat")
+            path = os.path.join(self.spill_path, str(key) + "." + extension)
+            value.saveto(path)
+            self.spilled[key] = (path, cls)
+
+    # -----------------------------------------------------------------
+
+    def clear(self):
+
+        """
+        This function removes all products
+        :return:
+        """
+
+        for key in list(self.products.keys()) + list(self.spilled.keys()): self.remove(key)
+
+    # -----------------------------------------------------------------
+
+    def close(self):
+
+        """
+        This function removes all products, and the temporary directory for the evicted products
+        :return:
+        """
+
+        self.clear()
+        if self._temporary_spill_path:
+            if os.path.isdir(self._spill_path): shutil.rmtree(self._spill_path)
+            self._spill_path = None
+            self._temporary_spill_path = False
+
+    # -----------------------------------------------------------------
+
+    def __del__(self):
+
+        """
+        The destructor ...
+        :return:
+        """
+
+        # Remove the temporary directory (the modules can already be gone when the interpreter exits)
+        if self._temporary_spill_path:
+            try: self.close()
+            except Exception: pass
+
+    # -----------------------------------------------------------------
+
+    @property
+    def statistics(self):
+
+        """
+        This function returns the cache statistics
+        :return:
+        """
+
+        return OrderedDict([("products", self.nproducts), ("nbytes", self.nbytes), ("budget", self.budget),
+                            ("hits", self.hits), ("misses", self.misses), ("evictions", self.evictions),
+                            ("reloads", self.reloads), ("spilled", len(self.spilled))])
+
+# -----------------------------------------------------------------
+
+class productproperty(lazyproperty):
+
+    """
+    Works like lazyproperty, but if the object has a ProductCache (as the '_product_cache' attribute), the value is
+    kept in that cache, so that it can be evicted when the memory budget is exceeded and reloaded or recomputed when
+    it is accessed again.
+    """
+
+    def __get__(self, obj, owner=None):
+
+        if obj is None: return self
+        cache = obj.__dict__.get("_product_cache")
+        if cache is None: return super(productproperty, self).__get__(obj, owner)
+        return cache.get(self._key, partial(self.fget, obj))
+
+    # -----------------------------------------------------------------
+
+    def __set__(self, obj, val):
+
+        cache = obj.__dict__.get("_product_cache")
+        if cache is None: return super(productproperty, self).__set__(obj, val)
+        if self.fset: self.fset(obj, val)
+        cache.put(self._key, val)
+
+    # -----------------------------------------------------------------
+
+    def __delete__(self, obj):
+
+        cache = obj.__dict__.get("_product_cache")
+        if cache is None: return super(productproperty, self).__delete__(obj)
+        if self.fdel: self.fdel(obj)
+        cache.remove(self._key)
+
+# -----------------------------------------------------------------
+
 class lazyfileproperty(object):
 
     """
@@ -801,6 +1230,420 @@ class memoize_method_reset(object):
 
 # -----------------------------------------------------------------
 
+# The caches of the bounded memoized functions and methods, by name
+memoize_registry = OrderedDict()
+
+# -----------------------------------------------------------------
+
+class MemoizeCache(object):
+
+    """
+    This class is the cache of a bounded memoized function. It keeps the return values for at most 'maxsize' argument
+    combinations (and optionally at most 'maxbytes' of estimated memory), evicting the least recently used ones, and
+    optionally lets the values expire after 'ttl' seconds. If a directory path is given, the values are also written to
+    disk so that they are reused by later processes. It counts the calls, hits, misses and the computation time saved.
+    """
+
+    def __init__(self, name, maxsize=128, ttl=None, maxbytes=None, path=None):
+
+        """
+        The constructor ...
+        :param name: the name of the cache (in the registry)
+        :param maxsize: the maximum number of values (None means no limit)
+        :param ttl: the time (in seconds) after which a value expires (None means never)
+        :param maxbytes: the maximum estimated memory size of the values in bytes (None means no limit)
+        :param path: the directory for the on-disk backend (None means no on-disk backend)
+        """
+
+        self.name = name
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.maxbytes = maxbytes
+        self.path = path
+
+        # The entries, from least to most recently used: key -> (value, creation time, computation time, nbytes)
+        self.entries = OrderedDict()
+        self.nbytes = 0
+
+        # The statistics
+        self.calls = 0
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.uncacheable = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.time_saved = 0.0
+
+    # -----------------------------------------------------------------
+
+    @property
+    def size(self):
+
+        """
+        This function ...
+        :return:
+        """
+
+        return len(self.entries)
+
+    # -----------------------------------------------------------------
+
+    def expired(self, created):
+
+        """
+        This function ...
+        :param created:
+        :return:
+        """
+
+        return self.ttl is not None and time.time() - created > self.ttl
+
+    # -----------------------------------------------------------------
+
+    def __call__(self, function, args, kwargs):
+
+        """
+        This function returns the (cached) return value of the function for the specified arguments
+        :param function:
+        :param args:
+        :param kwargs:
+        :return:
+        """
+
+        # Create the key
+        key = args + (_kwargs_marker,) + tuple(sorted(kwargs.items())) if kwargs else args
+
+        # Get the value
+        return self.get(key, partial(function, *args, **kwargs))
+
+    # -----------------------------------------------------------------
+
+    def get(self, key, compute):
+
+        """
+        This function returns the cached value for the specified key, or calls the compute function (without
+        arguments) if there is none
+        :param key:
+        :param compute:
+        :return:
+        """
+
+        self.calls += 1
+
+        # Look up in memory
+        try: entry = self.entries.pop(key)
+        except KeyError: entry = None
+        except TypeError:
+
+            # Unhashable key: not cachable
+            self.uncacheable += 1
+            return compute()
+
+        if entry is not None:
+
+            # Expired
+            if self.expired(entry[1]):
+                self.nbytes -= entry[3]
+                self.expirations += 1
+
+            # Hit: add again as most recently used
+            else:
+                self.entries[key] = entry
+                self.hits += 1
+                self.time_saved += entry[2]
+                return entry[0]
+
+        # Look up on disk
+        entry = self.load(key)
+        if entry is not None:
+            value, created, duration = entry
+            self.disk_hits += 1
+            self.time_saved += duration
+
+        # Compute
+        else:
+            self.misses += 1
+            created = time.time()
+            value = compute()
+            duration = time.time() - created
+            self.save(key, value, created, duration)
+
+        # Add the entry
+        nbytes = estimate_nbytes(value) if self.maxbytes is not None else 0
+        self.entries[key] = (value, created, duration, nbytes)
+        self.nbytes += nbytes
+        self.shrink()
+
+        # Return the value
+        return value
+
+    # -----------------------------------------------------------------
+
+    def shrink(self):
+
+        """
+        This function evicts the least recently used values (but not the most recent one) until the cache is within
+        its bounds
+        :return:
+        """
+
+        while len(self.entries) > 1 and ((self.maxsize is not None and len(self.entries) > self.maxsize) or (self.maxbytes is not None and self.nbytes > self.maxbytes)):
+
+            key = next(iter(self.entries))
+            self.nbytes -= self.entries.pop(key)[3]
+            self.evictions += 1
+
+    # -----------------------------------------------------------------
+
+    def disk_path(self, key):
+
+        """
+        This function returns the path of the file for the specified key
+        :param key:
+        :return:
+        """
+
+        try: digest = hashlib.sha1(pickle.dumps(key, 2)).hexdigest()
+        except Exception: return None # the key cannot be pickled
+        return os.path.join(self.path, digest + ".pickle")
+
+    # -----------------------------------------------------------------
+
+    def load(self, key):
+
+        """
+        This function loads the (value, creation time, computation time) for the specified key from disk, or returns
+        None if there is no (valid) file
+        :param key:
+        :return:
+        """
+
+        if self.path is None: return None
+        filepath = self.disk_path(key)
+        if filepath is None or not os.path.isfile(filepath): return None
+
+        try:
+            with open(filepath, "rb") as fh: entry = pickle.load(fh)
+        except Exception: return None
+
+        # Expired
+        if self.expired(entry[1]): return None
+        return entry
+
+    # -----------------------------------------------------------------
+
+    def save(self, key, value, created, duration):
+
+        """
+        This function writes the value for the specified key to disk
+        :param key:
+        :param value:
+        :param created:
+        :param duration:
+        :return:
+        """
+
+        if self.path is None: return
+        filepath = self.disk_path(key)
+        if filepath is None: return
+        if not os.path.isdir(self.path): os.makedirs(self.path)
+
+        # Write to a temporary file first, so that other processes never read a partial file
+        temp_filepath = filepath + "." + str(os.getpid())
+        try:
+            with open(temp_filepath, "wb") as fh: pickle.dump((value, created, duration), fh, 2)
+            os.rename(temp_filepath, filepath)
+        except Exception:
+            if os.path.isfile(temp_filepath): os.remove(temp_filepath) # the value cannot be pickled
+
+    # -----------------------------------------------------------------
+
+    def clear(self, disk=False):
+
+        """
+        This function removes all values from memory (and from disk if requested)
+        :param disk:
+        :return:
+        """
+
+        self.entries.clear()
+        self.nbytes = 0
+        if disk and self.path is not None and os.path.isdir(self.path):
+            for filename in os.listdir(self.path):
+                if filename.endswith(".pickle"): os.remove(os.path.join(self.path, filename))
+
+    # -----------------------------------------------------------------
+
+    @property
+    def hit_rate(self):
+
+        """
+        This function ...
+        :return:
+        """
+
+        return float(self.hits + self.disk_hits) / self.calls if self.calls > 0 else 0.
+
+    # -----------------------------------------------------------------
+
+    @property
+    def statistics(self):
+
+        """
+        This function returns the cache statistics
+        :return:
+        """
+
+        return OrderedDict([("calls", self.calls), ("hits", self.hits), ("disk_hits", self.disk_hits),
+                            ("misses", self.misses), ("uncacheable", self.uncacheable), ("hit_rate", self.hit_rate),
+                            ("evictions", self.evictions), ("expirations", self.expirations),
+                            ("time_saved", self.time_saved), ("size", self.size), ("nbytes", self.nbytes)])
+
+# -----------------------------------------------------------------
+
+# Separates the positional from the keyword arguments in the cache keys
+_kwargs_marker = object()
+
+# -----------------------------------------------------------------
+
+def register_memoize_cache(name, **kwargs):
+
+    """
+    This function creates the cache for a bounded memoized function and adds it to the registry
+    :param name:
+    :param kwargs:
+    :return:
+    """
+
+    cache = MemoizeCache(name, **kwargs)
+    memoize_registry[name] = cache
+    return cache
+
+# -----------------------------------------------------------------
+
+def bounded_memoize(maxsize=128, ttl=None, maxbytes=None, path=None, name=None):
+
+    """
+    This function creates a decorator that memoizes a function like memoize, but with a bounded, instrumented cache
+    (see MemoizeCache). Calls with unhashable arguments are not cached. The cache is available as the 'cache'
+    attribute of the decorated function and it is registered under the name of the function.
+    :param maxsize: the maximum number of cached values
+    :param ttl: the time (in seconds) after which a value expires
+    :param maxbytes: the maximum estimated memory size of the cached values in bytes
+    :param path: the directory for the on-disk backend (for expensive pure functions with picklable arguments and values)
+    :param name: the name in the registry (default is the module and name of the function)
+    :return:
+    """
+
+    def decorator(function):
+
+        cache = register_memoize_cache(name if name is not None else function.__module__ + "." + function.__name__,
+                                       maxsize=maxsize, ttl=ttl, maxbytes=maxbytes, path=path)
+
+        @wraps(function)
+        def wrapper(*args, **kwargs): return cache(function, args, kwargs)
+
+        wrapper.cache = cache
+        wrapper.reset = cache.clear
+        return wrapper
+
+    return decorator
+
+# -----------------------------------------------------------------
+
+class bounded_memoize_method(object):
+
+    """
+    Like memoize_method, but with a bounded, instrumented cache (see MemoizeCache) that is shared by all instances
+    (the instance is part of the key, so cached instances are only released when their values are evicted).
+    Use as @bounded_memoize_method(maxsize=32).
+    """
+
+    def __init__(self, maxsize=128, ttl=None, maxbytes=None, name=None):
+
+        """
+        The constructor ...
+        :param maxsize:
+        :param ttl:
+        :param maxbytes:
+        :param name:
+        """
+
+        self.options = dict(maxsize=maxsize, ttl=ttl, maxbytes=maxbytes)
+        self.name = name
+        self.func = None
+        self.cache = None
+
+    def __call__(self, *args, **kwargs):
+
+        # Decorating
+        if self.func is None:
+
+            self.func = args[0]
+            name = self.name if self.name is not None else self.func.__module__ + "." + self.func.__name__
+            self.cache = register_memoize_cache(name, **self.options)
+            return self
+
+        # Calling
+        return self.cache(self.func, args, kwargs)
+
+    def __get__(self, obj, objtype=None):
+
+        if obj is None: return self.func
+        return partial(self, obj)
+
+# -----------------------------------------------------------------
+
+def memoize_statistics():
+
+    """
+    This function returns the statistics of all registered caches, by name
+    :return:
+    """
+
+    return OrderedDict((name, cache.statistics) for name, cache in memoize_registry.items())
+
+# -----------------------------------------------------------------
+
+def show_memoize_statistics():
+
+    """
+    This function shows the statistics of all registered caches (and product caches) that have been used
+    :return:
+    """
+
+    from ..basics.log import log
+
+    for name, cache in memoize_registry.items():
+
+        if cache.calls == 0: continue
+        log.info(name + ": " + str(cache.calls) + " calls, " + str(cache.hits) + " hits, " + str(cache.disk_hits) +
+                 " disk hits, " + str(cache.misses) + " misses, " + str(cache.uncacheable) + " uncacheable, " +
+                 str(cache.evictions) + " evictions, " + str(cache.size) + " values, " +
+                 "{:.3f}".format(cache.time_saved) + " s saved")
+
+    # The product caches
+    for name, counts in product_cache_registry.items():
+
+        if counts["hits"] + counts["misses"] == 0: continue
+        log.info(name + " products: " + str(counts["hits"]) + " hits, " + str(counts["misses"]) + " misses, " +
+                 str(counts["evictions"]) + " evictions, " + str(counts["reloads"]) + " reloads")
+
+# -----------------------------------------------------------------
+
+def clear_memoize_caches(disk=False):
+
+    """
+    This function clears all registered caches
+    :param disk:
+    :return:
+    """
+
+    for cache in memoize_registry.values(): cache.clear(disk=disk)
+
+# -----------------------------------------------------------------
+
 # # example usage
 # class Test(object):
 #     v = 0
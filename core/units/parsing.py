@@ -18,6 +18,7 @@ from astropy.coordinates import Angle
 
 # Import the relevant PTS classes and modules
 from ..tools import types
+from ..tools.utils import bounded_memoize
 from .utils import clean_unit_string
 
 # -----------------------------------------------------------------
@@ -34,6 +35,24 @@ def parse_unit(argument, density=False, brightness=False, density_strict=False,
     :return:
     """
 
+    # Unit strings are parsed only once (the units are immutable)
+    if types.is_string_type(argument): return _parse_unit_string(argument, density, brightness, density_strict, brightness_strict)
+    else: return _parse_unit(argument, density=density, brightness=brightness, density_strict=density_strict, brightness_strict=brightness_strict)
+
+# -----------------------------------------------------------------
+
+def _parse_unit(argument, density=False, brightness=False, density_strict=False, brightness_strict=False):
+
+    """
+    This function ...
+    :param argument:
+    :param density:
+    :param brightness:
+    :param density_strict:
+    :param brightness_strict:
+    :return:
+    """
+
     from .unit import PhotometricUnit
 
     try: unit = PhotometricUnit(argument, density=density, brightness=brightness, density_strict=density_strict, brightness_strict=brightness_strict)
@@ -44,6 +63,23 @@ def parse_unit(argument, density=False, brightness=False, density_strict=False,
 
 # -----------------------------------------------------------------
 
+@bounded_memoize(maxsize=1024)
+def _parse_unit_string(argument, density, brightness, density_strict, brightness_strict):
+
+    """
+    This function parses a unit string, keeping the units for the most recently used unit strings and flags
+    :param argument:
+    :param density:
+    :param brightness:
+    :param density_strict:
+    :param brightness_strict:
+    :return:
+    """
+
+    return _parse_unit(argument, density=density, brightness=brightness, density_strict=density_strict, brightness_strict=brightness_strict)
+
+# -----------------------------------------------------------------
+
 def parse_unit_or_quantity(argument, density=False, brightness=False, density_strict=False, brightness_strict=False):
 
     """
@@ -94,6 +130,9 @@ def parse_photometric_unit(argument, density=False, brightness=False, density_st
     :return:
     """
 
+    # Unit strings are parsed only once (the units are immutable)
+    if types.is_string_type(argument): return _parse_photometric_unit_string(argument, density, brightness, density_strict, brightness_strict)
+
     from .unit import PhotometricUnit
 
     unit = PhotometricUnit(argument, density=density, brightness=brightness, density_strict=density_strict, brightness_strict=brightness_strict)
@@ -101,6 +140,25 @@ def parse_photometric_unit(argument, density=False, brightness=False, density_st
 
 # -----------------------------------------------------------------
 
+@bounded_memoize(maxsize=1024)
+def _parse_photometric_unit_string(argument, density, brightness, density_strict, brightness_strict):
+
+    """
+    This function parses a photometric unit string, keeping the units for the most recently used unit strings and flags
+    :param argument:
+    :param density:
+    :param brightness:
+    :param density_strict:
+    :param brightness_strict:
+    :return:
+    """
+
+    from .unit import PhotometricUnit
+
+    return PhotometricUnit(argument, density=density, brightness=brightness, density_strict=density_strict, brightness_strict=brightness_strict)
+
+# -----------------------------------------------------------------
+
 def split_value_unit(argument):
 
     """
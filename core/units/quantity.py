@@ -17,7 +17,7 @@ import math
 import numpy as np
 
 # Import astronomical modules
-from astropy.units import Quantity
+from astropy.units import Quantity, CompositeUnit
 from astropy.coordinates import Angle
 
 # Import the relevant PTS classes and modules
@@ -422,11 +422,8 @@ class PhotometricQuantity(Quantity):
             # Re-evaluate whether it is a photometric quantity or not by passing a stringified version to the parser
             return parse_quantity(represent_quantity(Quantity.to(self, unit, equivalencies=equivalencies)))
 
-        # Import
-        from .unit import PhotometricUnit
-
         # Parse the new photometric unit
-        unit = PhotometricUnit(unit, density=density, brightness=brightness, density_strict=density_strict, brightness_strict=brightness_strict)
+        unit = parse_photometric_unit(unit, density=density, brightness=brightness, density_strict=density_strict, brightness_strict=brightness_strict)
 
         # Determine conversion factor
         factor = self.unit.conversion_factor(unit, wavelength=wavelength, frequency=frequency, distance=distance, solid_angle=solid_angle, fltr=fltr, pixelscale=pixelscale, silent=silent)
@@ -583,6 +580,20 @@ def subtract_with_units(value, unit, other, other_unit=None, conversion_info=Non
 
 # -----------------------------------------------------------------
 
+def unscaled(unit):
+
+    """
+    This function returns the unit without its scale factor, as a new unit (the units returned by parse_unit are shared,
+    so they must not be changed)
+    :param unit:
+    :return:
+    """
+
+    if unit.scale == 1: return unit
+    else: return CompositeUnit(1, unit.bases, unit.powers)
+
+# -----------------------------------------------------------------
+
 def multiply_with_units(value, unit, other, other_unit=None):
 
     """
@@ -629,7 +640,7 @@ def multiply_with_units(value, unit, other, other_unit=None):
         elif types.is_unit(new_unit):
 
             new_value = value * new_unit.scale
-            new_unit._scale = 1
+            new_unit = unscaled(new_unit)
 
         # NOT A UNIT: UNITS MULTIPLIED AWAY
         elif types.is_real_or_integer(new_unit):
@@ -663,7 +674,7 @@ def multiply_with_units(value, unit, other, other_unit=None):
         elif types.is_unit(new_unit):
 
             new_value = value * other.value * new_unit.scale
-            new_unit._scale = 1
+            new_unit = unscaled(new_unit)
 
         # NOT A UNIT: UNITS MULTPLIED AWAY (FOR EXAMPLE Hz * s)
         elif types.is_real_or_integer(new_unit):
@@ -703,7 +714,7 @@ def multiply_with_units(value, unit, other, other_unit=None):
         elif types.is_unit(new_unit):
 
             new_value = value * other.value * new_unit.scale
-            new_unit._scale = 1
+            new_unit = unscaled(new_unit)
 
         # NOT A UNIT: UNITS MULTIPLIED AWAY (FOR EXAMPLE HZ * s)
         elif types.is_real_or_integer(new_unit):
@@ -798,7 +809,7 @@ def divide_with_units(value, unit, other, other_unit=None):
 
         other = parse_unit(other)
         if has_unit: new_unit = divide_units(unit, other)
-        else: new_unit = 1./other
+        else: new_unit = other**-1
 
         # Photometric unit?
         if isinstance(new_unit, PhotometricUnit):
@@ -814,7 +825,7 @@ def divide_with_units(value, unit, other, other_unit=None):
         elif types.is_unit(new_unit):
 
             new_value = value * new_unit.scale
-            new_unit._scale = 1
+            new_unit = unscaled(new_unit)
 
         # NOT A UNIT: UNITS DIVIDED AWAY?
         elif types.is_real_or_integer(new_unit):
@@ -862,7 +873,7 @@ def divide_with_units(value, unit, other, other_unit=None):
             #elif types.is_real_or_integer_array(value): new_value = value / float(other.value) * new_unit.scale
             #else: raise RuntimeError("Something went wrong")
             new_value = float_division(value, other.value) * new_unit.scale
-            new_unit._scale = 1
+            new_unit = unscaled(new_unit)
 
         # NOT A UNIT: UNITS DIVIDED AWAY?
         elif types.is_real_or_integer(new_unit):
@@ -905,7 +916,7 @@ def divide_with_units(value, unit, other, other_unit=None):
         elif types.is_unit(new_unit):
 
             new_value = value / other * new_unit.scale
-            new_unit._scale = 1
+            new_unit = unscaled(new_unit)
 
         # NOT A UNIT: UNITS DIVIDED AWAY?
         elif types.is_real_or_integer(new_unit):
@@ -17,6 +17,8 @@ import math
 import copy
 import warnings
 import traceback
+import numpy as np
+from functools import partial
 
 # Import astronomical modules
 from astropy.units import Unit, UnitBase, CompositeUnit, spectral, Quantity
@@ -25,8 +27,9 @@ from astropy import constants
 # Import the relevant PTS classes and modules
 from ...magic.basics.pixelscale import Pixelscale, PhysicalPixelscale
 from .utils import analyse_unit, divide_units_reverse, clean_unit_string, get_physical_type, interpret_physical_type
-from .parsing import parse_unit, parse_quantity
+from .parsing import parse_unit, parse_quantity, parse_photometric_unit
 from ..tools import types
+from ..tools.utils import register_memoize_cache
 from ..basics.log import log
 
 # -----------------------------------------------------------------
@@ -113,6 +116,47 @@ wavelength_times_frequency = speed_of_light
 
 # -----------------------------------------------------------------
 
+# The power of the wavelength that a spectral density of each kind is proportional to, for the same neutral density
+spectral_density_exponents = {"wavelength": -1, "frequency": 1, "neutral": 0, None: 0}
+
+# -----------------------------------------------------------------
+
+# The cache of the most recently used conversion factors
+conversion_factors_cache = register_memoize_cache("pts.core.units.unit.conversion_factor", maxsize=4096)
+
+# -----------------------------------------------------------------
+
+def unit_key(unit):
+
+    """
+    This function returns the key of a photometric unit in the cache of conversion factors
+    :param unit:
+    :return:
+    """
+
+    return unit.to_string(), unit.density, unit.brightness, str(unit.distance_unit), str(unit.extent_unit)
+
+# -----------------------------------------------------------------
+
+def info_key(value):
+
+    """
+    This function returns the key of a conversion info value (a scalar quantity, a string, a pixelscale or None) in
+    the cache of conversion factors. A TypeError is raised for other values.
+    :param value:
+    :return:
+    """
+
+    if value is None: return None
+    elif types.is_string_type(value): return value
+    elif isinstance(value, Quantity):
+        if not value.isscalar: raise TypeError("Not a scalar quantity")
+        return float(value.value), value.unit.to_string()
+    elif hasattr(value, "x") and hasattr(value, "y"): return type(value).__name__, info_key(value.x), info_key(value.y)
+    else: raise TypeError("Cannot use a value of type " + str(type(value)) + " as a key")
+
+# -----------------------------------------------------------------
+
 class PhotometricUnit(CompositeUnit):
 
     """
@@ -2053,7 +2097,102 @@ class PhotometricUnit(CompositeUnit):
         """
 
         # Parse "to unit"
-        to_unit = PhotometricUnit(to_unit, density=density, brightness=brightness, brightness_strict=brightness_strict, density_strict=density_strict)
+        to_unit = parse_photometric_unit(to_unit, density=density, brightness=brightness, brightness_strict=brightness_strict, density_strict=density_strict)
+
+        # Check
+        if wavelength is not None and frequency is not None: raise ValueError("Either frequency or wavelength can be specified")
+
+        # Calculate the conversion factor, or get it from the cache
+        compute = partial(self._conversion_factor, to_unit, wavelength=wavelength, frequency=frequency, distance=distance,
+                          solid_angle=solid_angle, fltr=fltr, pixelscale=pixelscale, silent=silent)
+        try: key = self.conversion_key(to_unit, wavelength=wavelength, frequency=frequency, distance=distance, solid_angle=solid_angle, fltr=fltr, pixelscale=pixelscale)
+        except TypeError: return compute() # conversion info that cannot be used as a key
+        return conversion_factors_cache.get(key, compute)
+
+    # -----------------------------------------------------------------
+
+    def conversion_key(self, to_unit, wavelength=None, frequency=None, distance=None, solid_angle=None, fltr=None, pixelscale=None):
+
+        """
+        This function returns the key of the conversion factor to the specified (parsed) unit in the cache. Only the
+        conversion info that the conversion factor depends on is part of the key: the wavelength (or frequency, or
+        filter) for conversions between different kinds of spectral densities, and the distance, solid angle and
+        pixelscale for conversions between different base physical types.
+        :param to_unit:
+        :param wavelength:
+        :param frequency:
+        :param distance:
+        :param solid_angle:
+        :param fltr:
+        :param pixelscale:
+        :return:
+        """
+
+        # Spectral conversion info
+        if self.spectral_density_type == to_unit.spectral_density_type: spectral = None
+        else: spectral = (info_key(wavelength), info_key(frequency), info_key(fltr.pivot) if fltr is not None else None)
+
+        # Geometric conversion info
+        if self.base_physical_type == to_unit.base_physical_type: geometric = None
+        else: geometric = (info_key(distance), info_key(solid_angle), info_key(pixelscale))
+
+        # Return the key
+        return unit_key(self), unit_key(to_unit), spectral, geometric
+
+    # -----------------------------------------------------------------
+
+    def conversion_factors(self, to_unit, wavelengths, density=False, brightness=False, brightness_strict=False,
+                           density_strict=False, **kwargs):
+
+        """
+        This function returns the conversion factors to the specified unit for an array of wavelengths at once.
+        Between different kinds of spectral densities (wavelength, frequency and neutral), the conversion factor
+        is proportional to a power of the wavelength, so only the factor for the first wavelength has to be calculated.
+        :param to_unit:
+        :param wavelengths: a quantity array or a sequence of wavelength quantities
+        :param density:
+        :param brightness:
+        :param brightness_strict:
+        :param density_strict:
+        :param kwargs: other conversion info (distance, solid_angle, pixelscale, silent)
+        :return: numpy array of conversion factors
+        """
+
+        # Parse "to unit"
+        to_unit = parse_photometric_unit(to_unit, density=density, brightness=brightness, brightness_strict=brightness_strict, density_strict=density_strict)
+
+        # Get the wavelengths in micron
+        if isinstance(wavelengths, Quantity): microns = np.asarray(wavelengths.to("micron").value, dtype=float)
+        else: microns = np.array([wavelength.to("micron").value for wavelength in wavelengths], dtype=float)
+        if len(microns) == 0: return microns
+
+        # Calculate the factor for the first wavelength
+        reference = microns[0]
+        factor = float(self.conversion_factor(to_unit, wavelength=reference * Unit("micron"), **kwargs))
+
+        # Scale with the right power of the wavelength
+        exponent = spectral_density_exponents[to_unit.spectral_density_type] - spectral_density_exponents[self.spectral_density_type]
+        if exponent == 0: return np.full(len(microns), factor)
+        else: return factor * (microns / reference)**exponent
+
+    # -----------------------------------------------------------------
+
+    def _conversion_factor(self, to_unit, wavelength=None, frequency=None, distance=None, solid_angle=None, fltr=None,
+                           pixelscale=None, silent=False):
+
+        """
+        This function calculates the conversion factor (use conversion_factor)
+        :param to_unit: the parsed photometric unit
+        :param wavelength:
+        :param frequency:
+        :param distance:
+        :param solid_angle:
+        :param fltr:
+        :param pixelscale:
+        :param silent:
+        :return:
+        """
+
 
         #print("1", self, self.density, self.is_neutral_density, self.is_wavelength_density, self.is_frequency_density)
         #print("2", to_unit, to_unit.density, to_unit.is_neutral_density, to_unit.is_wavelength_density, to_unit.is_frequency_density)
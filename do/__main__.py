@@ -35,7 +35,9 @@ import argparse
 # Import the relevant PTS modules
 from pts.core.tools import introspection, parsing
 from pts.core.tools import filesystem as fs
-from pts.do.run import run_configurable, no_match, no_input, show_version, multiple_matches
+from pts.core.tools.utils import show_memoize_statistics
+from pts.core.tools.profiling import start_profiling, finish_profiling
+from pts.do.run import run_configurable, no_match, no_input, show_version, multiple_matches, profile_path
 
 # -----------------------------------------------------------------
 
@@ -53,13 +55,17 @@ parser.add_argument("--input", type=str, help="the name/path of the input direct
 parser.add_argument("--output", type=str, help="the name/path of the output directory")
 parser.add_argument("--input_files", type=parsing.string_tuple_dictionary, help="dictionary of (class_path, input_file_path) where the key is the input variable name")
 parser.add_argument("--output_files", type=parsing.string_string_dictionary, help="dictionary of output file paths where the key is the variable (attribute) name")
+parser.add_argument("--cache_statistics", action="store_true", help="show the statistics of the memoization caches at the end of the command")
+parser.add_argument("--profile", action="store_true", help="show the time and memory spent in the steps of the command and the call sites with the most suppressed log messages, and write a trace file")
+parser.add_argument("--profile_path", type=str, help="the path of the trace file (default: [command]_profile.json in the current directory)")
 parser.add_argument("options", nargs=argparse.REMAINDER, help="options for the specific do command")
 
 # -----------------------------------------------------------------
 
-# Find possible PTS commands
-scripts = introspection.get_scripts()
-tables = introspection.get_arguments_tables()
+# Find possible PTS commands (from the command index, which is only recreated when commands have been changed)
+index = introspection.load_command_index()
+scripts = index.scripts
+tables = index.tables
 
 # -----------------------------------------------------------------
 
@@ -89,6 +95,9 @@ script_name = args.do_command
 # Construct clean arguments list
 sys.argv = ["pts", args.do_command] + args.options
 
+# Start profiling
+if args.profile: start_profiling("pts " + script_name)
+
 # -----------------------------------------------------------------
 
 # Find matches
@@ -113,9 +122,19 @@ elif len(matches) == 1 and len(table_matches) == 0: #run_script(matches, args) #
     del sys.argv[1]
     print("Executing: " + match[0] + "/" + match[1] + " " + " ".join(sys.argv[1:]))
 
+    # Get the flags and the path of the profile before executing the script (the script can redefine 'args' and 'match')
+    _cache_statistics = args.cache_statistics
+    _profile_path = profile_path(args, fs.strip_extension(match[1])) if args.profile else None
+
     # Execute the script
     exec open(target)
 
+    # Show the cache statistics
+    if _cache_statistics: show_memoize_statistics()
+
+    # Show and write the profile
+    if _profile_path is not None: finish_profiling(_profile_path)
+
 # If there is an unique match in a table
 elif len(table_matches) == 1 and len(matches) == 0: run_configurable(table_matches, args, tables)
 
@@ -0,0 +1,82 @@
+#!/usr/bin/env python
+# -*- coding: utf8 -*-
+# *****************************************************************
+# **       PTS -- Python Toolkit for working with SKIRT          **
+# **       © Astronomical Observatory, Ghent University          **
+# *****************************************************************
+
+## \package pts.do.core.benchmark_units Measure the time spent in unit parsing and conversion for a typical
+#  conversion of the photometry of an observed SED, with and without the cached unit layer.
+
+# -----------------------------------------------------------------
+
+# Ensure Python 3 compatibility
+from __future__ import absolute_import, division, print_function
+
+# Import standard modules
+import time
+import numpy as np
+
+# Import the relevant PTS classes and modules
+from pts.core.basics.configuration import ConfigurationDefinition, parse_arguments
+from pts.core.data.sed import ObservedSED
+from pts.core.filter.filter import parse_filter
+from pts.core.units.parsing import parse_quantity
+from pts.core.units.unit import PhotometricUnit
+from pts.core.tools.utils import clear_memoize_caches, show_memoize_statistics
+
+# -----------------------------------------------------------------
+
+# The filters of the photometric points
+filter_names = ["GALEX FUV", "GALEX NUV", "SDSS u", "SDSS g", "SDSS r", "SDSS i", "SDSS z", "2MASS J", "2MASS H",
+                "2MASS Ks", "IRAC I1", "IRAC I2", "IRAC I3", "IRAC I4", "WISE W1", "WISE W2", "WISE W3", "WISE W4",
+                "MIPS 24mu", "Pacs blue", "Pacs red", "SPIRE PSW", "SPIRE PMW", "SPIRE PLW"]
+
+# -----------------------------------------------------------------
+
+# Create the configuration definition
+definition = ConfigurationDefinition()
+definition.add_optional("repetitions", "positive_integer", "number of conversions", 100)
+definition.add_optional("unit", "photometric_unit", "the unit to convert the photometry to", "W/micron", convert_default=True)
+definition.add_optional("distance", "length_quantity", "the distance of the galaxy", "10 Mpc", convert_default=True)
+
+# Parse the arguments into a configuration
+config = parse_arguments("benchmark_units", definition, "Measure the time spent in unit code for the conversion of an observed SED")
+
+# -----------------------------------------------------------------
+
+# Create the SED
+sed = ObservedSED(photometry_unit="Jy")
+for index, name in enumerate(filter_names): sed.add_point(parse_filter(name), parse_quantity(str(0.1 * (index + 1)) + " Jy"))
+unit_string = str(config.unit)
+array_unit = sed.column_unit(sed.value_name)
+
+# -----------------------------------------------------------------
+
+# Convert point by point, parsing the unit and calculating the conversion factor every time (without the cache)
+start = time.time()
+for _ in range(config.repetitions):
+    reference = np.array([value * array_unit._conversion_factor(PhotometricUnit(unit_string), wavelength=wavelength, distance=config.distance)
+                          for value, wavelength in zip(sed[sed.value_name], sed.wavelengths())])
+uncached = (time.time() - start) / config.repetitions
+
+# -----------------------------------------------------------------
+
+# Convert with the cached unit layer, starting from empty caches
+clear_memoize_caches()
+start = time.time()
+for _ in range(config.repetitions): result = sed.photometry(unit=unit_string, asarray=True, conversion_info={"distance": config.distance})
+cached = (time.time() - start) / config.repetitions
+
+# -----------------------------------------------------------------
+
+# Show the results
+print("Number of photometric points: " + str(len(sed)))
+print("Point by point, without caching: {:.3f} ms per conversion".format(uncached * 1e3))
+print("Vectorized, with caching:        {:.3f} ms per conversion".format(cached * 1e3))
+print("Maximum relative difference:     {:.2e}".format(np.max(np.abs(result / reference - 1.))))
+
+# Show the cache statistics
+show_memoize_statistics()
+
+# -----------------------------------------------------------------
@@ -0,0 +1,96 @@
+#!/usr/bin/env python
+# -*- coding: utf8 -*-
+# *****************************************************************
+# **       PTS -- Python Toolkit for working with SKIRT          **
+# **       © Astronomical Observatory, Ghent University          **
+# *****************************************************************
+
+## \package pts.do.core.test_product_cache Check the memory accounting, eviction and clean-up of the product cache of
+#  pts.core.tools.utils: arrays that are shared by several products are counted once, evicted products are reloaded
+#  from file and the temporary directory is removed when the cache is closed.
+
+# -----------------------------------------------------------------
+
+# Ensure Python 3 compatibility
+from __future__ import absolute_import, division, print_function
+
+# Import standard modules
+import numpy as np
+
+# Import the relevant PTS classes and modules
+from pts.core.basics.log import setup_log
+from pts.core.tools import filesystem as fs
+from pts.core.tools.utils import ProductCache, estimate_nbytes, product_cache_registry
+
+# -----------------------------------------------------------------
+
+# Set logging
+log = setup_log("INFO")
+
+# -----------------------------------------------------------------
+
+class Product(object):
+
+    """
+    This class is a product that can be written to and read from file
+    """
+
+    default_extension = "npy"
+
+    def __init__(self, data):
+        self.data = data
+
+    def saveto(self, path):
+        np.save(path, self.data)
+
+    @classmethod
+    def from_file(cls, path):
+        return cls(np.load(path))
+
+# -----------------------------------------------------------------
+
+# Shared arrays: a dictionary of cubes and a view of one of them
+total = np.ones((20, 30, 40))
+dust = np.zeros((20, 30, 40))
+cubes = {"total": total, "dust": dust, "total_view": total[:10]}
+assert estimate_nbytes(cubes) == total.nbytes + dust.nbytes
+
+cache = ProductCache(budget=2 * total.nbytes)
+cache.put("cubes", cubes)
+cache.put("total", total)
+cache.put("first_frame", total[0])
+assert cache.nbytes == total.nbytes + dust.nbytes
+assert cache.evictions == 0
+
+cache.remove("cubes")
+assert cache.nbytes == total.nbytes
+cache.clear()
+assert cache.nbytes == 0
+
+# -----------------------------------------------------------------
+
+# Eviction and reloading
+cache = ProductCache(budget=total.nbytes, name="test_product_cache")
+cache.put("first", Product(np.ones((20, 30, 40))))
+cache.put("second", Product(np.zeros((20, 30, 40))))
+assert cache.evictions == 1 and "first" not in cache
+
+spill_path = cache.spill_path
+assert fs.is_directory(spill_path)
+assert np.all(cache.get("first", lambda: None).data == 1.)
+assert cache.reloads == 1
+
+# The statistics of named caches are reported by show_memoize_statistics (--cache_statistics)
+statistics = product_cache_registry["test_product_cache"]
+assert statistics["evictions"] == cache.evictions == 2 and statistics["reloads"] == 1 and statistics["misses"] == 1
+
+# Closing removes the temporary directory
+cache.close()
+assert not fs.is_directory(spill_path)
+assert cache.nproducts == 0
+
+# -----------------------------------------------------------------
+
+log.success("The product cache counts shared arrays once and removes its temporary directory")
+
+# -----------------------------------------------------------------
@@ -0,0 +1,69 @@
+#!/usr/bin/env python
+# -*- coding: utf8 -*-
+# *****************************************************************
+# **       PTS -- Python Toolkit for working with SKIRT          **
+# **       © Astronomical Observatory, Ghent University          **
+# *****************************************************************
+
+## \package pts.do.core.test_sphconvert Check that the SPH converters of pts.core.prep.sphconvert produce the same
+#  output files when the input is parsed serially, in parallel (with chunks that are smaller than the number of
+#  particles, so that several chunks are in flight) and from a binary numpy file.
+#
+# The script takes the following (optional) command-line arguments:
+#  - nparticles: the number of particles (default 10000)
+#  - nprocesses: the number of processes for the parallel parsing (default 4)
+#
+
+# -----------------------------------------------------------------
+
+# Ensure Python 3 compatibility
+from __future__ import absolute_import, division, print_function
+
+# Import standard modules
+import sys
+import numpy as np
+
+# Import the relevant PTS classes and modules
+from pts.core.tools import filesystem as fs
+from pts.core.tools import introspection
+from pts.core.tools import time
+from pts.core.prep import sphconvert
+
+# -----------------------------------------------------------------
+
+# get the command-line arguments
+nparticles = int(sys.argv[1]) if len(sys.argv) > 1 else 10000
+nprocesses = int(sys.argv[2]) if len(sys.argv) > 2 else 4
+
+# create the input files: EAGLE star particles, as text (with a comment line) and as a binary numpy file
+path = introspection.create_temp_dir(time.unique_name("sphconvert"))
+random = np.random.RandomState(1)
+data = np.column_stack((random.normal(size=(nparticles,3)), random.uniform(1e6, 1e10, nparticles),
+                        random.uniform(0.1, 1., nparticles), random.uniform(0., 0.04, nparticles),
+                        random.uniform(1e4, 1e6, nparticles)))
+textfile = fs.join(path, "stars.txt")
+np.savetxt(textfile, data, header="x y z t h Z M")
+binaryfile = fs.join(path, "stars.npy")
+np.save(binaryfile, data)
+
+# -----------------------------------------------------------------
+
+## This function converts the input file and returns the contents of the output file
+def converted(infile, name, **kwargs):
+    outfile = fs.join(path, name)
+    sphconvert.convert_stars_EAGLE(infile, outfile, **kwargs)
+    with open(outfile, 'r') as fid: return fid.read()
+
+# the reference: serial parsing in one chunk
+chunksize = max(nparticles // 10, 1)
+reference = converted(textfile, "serial.txt", chunksize=nparticles)
+assert reference.count('\n') == nparticles + 3
+
+# serial parsing in chunks, parallel parsing in chunks, binary input
+assert converted(textfile, "chunks.txt", chunksize=chunksize) == reference
+assert converted(textfile, "parallel.txt", chunksize=chunksize, nprocesses=nprocesses) == reference
+assert converted(binaryfile, "binary.txt", chunksize=chunksize) == reference
+
+print("The serial, chunked, parallel and binary conversions of " + str(nparticles) + " particles are identical")
+
+# -----------------------------------------------------------------
@@ -0,0 +1,61 @@
+#!/usr/bin/env python
+# -*- coding: utf8 -*-
+# *****************************************************************
+# **       PTS -- Python Toolkit for working with SKIRT          **
+# **       © Astronomical Observatory, Ghent University          **
+# *****************************************************************
+
+## \package pts.do.developer.benchmark_startup Measure the time spent at the startup of the 'pts' command line
+#  interface: finding the commands (by scanning the directories and command tables, or with the command index) and
+#  importing the modules for running commands.
+
+# -----------------------------------------------------------------
+
+# Ensure Python 3 compatibility
+from __future__ import absolute_import, division, print_function
+
+# Import standard modules
+import sys
+import time
+import subprocess
+
+# Import the relevant PTS classes and modules
+from pts.core.tools import introspection
+from pts.core.tools import filesystem as fs
+
+# -----------------------------------------------------------------
+
+## This function returns the average time (in seconds) of calling the specified function
+def measure(function, repetitions=10):
+    start = time.time()
+    for _ in range(repetitions): function()
+    return (time.time() - start) / repetitions
+
+## This function returns the time (in seconds) for executing the python statements in a new interpreter
+def measure_process(statements):
+    start = time.time()
+    subprocess.check_call([sys.executable, "-c", statements], cwd=introspection.pts_root_dir)
+    return time.time() - start
+
+# -----------------------------------------------------------------
+
+# Finding the commands
+scanning = measure(lambda: (introspection.get_scripts(), introspection.get_arguments_tables()))
+if fs.is_file(introspection.command_index_path): fs.remove_file(introspection.command_index_path)
+creating = measure(introspection.load_command_index, repetitions=1)
+reading = measure(introspection.load_command_index)
+
+# Starting the interpreter and importing the modules for running commands
+interpreter = measure_process("import pts.core.tools.introspection")
+importing = measure_process("import pts.core.tools.introspection; import pts.do.run")
+
+# -----------------------------------------------------------------
+
+# Show the results
+print("Scanning the scripts and command tables:     {:.1f} ms".format(scanning * 1e3))
+print("Creating and writing the command index:      {:.1f} ms".format(creating * 1e3))
+print("Reading the command index:                   {:.1f} ms".format(reading * 1e3))
+print("Starting python and importing introspection: {:.1f} ms".format(interpreter * 1e3))
+print("... and importing pts.do.run:                {:.1f} ms".format(importing * 1e3))
+
+# -----------------------------------------------------------------
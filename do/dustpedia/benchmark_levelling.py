@@ -0,0 +1,141 @@
+#!/usr/bin/env python
+# -*- coding: utf8 -*-
+# *****************************************************************
+# **       PTS -- Python Toolkit for working with SKIRT          **
+# **       © Astronomical Observatory, Ghent University          **
+# *****************************************************************
+
+## \package pts.do.dustpedia.benchmark_levelling Compare the background levelling of mosaic tiles with lmfit, with the
+#  closed-form level and with the global (overlap-based) levelling, on synthetic tiles with known offsets.
+
+# -----------------------------------------------------------------
+
+# Ensure Python 3 compatibility
+from __future__ import absolute_import, division, print_function
+
+# Import standard modules
+import numpy as np
+
+# Import the relevant PTS classes and modules
+from pts.core.basics.configuration import ConfigurationDefinition, parse_arguments
+from pts.core.basics.log import log
+from pts.core.tools import time
+from pts.magic.tools import levelling
+from pts.dustpedia.core.galex import fit_background_level, fit_background_level_lmfit
+
+# -----------------------------------------------------------------
+
+definition = ConfigurationDefinition()
+definition.add_optional("ntiles", "positive_integer", "number of tiles", 20)
+definition.add_optional("tile_size", "positive_integer", "size of the tiles (in pixels)", 300)
+definition.add_optional("mosaic_size", "positive_integer", "size of the mosaic (in pixels)", 800)
+definition.add_optional("noise", "real", "standard deviation of the noise", 1.0)
+definition.add_optional("gradient", "real", "sky gradient (per pixel)", 0.002)
+definition.add_optional("seed", "integer", "random seed", 42)
+config = parse_arguments("benchmark_levelling", definition)
+
+# -----------------------------------------------------------------
+
+class ShiftedGrid(object):
+
+    """
+    This class represents the pixel grid of a tile, shifted with respect to the mosaic (the 'world' coordinates
+    are the mosaic pixel coordinates)
+    """
+
+    def __init__(self, x_shift, y_shift):
+
+        """
+        The constructor ...
+        :param x_shift:
+        :param y_shift:
+        """
+
+        self.x_shift = x_shift
+        self.y_shift = y_shift
+
+    def all_pix2world(self, x, y, origin):
+
+        """
+        This function ...
+        """
+
+        return x + self.x_shift, y + self.y_shift
+
+    def all_world2pix(self, x, y, origin):
+
+        """
+        This function ...
+        """
+
+        return x - self.x_shift, y - self.y_shift
+
+# -----------------------------------------------------------------
+
+random = np.random.RandomState(config.seed)
+
+# The sky of the mosaic: a gradient and a galaxy
+y, x = np.mgrid[:config.mosaic_size, :config.mosaic_size].astype(float)
+center = 0.5 * config.mosaic_size
+sky = config.gradient * (x + y) + 50. * np.exp(-((x - center)**2 + (y - center)**2) / (2. * (0.05 * config.mosaic_size)**2))
+
+# Create the tiles, with known offsets
+offsets = random.normal(0.0, 5.0, config.ntiles)
+offsets[0] = 0.0
+tiles = []
+grids = []
+for index in range(config.ntiles):
+
+    x_min, y_min = random.randint(0, config.mosaic_size - config.tile_size, 2)
+    data = sky[y_min:y_min+config.tile_size, x_min:x_min+config.tile_size] + offsets[index]
+    data = data + random.normal(0.0, config.noise, data.shape)
+
+    tiles.append(data)
+    grids.append(ShiftedGrid(x_min, y_min))
+
+# The offsets that correct the tiles
+truth = offsets[0] - offsets
+
+# -----------------------------------------------------------------
+
+def report(name, found, seconds):
+
+    """
+    This function ...
+    :param name:
+    :param found:
+    :param seconds:
+    :return:
+    """
+
+    log.info(name + ": " + str(seconds) + " seconds, maximum error on the offsets: " + str(np.max(np.abs(np.asarray(found) - truth))))
+
+# -----------------------------------------------------------------
+
+# lmfit (the original procedure)
+with time.elapsed_timer() as elapsed:
+    levels_lmfit = [fit_background_level_lmfit(tile) for tile in tiles]
+    seconds = elapsed()
+report("lmfit", [levels_lmfit[0] - level for level in levels_lmfit], seconds)
+
+# Closed form
+with time.elapsed_timer() as elapsed:
+    levels = [fit_background_level(tile) for tile in tiles]
+    seconds = elapsed()
+report("closed form", [levels[0] - level for level in levels], seconds)
+log.info("maximum difference between the lmfit and closed-form levels: " + str(np.max(np.abs(np.array(levels_lmfit) - np.array(levels)))))
+
+# Global levelling
+with time.elapsed_timer() as elapsed:
+    sums = []
+    counts = []
+    for tile, grid in zip(tiles, grids):
+        tile_sums, tile_counts = levelling.cell_statistics(tile, grid, ShiftedGrid(0, 0), sky.shape)
+        sums.append(tile_sums)
+        counts.append(tile_counts)
+    differences, nshared = levelling.overlap_differences(np.array(sums), np.array(counts))
+    found = levelling.solve_offsets(differences, nshared, reference=0, levels=levels)
+    seconds = elapsed()
+report("global levelling", found, seconds)
+
+# -----------------------------------------------------------------
@@ -0,0 +1,171 @@
+#!/usr/bin/env python
+# -*- coding: utf8 -*-
+# *****************************************************************
+# **       PTS -- Python Toolkit for working with SKIRT          **
+# **       © Astronomical Observatory, Ghent University          **
+# *****************************************************************
+
+## \package pts.do.eagle.benchmarkextraction Compare the throughput of reading the particle data for EAGLE galaxies
+#  one galaxy at a time with the chunked reading used by the extraction scheduler, on a synthetic HDF5 snapshot.
+#
+# The script creates a synthetic snapshot file with clustered star and gas particles (in a temporary directory),
+# stored in the order of a grid of spatial hash cells, as in the EAGLE snapshots. It then reads the particle data for
+# a set of galaxies with the pts.eagle.extractor.readRegion function, first for one galaxy at a time, and then for
+# chunks of galaxies as scheduled by pts.eagle.extractor.scheduleExtraction, and verifies that the same particles are
+# obtained. Finally, it determines the centre and rotation axis of all galaxies, distributed over a number of processes.
+#
+# The script takes the following (optional) command-line arguments:
+#  - ngalaxies: the number of galaxies (default 200)
+#  - nparticles: the number of particles per galaxy and per particle type (default 20000)
+#  - nprocesses: the number of processes for determining the centre and rotation axis (default 4)
+#  - chunksize: the maximum number of galaxies in a chunk (default 20)
+#
+
+# -----------------------------------------------------------------
+
+# Import standard modules
+import os
+import sys
+import time
+import shutil
+import tempfile
+import numpy as np
+import h5py
+
+# Import the relevant PTS classes and modules
+from pts.core.tools.parallelization import ParallelTarget
+from pts.eagle.extractor import readRegion, scheduleExtraction, shrinkingCentroid, rotAxis
+
+# -----------------------------------------------------------------
+
+# get the command-line arguments
+ngalaxies = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+nparticles = int(sys.argv[2]) if len(sys.argv) > 2 else 20000
+nprocesses = int(sys.argv[3]) if len(sys.argv) > 3 else 4
+chunksize = int(sys.argv[4]) if len(sys.argv) > 4 else 20
+
+# snapshot parameters (positions in Mpc/h)
+boxsize = 25.
+ncells = 32
+params = { "HubbleParam": 0.6777, "ExpansionFactor": 1., "BoxSize": boxsize }
+
+# -----------------------------------------------------------------
+
+## This class mimics the interface of read_eagle.EagleSnapshot for the synthetic snapshot: the particles are stored
+# in the order of the hash cells, and selecting a region selects all cells that overlap with it.
+class SyntheticSnapshot:
+    def __init__(self, filename):
+        self._file = h5py.File(filename, 'r')
+        self._selected = np.zeros((ncells,ncells,ncells), dtype=bool)
+
+    def select_region(self, xmin, xmax, ymin, ymax, zmin, zmax):
+        cellsize = boxsize / ncells
+        ranges = [ np.arange(int(np.floor(low/cellsize)), int(np.floor(high/cellsize))+1) % ncells
+                   for low,high in ((xmin,xmax),(ymin,ymax),(zmin,zmax)) ]
+        self._selected[np.ix_(*ranges)] = True
+
+    def clear_selection(self):
+        self._selected[:] = False
+
+    def read_dataset(self, parttype, name):
+        group = self._file["PartType{}".format(parttype)]
+        offsets = group["CellOffsets"][...]
+        cells = np.flatnonzero(self._selected)
+        dataset = group[name]
+        return np.concatenate([ dataset[offsets[cell]:offsets[cell+1]] for cell in cells ]) if len(cells) > 0 \
+               else dataset[0:0]
+
+    def close(self):
+        self._file.close()
+
+# -----------------------------------------------------------------
+
+## This function creates the synthetic snapshot and returns the corresponding SKIRT-runs records
+def createSnapshot(filename):
+    random = np.random.RandomState(1)
+    centres = random.uniform(0, boxsize, (ngalaxies,3))
+    outfile = h5py.File(filename, 'w')
+    for parttype, fields in ((4, ("InitialMass","Mass","SmoothedMetallicity","StellarFormationTime","BirthDensity")),
+                             (0, ("Mass","SmoothedMetallicity","Temperature","Density","StarFormationRate"))):
+        # positions around the galaxy centres, with velocities that rotate about the z-axis
+        groupnr = np.repeat(np.arange(1, ngalaxies+1), nparticles)
+        offsets = random.normal(scale=0.01, size=(len(groupnr),3))
+        r = (centres[groupnr-1] + offsets) % boxsize
+        v = np.column_stack((-offsets[:,1], offsets[:,0], np.zeros(len(groupnr)))) * 2e4
+
+        # sort the particles on hash cell
+        cell = np.floor(r / (boxsize/ncells)).astype(int)
+        cell = np.ravel_multi_index((cell[:,0],cell[:,1],cell[:,2]), (ncells,ncells,ncells))
+        order = np.argsort(cell, kind="mergesort")
+
+        group = outfile.create_group("PartType{}".format(parttype))
+        group["CellOffsets"] = np.concatenate(([0], np.cumsum(np.bincount(cell, minlength=ncells**3))))
+        group["Coordinates"] = r[order]
+        group["Velocity"] = v[order]
+        group["SmoothingLength"] = np.full(len(order), 1e-3)
+        group["GroupNumber"] = groupnr[order]
+        group["SubGroupNumber"] = np.zeros(len(order), dtype=int)
+        for name in fields:
+            group[name] = random.uniform(1e-6, 1e-5, len(order))
+    outfile.close()
+
+    h = params["HubbleParam"]
+    return [ { "runid": index+1, "eaglesim": "Synthetic", "snaptag": 28, "galaxyid": index+1,
+               "groupnr": index+1, "subgroupnr": 0,
+               "copx": centre[0]/h, "copy": centre[1]/h, "copz": centre[2]/h } for index,centre in enumerate(centres) ]
+
+## This function determines the centre and rotation axis of a galaxy
+def orient(sdat):
+    com, v_bar = shrinkingCentroid(sdat['r'], sdat['m'], sdat['v'])
+    return rotAxis(sdat['r'], sdat['v'], sdat['m'], com, v_bar, apt=0.03, aptfrac=0.08)
+
+# -----------------------------------------------------------------
+
+tempdir = tempfile.mkdtemp()
+try:
+    filename = os.path.join(tempdir, "snapshot.hdf5")
+    records = createSnapshot(filename)
+    print "Created a synthetic snapshot with {} galaxies and {} particles".format(ngalaxies, 2*ngalaxies*nparticles)
+
+    # read one galaxy at a time
+    start = time.time()
+    single = { }
+    for record in records:
+        snapshot = SyntheticSnapshot(filename)
+        single[record["runid"]] = readRegion(snapshot, params, [record])[0]
+        snapshot.close()
+    seconds = time.time() - start
+    print "One galaxy at a time: {:.2f} s ({:.1f} galaxies/s)".format(seconds, ngalaxies/seconds)
+
+    # read in chunks
+    start = time.time()
+    chunked = { }
+    for eaglesim, snaptag, chunk in scheduleExtraction(records, chunksize, cellsize=boxsize/4):
+        snapshot = SyntheticSnapshot(filename)
+        for record, particles in zip(chunk, readRegion(snapshot, params, chunk)):
+            chunked[record["runid"]] = particles
+        snapshot.close()
+    seconds = time.time() - start
+    print "In chunks of {} galaxies: {:.2f} s ({:.1f} galaxies/s)".format(chunksize, seconds, ngalaxies/seconds)
+
+    # verify
+    for runid in single:
+        for first, second in zip(single[runid], chunked[runid]):
+            for key in first:
+                if not np.array_equal(first[key], second[key]):
+                    raise ValueError("Particle data differs for galaxy {}".format(runid))
+    total = sum(len(sdat['m']) + len(gdat['m']) for sdat, gdat in chunked.values())
+    print "The particle data is identical ({} particles read)".format(total)
+
+    # determine the centre and rotation axis in parallel
+    start = time.time()
+    with ParallelTarget(orient, nprocesses) as target:
+        outputs = [ target(chunked[record["runid"]][0]) for record in records ]
+    for output in outputs: output.request()
+    seconds = time.time() - start
+    print "Orienting with {} processes: {:.2f} s ({:.1f} galaxies/s)".format(nprocesses, seconds, ngalaxies/seconds)
+
+finally:
+    shutil.rmtree(tempdir)
+
+# -----------------------------------------------------------------
@@ -0,0 +1,93 @@
+#!/usr/bin/env python
+# -*- coding: utf8 -*-
+# *****************************************************************
+# **       PTS -- Python Toolkit for working with SKIRT          **
+# **       © Astronomical Observatory, Ghent University          **
+# *****************************************************************
+
+## \package pts.do.eagle.benchmarktransform Check the batched coordinate transforms of pts.core.tools.geometry.Transform
+#  against the per-point transform, and measure their throughput.
+#
+# The script creates a transform like the one used by the EAGLE extractor (a translation followed by two rotations)
+# and applies it to a set of random particle positions. It verifies that the batched, in-place and chunked transforms
+# give the same result as the per-point transform (for a subset of the points), and reports the time per million
+# particles for each of them.
+#
+# The script takes the following (optional) command-line arguments:
+#  - nparticles: the number of particles (default 10000000)
+#  - chunksize: the maximum number of particles transformed at once (default 1000000)
+#
+
+# -----------------------------------------------------------------
+
+# Import standard modules
+import sys
+import time
+import numpy as np
+
+# Import the relevant PTS classes and modules
+from pts.core.tools.geometry import Transform
+
+# -----------------------------------------------------------------
+
+# get the command-line arguments
+nparticles = int(sys.argv[1]) if len(sys.argv) > 1 else 10000000
+chunksize = int(sys.argv[2]) if len(sys.argv) > 2 else 1000000
+
+# create the transform, as in the EAGLE extractor
+random = np.random.RandomState(1)
+com = random.uniform(-1e6, 1e6, 3)
+a, b, c = random.normal(size=3) / np.sqrt(3.)
+a, b, c = np.array((a, b, c)) / np.sqrt(a*a+b*b+c*c)
+v = np.sqrt(b*b+c*c)
+transf = Transform()
+transf.translate(-com[0], -com[1], -com[2])
+transf.rotateX(c/v, -b/v)
+transf.rotateY(v, -a)
+
+# create the positions
+r = com + random.normal(scale=1e4, size=(nparticles,3))
+
+# -----------------------------------------------------------------
+
+## This function returns the maximum difference relative to the coordinate scale
+def maxdiff(first, second):
+    return np.max(np.abs(first - second)) / np.max(np.abs(second))
+
+# per-point transform for a subset of the points (the reference)
+nsubset = min(nparticles, 20000)
+start = time.time()
+reference = np.array([ transf.transform(x, y, z, 1.) for x, y, z in r[:nsubset] ])
+seconds = time.time() - start
+print "Per point:           {:.3f} s per million particles".format(seconds * 1e6 / nsubset)
+
+# transform_vec
+start = time.time()
+rvec, wvec = transf.transform_vec(r[:,0], r[:,1], r[:,2], np.ones(nparticles), chunksize=chunksize)
+seconds = time.time() - start
+print "transform_vec:       {:.3f} s per million particles   (max. difference {:.2e})".format(
+        seconds * 1e6 / nparticles, max(maxdiff(rvec[:nsubset], reference[:,:3]), maxdiff(wvec[:nsubset], reference[:,3])))
+
+# transform_array on homogeneous coordinates
+crds = np.column_stack((r, np.ones(nparticles)))
+start = time.time()
+result = transf.transform_array(crds, chunksize=chunksize)
+seconds = time.time() - start
+print "transform_array:     {:.3f} s per million particles   (max. difference {:.2e})".format(
+        seconds * 1e6 / nparticles, maxdiff(result[:nsubset], reference))
+
+# transform_positions
+start = time.time()
+result = transf.transform_positions(r, chunksize=chunksize)
+seconds = time.time() - start
+print "transform_positions: {:.3f} s per million particles   (max. difference {:.2e})".format(
+        seconds * 1e6 / nparticles, maxdiff(result[:nsubset], reference[:,:3]))
+
+# transform_positions in place
+start = time.time()
+transf.transform_positions(r, out=r, chunksize=chunksize)
+seconds = time.time() - start
+print "... in place:        {:.3f} s per million particles   (max. difference {:.2e})".format(
+        seconds * 1e6 / nparticles, maxdiff(r[:nsubset], reference[:,:3]))
+
+# -----------------------------------------------------------------
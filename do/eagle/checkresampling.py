@@ -0,0 +1,78 @@
+#!/usr/bin/env python
+# -*- coding: utf8 -*-
+# *****************************************************************
+# **       PTS -- Python Toolkit for working with SKIRT          **
+# **       © Astronomical Observatory, Ghent University          **
+# *****************************************************************
+
+## \package pts.do.eagle.checkresampling Check that the vectorised resampling of star forming particles is
+#  statistically equivalent to the original particle-by-particle loop.
+#
+# The script resamples the same set of synthetic parent particles many times with both implementations (with
+# different random seeds) and compares the distributions of the sub-particle masses and lookback times with a
+# two-sample Kolmogorov-Smirnov test, as well as the mean number of sub-particles and the mean total mass that is
+# locked up in new stars. It also reports the time spent by both implementations.
+#
+# The script takes the following (optional) command-line arguments:
+#  - nparticles: the number of parent particles (default 2000)
+#  - nrealizations: the number of times the particles are resampled (default 20)
+#
+
+# -----------------------------------------------------------------
+
+# Import standard modules
+import sys
+import time
+import numpy as np
+from scipy.stats import ks_2samp
+
+# Import the relevant PTS classes and modules
+from pts.eagle.extractor import stochResamp, stochResampLoop
+
+# -----------------------------------------------------------------
+
+# get the command-line arguments
+nparticles = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+nrealizations = int(sys.argv[2]) if len(sys.argv) > 2 else 20
+
+# create synthetic parent particles, with masses and star formation rates typical for EAGLE gas particles
+random = np.random.RandomState(12345)
+m_gas = 10**random.uniform(5., 6.5, nparticles)            # M_sun
+sfr = m_gas / 10**random.uniform(8.5, 10., nparticles)      # M_sun / yr
+
+# resample with both implementations
+results = { }
+for name, function in (("loop", stochResampLoop), ("vectorised", stochResamp)):
+    ms = [ ]
+    ts = [ ]
+    counts = [ ]
+    mdiffs = [ ]
+    start = time.time()
+    for seed in range(nrealizations):
+        m, t, idx, mdiff = function(sfr, m_gas, np.random.RandomState(seed))
+        ms.append(m)
+        ts.append(t)
+        counts.append(len(m))
+        mdiffs.append(mdiff.sum())
+    seconds = time.time() - start
+    results[name] = (np.concatenate(ms), np.concatenate(ts), np.array(counts), np.array(mdiffs), seconds)
+
+# -----------------------------------------------------------------
+
+# compare
+ms_loop, ts_loop, counts_loop, mdiffs_loop, seconds_loop = results["loop"]
+ms_vec, ts_vec, counts_vec, mdiffs_vec, seconds_vec = results["vectorised"]
+
+print "Time per realization:   loop {:.4f} s   vectorised {:.4f} s   (speedup {:.1f}x)".format(
+        seconds_loop/nrealizations, seconds_vec/nrealizations, seconds_loop/seconds_vec)
+print "Sub-particles:          loop {:.1f} +- {:.1f}   vectorised {:.1f} +- {:.1f}".format(
+        counts_loop.mean(), counts_loop.std(), counts_vec.mean(), counts_vec.std())
+print "Mass in new stars:      loop {:.4e} +- {:.2e}   vectorised {:.4e} +- {:.2e}".format(
+        mdiffs_loop.mean(), mdiffs_loop.std(), mdiffs_vec.mean(), mdiffs_vec.std())
+
+statistic, pvalue = ks_2samp(ms_loop, ms_vec)
+print "Sub-particle masses:    KS statistic {:.4f}   p-value {:.3f}".format(statistic, pvalue)
+statistic, pvalue = ks_2samp(ts_loop, ts_vec)
+print "Lookback times:         KS statistic {:.4f}   p-value {:.3f}".format(statistic, pvalue)
+
+# -----------------------------------------------------------------
@@ -92,11 +92,10 @@ database.backup()
 db = database.Database()
 firstid = db.maxrunid()+1
 with db.transaction():
-    for record in records:
-        db.insert(label, eaglesim,
-                  int(record["snaptag"]), int(record["galaxyid"]), int(record["groupnr"]), int(record["subgroupnr"]),
-                  float(record["starmass"]), float(record["copx"]), float(record["copy"]), float(record["copz"]),
-                  skitemplate, numpp, deltamax)
+    db.insertmany([ (label, eaglesim,
+                     int(record["snaptag"]), int(record["galaxyid"]), int(record["groupnr"]), int(record["subgroupnr"]),
+                     float(record["starmass"]), float(record["copx"]), float(record["copy"]), float(record["copz"]),
+                     skitemplate, numpp, deltamax) for record in records ])
 lastid = db.maxrunid()
 db.close()
 
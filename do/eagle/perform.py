@@ -11,18 +11,20 @@
 # depending on the command line arguments:
 #
 #\verbatim
-#pts eagle/perform <stage> loop <runtime>
+#pts eagle/perform <stage> loop <runtime> [<nprocesses>]
 #pts eagle/perform <stage> force <runidspec>
 #\endverbatim
 #
 # where:
 #  - \<stage\> is one of "extract", "simulate", "observe", or "store";
 #  - \<runtime\> is a run time in seconds (given as a floating point expression);
-#  - \<runidspec\> is a comma-seperated list of run-ids and/or run-id ranges (two run-ids with a dash in between).
+#  - \<runidspec\> is a comma-seperated list of run-ids and/or run-id ranges (two run-ids with a dash in between);
+#  - \<nprocesses\> is the number of processes used for each chunk of records in the extract stage (default 1).
 #
 # In loop mode, the script repeatedly performs the specified stage for a SKIRT-run record that is
 # at the corresponding workflow stage and has the 'scheduled' status, until there are no more such records,
-# or until the specified run time (given in seconds) has been surpassed.
+# or until the specified run time (given in seconds) has been surpassed. In the extract stage, the galaxies
+# in each chunk of records are extracted together, reading the snapshot regions they share only once.
 #
 # In force mode, the script performs the specified stage for each of the specified SKIRT-run records,
 # regardless of the stage and status of those records.
@@ -34,8 +36,8 @@
 import sys
 
 # Get the command-line arguments
-if len(sys.argv) != 4: raise ValueError("This script expects three command-line arguments: " \
-                                        "(stage loop runtime) or (stage force runidspec)")
+if len(sys.argv) not in (4,5): raise ValueError("This script expects three or four command-line arguments: " \
+                                               "(stage loop runtime [nprocesses]) or (stage force runidspec)")
 stage = sys.argv[1]
 if not stage in ("extract", "simulate", "observe", "store"):
     raise ValueError("First argument must be 'extract', 'simulate', 'observe', or 'store'")
@@ -43,6 +45,7 @@ mode = sys.argv[2]
 if not mode in ("loop", "force"):
     raise ValueError("Second argument must be 'loop' or 'force'")
 argum = sys.argv[3]
+nprocesses = int(sys.argv[4]) if len(sys.argv) > 4 else 1
 
 # -----------------------------------------------------------------
 
@@ -61,12 +64,16 @@ from pts.eagle import performer
 # Get appropriate callback for given stage
 if stage == "extract":
     from pts.eagle.extractor import extract as callback
+    from pts.eagle.extractor import extractMany
+    batchcallback = lambda records: extractMany(records, nprocesses=nprocesses)
     chunksize = 20
 if stage == "simulate":
     from pts.eagle.simulator import simulate as callback
+    batchcallback = None
     chunksize = 1
 if stage == "observe":
     from pts.eagle.observer import observe as callback
+    batchcallback = None
     chunksize = 20
 if stage == "store":
     log.error("Sorry - the store stage is not yet implemented")
@@ -75,7 +82,7 @@ if stage == "store":
 # Perform according to requested mode
 log.info("Performing {} in {} mode ...".format(stage, mode))
 if mode == "loop":
-    performer.loop(callback, stage, float(eval(argum)), chunksize)
+    performer.loop(callback, stage, float(eval(argum)), chunksize, batchcallback)
 if mode == "force":
     performer.force(callback, stage, argum)
 log.info("Finished performing.")
@@ -0,0 +1,69 @@
+#!/usr/bin/env python
+# -*- coding: utf8 -*-
+# *****************************************************************
+# **       PTS -- Python Toolkit for working with SKIRT          **
+# **       © Astronomical Observatory, Ghent University          **
+# *****************************************************************
+
+## \package pts.do.magic.test_convolution_cache Check the convolution with cached kernel transforms against astropy's
+#  convolve_fft(boundary='fill', nan_treatment='interpolate'), for images with and without NaNs (including the pixels
+#  near the edges).
+
+# -----------------------------------------------------------------
+
+# Ensure Python 3 compatibility
+from __future__ import absolute_import, division, print_function
+
+# Import standard modules
+import numpy as np
+
+# Import astronomical modules
+from astropy.convolution import convolve_fft
+
+# Import the relevant PTS classes and modules
+from pts.core.basics.log import setup_log
+from pts.magic.convolution.cache import fft_shape, kernel_transform, convolve_fft_with_transform
+
+# -----------------------------------------------------------------
+
+# Set logging
+log = setup_log("INFO")
+
+# -----------------------------------------------------------------
+
+# Create a normalized, asymmetric kernel and an image
+random = np.random.RandomState(1)
+y, x = np.mgrid[-7:8, -7:8]
+kernel = np.exp(-0.5 * ((x / 2.5)**2 + (y / 1.5)**2))
+kernel /= np.sum(kernel)
+data = random.normal(10., 1., size=(60, 83))
+
+# Image with NaNs, also at the border
+data_nans = data.copy()
+data_nans[random.uniform(size=data.shape) < 0.05] = float("nan")
+data_nans[0, :5] = float("nan")
+
+# -----------------------------------------------------------------
+
+# Loop over the images
+for name, image in [("without NaNs", data), ("with NaNs", data_nans)]:
+
+    # Reference
+    reference = convolve_fft(image, kernel, boundary='fill', nan_treatment="interpolate", normalize_kernel=False, allow_huge=True)
+
+    # With the kernel transform
+    shape = fft_shape(image.shape, kernel.shape)
+    result = convolve_fft_with_transform(image, kernel_transform(kernel, shape), shape, kernel.shape)
+
+    # Compare, including the edges
+    difference = np.nanmax(np.abs(result - reference))
+    edge_difference = max(np.nanmax(np.abs(result - reference)[:, :7]), np.nanmax(np.abs(result - reference)[-7:, :]))
+    log.info("Image " + name + ": maximum difference " + str(difference) + " (near the edges: " + str(edge_difference) + ")")
+    assert np.array_equal(np.isnan(result), np.isnan(reference))
+    assert difference < 1e-8
+
+# -----------------------------------------------------------------
+
+log.success("The convolution with cached kernel transforms is equal to astropy's convolve_fft")
+
+# -----------------------------------------------------------------
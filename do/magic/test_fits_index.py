@@ -0,0 +1,72 @@
+#!/usr/bin/env python
+# -*- coding: utf8 -*-
+# *****************************************************************
+# **       PTS -- Python Toolkit for working with SKIRT          **
+# **       © Astronomical Observatory, Ghent University          **
+# *****************************************************************
+
+## \package pts.do.magic.test_fits_index Check the header index of pts.magic.core.fits for a FITS file of which the
+#  primary HDU is empty and the planes are in an extension: the planes must be resolved against the HDU that is
+#  loaded, and no sidecar index file may be written unless enabled.
+
+# -----------------------------------------------------------------
+
+# Ensure Python 3 compatibility
+from __future__ import absolute_import, division, print_function
+
+# Import standard modules
+import numpy as np
+
+# Import astronomical modules
+from astropy.io import fits
+
+# Import the relevant PTS classes and modules
+from pts.core.basics.log import setup_log
+from pts.core.tools import filesystem as fs
+from pts.core.tools import introspection
+from pts.core.tools import time
+from pts.magic.core import fits as pts_fits
+
+# -----------------------------------------------------------------
+
+# Set logging
+log = setup_log("INFO")
+
+# -----------------------------------------------------------------
+
+# Create the FITS file: empty primary HDU, three named planes in the first extension
+path = fs.join(introspection.create_temp_dir(time.unique_name("fits_index")), "test.fits")
+data = np.arange(3 * 4 * 5, dtype="float64").reshape(3, 4, 5)
+extension = fits.ImageHDU(data)
+for i, name in enumerate(["primary", "errors", "sky"]): extension.header["PLANE" + str(i)] = name + " [frame]"
+fits.HDUList([fits.PrimaryHDU(), extension]).writeto(path)
+
+# -----------------------------------------------------------------
+
+# The primary HDU has no planes
+assert pts_fits.get_index(path)["planes"] == []
+assert pts_fits.get_plane_names(path) == dict()
+
+# The planes of the extension
+assert [plane[0] for plane in pts_fits.get_index(path, hdulist_index=1)["planes"]] == ["primary", "errors", "sky"]
+assert pts_fits.get_plane_index(path, "sky", hdulist_index=1) == 2
+
+# Resolving a plane of the extension against the primary HDU fails
+try:
+    pts_fits.get_plane_index(path, "sky")
+    raise AssertionError("The plane should not be found in the primary HDU")
+except ValueError: pass
+
+# Load a plane by name from the extension
+frames, masks, segments, meta = pts_fits.load_frames(path, hdulist_index=1, planes=["sky"], no_filter=True, no_wcs=True)
+assert list(frames.keys()) == ["sky"]
+assert np.array_equal(frames["sky"].data, data[2])
+
+# No sidecar file by default
+assert not fs.is_file(pts_fits.get_index_path(path))
+
+# -----------------------------------------------------------------
+
+log.success("The FITS header index is correct for a file with an empty primary HDU")
+
+# -----------------------------------------------------------------
@@ -0,0 +1,168 @@
+#!/usr/bin/env python
+# -*- coding: utf8 -*-
+# *****************************************************************
+# **       PTS -- Python Toolkit for working with SKIRT          **
+# **       © Astronomical Observatory, Ghent University          **
+# *****************************************************************
+
+## \package pts.do.magic.test_inpainting Check the vectorised inpainting functions of pts.magic.tools.inpainting
+#  against the original implementations on small random images: replace_nans (the original element-by-element loops
+#  are included below as the reference) and astropy's interpolate_replace_nans.
+
+# -----------------------------------------------------------------
+
+# Ensure Python 3 compatibility
+from __future__ import absolute_import, division, print_function
+
+# Import standard modules
+import warnings
+import numpy as np
+
+# Import astronomical modules
+from astropy.convolution import Gaussian2DKernel, interpolate_replace_nans
+
+# Import the relevant PTS classes and modules
+from pts.core.basics.log import setup_log
+from pts.magic.tools.interpolation import replace_nans
+from pts.magic.tools.inpainting import normalized_convolution, pyramid_fill, kdtree_idw_fill
+
+# -----------------------------------------------------------------
+
+# Set logging
+log = setup_log("INFO")
+
+# -----------------------------------------------------------------
+
+def reference_replace_nans(array, max_iter, tol, kernel_size=1, method='localmean'):
+
+    """
+    This function is the original (element-by-element) implementation of replace_nans
+    :param array:
+    :param max_iter:
+    :param tol:
+    :param kernel_size:
+    :param method:
+    :return:
+    """
+
+    filled = np.zeros_like(array)
+    kernel = np.empty((2*kernel_size+1, 2*kernel_size+1), dtype=np.float64)
+    inans, jnans = np.nonzero(np.isnan(array))
+    n_nans = len(inans)
+    replaced_new = np.zeros(n_nans, dtype=np.float64)
+    replaced_old = np.zeros(n_nans, dtype=np.float64)
+
+    if method == 'localmean':
+        for i in range(2*kernel_size+1):
+            for j in range(2*kernel_size+1):
+                kernel[i,j] = 1.
+    elif method == 'idw':
+        kernel = np.array([[0, 0.5, 0.5, 0.5,0],
+                  [0.5,0.75,0.75,0.75,0.5],
+                  [0.5,0.75,1,0.75,0.5],
+                  [0.5,0.75,0.75,0.5,1],
+                  [0, 0.5, 0.5 ,0.5 ,0]])
+
+    for i in range(array.shape[0]):
+        for j in range(array.shape[1]):
+            filled[i,j] = array[i,j]
+
+    for it in range(max_iter):
+        for k in range(n_nans):
+            i = inans[k]
+            j = jnans[k]
+            filled[i,j] = 0.0
+            n = 0
+            for I in range(2*kernel_size+1):
+                for J in range(2*kernel_size+1):
+                    if i+I-kernel_size < array.shape[0] and i+I-kernel_size >= 0:
+                        if j+J-kernel_size < array.shape[1] and j+J-kernel_size >= 0:
+                            if filled[i+I-kernel_size, j+J-kernel_size] == filled[i+I-kernel_size, j+J-kernel_size]:
+                                if I-kernel_size != 0 and J-kernel_size != 0:
+                                    filled[i,j] = filled[i,j] + filled[i+I-kernel_size, j+J-kernel_size]*kernel[I, J]
+                                    n = n + 1
+            if n != 0:
+                filled[i,j] = filled[i,j] / n
+                replaced_new[k] = filled[i,j]
+            else: filled[i,j] = np.nan
+        if np.mean((replaced_new-replaced_old)**2) < tol: break
+        else:
+            for l in range(n_nans): replaced_old[l] = replaced_new[l]
+
+    return filled
+
+# -----------------------------------------------------------------
+
+def random_image(random, ny, nx, fraction):
+
+    """
+    This function ...
+    :param random:
+    :param ny:
+    :param nx:
+    :param fraction:
+    :return:
+    """
+
+    data = random.normal(5., 2., size=(ny, nx))
+    data[random.uniform(size=data.shape) < fraction] = float("nan")
+    data[2:6, 1:5] = float("nan")
+    return data
+
+# -----------------------------------------------------------------
+
+random = np.random.RandomState(3)
+warnings.simplefilter("ignore", RuntimeWarning)
+
+# -----------------------------------------------------------------
+
+# replace_nans
+for method in ["localmean", "idw"]:
+    for kernel_size in [1, 2]:
+        for max_iter, tol in [(1, 0.5), (5, 1e-3), (20, 1e-9)]:
+            for _ in range(5):
+
+                data = random_image(random, random.randint(8, 30), random.randint(8, 30), random.uniform(0.05, 0.6))
+                reference = reference_replace_nans(data.copy(), max_iter, tol, kernel_size=kernel_size, method=method)
+                result = replace_nans(data.copy(), max_iter, tol, kernel_size=kernel_size, method=method)
+
+                assert np.array_equal(np.isnan(result), np.isnan(reference))
+                assert np.allclose(result, reference, rtol=0, atol=1e-10, equal_nan=True)
+
+        log.info("replace_nans with method '" + method + "' and kernel size " + str(kernel_size) + ": OK")
+
+# -----------------------------------------------------------------
+
+# Normalized convolution against interpolate_replace_nans (away from the edges, where astropy counts the pixels
+# outside the image as zeros)
+kernel = Gaussian2DKernel(1.5)
+margin = kernel.array.shape[0] // 2
+for _ in range(5):
+
+    data = random_image(random, 40, 50, 0.1)
+    reference = interpolate_replace_nans(data, kernel)
+    result = normalized_convolution(data, kernel)
+    inner = (slice(margin, -margin), slice(margin, -margin))
+
+    assert np.allclose(result[inner], reference[inner], rtol=0, atol=1e-8, equal_nan=True)
+
+log.info("normalized_convolution: OK")
+
+# -----------------------------------------------------------------
+
+# The pyramid and KD-tree fills fill all pixels, and reproduce a constant image
+for fill in [pyramid_fill, kdtree_idw_fill]:
+
+    data = random_image(random, 64, 48, 0.3)
+    assert not np.any(np.isnan(fill(data)))
+
+    constant = np.where(np.isnan(data), np.nan, 3.)
+    assert np.allclose(fill(constant), 3.)
+
+    log.info(fill.__name__ + ": OK")
+
+# -----------------------------------------------------------------
+
+log.success("The inpainting functions agree with the original implementations")
+
+# -----------------------------------------------------------------
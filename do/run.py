@@ -20,19 +20,16 @@ import importlib
 from pts.core.tools import introspection
 from pts.core.tools import time
 from pts.core.tools import filesystem as fs
+from pts.core.tools.utils import show_memoize_statistics
+from pts.core.tools.profiling import profile_span, finish_profiling
 from .commandline import start_and_clear
-from pts.modeling.welcome import welcome as welcome_modeling
-from pts.magic.welcome import welcome as welcome_magic
-from pts.evolve.welcome import welcome as welcome_evolve
-from pts.dustpedia.welcome import welcome as welcome_dustpedia
-from pts.core.basics.configuration import create_configuration
-from pts.modeling.setup import setup as setup_modeling, finish as finish_modeling
-from pts.modeling.setup import check_modeling_cwd
-from pts.magic.setup import setup as setup_magic, finish as finish_magic
-from pts.evolve.setup import setup as setup_evolve, finish as finish_evolve
-from pts.dustpedia.setup import setup as setup_dustpedia, finish as finish_dustpedia
 from pts.do.commandline import show_all_available, show_possible_matches, print_welcome
-from pts.core.basics.filemonitor import FileMonitor
+
+# -----------------------------------------------------------------
+
+# The subprojects with a welcome message and setup and finish functions (these modules, and the modules of the
+# command itself, are only imported when a command of the subproject is run, to keep the startup of PTS fast)
+setup_subprojects = ["modeling", "magic", "evolve", "dustpedia"]
 
 # -----------------------------------------------------------------
 
@@ -179,14 +176,17 @@ def run_configurable(table_matches, args, tables):
     # Get a list of the leftover arguments
     leftover_arguments = sys.argv[1:]
 
+    # Import the welcome and setup module of the subproject
+    if subproject in setup_subprojects:
+        welcome_module = importlib.import_module("pts." + subproject + ".welcome")
+        setup_module = importlib.import_module("pts." + subproject + ".setup")
+    else: welcome_module = setup_module = None
+
     # Welcome message
-    if subproject == "modeling": welcome_modeling()
-    elif subproject == "magic": welcome_magic()
-    elif subproject == "dustpedia": welcome_dustpedia()
-    elif subproject == "evolve": welcome_evolve()
+    if welcome_module is not None: welcome_module.welcome()
 
     # Special
-    if subproject == "modeling": check_modeling_cwd(command_name, fs.cwd())
+    if subproject == "modeling": setup_module.check_modeling_cwd(command_name, fs.cwd())
 
     # Get the configuration definition
     definition = introspection.get_configuration_definition_pts_not_yet_in_pythonpath(configuration_module_path)
@@ -198,7 +198,8 @@ def run_configurable(table_matches, args, tables):
     if configuration_method == "interactive" and len(leftover_arguments) > 0: raise ValueError("Arguments on the command-line are not supported by default for this command. Run with pts --arguments to change this behaviour.")
 
     # Create the configuration
-    config = create_configuration(definition, command_name, description, configuration_method)
+    from pts.core.basics.configuration import create_configuration
+    with profile_span("configuration", "setup"): config = create_configuration(definition, command_name, description, configuration_method)
 
     ## SAVE THE CONFIG if requested
     if config.write_config:
@@ -214,10 +215,8 @@ def run_configurable(table_matches, args, tables):
         config.saveto(config_cache_path)
 
     # Setup function
-    if subproject == "modeling": setup_modeling(command_name, fs.cwd(), configuration_method_argument)
-    elif subproject == "magic": setup_magic(command_name, fs.cwd())
-    elif subproject == "dustpedia": setup_dustpedia(command_name, fs.cwd())
-    elif subproject == "evolve": setup_evolve(command_name, fs.cwd())
+    if subproject == "modeling": setup_module.setup(command_name, fs.cwd(), configuration_method_argument)
+    elif setup_module is not None: setup_module.setup(command_name, fs.cwd())
 
     # Initialize the logger
     log = initialize_pts(config, remote=args.remote, command_name=command_name)
@@ -232,10 +231,28 @@ def run_configurable(table_matches, args, tables):
     else: run_locally(exact_command_name, module_path, class_name, config, args.input_files, args.output_files, args.output, log)
 
     # Finish function
-    if subproject == "modeling": finish_modeling(command_name, fs.cwd(), config_path=config_filepath)
-    elif subproject == "magic": finish_magic(command_name, fs.cwd())
-    elif subproject == "dustpedia": finish_dustpedia(command_name, fs.cwd())
-    elif subproject == "evolve": finish_evolve(command_name, fs.cwd())
+    if subproject == "modeling": setup_module.finish(command_name, fs.cwd(), config_path=config_filepath)
+    elif setup_module is not None: setup_module.finish(command_name, fs.cwd())
+
+    # Show the cache statistics
+    if args.cache_statistics: show_memoize_statistics()
+
+    # Show and write the profile
+    if args.profile: finish_profiling(profile_path(args, command_name))
+
+# -----------------------------------------------------------------
+
+def profile_path(args, command_name):
+
+    """
+    This function returns the path of the profile trace file
+    :param args:
+    :param command_name:
+    :return:
+    """
+
+    if args.profile_path is not None: return fs.absolute_path(args.profile_path)
+    else: return fs.join(fs.cwd(), command_name + "_profile.json")
 
 # -----------------------------------------------------------------
 
@@ -254,6 +271,7 @@ def initialize_pts(config, remote=None, command_name=None):
 
     # Initialize the file monitor
     if log.is_debug:
+        from pts.core.basics.filemonitor import FileMonitor
         monitor = FileMonitor(short=True)
         monitor.patch()
 
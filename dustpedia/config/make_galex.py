@@ -26,6 +26,11 @@ definition.add_optional("output", "string", "the name of the output directory",
 definition.add_optional("max_nobservations_fuv", "positive_integer", "limit the number of FUV observations")
 definition.add_optional("max_nobservations_nuv", "positive_integer", "limit the number of NUV observations")
 
+# Background levelling
+definition.add_optional("level_method", "string", "method for determining the background level of each tile ('mean': the least-squares level, faster but not the same as the 'lmfit' level)", "lmfit", choices=["lmfit", "mean"])
+definition.add_flag("global_levelling", "determine the offsets between the tiles from their overlaps, for all tiles at once", False)
+definition.add_optional("levelling_cell_size", "positive_integer", "size of the cells (in mosaic pixels) for comparing overlapping tiles", 16)
+
 # Parallelization
 definition.add_optional("nprocesses", "positive_integer", "number of processes for parallel execution", max(8, ncores()))
 
@@ -34,7 +34,7 @@ from .sample import DustPediaSample
 from ...core.tools import filesystem as fs
 from ...core.tools import tables, network
 from ...magic.basics.coordinate import SkyCoordinate
-from ...magic.tools import mosaicing
+from ...magic.tools import mosaicing, levelling
 from ...core.tools.parallelization import ParallelTarget
 from ...magic.misc import chrisfuncs
 from ...magic.basics.coordinatesystem import CoordinateSystem
@@ -844,12 +844,13 @@ class GALEXMosaicMaker(Configurable):
                     filename = fitsfile_list[i]
 
                     # Call the target function
-                    result = target(filename, convolve_path)
+                    result = target(filename, convolve_path, self.config.level_method)
 
                     # Set the result handle
                     results[i] = result
 
             level_ref = None
+            levels = [None] * len(fitsfile_list)
 
             # For
             for index in range(len(results)):
@@ -861,6 +862,7 @@ class GALEXMosaicMaker(Configurable):
                 elif types.is_sequence(output): level = output[0]
                 else: raise RuntimeError("Output type not recognized: " + str(output))
                 #level = output[0]
+                levels[index] = level
 
                 if index == 0:
                     level_ref = level
@@ -869,6 +871,11 @@ class GALEXMosaicMaker(Configurable):
                 average_offset = level_ref - level
                 offsets[index] = average_offset
 
+            # Determine the offsets from the overlaps between the tiles
+            if self.config.global_levelling and len(fitsfile_list) > 1:
+                global_offsets = determine_global_offsets(fitsfile_list, convolve_path, self.rebin_header_path, levels, cell_size=self.config.levelling_cell_size)
+                for index in range(1, len(fitsfile_list)): offsets[index] = global_offsets[index]
+
             # Parallel execution
             with ParallelTarget(level_galex_map, self.config.nprocesses) as target:
 
@@ -1689,11 +1696,14 @@ def level_chi_squared(level_params, image):
 
 # -----------------------------------------------------------------
 
-def determine_background_level(filename, convolve_path):
+def determine_background_level(filename, convolve_path, method="lmfit"):
 
     """
     original name: GALEX_Zero
     Set a set of maps to the same level
+    :param filename:
+    :param convolve_path:
+    :param method: 'lmfit' (the original fit) or 'mean' (the closed-form least-squares level)
     :return:
     """
 
@@ -1705,16 +1715,48 @@ def determine_background_level(filename, convolve_path):
     image_conv = fitsdata_conv[0].data
     fitsdata_conv.close()
 
+    # Fit to level of image; save if first image, otherwise calculate appropriate offset
+    if method == "lmfit": return fit_background_level_lmfit(image_conv)
+    elif method == "mean": return fit_background_level(image_conv)
+    else: raise ValueError("Invalid method: '" + method + "'")
+
+# -----------------------------------------------------------------
+
+def fit_background_level(image):
+
+    """
+    This function determines the level of the image as the mean of the sigma-clipped values, which is the
+    least-squares solution for a constant level. This is not the level found by fit_background_level_lmfit, which
+    minimizes the sum of the fourth powers of the residuals (level_chi_squared returns the squared residuals, which
+    lmfit squares again).
+    :param image:
+    :return:
+    """
+
+    image_clipped = chrisfuncs.SigmaClip(image, tolerance=0.005, median=False, sigma_thresh=3.0)[2]
+    return levelling.constant_level(image_clipped)
+
+# -----------------------------------------------------------------
+
+def fit_background_level_lmfit(image):
+
+    """
+    This function determines the level of the image by fitting a constant to the sigma-clipped values with lmfit
+    (minimizing the sum of the fourth powers of the residuals, see fit_background_level)
+    :param image:
+    :return:
+    """
+
     # Fit to level of image; save if first image, otherwise calculate appropriate offset
     level_params = lmfit.Parameters()
 
     #level_params.add('level', value=np.nanmedian(image_conv), vary=True) ## FOR NUMPY VERSION 1.9.0 AND ABOVE
-    image_conv_nonans = image_conv[np.logical_not(np.isnan(image_conv))]
-    level_params.add('level', value=np.median(image_conv_nonans), vary=True) # BELOW NUMPY VERSION 1.9.0
+    image_nonans = image[np.logical_not(np.isnan(image))]
+    level_params.add('level', value=np.median(image_nonans), vary=True) # BELOW NUMPY VERSION 1.9.0
     #
 
-    image_conv_clipped = chrisfuncs.SigmaClip(image_conv, tolerance=0.005, median=False, sigma_thresh=3.0)[2]
-    level_result = lmfit.minimize(level_chi_squared, level_params, args=(image_conv_clipped.flatten(),))
+    image_clipped = chrisfuncs.SigmaClip(image, tolerance=0.005, median=False, sigma_thresh=3.0)[2]
+    level_result = lmfit.minimize(level_chi_squared, level_params, args=(image_clipped.flatten(),))
     level = level_result.params['level'].value
 
     # Return the level
@@ -1722,6 +1764,53 @@ def determine_background_level(filename, convolve_path):
 
 # -----------------------------------------------------------------
 
+def determine_global_offsets(filenames, convolve_path, header_path, levels, cell_size=16, stride=4):
+
+    """
+    This function determines the offsets for all tiles at once, from the differences between the overlapping
+    tiles on a coarse grid of the mosaic, solved as one sparse least-squares problem
+    :param filenames:
+    :param convolve_path:
+    :param header_path:
+    :param levels: the background levels of the individual tiles
+    :param cell_size:
+    :param stride:
+    :return:
+    """
+
+    # Inform the user
+    log.info("Determining the offsets between the overlapping tiles ...")
+
+    # Get the mosaic WCS
+    target_header = Header.fromtextfile(header_path)
+    target_wcs = WCS(target_header)
+    target_shape = (target_header["NAXIS2"], target_header["NAXIS1"])
+
+    # Bin all tiles (one at a time) on the grid of the mosaic
+    sums = []
+    counts = []
+    for filename in filenames:
+
+        fitsdata_conv = open_fits(fs.join(convolve_path, filename))
+        image_conv = fitsdata_conv[0].data
+        tile_wcs = WCS(fitsdata_conv[0].header)
+        tile_sums, tile_counts = levelling.cell_statistics(image_conv, tile_wcs, target_wcs, target_shape, cell_size=cell_size, stride=stride)
+        fitsdata_conv.close()
+
+        sums.append(tile_sums)
+        counts.append(tile_counts)
+
+    # Calculate the differences between all pairs
+    differences, nshared = levelling.overlap_differences(np.array(sums), np.array(counts))
+
+    # Debugging
+    log.debug("Found " + str(int(np.sum(np.triu(nshared, k=1) > 0))) + " pairs of overlapping tiles")
+
+    # Solve
+    return levelling.solve_offsets(differences, nshared, reference=0, levels=levels)
+
+# -----------------------------------------------------------------
+
 def level_galex_map(filename, average_offset, reproject_path):
 
     """
@@ -1962,76 +2051,58 @@ def combine_frames_and_error_maps(image_names_for_mosaic, temp_rebinned_path, te
     rebin_header = Header.fromtextfile(header_path)
     wcs = CoordinateSystem(rebin_header)
 
-    #primary_frames = []
-    #error_frames = []
-    weight_frames = []
-    weighted_frames = []
-    frames = []
+    # Create the accumulator for the weighted frames (numerator), the weights (denominator) and the frames in counts
+    # (for the poisson errors), in memory-mapped files, so that only one tile has to be in memory at a time
+    accumulator = mosaicing.MosaicAccumulator(wcs.shape, path=temp_mosaic_path)
 
     # Loop over the images to be used for the mosaic
     for image_name in image_names_for_mosaic:
 
         # Determine paths
         filepath = fs.join(temp_rebinned_path, image_name + ".fits")
-        errorpath = fs.join(temp_rebinned_path, image_name + "_error.fits")
         weightpath = fs.join(temp_rebinned_path, image_name + "_weight.fits")
 
-        # Load the frames
-        frame = Frame.from_file(filepath)
-        errors = Frame.from_file(errorpath)
-        weights = Frame.from_file(weightpath)
+        # Open the weight map, memory-mapped
+        weights = Frame.from_file(weightpath, memmap=True, lazy=True, silent=True)
 
-        # Calculate the weighted frame
-        frame_weighted = frame * weights
-        #errors_weighted = errors / weights
+        # Determine the footprint of the tile: the bounding box of the pixels where the weights are not NaN (the
+        # tile doesn't contribute outside of it)
+        bounds = mosaicing.contribution_bounds(np.logical_not(np.isnan(weights.data)))
+        if bounds is None: continue
+        y_min, y_max, x_min, x_max = bounds
 
-        # Convert the units from counts/s/sr to counts/s
-        pixelsr = frame_weighted.pixelarea.to("sr").value
-        frame_weighted *= pixelsr
-        frame *= pixelsr
-        #errors_weighted *= pixelsr
+        # Open the frame, memory-mapped, and read only the footprint
+        frame = Frame.from_file(filepath, memmap=True, lazy=True, silent=True)
+        pixelsr = frame.pixelarea.to("sr").value
+        frame_data = np.array(frame.data[y_min:y_max, x_min:x_max], dtype=np.float64)
+        weights_data = np.array(weights.data[y_min:y_max, x_min:x_max], dtype=np.float64)
 
-        # Create mask where the weights are nans
-        mask = weights.nans
+        # Calculate the weighted frame, and convert the units from counts/s/sr to counts/s
+        frame_weighted = frame_data * weights_data
+        frame_weighted *= pixelsr
+        frame_data *= pixelsr
 
-        # Set zero
+        # Set zero where the weights are nans
+        mask = np.isnan(weights_data)
         frame_weighted[mask] = 0.0
-        frame[mask] = 0.0
-        #errors_weighted[mask] = 0.0
-        weights[mask] = 0.0
-
-        # Add to the list
-        #primary_frames.append(frame_weighted)
-        #error_frames.append(errors_weighted)
-        #weight_frames.append(weights)
-
-        ## NEW: FIX MISTAKE
-        weight_frames.append(weights)
-        weighted_frames.append(frame_weighted)
-        frames.append(frame)
-
-    # Calculate denominator for weighted average (mosaicing)
-    normalization = sum_frames(*weight_frames)
-
-    # CALCULATE THE MOSAIC FRAME IN COUNTS/S
-    #mosaic_frame = sum_frames(*primary_frames) / normalization
-    #mosaic_frame.wcs = wcs
-    ## NEW
-    mosaic_frame = sum_frames(*weighted_frames) / normalization
+        frame_data[mask] = 0.0
+        weights_data[mask] = 0.0
+
+        # Add to the mosaic
+        accumulator.add(frame_weighted, weights_data, frame_data, bounds=bounds)
+
+    # CALCULATE THE MOSAIC FRAME AND ERROR MAP IN COUNTS/S
+    mosaic_data, errors_data = accumulator.finalize()
+    accumulator.remove()
+
+    mosaic_frame = Frame(mosaic_data)
     mosaic_frame.wcs = wcs
     mosaic_frame.unit = "ct/s"
 
-    # CALCULATE THE MOSAIC ERROR MAP IN COUNTS/S
-    #mosaic_errormap = sum_frames_quadratically(*error_frames) / normalization
-    #mosaic_errormap.wcs = wcs
-    ## NEW
-    frames_sum = sum_frames(*frames)
-    mosaic_errormap = Frame(np.sqrt(frames_sum.data)) / normalization
+    mosaic_errormap = Frame(errors_data)
     mosaic_errormap.wcs = wcs
     mosaic_errormap.unit = "ct/s"
 
-    ## DONE
-
     # SAVE THE MOSAIC IN COUNTS/S
     mosaic_path = fs.join(temp_mosaic_path, "mosaic.fits")
     mosaic_frame.saveto(mosaic_path)
@@ -1140,9 +1140,9 @@ def create_mosaic(band, rebinned_path, rebin_wcs, mosaics_path):
     # BUT BECAUSE d[x,y]_i = 0 for field that doesn't overlap in pixel [x,y], we can replace the sum from i=0 to n_overlapping_frames[x,y]
     # to a sum over ALL FIELDS; the contribution of the other fields will just be zero
 
-    primary_frames = []
-    error_frames = []
-    n_overlapping_frames = []
+    # Create the accumulator for the sum of the frames, the number of overlapping frames and the sum of the squared
+    # errors, so that only one field has to be in memory at a time
+    accumulator = mosaicing.MosaicAccumulator(rebin_wcs.shape, path=mosaics_path)
 
     # Loop over the images in the 'rebinned' directory
     for path, name in fs.files_in_path(rebinned_path, extension="fits", returns=["path", "name"]):
@@ -1167,20 +1167,18 @@ def create_mosaic(band, rebinned_path, rebin_wcs, mosaics_path):
         a.replace_nans(0.0)
         b.replace_nans(0.0)
 
-        # Add to the list
-        primary_frames.append(a)
-        error_frames.append(b)
-        n_overlapping_frames.append(footprint)
+        # Add to the mosaic (only within the region where the field contributes)
+        accumulator.add(a.data, footprint.data, b.data**2)
 
-    # Calculate n_overlapping_frames array
-    n_overlapping = sum_frames(*n_overlapping_frames)  # = n_overlapping_frames[x,y] = 2D ARRAY !
+    # CALCULATE THE MOSAIC FRAME AND ERROR MAP IN NANOMAGGIES
+    # (n_overlapping_frames[x,y] is the sum of the footprints = 2D ARRAY !)
+    mosaic_data, errors_data = accumulator.finalize()
+    accumulator.remove()
 
-    # CALCULATE THE MOSAIC FRAME IN NANOMAGGIES
-    mosaic_frame = sum_frames(*primary_frames) / n_overlapping
+    mosaic_frame = Frame(mosaic_data)
     mosaic_frame.wcs = rebin_wcs
 
-    # CALCULATE THE MOSAIC ERROR MAP IN NANOMAGGIES
-    mosaic_errormap = sum_frames_quadratically(*error_frames) / n_overlapping
+    mosaic_errormap = Frame(errors_data)
     mosaic_errormap.wcs = rebin_wcs
 
     # SAVE THE MOSAIC IN NANOMAGGIES
@@ -19,7 +19,7 @@ import numpy as np
 
 from . import config
 from ..core.filter.broad import BroadBandFilter
-from ..core.basics.greybody import Bnu, GreyBody, kappa350_Cortese, kappa350_Zubko
+from ..core.basics.greybody import Bnu, fitgreybodies, kappa350_Cortese, kappa350_Zubko
 
 # ----------------------------------------------------------------------
 
@@ -204,19 +204,10 @@ class CollectionData:
                           self.instr_fluxdensity_spire_pmw_{0}, self.instr_fluxdensity_spire_plw_{0} ]'''.format(fluxtype)
         fluxes = eval(fluxstring)
 
-        # setup an iterator over the galaxies, specifying two to-be-allocated output arrays for T and M
-        it = np.nditer([None, None, self.setup_distance_instrument] + fluxes,
-                       op_flags = [['writeonly','allocate'],['writeonly','allocate'],['readonly'],
-                                   ['readonly'], ['readonly'], ['readonly'], ['readonly']])
-
-        # do the fit, iterating over the galaxies
-        for Ti,Mi,di,f160i,f250i,f350i,f500i in it:
-            greybody = GreyBody(di, 2, kappa350_Cortese)
-            #greybody = GreyBody(di, 2, kappa350_Zubko)
-            it[0],it[1] = greybody.fit(waves, (f160i,f250i,f350i,f500i), sigmas)
-
-        # return the two result arrays T and M allocated by the iterator
-        return it.operands[0:2]
+        # do the fit for all galaxies at once
+        fluxes = np.stack(np.broadcast_arrays(*fluxes), axis=-1)
+        return fitgreybodies(self.setup_distance_instrument, 2, kappa350_Cortese, waves, fluxes, sigmas)
+        #return fitgreybodies(self.setup_distance_instrument, 2, kappa350_Zubko, waves, fluxes, sigmas)
 
     ## This function returns dust temperature (in K) for best fit with Herschel 160, 250, 350, 500 data points
     def dust_temperature_from_grey_body_fit(self, fluxtype='limited'):
@@ -84,12 +84,19 @@
 # The SKIRT-runs database is implemented using the sqlite3 package (part of standard Python), which is based on
 # the SQLite library version 3.7.3. See www.sqlite.org for information on the supported SQL dialect and its syntax.
 #
+# The fields that are commonly used in queries (see the \em indexed_fields variable) are automatically indexed
+# when the database is opened. Functions that insert or update many records issue a single \em executemany
+# statement, and the selectarray() function returns the selected records as a NumPy structured array, so that large
+# databases (with 1e5 or more records) can be handled efficiently. Optionally, the database can be switched to
+# write-ahead logging (WAL) so that readers (e.g. monitoring scripts) do not block writers and vice versa.
+#
 
 # -----------------------------------------------------------------
 
 import os.path
 import shutil
 import sqlite3
+import numpy as np
 
 from . import config as config
 
@@ -102,6 +109,13 @@ fieldtype_enum = ('text', 'numeric')
 stage_enum = ('insert', 'extract', 'simulate', 'observe', 'store', 'completed', 'removed')
 status_enum = ('scheduled', 'running', 'failed', 'succeeded')
 
+## This variable holds the fields (or combinations of fields) for which an index is created
+indexed_fields = (('label',), ('stage','status'), ('galaxyid',), ('eaglesim',))
+
+## This variable holds the numeric fields that are documented as integers in the table above; the other numeric fields
+# (including those added with the addfield() function) are real-valued
+integer_fields = ('runid', 'snaptag', 'galaxyid', 'groupnr', 'subgroupnr')
+
 # -----------------------------------------------------------------
 
 ## This function copies the complete database to the backup location (under a time-stamped name).
@@ -136,12 +150,20 @@ class Database:
     #
     # The optional filepath argument allows opening a SKIRT-runs database with a nonstandard location and name.
     # In almost all cases this argument should be omitted so that the constructor opens the standard database.
-    def __init__(self, filepath=None):
+    #
+    # If the \em wal argument is True, the database is switched to write-ahead logging, so that reading the database
+    # does not block writing it and vice versa. This setting is stored in the database file and thus persists for
+    # all connections. Note that WAL mode does not work for database files on a network file system.
+    # If the \em indices argument is True (the default), the indices on the commonly queried fields are created
+    # if they do not yet exist.
+    def __init__(self, filepath=None, wal=False, indices=True):
         if filepath==None:
             filepath = os.path.join(config.database_path, "SKIRT-runs.db")
         self._con = sqlite3.connect(filepath, timeout=60)
         self._con.row_factory = sqlite3.Row
         self._con.text_factory = sqlite3.OptimizedUnicode
+        if wal: self._con.execute("pragma journal_mode=wal")
+        if indices: self.createindices()
 
     ## This function closes the connection to the database. Any uncommited changes are lost.
     # You can no longer use the database after calling this function.
@@ -187,6 +209,48 @@ class Database:
         cursor = self._con.execute("select * from skirtruns where " + where, params if params!=None else ())
         return cursor.fetchall()
 
+    ## This function returns a NumPy structured array with the values of the specified fields (by default all fields)
+    # for the set of database records selected by the specified SQL \em where expression (see the select() function).
+    # The type of each field follows from the database schema rather than from the selected values (SQLite stores
+    # a real value such as 7.0 as an integer in a numeric field): a text field has a unicode string type that can hold
+    # the longest value, an integer field (see the \em integer_fields variable) has type int64 (with -1 for missing
+    # values), and any other numeric field has type float64 (with NaN for missing values).
+    # For example:
+    #
+    #\verbatim
+    #runs = db.selectarray("stage='completed'", fields=('runid','galaxyid','starmass'))
+    #massive = runs['galaxyid'][runs['starmass'] > 1e10]
+    #\endverbatim
+    #
+    def selectarray(self, where, params=None, fields=None):
+        columninfo = [ (col['name'], col['type'].lower()) for col in self._con.execute("pragma table_info('skirtruns')") ]
+        fieldtypes = dict(columninfo)
+        if fields is None: fields = [ name for name,fieldtype in columninfo ]
+        cursor = self._con.execute("select " + ",".join(fields) + " from skirtruns where " + where,
+                                   params if params!=None else ())
+        rows = cursor.fetchall()
+        columns = zip(*rows) if len(rows)>0 else [ () ] * len(fields)
+
+        # determine the type of each field from the schema, and convert the values
+        dtype = [ ]
+        data = [ ]
+        for field, column in zip(fields, columns):
+            if fieldtypes[field] == 'text':
+                strings = [ unicode(value) if value is not None else u"" for value in column ]
+                dtype.append((field, "U{}".format(max([ len(string) for string in strings ] + [1]))))
+                data.append(strings)
+            elif field in integer_fields:
+                dtype.append((field, np.int64))
+                data.append([ int(value) if value is not None else -1 for value in column ])
+            else:
+                dtype.append((field, np.float64))
+                data.append([ float(value) if value is not None else np.nan for value in column ])
+
+        # fill the array column by column
+        result = np.zeros(len(rows), dtype=dtype)
+        for field, values in zip(fields, data): result[field] = values
+        return result
+
     ## This function prints the contents of a sequence of row objects for visual inspection. If the \em refetch
     # argument is False or missing, the function simply prints the contents of the specified row objects.
     # For example:
@@ -242,17 +306,23 @@ class Database:
     # and statusdate (now). The change is \em not committed.
     def insert(self, label, eaglesim, snaptag, galaxyid, groupnr, subgroupnr, starmass, copx, copy, copz,
                      skitemplate, numpp, deltamax):
+        self.insertmany([ (label, eaglesim, snaptag, galaxyid, groupnr, subgroupnr, starmass, copx, copy, copz,
+                           skitemplate, numpp, deltamax) ])
+
+    ## This function inserts new records into the database in a single statement. The \em records argument provides
+    # a sequence of records, each of which is a sequence with the field values in the order of the arguments of the
+    # insert() function (label through deltamax). The values for runid, stage, status, and statusdate are determined
+    # as for the insert() function. The change is \em not committed.
+    def insertmany(self, records):
         stage = 'insert'
         status = 'succeeded'
         statusdate = config.timestamp()
-        self._con.execute('''insert into skirtruns (label, stage, status, statusdate, eaglesim, snaptag,
-                                                    galaxyid, groupnr, subgroupnr, starmass, copx, copy, copz,
-                                                    skitemplate, numpp, deltamax)
-                             values (?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?)''',
-                           (label, stage, status, statusdate, eaglesim, snaptag,
-                            galaxyid, groupnr, subgroupnr, starmass, copx, copy, copz,
-                            skitemplate, numpp, deltamax)
-                          )
+        self._con.executemany('''insert into skirtruns (label, stage, status, statusdate, eaglesim, snaptag,
+                                                        galaxyid, groupnr, subgroupnr, starmass, copx, copy, copz,
+                                                        skitemplate, numpp, deltamax)
+                                 values (?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?)''',
+                              ( (record[0], stage, status, statusdate) + tuple(record[1:]) for record in records )
+                             )
 
     ## This function updates the value of a field in the records specified through a list of run-id's.
     # The change is \em not committed.
@@ -262,8 +332,17 @@ class Database:
     def updatefield(self, runids, fieldname, value):
         if fieldname in ('stage','status'):
             raise ValueError("Use the updatestage() or updatestatus() functions to update these fields")
-        for runid in runids:
-            self._con.execute("update skirtruns set " + fieldname + " = ? where runid = ?", (value,cleanrunid(runid)))
+        self._con.executemany("update skirtruns set " + fieldname + " = ? where runid = ?",
+                              ( (value,cleanrunid(runid)) for runid in runids ))
+
+    ## This function updates the value of a field in the records specified through a list of run-id's to the
+    # corresponding values in the \em values sequence, in a single statement. The change is \em not committed.
+    # The restrictions on the arguments are the same as for the updatefield() function.
+    def updatevalues(self, runids, fieldname, values):
+        if fieldname in ('stage','status'):
+            raise ValueError("Use the updatestage() or updatestatus() functions to update these fields")
+        self._con.executemany("update skirtruns set " + fieldname + " = ? where runid = ?",
+                              ( (value,cleanrunid(runid)) for runid,value in zip(runids,values) ))
 
     ## This function updates the value of the stage and status fields, and stores a new timestamp in the statusdate
     # field, for the specified records. The default new value for the status field is 'scheduled', but another value
@@ -274,9 +353,8 @@ class Database:
         if not stage in stage_enum: raise ValueError("Unsupported stage value: " + stage)
         if not status in status_enum: raise ValueError("Unsupported status value: " + status)
         statusdate = config.timestamp()
-        for runid in runids:
-            self._con.execute("update skirtruns set stage = ?, status = ?, statusdate = ? where runid = ?",
-                               (stage,status,statusdate,cleanrunid(runid)))
+        self._con.executemany("update skirtruns set stage = ?, status = ?, statusdate = ? where runid = ?",
+                              ( (stage,status,statusdate,cleanrunid(runid)) for runid in runids ))
 
     ## This function updates the value of the status field (without touching the stage field), and stores a new
     # timestamp in the statusdate field, for the specified records. The change is \em not committed.
@@ -285,9 +363,8 @@ class Database:
     def updatestatus(self, runids, status):
         if not status in status_enum: raise ValueError("Unsupported status value: " + status)
         statusdate = config.timestamp()
-        for runid in runids:
-            self._con.execute("update skirtruns set status = ?, statusdate = ? where runid = ?",
-                               (status,statusdate,cleanrunid(runid)))
+        self._con.executemany("update skirtruns set status = ?, statusdate = ? where runid = ?",
+                              ( (status,statusdate,cleanrunid(runid)) for runid in runids ))
 
     ## This function updates all fields of the database record for the specified run-id to the values contained
     # in the specified row object. The row object should be obtained through the select() function from a database
@@ -301,14 +378,13 @@ class Database:
         if len(oldrows) != 1: raise ValueError("The specified run-id does not match a database record: " + str(runid))
         oldrow = oldrows[0]
 
-        # update each field if needed
-        modified = False
-        for fieldname in oldrow.keys():
-            if fieldname != 'runid' and oldrow[fieldname] != newrow[fieldname]:
-                self._con.execute("update skirtruns set " + fieldname + " = ? where runid = ?",
-                                  (newrow[fieldname],runid))
-                modified = True
-        return modified
+        # update the modified fields, if any
+        fieldnames = [ fieldname for fieldname in oldrow.keys()
+                       if fieldname != 'runid' and oldrow[fieldname] != newrow[fieldname] ]
+        if len(fieldnames) > 0:
+            self._con.execute("update skirtruns set " + ", ".join(fieldname + " = ?" for fieldname in fieldnames) +
+                              " where runid = ?", [ newrow[fieldname] for fieldname in fieldnames ] + [runid])
+        return len(fieldnames) > 0
 
     # -------- maintaining --------
 
@@ -337,6 +413,25 @@ class Database:
                              numpp numeric,
                              deltamax numeric
                           )''')
+        self.createindices()
+
+    ## This function creates the indices on the fields listed in the \em indexed_fields variable, if they do not yet
+    # exist and if the skirtruns table exists. The change is automatically committed. If the database cannot be
+    # written (e.g. because it is locked or read-only), the indices are not created.
+    def createindices(self):
+        if self._con.execute("select name from sqlite_master where type='table' and name='skirtruns'").fetchone() is None:
+            return
+        existing = [ index['name'] for index in
+                     self._con.execute("select name from sqlite_master where type='index' and tbl_name='skirtruns'") ]
+        missing = [ fields for fields in indexed_fields if "skirtruns_" + "_".join(fields) not in existing ]
+        if len(missing) == 0: return
+        try:
+            with self._con:
+                for fields in missing:
+                    self._con.execute("create index if not exists skirtruns_" + "_".join(fields) +
+                                      " on skirtruns (" + ",".join(fields) + ")")
+        except sqlite3.OperationalError:
+            pass
 
     ## This function adds a field to the main table in the SKIRT-runs database. It is \em not intended for use in
     # production code. The change is automatically committed. The field type should be 'text' for strings and dates,
@@ -40,7 +40,9 @@ import numpy as np
 import h5py
 import read_eagle       # EAGLE-specific package by must be seperately installed
 
+from ..core.basics.log import log
 from ..core.tools.geometry import Transform
+from ..core.tools.parallelization import ParallelTarget
 from . import config as config
 from .skirtrun import SkirtRun
 
@@ -60,54 +62,152 @@ def extract(record):
 
     # ---- get the particle data
 
-    # initialise star and gas dictionaries
-    sdat        = {}
-    gdat        = {}
-    yngstars    = {}
-    hiiregions  = {}
-
     # open snapshot and read relevant field attributes
     sfn = snapfilename(record["eaglesim"], record["snaptag"])
     snapshot = read_eagle.EagleSnapshot(sfn)
+    params = snapshotParameters(sfn)
+
+    # read the particles and process them
+    sdat, gdat = readRegion(snapshot, params, [record])[0]
+    processGalaxy(record, params, sdat, gdat)
+
+# -----------------------------------------------------------------
+
+## This function extracts information relevant for SKIRT from the EAGLE output for all galaxies described
+# by the specified SKIRT-runs database records, producing the same output files as the extract() function.
+# The galaxies are grouped by snapshot and by spatial region (cubic cells with a size of \em cellsize comoving Mpc),
+# and these groups are cut into chunks of at most \em chunksize galaxies. The particle data for all galaxies in a
+# chunk is read from the snapshot at once, so that the snapshot regions shared by neighbouring galaxies are read only
+# once, and the memory usage is limited by the chunk size. The further processing of the galaxies in a chunk
+# (centring, rotation, resampling and writing the SKIRT input files) is distributed over \em nprocesses processes.
+def extractMany(records, nprocesses=1, chunksize=20, cellsize=10.):
+
+    # the records are passed to other processes, so convert them to regular dictionaries
+    records = [ dict((key, record[key]) for key in record.keys()) for record in records ]
+
+    # loop over the chunks
+    for eaglesim, snaptag, chunk in scheduleExtraction(records, chunksize, cellsize):
+        sfn = snapfilename(eaglesim, snaptag)
+        log.info("Reading particle data for {} galaxies from {}...".format(len(chunk), sfn))
+
+        # read the particle data for all galaxies in the chunk
+        snapshot = read_eagle.EagleSnapshot(sfn)
+        params = snapshotParameters(sfn)
+        particles = readRegion(snapshot, params, chunk)
+        del snapshot
+
+        # process the galaxies
+        outputs = []
+        with ParallelTarget(processGalaxy, nprocesses) as target:
+            for record, (sdat, gdat) in zip(chunk, particles):
+                outputs.append(target(record, params, sdat, gdat))
+
+        # wait for the results, so that exceptions are raised here
+        for output in outputs: output.request()
+
+# -----------------------------------------------------------------
+
+## This function divides the specified SKIRT-runs database records into chunks of at most \em chunksize galaxies
+# that reside in the same snapshot, sorted by the cubic cell (with a size of \em cellsize comoving Mpc) that contains
+# the galaxy's center of potential, so that the galaxies in a chunk are spatially close to each other.
+# The function returns a list of (eaglesim, snaptag, list of records) tuples.
+def scheduleExtraction(records, chunksize=20, cellsize=10.):
+
+    # group the records by snapshot
+    groups = { }
+    for record in records:
+        groups.setdefault((record["eaglesim"], record["snaptag"]), []).append(record)
+
+    # within each snapshot, sort by spatial hash cell and cut into chunks
+    cell = lambda record: tuple(int(np.floor(record[key]/cellsize)) for key in ("copx","copy","copz"))
+    chunks = []
+    for eaglesim, snaptag in sorted(groups.keys()):
+        group = sorted(groups[(eaglesim, snaptag)], key=lambda record: (cell(record), record["runid"]))
+        for first in range(0, len(group), chunksize):
+            chunks.append((eaglesim, snaptag, group[first:first+chunksize]))
+    return chunks
+
+# -----------------------------------------------------------------
+
+## This function returns the relevant field attributes of the snapshot with the specified (first) filename,
+# as a python dictionary.
+def snapshotParameters(sfn):
     params = fieldAttrs(sfn, "Header")
     params.update(fieldAttrs(sfn, "Constants"))
     params.update(fieldAttrs(sfn, "RuntimePars"))
+    return params
+
+# -----------------------------------------------------------------
+
+# the particle datasets to be read for each particle type, and the corresponding keys in the particle dictionaries
+starfields = ( ('r', "Coordinates"), ('h', "SmoothingLength"), ('im', "InitialMass"), ('m', "Mass"),
+               ('v', "Velocity"), ('Z', "SmoothedMetallicity"), ('born', "StellarFormationTime"),
+               ('rho_born', "BirthDensity") )
+gasfields  = ( ('r', "Coordinates"), ('h', "SmoothingLength"), ('m', "Mass"), ('v', "Velocity"),
+               ('Z', "SmoothedMetallicity"), ('T', "Temperature"), ('rho', "Density"), ('sfr', "StarFormationRate") )
+
+## This function reads the star and gas particle data (in snapshot units) for the galaxies described by the specified
+# SKIRT-runs database records from the specified snapshot (an EagleSnapshot instance, given the field attributes
+# \em params). The particles of a galaxy are those of its subhalo within a (2*250kpc)^3 physical volume about its
+# center of potential. The union of these volumes is selected in the snapshot and each dataset is read only once.
+# The function returns a list with a (star dictionary, gas dictionary) tuple for each record.
+def readRegion(snapshot, params, records):
     hubbleparam = params["HubbleParam"]
     expansionfactor = params["ExpansionFactor"]
-    schmidtparams = schmidtParameters(params)
+    boxsize = params["BoxSize"]
 
-    # convert center of potential to snapshot units
-    copx = record["copx"] * hubbleparam
-    copy = record["copy"] * hubbleparam
-    copz = record["copz"] * hubbleparam
-
-    # specify (2*250kpc)^3 physical volume about galaxy centre
+    # specify (2*250kpc)^3 physical volume about each galaxy centre, converted to snapshot units
     delta = 0.25 * hubbleparam / expansionfactor
-    snapshot.select_region(copx-delta, copx+delta, copy-delta, copy+delta, copz-delta, copz+delta)
-
-    # read star particle informaton
-    insubhalo = (snapshot.read_dataset(4, "GroupNumber") == record["groupnr"]) & \
-                (snapshot.read_dataset(4, "SubGroupNumber") == record["subgroupnr"])
-    sdat['r']        = snapshot.read_dataset(4, "Coordinates") [insubhalo]
-    sdat['h']        = snapshot.read_dataset(4, "SmoothingLength") [insubhalo]
-    sdat['im']       = snapshot.read_dataset(4, "InitialMass") [insubhalo]
-    sdat['m']        = snapshot.read_dataset(4, "Mass") [insubhalo]
-    sdat['v']        = snapshot.read_dataset(4, "Velocity") [insubhalo]
-    sdat['Z']        = snapshot.read_dataset(4, "SmoothedMetallicity") [insubhalo]
-    sdat['born']     = snapshot.read_dataset(4, "StellarFormationTime") [insubhalo]
-    sdat['rho_born'] = snapshot.read_dataset(4, "BirthDensity") [insubhalo]
-
-    # read gas particle informaton
-    insubhalo = (snapshot.read_dataset(0, "GroupNumber") == record["groupnr"]) & \
-                (snapshot.read_dataset(0, "SubGroupNumber") == record["subgroupnr"])
-    gdat['r']        = snapshot.read_dataset(0, "Coordinates") [insubhalo]
-    gdat['h']        = snapshot.read_dataset(0, "SmoothingLength") [insubhalo]
-    gdat['m']        = snapshot.read_dataset(0, "Mass") [insubhalo]
-    gdat['v']        = snapshot.read_dataset(0, "Velocity") [insubhalo]
-    gdat['Z']        = snapshot.read_dataset(0, "SmoothedMetallicity") [insubhalo]
-    gdat['T']        = snapshot.read_dataset(0, "Temperature") [insubhalo]
-    gdat['rho']      = snapshot.read_dataset(0, "Density") [insubhalo]
-    gdat['sfr']      = snapshot.read_dataset(0, "StarFormationRate") [insubhalo]
+    centres = []
+    for record in records:
+        cop = np.array((record["copx"], record["copy"], record["copz"])) * hubbleparam
+        snapshot.select_region(cop[0]-delta, cop[0]+delta, cop[1]-delta, cop[1]+delta, cop[2]-delta, cop[2]+delta)
+        centres.append(cop)
+
+    # read the particle data for the selected region, and find the particles for each galaxy
+    particles = [ ({}, {}) for record in records ]
+    for parttype, fields in ((4, starfields), (0, gasfields)):
+
+        # sort the particles on subhalo, keeping the original order within each subhalo
+        # (subgroup numbers are below 2**31, including the value 2**30 for particles that are not bound to a subhalo)
+        keys = snapshot.read_dataset(parttype, "GroupNumber").astype(np.int64) * 2**31 + \
+               snapshot.read_dataset(parttype, "SubGroupNumber").astype(np.int64)
+        order = np.argsort(keys, kind="mergesort")
+        keys = keys[order]
+        coordinates = snapshot.read_dataset(parttype, "Coordinates")
+
+        # determine the indices of the particles for each galaxy
+        indices = []
+        for record, cop in zip(records, centres):
+            key = int(record["groupnr"]) * 2**31 + int(record["subgroupnr"])
+            insubhalo = order[np.searchsorted(keys, key, side="left"):np.searchsorted(keys, key, side="right")]
+            offsets = np.abs((coordinates[insubhalo] - cop + 0.5*boxsize) % boxsize - 0.5*boxsize)
+            indices.append(insubhalo[np.all(offsets <= delta, axis=1)])
+        del coordinates
+
+        # read each dataset once and distribute it over the galaxies
+        for key, name in fields:
+            data = snapshot.read_dataset(parttype, name)
+            for index, galaxy in zip(indices, particles):
+                galaxy[0 if parttype == 4 else 1][key] = data[index]
+            del data
+
+    return particles
+
+# -----------------------------------------------------------------
+
+## This function processes the star and gas particle data (in snapshot units, as returned by readRegion) for the
+# galaxy described by the specified SKIRT-runs database record, given the field attributes of the snapshot, and
+# writes the resulting files to the "in" folder of the appropriate SkirtRun data structure (see extract()).
+def processGalaxy(record, params, sdat, gdat):
+
+    # initialise young star and HII region dictionaries
+    yngstars    = {}
+    hiiregions  = {}
+
+    hubbleparam = params["HubbleParam"]
+    expansionfactor = params["ExpansionFactor"]
+    schmidtparams = schmidtParameters(params)
 
     # convert units
     sdat['r']        = periodicCorrec(sdat['r'], params["BoxSize"])
@@ -148,8 +248,8 @@ def extract(record):
         v = np.sqrt(a*a+c*c)
         transf.rotateY(c/v, -a/v)
         transf.rotateX(v, -b)
-    sdat['r'],w = transf.transform_vec(sdat['r'][:,0],sdat['r'][:,1],sdat['r'][:,2], np.ones(sdat['r'].shape[0]))
-    gdat['r'],w = transf.transform_vec(gdat['r'][:,0],gdat['r'][:,1],gdat['r'][:,2], np.ones(gdat['r'].shape[0]))
+    transf.transform_positions(sdat['r'], out=sdat['r'])
+    transf.transform_positions(gdat['r'], out=gdat['r'])
 
     # apply 30kpc aperture (i.e. remove all particles outside the aperture)
     applyAperture(sdat, 30e3)
@@ -217,7 +317,7 @@ def extract(record):
     f_PDR = 0.1
 
     # seed the random generator so that a consistent pseudo-random sequence is used for each particular galaxy
-    np.random.seed(int(record["galaxyid"]))
+    random = np.random.RandomState(int(record["galaxyid"]))
 
     # define HII region age constants (in years)
     young_age = 1e8     # 100 Myr  --> particles below this age are resampled
@@ -259,7 +359,7 @@ def extract(record):
         # calculate SFR at birth of young star particles in M_sun / yr
         sdat['sfr']       = getSFR(sdat['rho_born'], sdat['im'], schmidtparams)
 
-        ms, ts, idxs, mdiffs = stochResamp(sdat['sfr'], sdat['im'])
+        ms, ts, idxs, mdiffs = stochResamp(sdat['sfr'], sdat['im'], random)
         isinfant = ts < infant_age
 
         if (~isinfant).any():
@@ -287,7 +387,7 @@ def extract(record):
             # using SKIRT's standard smoothing kernel mass/size normalization: rho = 8/pi * M/h^3;
             # and randomly shift the positions of the HII regions within a similarly enlarged range
             hiiregions['h_mapp'] = (10*ms[isinfant] / (np.pi/8 * sdat['rho_born'][idxs][isinfant] * densconv))**(1/3.)
-            stochShiftPos(hiiregions['r'], hiiregions['h'], hiiregions['h_mapp'])
+            stochShiftPos(hiiregions['r'], hiiregions['h'], hiiregions['h_mapp'], random)
 
             # append to MAPPINGSIII array
             mapstars = np.concatenate((mapstars, np.column_stack([hiiregions['r'], hiiregions['h_mapp'], hiiregions['SFR'],
@@ -317,7 +417,7 @@ def extract(record):
         for k in gdat.keys():
             gdat[k] = gdat[k][issf].copy()
 
-        ms, ts, idxs, mdiffs = stochResamp(gdat['sfr'], gdat['m'])
+        ms, ts, idxs, mdiffs = stochResamp(gdat['sfr'], gdat['m'], random)
         isinfant = ts < infant_age
 
         if (~isinfant).any():
@@ -345,7 +445,7 @@ def extract(record):
             # using SKIRT's standard smoothing kernel mass/size normalization: rho = 8/pi * M/h^3;
             # and randomly shift the positions of the HII regions within a similarly enlarged range
             hiiregions['h_mapp'] = (10*ms[isinfant] / (np.pi/8 * gdat['rho'][idxs][isinfant] * densconv))**(1/3.)
-            stochShiftPos(hiiregions['r'], hiiregions['h'], hiiregions['h_mapp'])
+            stochShiftPos(hiiregions['r'], hiiregions['h'], hiiregions['h_mapp'], random)
 
             # append to MAPPINGSIII array
             mapstars = np.concatenate((mapstars, np.column_stack([hiiregions['r'], hiiregions['h_mapp'], hiiregions['SFR'],
@@ -714,11 +814,26 @@ def getPtot(rho, schmidtpars):
 
 # -----------------------------------------------------------------
 
+# mass resampling parameters (see Kennicutt & Evans 2012 section 2.5)
+_resamp_m_min = 700         # minimum mass of sub-particle in M_solar
+_resamp_m_max = 1e6         # maximum mass of sub-particle in M_solar
+_resamp_alpha = 1.8         # exponent of power-law mass function
+
+# age resampling parameters
+_resamp_thresh_age = 1e8    # period over which to resample in yr (100 Myr)
+
+# -----------------------------------------------------------------
+
 ## This private helper function samples star forming gas particles into a number of sub-particles.
+# The sub-particles of many parent particles are drawn at once: the numbers of sub-particles per parent are expanded
+# with np.repeat, and the sub-particle masses and ages are drawn in batches. To limit memory usage, the parent
+# particles are processed in chunks of at most max_draws (maximum numbers of) sub-particles.
 #
 # Inputs:
 #  - sfr: star formation rate in solar masses per yr
 #  - m_gas: particle mass in solar masses
+#  - random: numpy RandomState used for the random draws (np.random if None)
+#  - max_draws: the maximum number of sub-particle masses drawn at once
 #
 # Outputs:
 #  - nested arrays with a list of subparticles for each parent input particle:
@@ -728,16 +843,140 @@ def getPtot(rho, schmidtpars):
 #  - mdiffs: mass of parent particles locked up in new stars; this can be subtracted from the parent gas
 #            particles for mass conservation
 #
-def stochResamp(sfr, m_gas):
+def stochResamp(sfr, m_gas, random=None, max_draws=2000000):
+    if random is None: random = np.random
+
+    sfr = np.asarray(sfr, dtype=float)
+    m_gas = np.asarray(m_gas, dtype=float)
+
+    # determine the maximum number of sub-particles for each parent based on the minimum sub-particle mass
+    N = np.maximum(1, np.ceil(m_gas/_resamp_m_min)).astype(int)
+    ends = np.cumsum(N)
+
+    # initialise lists for output
+    ms   = [np.zeros(0)]
+    ts   = [np.zeros(0)]
+    idxs = [np.zeros(0, dtype=int)]
+    mdiffs = [np.zeros(0)]
+
+    # process the parent particles in chunks
+    first = 0
+    while first < sfr.size:
+        offset = ends[first-1] if first > 0 else 0
+        last = max(first+1, np.searchsorted(ends, offset + max_draws, side="right"))
+        m, t, idx, mdiff = _stochResampChunk(sfr[first:last], m_gas[first:last], N[first:last], random)
+        ms.append(m)
+        ts.append(t)
+        idxs.append(idx + first)
+        mdiffs.append(mdiff)
+        first = last
+
+    return np.concatenate(ms), np.concatenate(ts), np.concatenate(idxs), np.concatenate(mdiffs)
+
+# -----------------------------------------------------------------
+
+## This private helper function draws the sub-particle masses of a chunk of parent particles for stochResamp(),
+# given the maximum number of sub-particles N for each parent. Only the masses up to the first one for which the
+# cumulative mass exceeds the parent mass are relevant. Therefore, only about twice the expected number of
+# sub-particles is drawn at first, and the remaining masses are drawn only for the parents where this was not enough.
+# The result has the same distribution as drawing all N masses for each parent.
+#
+# Outputs:
+#  - m: the drawn masses, grouped per parent
+#  - parents: the parent index of each mass
+#  - counts: the number of masses drawn for each parent
+#
+def _stochResampMasses(m_gas, N, random):
+    alpha1 = 1. - _resamp_alpha
+    def draw(size):
+        X = random.random_sample(size)
+        return (_resamp_m_min**alpha1 + X*(_resamp_m_max**alpha1-_resamp_m_min**alpha1))**(1./alpha1)
+
+    # the expected mass of a sub-particle
+    alpha2 = 2. - _resamp_alpha
+    m_mean = (alpha1/alpha2) * (_resamp_m_max**alpha2-_resamp_m_min**alpha2) / (_resamp_m_max**alpha1-_resamp_m_min**alpha1)
+
+    # generate random sub-particle masses from a power-law distribution between min and max values
+    counts = np.minimum(N, np.ceil(2*m_gas/m_mean).astype(int) + 10)
+    parents = np.repeat(np.arange(m_gas.size), counts)
+    m = draw(parents.size)
+
+    # determine the parents for which the cumulative mass does not yet exceed the parent mass
+    unresolved = (np.bincount(parents, weights=m, minlength=m_gas.size) <= m_gas) & (counts < N)
+
+    # draw the remaining masses for these parents, and add them after the ones of the same parent
+    if unresolved.any():
+        extra_counts = np.where(unresolved, N - counts, 0)
+        extra_parents = np.repeat(np.arange(m_gas.size), extra_counts)
+        parents = np.concatenate((parents, extra_parents))
+        m = np.concatenate((m, draw(extra_parents.size)))
+        order = np.argsort(parents, kind="mergesort")
+        parents = parents[order]
+        m = m[order]
+        counts = counts + extra_counts
+
+    return m, parents, counts
+
+# -----------------------------------------------------------------
+
+## This private helper function resamples a chunk of parent particles for stochResamp(), given the maximum
+# number of sub-particles N for each parent.
+def _stochResampChunk(sfr, m_gas, N, random):
+
+    # generate random sub-particle masses
+    m, parents, counts = _stochResampMasses(m_gas, N, random)
+    starts = np.cumsum(counts) - counts
+
+    # calculate the cumulative mass within each parent
+    cumulative = np.cumsum(m)
+    cumulative -= np.repeat(cumulative[starts] - m[starts], counts)
+
+    # limit and normalize the sub-particles to the total mass of the parent (keeping at least the first one)
+    keep = cumulative <= m_gas[parents]
+    keep[starts] = True
+    m = m[keep]
+    parents = parents[keep]
+    m *= (m_gas / np.bincount(parents, weights=m, minlength=sfr.size))[parents]
+
+    # generate random decay lookback time for each sub-particle
+    X = random.random_sample(m.size)       # X in range (0,1]
+    t = _resamp_thresh_age + (m_gas/sfr)[parents] * np.log(1-X)
+
+    # determine mask for sub-particles that form stars by present day
+    issf = t > 0.
+
+    # the mass of each parent locked up in star-forming sub-particles
+    mdiffs = np.bincount(parents[issf], weights=m[issf], minlength=sfr.size)
 
-    # mass resampling parameters (see Kennicutt & Evans 2012 section 2.5)
-    m_min = 700         # minimum mass of sub-particle in M_solar
-    m_max = 1e6         # maximum mass of sub-particle in M_solar
-    alpha = 1.8         # exponent of power-law mass function
-    alpha1 = 1. - alpha
+    return m[issf], t[issf], parents[issf].astype(int), mdiffs
 
-    # age resampling parameters
-    thresh_age = 1e8    # period over which to resample in yr (100 Myr)
+# -----------------------------------------------------------------
+
+## This private helper function samples star forming gas particles into a number of sub-particles, one parent
+# particle at a time. It is the original (reference) implementation of stochResamp(), which is statistically
+# equivalent but draws the random numbers in a different order.
+#
+# Inputs:
+#  - sfr: star formation rate in solar masses per yr
+#  - m_gas: particle mass in solar masses
+#  - random: numpy RandomState used for the random draws (np.random if None)
+#
+# Outputs:
+#  - nested arrays with a list of subparticles for each parent input particle:
+#     - ms: sub-particle stellar masses in solar masses
+#     - ts: lookback times of sub-particle formation
+#     - idxs: index of the sub-particle's parent particle in input array
+#  - mdiffs: mass of parent particles locked up in new stars; this can be subtracted from the parent gas
+#            particles for mass conservation
+#
+def stochResampLoop(sfr, m_gas, random=None):
+    if random is None: random = np.random
+
+    # resampling parameters
+    m_min = _resamp_m_min
+    m_max = _resamp_m_max
+    alpha1 = 1. - _resamp_alpha
+    thresh_age = _resamp_thresh_age
 
     # initialise lists for output
     ms   = [[]]
@@ -754,7 +993,7 @@ def stochResamp(sfr, m_gas):
         N = int(max(1,np.ceil(mi/m_min)))
 
         # generate random sub-particle masses from a power-law distribution between min and max values
-        X = np.random.random(N)
+        X = random.random_sample(N)
         m = (m_min**alpha1 + X*(m_max**alpha1-m_min**alpha1))**(1./alpha1)
 
         # limit and normalize the list of sub-particles to the total mass of the parent
@@ -764,7 +1003,7 @@ def stochResamp(sfr, m_gas):
         N = len(m)
 
         # generate random decay lookback time for each sub-particle
-        X = np.random.random(N)               # X in range (0,1]
+        X = random.random_sample(N)               # X in range (0,1]
         t = thresh_age + mi/sfri * np.log(1-X)
 
         # determine mask for sub-particles that form stars by present day
@@ -793,8 +1032,11 @@ def stochResamp(sfr, m_gas):
 #  - r: parent positions; updated by this function to the shifted positions
 #  - h: the smoothing lengths of the parents
 #  - h_mapp: the smoothing lengths of the sub-particles
+#  - random: numpy RandomState used for the random draws (np.random if None)
 #
-def stochShiftPos(r, h, h_mapp):
+def stochShiftPos(r, h, h_mapp, random=None):
+    if random is None: random = np.random
+
     # the offset sampling smoothing length is determined so that in the limit of infinite particles,
     # the light distribution is the same as the parent particle kernel;
     # assuming Gaussian kernels this means h_sampling**2 + h_mapp**2 = h**2.
@@ -802,8 +1044,8 @@ def stochShiftPos(r, h, h_mapp):
 
     # sample the offset from a scaled gaussian that resembles a cubic spline kernel
     # (see the documentation of the SPHDustDistribution class in SKIRT)
-    r[:,0] += h_sampling * np.random.normal(scale=0.29, size=h_sampling.shape)
-    r[:,1] += h_sampling * np.random.normal(scale=0.29, size=h_sampling.shape)
-    r[:,2] += h_sampling * np.random.normal(scale=0.29, size=h_sampling.shape)
+    r[:,0] += h_sampling * random.normal(scale=0.29, size=h_sampling.shape)
+    r[:,1] += h_sampling * random.normal(scale=0.29, size=h_sampling.shape)
+    r[:,2] += h_sampling * random.normal(scale=0.29, size=h_sampling.shape)
 
 # -----------------------------------------------------------------
@@ -37,8 +37,10 @@ from .skirtrun import runids_in_range
 #
 # The callback function is passed a single argument containing the SKIRT-run database record
 # to be handled. This record offers dictionary-style access to the database fields.
+# If a batch callback function is provided, it is invoked instead, once for each chunk of records,
+# with a single argument containing the list of SKIRT-run database records in the chunk.
 #
-def loop(callback, stage, runtime, chunksize=1):
+def loop(callback, stage, runtime, chunksize=1, batchcallback=None):
     # loop until runtime has been surpassed
     starttime = time.time()
     while (time.time()-starttime)<runtime:
@@ -54,9 +56,13 @@ def loop(callback, stage, runtime, chunksize=1):
 
         try:
             # invoke the callback function
-            for record in chunkrecords:
-                log.info("Processing {} for SKIRT-run {}...".format(stage, record['runid']))
-                callback(record)
+            if batchcallback is not None:
+                log.info("Processing {} for SKIRT-runs {}...".format(stage, ",".join(str(record['runid']) for record in chunkrecords)))
+                batchcallback(chunkrecords)
+            else:
+                for record in chunkrecords:
+                    log.info("Processing {} for SKIRT-run {}...".format(stage, record['runid']))
+                    callback(record)
 
             # set the runstatus of the database records to 'succeeded'
             db = Database()
@@ -40,6 +40,9 @@ definition.add_optional("other_dilation_factor", "real", "dilation factor for ot
 
 definition.add_flag("only_foreground", "only interpolate over the stars that are in the foreground of the galaxy", False)
 
+# Parallelization
+definition.add_optional("nprocesses", "positive_integer", "number of parallel processes for estimating the backgrounds of the sources", 1)
+
 definition.add_flag("write", "do writing", True)
 
 # Flags
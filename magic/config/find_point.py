@@ -94,6 +94,7 @@ definition.sections["fitting"].sections["debug"].add_flag("model_offset", "model
 definition.sections["fitting"].sections["debug"].add_flag("success", "success")
 
 definition.sections["fitting"].add_flag("fit_if_undetected", "fit if undetected (no source (peak) found)")
+definition.sections["fitting"].add_flag("batch", "fit Gaussians to all sources at once (vectorised), before fitting the remaining sources separately", False)
 
 definition.add_optional("source_psf_sigma_level", "real", "source PSF sigma level", 4.0)
 definition.add_optional("source_outer_factor", "real", "source outer factor", 1.6)
@@ -91,6 +91,9 @@ definition.sections["estimation"].sections["photutils"].add_optional("polynomial
 definition.sections["estimation"].sections["photutils"].add_optional("polynomial_fitter", "string", "name of the fitter to be used for the polynomial", "levenberg-marquardt")
 definition.sections["estimation"].sections["photutils"].add_optional("exclude_mesh_percentile", "positive_real", "who knows", 50.)
 definition.sections["estimation"].sections["photutils"].add_flag("replace_all_interpolated", "replace all pixels by the interpolated version")
+definition.sections["estimation"].sections["photutils"].add_optional("idw_neighbours", "positive_integer", "number of nearest mesh centers used for inverse distance weighting", 8)
+definition.sections["estimation"].sections["photutils"].add_optional("idw_power", "positive_real", "power of the inverse distance for the weights", 2.)
+definition.sections["estimation"].sections["photutils"].add_optional("idw_coarse_factor", "positive_integer", "evaluate the inverse distance weighting on a grid that is coarser by this factor and upsample (for very large frames)", 1)
 
 # -----------------------------------------------------------------
 
@@ -0,0 +1,363 @@
+#!/usr/bin/env python
+# -*- coding: utf8 -*-
+# *****************************************************************
+# **       PTS -- Python Toolkit for working with SKIRT          **
+# **       © Astronomical Observatory, Ghent University          **
+# *****************************************************************
+
+## \package pts.magic.convolution.cache Contains the PreparedKernelCache class, which keeps convolution kernels
+#  that have been prepared for a certain pixelscale (and optionally their Fourier transforms) in memory and on disk.
+
+# -----------------------------------------------------------------
+
+# Ensure Python 3 compatibility
+from __future__ import absolute_import, division, print_function
+
+# Import standard modules
+import hashlib
+import numpy as np
+from collections import OrderedDict
+
+# Import the relevant PTS classes and modules
+from ...core.tools import filesystem as fs
+from ...core.basics.log import log
+from .kernels import kernels_path
+
+# -----------------------------------------------------------------
+
+# The path to the directory where prepared kernels are stored
+prepared_kernels_path = fs.join(kernels_path, "prepared")
+
+# -----------------------------------------------------------------
+
+def kernel_digest(kernel):
+
+    """
+    This function returns a short digest of the kernel data, to distinguish kernels for the same filters
+    :param kernel:
+    :return:
+    """
+
+    data = np.ascontiguousarray(kernel.data, dtype="float64")
+    return hashlib.md5(data.tobytes()).hexdigest()[:16]
+
+# -----------------------------------------------------------------
+
+def arcsec(quantity):
+
+    """
+    This function ...
+    :param quantity:
+    :return:
+    """
+
+    if quantity is None: return None
+    return round(quantity.to("arcsec").value, 6)
+
+# -----------------------------------------------------------------
+
+def fft_shape(data_shape, kernel_shape):
+
+    """
+    This function returns the padded shape used for the FFT convolution of an image with a kernel
+    (large enough for linear convolution with zero fill, and rounded up to sizes that FFT efficiently)
+    :param data_shape:
+    :param kernel_shape:
+    :return:
+    """
+
+    from scipy.fftpack import next_fast_len
+    return tuple(next_fast_len(int(nd + nk - 1)) for nd, nk in zip(data_shape, kernel_shape))
+
+# -----------------------------------------------------------------
+
+def kernel_transform(kernel_data, shape):
+
+    """
+    This function calculates the real FFT of the kernel, zero-padded to the given shape and with its center pixel
+    moved to the origin
+    :param kernel_data:
+    :param shape:
+    :return:
+    """
+
+    ky, kx = kernel_data.shape
+    padded = np.zeros(shape, dtype="float64")
+    padded[:ky, :kx] = kernel_data
+
+    # Move the kernel center to (0,0)
+    padded = np.roll(padded, -(ky // 2), axis=0)
+    padded = np.roll(padded, -(kx // 2), axis=1)
+
+    # Return the transform
+    return np.fft.rfft2(padded)
+
+# -----------------------------------------------------------------
+
+def convolve_fft_with_transform(data, kernel_fft, shape, kernel_shape, min_weight=1e-8):
+
+    """
+    This function convolves the data with a (normalized) kernel of which the FFT is already known. NaNs are
+    interpolated over and the boundary is filled with zeros, as with astropy's convolve_fft(boundary='fill',
+    nan_treatment='interpolate'): the result is divided by the convolution of the weights, which are zero for the NaN
+    pixels and one elsewhere, also outside of the image (so that the pixels near the edges are not renormalized).
+    :param data:
+    :param kernel_fft:
+    :param shape: the padded shape for which kernel_fft was calculated
+    :param kernel_shape:
+    :param min_weight:
+    :return:
+    """
+
+    ny, nx = data.shape
+
+    # Check the shape
+    if tuple(shape) != fft_shape(data.shape, kernel_shape): raise ValueError("The kernel transform does not correspond to the shape of the data")
+
+    # Create the padded data and weights
+    nans = np.isnan(data)
+    padded = np.zeros(shape, dtype="float64")
+    padded[:ny, :nx] = data
+    padded[:ny, :nx][nans] = 0.0
+
+    # Convolve the data
+    result = np.fft.irfft2(np.fft.rfft2(padded) * kernel_fft, s=shape)[:ny, :nx]
+
+    # Convolve the weights
+    weights = np.ones(shape, dtype="float64")
+    weights[:ny, :nx][nans] = 0.0
+    weights = np.fft.irfft2(np.fft.rfft2(weights) * kernel_fft, s=shape)[:ny, :nx]
+
+    # Divide by the convolved weights
+    with np.errstate(invalid="ignore", divide="ignore"): result /= weights
+    result[weights < min_weight] = float("nan")
+
+    # Return the result
+    return result
+
+# -----------------------------------------------------------------
+
+class PreparedKernelCache(object):
+
+    """
+    This class keeps convolution kernels that are prepared for a certain pixelscale, keyed on the from and to filter,
+    the pixelscale, the FWHM and the preparation options. The Fourier transforms of the prepared kernels can also
+    be kept for a certain padded image shape.
+    """
+
+    def __init__(self, path=None, persistent=False, max_kernels=20, max_transforms=4):
+
+        """
+        The constructor ...
+        :param path: the directory for the on-disk cache
+        :param persistent: whether prepared kernels have to be saved to (and looked up in) the on-disk cache
+        :param max_kernels: maximum number of prepared kernels kept in memory
+        :param max_transforms: maximum number of kernel transforms kept in memory
+        """
+
+        # The path
+        self.path = path if path is not None else prepared_kernels_path
+        self.persistent = persistent
+
+        # The limits
+        self.max_kernels = max_kernels
+        self.max_transforms = max_transforms
+
+        # The in-memory caches
+        self.kernels = OrderedDict()
+        self.transforms = OrderedDict()
+
+        # Statistics
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+
+    # -----------------------------------------------------------------
+
+    def get_key(self, kernel, pixelscale, sigma_level=10.0):
+
+        """
+        This function ...
+        :param kernel:
+        :param pixelscale:
+        :param sigma_level:
+        :return:
+        """
+
+        return (str(kernel.from_filter), str(kernel.to_filter), arcsec(pixelscale.x), arcsec(pixelscale.y),
+                arcsec(kernel.fwhm), sigma_level, kernel_digest(kernel))
+
+    # -----------------------------------------------------------------
+
+    def get_filename(self, key):
+
+        """
+        This function ...
+        :param key:
+        :return:
+        """
+
+        return hashlib.md5(repr(key).encode("utf-8")).hexdigest() + ".fits"
+
+    # -----------------------------------------------------------------
+
+    def get_filepath(self, key):
+
+        """
+        This function ...
+        :param key:
+        :return:
+        """
+
+        return fs.join(self.path, self.get_filename(key))
+
+    # -----------------------------------------------------------------
+
+    def add(self, key, kernel):
+
+        """
+        This function ...
+        :param key:
+        :param kernel:
+        :return:
+        """
+
+        self.kernels[key] = kernel
+        while len(self.kernels) > self.max_kernels: self.kernels.popitem(last=False)
+
+    # -----------------------------------------------------------------
+
+    def prepare(self, kernel, pixelscale, sigma_level=10.0):
+
+        """
+        This function returns a prepared copy of the kernel, from the cache if possible
+        :param kernel:
+        :param pixelscale:
+        :param sigma_level:
+        :return:
+        """
+
+        from ..core.kernel import ConvolutionKernel
+
+        # Determine the key
+        key = self.get_key(kernel, pixelscale, sigma_level=sigma_level)
+
+        # In memory
+        if key in self.kernels:
+
+            # Debugging
+            log.debug("Using the prepared kernel from the cache ...")
+
+            self.hits += 1
+            self.kernels[key] = prepared = self.kernels.pop(key)
+            return prepared.copy()
+
+        # On disk
+        filepath = self.get_filepath(key)
+        if self.persistent and fs.is_file(filepath):
+
+            # Debugging
+            log.debug("Loading the prepared kernel from '" + filepath + "' ...")
+
+            self.disk_hits += 1
+            prepared = ConvolutionKernel.from_file(filepath, from_filter=kernel.from_filter, to_filter=kernel.to_filter)
+            prepared._prepared = True
+
+        # Prepare
+        else:
+
+            self.misses += 1
+            prepared = kernel.copy()
+            prepared.prepare(pixelscale, sigma_level=sigma_level)
+
+            # Save
+            if self.persistent:
+                if not fs.is_directory(self.path): fs.create_directory(self.path)
+                prepared.saveto(filepath)
+
+        # Add to the in-memory cache
+        self.add(key, prepared)
+
+        # Return a copy
+        return prepared.copy()
+
+    # -----------------------------------------------------------------
+
+    def get_transform(self, kernel, data_shape):
+
+        """
+        This function returns the shape of the padded arrays and the FFT of the prepared kernel for that shape
+        :param kernel:
+        :param data_shape:
+        :return:
+        """
+
+        # Determine the padded shape and the key
+        shape = fft_shape(data_shape, kernel.data.shape)
+        key = (kernel_digest(kernel), shape)
+
+        # Get from the cache
+        if key in self.transforms:
+            self.hits += 1
+            self.transforms[key] = transform = self.transforms.pop(key)
+            return shape, transform
+
+        # On disk
+        filepath = fs.join(self.path, key[0] + "_" + "x".join(str(n) for n in shape) + ".npy")
+        if self.persistent and fs.is_file(filepath):
+            self.disk_hits += 1
+            transform = np.load(filepath)
+
+        # Calculate
+        else:
+
+            self.misses += 1
+            transform = kernel_transform(kernel.data, shape)
+
+            # Save
+            if self.persistent:
+                if not fs.is_directory(self.path): fs.create_directory(self.path)
+                np.save(filepath, transform)
+
+        # Add
+        self.transforms[key] = transform
+        while len(self.transforms) > self.max_transforms: self.transforms.popitem(last=False)
+
+        # Return
+        return shape, transform
+
+    # -----------------------------------------------------------------
+
+    def convolve(self, data, kernel, min_weight=1e-8):
+
+        """
+        This function convolves the data with the prepared kernel, using the cached kernel transform
+        :param data:
+        :param kernel:
+        :param min_weight:
+        :return:
+        """
+
+        shape, transform = self.get_transform(kernel, data.shape)
+        return convolve_fft_with_transform(data, transform, shape, kernel.data.shape, min_weight=min_weight)
+
+    # -----------------------------------------------------------------
+
+    def clear(self, disk=False):
+
+        """
+        This function ...
+        :param disk:
+        :return:
+        """
+
+        self.kernels.clear()
+        self.transforms.clear()
+        if disk and fs.is_directory(self.path): fs.clear_directory(self.path)
+
+# -----------------------------------------------------------------
+
+# The default cache
+prepared_kernels = PreparedKernelCache()
+
+# -----------------------------------------------------------------
@@ -13,6 +13,8 @@
 from __future__ import absolute_import, division, print_function
 
 # Import standard modules
+import os
+import json
 import numpy as np
 from collections import OrderedDict
 
@@ -73,29 +75,21 @@ def is_valid(filepath):
 
 # -----------------------------------------------------------------
 
-def get_plane_names(path, ptype=None):
+def get_plane_names(path, ptype=None, hdulist_index=0):
 
     """
     This function ...
     :param path:
     :param ptype:
+    :param hdulist_index:
     :return:
     """
 
-    # Load the header
-    header = fits.getheader(path)
-
-    # Get the number of planes
-    nplanes = headers.get_number_of_frames(header)
-
     # Initialize a dictionary to contain the frame names and corresponding descriptions
     frames = dict()
 
-    # Look at the properties of each plane
-    for i in range(nplanes):
-
-        # Get name and description of plane
-        name, description, plane_type = headers.get_frame_name_and_description(header, i, always_call_first_primary=False)
+    # Look at the properties of each plane (from the index)
+    for name, description, plane_type in get_index(path, hdulist_index=hdulist_index)["planes"]:
         if ptype is None or (plane_type == ptype): frames[name] = description
 
     # Return the frames with their name and description
@@ -185,8 +179,9 @@ def get_npixels(path):
     :return:
     """
 
-    header = get_header(path)
-    return header["NAXIS1"] * header["NAXIS2"]
+    index = get_index(path)
+    if index["xsize"] is None: raise ValueError("The primary HDU of '" + path + "' does not contain image data")
+    return index["xsize"] * index["ysize"]
 
 # -----------------------------------------------------------------
 
@@ -198,15 +193,194 @@ def get_total_npixels(path):
     :return:
     """
 
-    header = get_header(path)
-    if "NAXIS3" in header: return header["NAXIS1"] * header["NAXIS2"] * header["NAXIS3"]
-    else: return header["NAXIS1"] * header["NAXIS2"]
+    index = get_index(path)
+    if index["xsize"] is None: raise ValueError("The primary HDU of '" + path + "' does not contain image data")
+    return index["xsize"] * index["ysize"] * index["nplanes"]
+
+# -----------------------------------------------------------------
+
+# Whether the index of a FITS file is also saved in a (hidden) file next to it, so that it can be reused by other
+# processes (disabled by default: reading a file should not write into the data directory)
+write_index_files = False
+
+# The indices that have already been loaded or created, by path
+_indices = dict()
+
+# -----------------------------------------------------------------
+
+def get_index_path(path):
+
+    """
+    This function returns the path of the sidecar index file for a FITS file
+    :param path:
+    :return:
+    """
+
+    return fs.join(fs.directory_of(path), "." + fs.name(path) + ".index")
+
+# -----------------------------------------------------------------
+
+def get_modification_key(path):
+
+    """
+    This function ...
+    :param path:
+    :return:
+    """
+
+    stat = os.stat(path)
+    return [stat.st_mtime, stat.st_size]
+
+# -----------------------------------------------------------------
+
+def create_index(path, hdulist_index=0):
+
+    """
+    This function scans the header of an HDU and creates its index: the shape, the names, descriptions and types of
+    the planes, the filter, the unit and the header itself (for the WCS)
+    :param path:
+    :param hdulist_index:
+    :return:
+    """
+
+    # Debugging
+    log.debug("Creating the index of HDU " + str(hdulist_index) + " of '" + path + "' ...")
+
+    # Get the header
+    header = fits.getheader(path, ext=hdulist_index)
+    has_data = header.get("NAXIS", 0) >= 2
+
+    # Get the planes
+    planes = []
+    if has_data:
+        for i in range(headers.get_number_of_frames(header)):
+            name, description, plane_type = headers.get_frame_name_and_description(header, i, always_call_first_primary=False)
+            planes.append([name, description, plane_type])
+
+    # Get the filter and the unit
+    try: fltr = headers.get_filter(fs.strip_extension(fs.name(path)), header)
+    except Exception: fltr = None
+    try: unit = headers.get_unit(header)
+    except Exception: unit = None
+
+    # Create the index
+    index = dict()
+    index["xsize"] = header["NAXIS1"] if has_data else None
+    index["ysize"] = header["NAXIS2"] if has_data else None
+    index["nplanes"] = len(planes)
+    index["planes"] = planes
+    index["filter"] = str(fltr) if fltr is not None else None
+    index["unit"] = str(unit) if unit is not None else None
+    index["header"] = header.tostring()
+
+    # Return the index
+    return index
+
+# -----------------------------------------------------------------
+
+def get_index(path, hdulist_index=0):
+
+    """
+    This function returns the index of an HDU of a FITS file (by default the primary HDU, the one that is loaded by
+    load_frames), from memory or the sidecar file if the FITS file has not been modified since the index was created
+    :param path:
+    :param hdulist_index:
+    :return:
+    """
+
+    path = fs.absolute_path(path)
+    modification = get_modification_key(path)
+    key = str(hdulist_index)
+
+    # Get the indices of the HDUs of this file, in memory
+    if path in _indices and _indices[path]["modification"] == modification: indices = _indices[path]
+
+    # From the sidecar file
+    else:
+
+        indices = None
+        index_path = get_index_path(path)
+        if fs.is_file(index_path):
+            try:
+                with open(index_path, "r") as index_file: indices = json.load(index_file)
+                if indices.get("modification") != modification or "hdus" not in indices: indices = None
+            except (IOError, OSError, ValueError): indices = None
+
+        # Nothing yet for this version of the file
+        if indices is None: indices = {"modification": modification, "hdus": dict()}
+        _indices[path] = indices
+
+    # Create the index of this HDU
+    if key not in indices["hdus"]:
+
+        indices["hdus"][key] = create_index(path, hdulist_index=hdulist_index)
+
+        # Write the sidecar file, if enabled (not possible for read-only directories)
+        if write_index_files:
+            index_path = get_index_path(path)
+            try:
+                with open(index_path, "w") as index_file: json.dump(indices, index_file)
+            except (IOError, OSError): log.debug("Could not write the index file '" + index_path + "'")
+
+    # Return the index
+    return indices["hdus"][key]
+
+# -----------------------------------------------------------------
+
+def get_indexed_header(path, hdulist_index=0):
+
+    """
+    This function returns the header of an HDU, from the index
+    :param path:
+    :param hdulist_index:
+    :return:
+    """
+
+    return fits.Header.fromstring(get_index(path, hdulist_index=hdulist_index)["header"])
+
+# -----------------------------------------------------------------
+
+def get_indexed_wcs(path, hdulist_index=0):
+
+    """
+    This function returns the coordinate system of the image, from the header in the index
+    :param path:
+    :param hdulist_index:
+    :return:
+    """
+
+    # Get the flattened header
+    header = headers.flattened(get_indexed_header(path, hdulist_index=hdulist_index))
+    clean_header(header)
+    simplify_header(header)
+    fix_ctypes(header)
+
+    # Create the coordinate system
+    try: return CoordinateSystem(header)
+    except ValueError: return None
+
+# -----------------------------------------------------------------
+
+def get_plane_index(path, name, hdulist_index=0):
+
+    """
+    This function returns the index of the plane with the given name
+    :param path:
+    :param name:
+    :param hdulist_index:
+    :return:
+    """
+
+    for index, (plane_name, description, plane_type) in enumerate(get_index(path, hdulist_index=hdulist_index)["planes"]):
+        if plane_name == name: return index
+    raise ValueError("Plane with name '" + name + "' not found in HDU " + str(hdulist_index) + " of '" + path + "'")
 
 # -----------------------------------------------------------------
 
 def load_frames(path, index=None, name=None, description=None, always_call_first_primary=True, hdulist_index=0,
                 no_filter=False, no_wcs=False, density=False, brightness=False, density_strict=False,
-                brightness_strict=False, indices=None, absolute_index_names=True):
+                brightness_strict=False, indices=None, absolute_index_names=True, planes=None, memmap=None,
+                lazy=False):
 
     """
     This function ...
@@ -224,12 +398,20 @@ def load_frames(path, index=None, name=None, description=None, always_call_first
     :param brightness_strict:
     :param indices:
     :param absolute_index_names:
+    :param planes: names of the planes that have to be loaded (instead of indices)
+    :param memmap: memory-map the file (None is the astropy default), so that only the planes that are loaded are read
+    :param lazy: when memory-mapped, don't copy the planes into memory but let the data be read when it is accessed
     :return:
     """
 
     # Cannot both specify index and indices
     if index is not None and indices is not None: raise ValueError("Cannot specify both 'index' and 'indices'")
 
+    # Get the indices of the planes from the index
+    if planes is not None:
+        if index is not None or indices is not None: raise ValueError("Cannot specify 'planes' together with 'index' or 'indices'")
+        indices = [get_plane_index(path, plane_name, hdulist_index=hdulist_index) for plane_name in planes]
+
     # Initialize
     frames = OrderedDict()
     masks = OrderedDict()
@@ -246,7 +428,7 @@ def load_frames(path, index=None, name=None, description=None, always_call_first
     log.debug("Reading in file '" + path + "' ...")
 
     # Open the HDU list for the FITS file
-    hdulist = fits.open(path)
+    hdulist = fits.open(path, memmap=memmap)
 
     # Get the primary HDU
     hdu = hdulist[hdulist_index]
@@ -255,6 +437,9 @@ def load_frames(path, index=None, name=None, description=None, always_call_first
     try: first_plane = hdu.data[0]
     except TypeError: raise DamagedFITSFileError("The FITS file is damaged", path=path)
 
+    # Get the data (only copy the planes that are used, if the file is memory-mapped)
+    data = PlaneReader(hdu.data, copy=bool(memmap) and not lazy)
+
     # Get the image header
     original_header = hdu.header
 
@@ -356,7 +541,7 @@ def load_frames(path, index=None, name=None, description=None, always_call_first
         for i in indices:
 
             # Load plane into one of the dictionaries
-            load_plane(frames, masks, segments, hdu.data, i, original_header, wcs, pixelscale,
+            load_plane(frames, masks, segments, data, i, original_header, wcs, pixelscale,
                        frame_properties=properties, always_call_first_primary=always_call_first_primary,
                        absolute_index_names=absolute_index_names)
 
@@ -370,7 +555,7 @@ def load_frames(path, index=None, name=None, description=None, always_call_first
             if index is not None and i != index: continue
 
             # Load plane into one of the directories
-            load_plane(frames, masks, segments, hdu.data, i, original_header, wcs, pixelscale,
+            load_plane(frames, masks, segments, data, i, original_header, wcs, pixelscale,
                        frame_properties=properties, always_call_first_primary=always_call_first_primary,
                        absolute_index_names=absolute_index_names)
 
@@ -378,7 +563,8 @@ def load_frames(path, index=None, name=None, description=None, always_call_first
     else:
 
         # Sometimes, the 2D frame is embedded in a 3D array with shape (1, xsize, ysize)
-        if len(hdu.data.shape) == 3: hdu.data = hdu.data[0]
+        if len(hdu.data.shape) == 3: plane_data = data[0]
+        else: plane_data = data.get()
 
         # Set name and description
         if name is None: name = "primary"
@@ -396,7 +582,7 @@ def load_frames(path, index=None, name=None, description=None, always_call_first
 
         # Load plane
         # frames, masks, segments, data, wcs, pixelscale, frame_properties=None
-        load_plane_impl(name, description, plane_type, frames, masks, segments, hdu.data, wcs, pixelscale, frame_properties=properties)
+        load_plane_impl(name, description, plane_type, frames, masks, segments, plane_data, wcs, pixelscale, frame_properties=properties)
 
     # Add meta information
     for key in original_header:
@@ -426,7 +612,8 @@ other_ignore_keywords = ["ORIGIN", "BITPIX", "FILTER", "UNIT", "FWHM", "PHYSTYPE
 
 def load_frame(cls, path, index=None, name=None, description=None, plane=None, hdulist_index=None, no_filter=False,
                fwhm=None, add_meta=True, extra_meta=None, distance=None, no_wcs=False, density=False, brightness=False,
-               density_strict=False, brightness_strict=False, class_picker=None, data_converter=None):
+               density_strict=False, brightness_strict=False, class_picker=None, data_converter=None, memmap=None,
+               lazy=False):
 
     """
     This function ...
@@ -449,6 +636,8 @@ def load_frame(cls, path, index=None, name=None, description=None, plane=None, h
     :param brightness_strict:
     :param class_picker:
     :param data_converter:
+    :param memmap: memory-map the file (None is the astropy default), so that only the plane that is loaded is read
+    :param lazy: when memory-mapped, don't copy the plane into memory but let the data be read when it is accessed
     :return:
     """
 
@@ -468,7 +657,7 @@ def load_frame(cls, path, index=None, name=None, description=None, plane=None, h
     metadata = dict()
 
     # Open the HDU list for the FITS file
-    hdulist = fits.open(path)
+    hdulist = fits.open(path, memmap=memmap)
 
     # Look for the first HDU with data
     if hdulist_index is None:
@@ -493,6 +682,9 @@ def load_frame(cls, path, index=None, name=None, description=None, plane=None, h
     try: first_plane = hdu.data[0]
     except TypeError: raise DamagedFITSFileError("The FITS file is damaged", path=path)
 
+    # Get the data (only copy the plane that is used, if the file is memory-mapped)
+    reader = PlaneReader(hdu.data, copy=bool(memmap) and not lazy)
+
     # Get the image header
     header = hdu.header
 
@@ -687,8 +879,8 @@ def load_frame(cls, path, index=None, name=None, description=None, plane=None, h
         if name is None: name = fs.name(path[:-5])
 
         # Get the data
-        if data_converter is not None: data = data_converter(hdu.data[index])
-        else: data = hdu.data[index]
+        if data_converter is not None: data = data_converter(reader[index])
+        else: data = reader[index]
 
         # Get the class
         if class_picker is not None: cls = class_picker(data)
@@ -722,14 +914,14 @@ def load_frame(cls, path, index=None, name=None, description=None, plane=None, h
     else:
 
         # Sometimes, the 2D frame is embedded in a 3D array with shape (1, xsize, ysize)
-        if len(hdu.data.shape) == 3: hdu.data = hdu.data[0]
+        if len(hdu.data.shape) == 3: data = reader[0]
+        else: data = reader.get()
 
         # Get the name from the file path
         if name is None: name = fs.name(path[:-5])
 
         # Get the data
-        if data_converter is not None: data = data_converter(hdu.data)
-        else: data = hdu.data
+        if data_converter is not None: data = data_converter(data)
 
         # Get the class
         if class_picker is not None: cls = class_picker(data)
@@ -976,6 +1168,64 @@ def fix_ctypes(header):
 
 # -----------------------------------------------------------------
 
+class PlaneReader(object):
+
+    """
+    This class gives access to the planes of the (possibly memory-mapped) data of a FITS HDU. If copy is enabled,
+    the planes are copied into memory when they are requested, so that only the requested planes are read from
+    the file. Otherwise, the planes are views on the data.
+    """
+
+    def __init__(self, data, copy=False):
+
+        """
+        The constructor ...
+        :param data:
+        :param copy:
+        """
+
+        self.data = data
+        self.copy = copy
+
+    # -----------------------------------------------------------------
+
+    @property
+    def shape(self):
+
+        """
+        This function ...
+        :return:
+        """
+
+        return self.data.shape
+
+    # -----------------------------------------------------------------
+
+    def __getitem__(self, index):
+
+        """
+        This function ...
+        :param index:
+        :return:
+        """
+
+        if self.copy: return np.array(self.data[index])
+        else: return self.data[index]
+
+    # -----------------------------------------------------------------
+
+    def get(self):
+
+        """
+        This function returns all data
+        :return:
+        """
+
+        if self.copy: return np.array(self.data)
+        else: return self.data
+
+# -----------------------------------------------------------------
+
 def load_plane(frames, masks, segments, data, index, header, wcs, pixelscale, frame_properties=None,
                always_call_first_primary=True, absolute_index_names=True):
 
@@ -36,7 +36,7 @@ from ..region.rectangle import SkyRectangleRegion, PixelRectangleRegion
 from ..basics.coordinate import SkyCoordinate, PixelCoordinate
 from ..basics.stretch import SkyStretch
 from ..tools import cropping
-from ...core.basics.log import log
+from ...core.basics.log import log, LazyString
 from ..basics.mask import MaskBase
 from ...core.tools import filesystem as fs
 from ...core.tools import archive
@@ -45,6 +45,7 @@ from ...core.filter.filter import parse_filter
 from .mask import Mask
 from .alpha import AlphaMask
 from ..convolution.kernels import get_fwhm, has_variable_fwhm
+from ..convolution.cache import prepared_kernels
 from ...core.tools import types
 from ...core.units.parsing import parse_unit as u
 from ...core.units.unit import get_conversion_factor
@@ -882,7 +883,8 @@ class Frame(NDDataArray):
     @classmethod
     def from_file(cls, path, index=None, name=None, description=None, plane=None, hdulist_index=None, no_filter=False,
                   fwhm=None, add_meta=True, extra_meta=None, silent=False, distance=None, no_wcs=False, density=False,
-                  brightness=False, density_strict=False, brightness_strict=False, wcs=None, pixelscale=None):
+                  brightness=False, density_strict=False, brightness_strict=False, wcs=None, pixelscale=None,
+                  memmap=None, lazy=False):
 
         """
         This function ...
@@ -905,6 +907,8 @@ class Frame(NDDataArray):
         :param brightness_strict:
         :param wcs:
         :param pixelscale:
+        :param memmap: memory-map the file, so that only the requested plane is read
+        :param lazy: when memory-mapped, only read the data when it is accessed
         :return:
         """
 
@@ -916,7 +920,7 @@ class Frame(NDDataArray):
         try: frame = load_frame(cls, path, index, name, description, plane, hdulist_index, no_filter, fwhm,
                                add_meta=add_meta, extra_meta=extra_meta, distance=distance, no_wcs=no_wcs,
                                density=density, brightness=brightness, density_strict=density_strict,
-                               brightness_strict=brightness_strict)
+                               brightness_strict=brightness_strict, memmap=memmap, lazy=lazy)
         except DamagedFITSFileError: raise IOError("File is possibly damaged")
 
         # Set
@@ -2621,7 +2625,7 @@ class Frame(NDDataArray):
             return 1.
 
         # Debugging
-        if not silent: log.debug("Converting the frame from unit " + tostr(self.unit, add_physical_type=True) + " to unit " + tostr(to_unit, add_physical_type=True) + " ...")
+        if not silent: log.debug("Converting the frame from unit %s to unit %s ...", LazyString(tostr, self.unit, add_physical_type=True), LazyString(tostr, to_unit, add_physical_type=True))
 
         # Get the conversion factor
         factor = self._get_conversion_factor(to_unit, distance=distance, wavelength=wavelength, silent=silent)
@@ -3467,7 +3471,7 @@ class Frame(NDDataArray):
 
     # -----------------------------------------------------------------
 
-    def convolve(self, kernel, allow_huge=True, fft=True, preserve_nans=True):
+    def convolve(self, kernel, allow_huge=True, fft=True, preserve_nans=True, cache=False):
 
         """
         This function ...
@@ -3475,6 +3479,7 @@ class Frame(NDDataArray):
         :param allow_huge:
         :param fft:
         :param preserve_nans:
+        :param cache: use the cache of prepared kernels and kernel transforms (for repeated convolutions)
         :return:
         """
 
@@ -3491,8 +3496,10 @@ class Frame(NDDataArray):
         # Check whether the kernel is prepared
         if not kernel.prepared:
             log.warning("The convolution kernel is not prepared, creating a prepared copy ...")
-            kernel = kernel.copy()
-            kernel.prepare(self.pixelscale)
+            if cache: kernel = prepared_kernels.prepare(kernel, self.pixelscale)
+            else:
+                kernel = kernel.copy()
+                kernel.prepare(self.pixelscale)
 
         # Check where the NaNs are at
         nans_mask = np.isnan(self._data)
@@ -3509,7 +3516,8 @@ class Frame(NDDataArray):
 
         # Do the convolution on this frame
         log.debug("Convolving ...")
-        if fft: new_data = convolve_fft(self._data, kernel.data, boundary='fill', nan_treatment="interpolate", normalize_kernel=False, allow_huge=allow_huge)
+        if fft and cache: new_data = prepared_kernels.convolve(self._data, kernel)
+        elif fft: new_data = convolve_fft(self._data, kernel.data, boundary='fill', nan_treatment="interpolate", normalize_kernel=False, allow_huge=allow_huge)
         else: new_data = convolve(self._data, kernel.data, boundary='fill', nan_treatment="interpolate", normalize_kernel=False)
 
         # Determine new min and max value
@@ -3799,7 +3807,7 @@ class Frame(NDDataArray):
     # -----------------------------------------------------------------
 
     def interpolate_nans_with_kernel(self, kernel, plot=False, max_iterations=10, not_converge="keep", min_max_in=None,
-                                     error_on_max=True):
+                                     error_on_max=True, fft=False):
 
         """
         This function ...
@@ -3809,10 +3817,17 @@ class Frame(NDDataArray):
         :param not_converge:
         :param min_max_in:
         :param error_on_max:
+        :param fft: use normalized convolution with FFTs instead of astropy's (direct) interpolate_replace_nans
+                    (faster for large kernels; near the edges, pixels outside the frame are ignored instead of counted as zeros)
         :return:
         """
 
         from ..tools import plotting
+        from ..tools.inpainting import normalized_convolution
+
+        # Set the interpolation function
+        if fft: interpolate = normalized_convolution
+        else: interpolate = interpolate_replace_nans
 
         # Get the current minimum and maximum of the frame
         if min_max_in is not None:
@@ -3829,7 +3844,7 @@ class Frame(NDDataArray):
         log.debug("Interpolation iteration 1 ...")
 
         # Generate the interpolated result
-        result = interpolate_replace_nans(self.data, kernel)
+        result = interpolate(self.data, kernel)
         niterations = 1
 
         # Plot
@@ -3857,7 +3872,7 @@ class Frame(NDDataArray):
             log.debug("Interpolation iteration " + str(niterations+1) + " ...")
 
             # Perform next interpolation
-            result = interpolate_replace_nans(result, kernel)
+            result = interpolate(result, kernel)
 
             # Increment the niterations counter
             niterations += 1
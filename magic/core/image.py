@@ -78,7 +78,8 @@ class Image(object):
 
     @classmethod
     def from_file(cls, path, name=None, always_call_first_primary=True, hdulist_index=0, no_filter=False, density=False,
-                  brightness=False, density_strict=False, brightness_strict=False, indices=None, absolute_index_names=True):
+                  brightness=False, density_strict=False, brightness_strict=False, indices=None, absolute_index_names=True,
+                  planes=None, memmap=None, lazy=False):
 
         """
         This function ...
@@ -93,6 +94,9 @@ class Image(object):
         :param brightness_strict:
         :param indices:
         :param absolute_index_names:
+        :param planes: the names of the planes to load
+        :param memmap:
+        :param lazy:
         :return:
         """
 
@@ -108,7 +112,8 @@ class Image(object):
         # Load the image frames
         image.load_frames(path, always_call_first_primary=always_call_first_primary, hdulist_index=hdulist_index,
                           no_filter=no_filter, density=density, brightness=brightness, density_strict=density_strict,
-                          brightness_strict=brightness_strict, indices=indices, absolute_index_names=absolute_index_names)
+                          brightness_strict=brightness_strict, indices=indices, absolute_index_names=absolute_index_names,
+                          planes=planes, memmap=memmap, lazy=lazy)
 
         # Return the image
         return image
@@ -2217,7 +2222,8 @@ class Image(object):
 
     def load_frames(self, path, index=None, name=None, description=None, always_call_first_primary=True,
                     hdulist_index=0, no_filter=False, silent=False, density=False, brightness=False,
-                    density_strict=False, brightness_strict=False, indices=None, absolute_index_names=True):
+                    density_strict=False, brightness_strict=False, indices=None, absolute_index_names=True,
+                    planes=None, memmap=None, lazy=False):
 
         """
         This function ...
@@ -2235,6 +2241,9 @@ class Image(object):
         :param brightness_strict:
         :param indices:
         :param absolute_index_names:
+        :param planes:
+        :param memmap:
+        :param lazy:
         :return:
         """
 
@@ -2250,7 +2259,8 @@ class Image(object):
             frames, masks, segments, meta = pts_fits.load_frames(path, index, name, description, always_call_first_primary,
                                                            hdulist_index, no_filter, density=density, brightness=brightness,
                                                            density_strict=density_strict, brightness_strict=brightness_strict,
-                                                           indices=indices, absolute_index_names=absolute_index_names)
+                                                           indices=indices, absolute_index_names=absolute_index_names,
+                                                           planes=planes, memmap=memmap, lazy=lazy)
         except pts_fits.DamagedFITSFileError: raise IOError("File is possibly damaged")
 
         # Set frames, masks and meta information
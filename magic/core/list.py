@@ -16,7 +16,7 @@ from __future__ import absolute_import, division, print_function
 import numpy as np
 
 # Import the relevant PTS classes and modules
-from ...core.basics.log import log
+from ...core.basics.log import log, LazyString
 from ...core.filter.filter import parse_filter
 from ..region.list import SkyRegionList
 from ...core.units.parsing import parse_unit as u
@@ -2661,7 +2661,7 @@ def convert_to_same_unit(*frames, **kwargs):
         if frame.unit == unit:
 
             # Debugging
-            log.debug("Frame " + print_name + "already has the target unit of '" + tostr(unit, add_physical_type=True) + "' and will not be converted")
+            log.debug("Frame %salready has the target unit of '%s' and will not be converted", print_name, LazyString(tostr, unit, add_physical_type=True))
 
             # Create copy
             converted = frame.copy()
@@ -2670,7 +2670,7 @@ def convert_to_same_unit(*frames, **kwargs):
         elif frame.unit is not None:
 
             # Debugging
-            log.debug("Converting " + image_type + " " + print_name + "with unit " + tostr(frame.unit, add_physical_type=True) + " to " + tostr(unit, add_physical_type=True) + " ...")
+            log.debug("Converting %s %swith unit %s to %s ...", image_type, print_name, LazyString(tostr, frame.unit, add_physical_type=True), LazyString(tostr, unit, add_physical_type=True))
 
             # Create converted version
             if image_type == "frame": converted = frame.converted_to(unit, distance=distance, density=density, brightness=brightness, density_strict=density_strict, brightness_strict=brightness_strict, wavelength=wavelength)
@@ -3734,8 +3734,8 @@ def convolve_to_fwhm_local(*frames, **kwargs):
                 kernel = matching.get_kernel(from_filter, to_filter, frame.angular_pixelscale, from_fwhm=from_fwhm, to_fwhm=to_fwhm)
                 #kernel.saveto("kernel.fits")
 
-            # Convolve with the kernel
-            convolved = frame.convolved(kernel)
+            # Convolve with the kernel (reusing prepared kernels and kernel transforms for frames with the same pixelscale)
+            convolved = frame.convolved(kernel, cache=True)
 
             # Set the PSF filter to be sure
             convolved.psf_filter = highest_fwhm_filter
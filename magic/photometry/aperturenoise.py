@@ -48,6 +48,9 @@ from ..region.composite import PixelCompositeRegion
 from ..core.source import Source
 from ..misc import chrisfuncs
 from ...core.units.parsing import parse_unit as u
+from ..region.rasterization import shape_cutout_mask
+from .randomapertures import RowIntegralImage, draw_elliptical_positions, nan_fractions, aperture_statistics
+from .randomapertures import min_separation_for_overlap, select_separated
 
 # -----------------------------------------------------------------
 
@@ -620,7 +623,12 @@ class ExactApertureNoiseCalculator(Configurable):
             # PTS method
             self.generate_apertures_pts(total_mask, pixel_area, sky_ap_rad_pix, max_number_of_sky_apertures)
 
-        else: raise ValueError("Invalid method (must be 'caapr' or 'pts')")
+        elif self.config.method == "batch":
+
+            # Vectorised PTS method
+            self.generate_apertures_batch(total_mask, sky_ap_rad_pix, max_number_of_sky_apertures)
+
+        else: raise ValueError("Invalid method (must be 'caapr', 'pts' or 'batch')")
 
         # Writing
         self.write()
@@ -650,12 +658,17 @@ class ExactApertureNoiseCalculator(Configurable):
 
             circle = PixelCircleRegion(center, aperture_radius)
 
-            mask = Mask.from_shape(circle, self.cutout.shape[1], self.cutout.shape[0])
+            # Evaluate the aperture only within its bounding box
+            cutout = shape_cutout_mask(circle, self.cutout.shape[1], self.cutout.shape[0])
+            if cutout is None: continue
+            x_min, y_min, mask = cutout
+            y_slice = slice(y_min, y_min + mask.shape[0])
+            x_slice = slice(x_min, x_min + mask.shape[1])
 
-            self.apertures_frame[mask] = self.cutout[mask.data]
-            self.apertures_sum_frame[mask] = aperture_sums[i]
-            self.apertures_mean_frame[mask] = aperture_means[i]
-            self.apertures_noise_frame[mask] = aperture_stddevs[i]
+            self.apertures_frame.data[y_slice, x_slice][mask] = self.cutout[y_slice, x_slice][mask]
+            self.apertures_sum_frame.data[y_slice, x_slice][mask] = aperture_sums[i]
+            self.apertures_mean_frame.data[y_slice, x_slice][mask] = aperture_means[i]
+            self.apertures_noise_frame.data[y_slice, x_slice][mask] = aperture_stddevs[i]
 
     # -----------------------------------------------------------------
 
@@ -972,6 +985,154 @@ class ExactApertureNoiseCalculator(Configurable):
 
     # -----------------------------------------------------------------
 
+    def generate_apertures_batch(self, total_mask, sky_ap_rad_pix, max_number_of_sky_apertures, batch_size=1000):
+
+        """
+        This function generates the sky apertures as generate_apertures_pts, but draws the candidate centers in
+        batches and rejects masked, overlapping and NaN-dominated candidates for a whole batch at once.
+        The sums, means and standard deviations of the apertures and the NaN fractions of the apertures and annuli
+        are obtained from row-wise integral images. Only for the accepted apertures, the sigma-clipped background in
+        the annulus is calculated as in the CAAPR method.
+        :param total_mask:
+        :param sky_ap_rad_pix:
+        :param max_number_of_sky_apertures:
+        :param batch_size:
+        :return:
+        """
+
+        # DETERMINE THE REQUIRED NUMBER OF APERTURES
+        required_napertures = min(int(0.5 * max_number_of_sky_apertures), sky_success_target)
+
+        # SHOW THE REQUIRED NUMBER OF APERTURES
+        log.info("The required number of apertures for this radius is " + str(required_napertures))
+
+        # Determine the maximum "major-relative" radius
+        center = Position(int(round(self.centre_j)), int(round(self.centre_i)))
+        distance_ell = distance_ellipse(self.cutout.shape, center, self.adj_axial_ratio, self.adj_angle * u("deg"))
+        min_random_r = self.adj_semimaj_pix_full + sky_ap_rad_pix
+        max_random_r = np.max(distance_ell) - sky_ap_rad_pix
+
+        # Annulus
+        bg_inner_semimaj_pix = self.adj_semimaj_pix * self.annulus_inner_factor
+        bg_width = (self.adj_semimaj_pix * self.annulus_outer_factor) - bg_inner_semimaj_pix
+        bg_width = min(2.0, bg_width)
+
+        # Create the integral images and the mask data
+        integral = RowIntegralImage(self.cutout)
+        mask_data = total_mask.data
+        ysize, xsize = self.cutout.shape
+
+        # Minimal distance between the apertures (maximal overlap of 10%)
+        min_distance = min_separation_for_overlap(0.1) * sky_ap_rad_pix
+
+        # The accepted apertures
+        accepted_x = np.array([], dtype=np.float64)
+        accepted_y = np.array([], dtype=np.float64)
+        aperture_totals = []
+        aperture_counts = []
+        aperture_means = []
+        aperture_stddevs = []
+
+        ncandidates_total = 0
+        nfailed_batches = 0
+
+        # Draw batches of candidates
+        while len(accepted_x) < required_napertures:
+
+            # Draw
+            x, y = draw_elliptical_positions(batch_size, self.centre_j, self.centre_i, self.adj_axial_ratio, self.adj_angle, min_random_r, max_random_r)
+            ncandidates_total += batch_size
+
+            # Inside the frame and not masked
+            x_pixels = np.round(x).astype(int)
+            y_pixels = np.round(y).astype(int)
+            valid = (x_pixels > 0) & (x_pixels < xsize) & (y_pixels > 0) & (y_pixels < ysize)
+            x, y = x[valid], y[valid]
+            valid = np.logical_not(mask_data[y_pixels[valid], x_pixels[valid]])
+            x, y = x[valid], y[valid]
+
+            # NaN fractions in the apertures and annuli
+            totals, squares, counts, nans = integral.circle(x, y, sky_ap_rad_pix)
+            annulus_nans = integral.annulus(x, y, bg_inner_semimaj_pix, bg_inner_semimaj_pix + bg_width)
+            valid = (nan_fractions(counts, nans) <= 0.10) & (nan_fractions(annulus_nans[2], annulus_nans[3]) <= 0.80)
+
+            # Not overlapping with other apertures
+            indices = np.arange(len(x))[valid]
+            selected = indices[select_separated(x[valid], y[valid], min_distance, accepted_x, accepted_y, limit=required_napertures - len(accepted_x))]
+
+            # No new apertures
+            if len(selected) == 0:
+                nfailed_batches += 1
+                if nfailed_batches * batch_size > sky_gen_max * required_napertures:
+                    log.debug('Unable to generate suitable random sky apertures after ' + str(ncandidates_total) + ' attempts')
+                    break
+                continue
+
+            # Add the apertures
+            means, stddevs = aperture_statistics(totals[selected], squares[selected], counts[selected])
+            accepted_x = np.concatenate((accepted_x, x[selected]))
+            accepted_y = np.concatenate((accepted_y, y[selected]))
+            aperture_totals.extend(totals[selected])
+            aperture_counts.extend(counts[selected])
+            aperture_means.extend(means)
+            aperture_stddevs.extend(stddevs)
+
+            # Debugging
+            log.debug("Accepted " + str(len(accepted_x)) + " apertures after " + str(ncandidates_total) + " candidates")
+
+        # Not enough apertures
+        if len(accepted_x) < sky_success_min:
+
+            log.error("Only " + str(len(accepted_x)) + " suitable sky apertures could be generated, but we need " + str(sky_success_min))
+            self.success = False
+            self.sky_success_counter = len(accepted_x)
+            return
+
+        # Subtract the sigma-clipped background in the annuli
+        aperture_centers = []
+        aperture_sums = []
+        for index in range(len(accepted_x)):
+
+            x = accepted_x[index]
+            y = accepted_y[index]
+            bg_calc = chrisfuncs.AnnulusSum(self.cutout, bg_inner_semimaj_pix, bg_width, 1.0, 0.0, y, x)
+            bg_avg = chrisfuncs.SigmaClip(bg_calc[2], median=False, sigma_thresh=3.0)[1]
+            aperture_sums.append(aperture_totals[index] - (aperture_counts[index] * bg_avg))
+
+            # Create the regions
+            center = PixelCoordinate(x, y)
+            aperture_centers.append(center)
+            circle = PixelCircleRegion(center, sky_ap_rad_pix)
+            base = PixelCircleRegion(center, bg_inner_semimaj_pix)
+            exclude = PixelCircleRegion(center, bg_inner_semimaj_pix + bg_width)
+            self.aperture_region.append(circle)
+            self.aperture_region.append(PixelCompositeRegion(base, exclude))
+
+            # Add the aperture to the masks
+            cutout = shape_cutout_mask(circle, xsize, ysize)
+            if cutout is None: continue
+            x_min, y_min, ap_mask = cutout
+            y_slice = slice(y_min, y_min + ap_mask.shape[0])
+            x_slice = slice(x_min, x_min + ap_mask.shape[1])
+            self.apertures_mask.data[y_slice, x_slice] |= ap_mask
+            self.prior_mask.data[y_slice, x_slice] |= ap_mask
+            self.covering_apertures._data[y_slice, x_slice] += ap_mask.astype(int)
+
+        # CALCULATE NOISE BASED ON THE APERTURE SUMS
+        ap_noise = abs(chrisfuncs.SigmaClip(np.array(aperture_sums), tolerance=0.001, median=True, sigma_thresh=3.0)[0])
+
+        # Debugging
+        log.debug('Aperture noise from current random apertures is ' + str(chrisfuncs.ToPrecision(ap_noise, 4)) + ' (in map units).')
+
+        self.success = True
+        self.noise = ap_noise
+        self.sky_success_counter = len(aperture_sums)
+
+        # Create aperture frames
+        self.create_aperture_frames(aperture_centers, aperture_sums, aperture_means, aperture_stddevs, sky_ap_rad_pix)
+
+    # -----------------------------------------------------------------
+
     def generate_apertures_caapr(self, adj_semimin_pix, adj_semimin_pix_full,
                                  cutout_inviolate, sky_border, sky_ap_rad_pix, exclude_mask, ap_area):
 
@@ -0,0 +1,252 @@
+#!/usr/bin/env python
+# -*- coding: utf8 -*-
+# *****************************************************************
+# **       PTS -- Python Toolkit for working with SKIRT          **
+# **       © Astronomical Observatory, Ghent University          **
+# *****************************************************************
+
+## \package pts.magic.photometry.randomapertures Vectorised generation and measurement of random (sky) apertures:
+#  candidate centers are drawn in batches and aperture statistics are calculated for all candidates at once from
+#  row-wise integral images (summed-area tables).
+
+# -----------------------------------------------------------------
+
+# Ensure Python 3 compatibility
+from __future__ import absolute_import, division, print_function
+
+# Import standard modules
+import math
+import numpy as np
+
+# -----------------------------------------------------------------
+
+class RowIntegralImage(object):
+
+    """
+    This class contains the cumulative sums along the rows of an image, of the (non-NaN) values, their squares and
+    the number of valid and NaN pixels. The sum over any set of pixels that consists of one interval per row (such as
+    a circle) is then obtained with two lookups per row.
+    """
+
+    def __init__(self, data):
+
+        """
+        The constructor ...
+        :param data:
+        """
+
+        data = np.asarray(data, dtype=np.float64)
+        self.ny, self.nx = data.shape
+
+        # Get the valid pixels
+        valid = np.logical_not(np.isnan(data))
+        values = np.where(valid, data, 0.0)
+
+        # Create the tables
+        self.sums = self._cumulate(values)
+        self.squares = self._cumulate(values**2)
+        self.counts = self._cumulate(valid.astype(np.float64))
+        self.nans = self._cumulate(np.logical_not(valid).astype(np.float64))
+
+    # -----------------------------------------------------------------
+
+    @staticmethod
+    def _cumulate(array):
+
+        """
+        This function ...
+        :param array:
+        :return:
+        """
+
+        table = np.zeros((array.shape[0], array.shape[1] + 1), dtype=np.float64)
+        np.cumsum(array, axis=1, out=table[:, 1:])
+        return table
+
+    # -----------------------------------------------------------------
+
+    def circle(self, x, y, radius):
+
+        """
+        This function returns the sum, the sum of squares, the number of valid pixels and the number of NaN pixels
+        for circles around the given centers. A pixel (i, j) belongs to a circle if (i - y)^2 + (j - x)^2 <= radius^2,
+        as for chrisfuncs.EllipseSum with an axial ratio of one.
+        :param x: array of x (j) coordinates of the centers
+        :param y: array of y (i) coordinates of the centers
+        :param radius:
+        :return:
+        """
+
+        x = np.atleast_1d(np.asarray(x, dtype=np.float64))
+        y = np.atleast_1d(np.asarray(y, dtype=np.float64))
+
+        # The rows that can overlap with the circles
+        extent = int(math.ceil(radius)) + 1
+        offsets = np.arange(-extent, extent + 1)
+        rows = np.floor(y)[:, np.newaxis].astype(int) + offsets[np.newaxis, :]
+        dy = rows - y[:, np.newaxis]
+
+        # Determine the column interval in each row
+        halfwidths = np.sqrt(np.maximum(radius**2 - dy**2, 0.0))
+        column_min = np.clip(np.ceil(x[:, np.newaxis] - halfwidths), 0, self.nx).astype(int)
+        column_max = np.clip(np.floor(x[:, np.newaxis] + halfwidths) + 1, 0, self.nx).astype(int)
+        inside = (dy**2 <= radius**2) & (rows >= 0) & (rows < self.ny) & (column_max > column_min)
+        rows = np.clip(rows, 0, self.ny - 1)
+
+        # Look up
+        def lookup(table): return np.sum(np.where(inside, table[rows, column_max] - table[rows, column_min], 0.0), axis=1)
+        return lookup(self.sums), lookup(self.squares), lookup(self.counts), lookup(self.nans)
+
+    # -----------------------------------------------------------------
+
+    def annulus(self, x, y, inner_radius, outer_radius):
+
+        """
+        This function returns the same quantities as circle() for the annuli inner_radius < r <= outer_radius
+        :param x:
+        :param y:
+        :param inner_radius:
+        :param outer_radius:
+        :return:
+        """
+
+        outer = self.circle(x, y, outer_radius)
+        inner = self.circle(x, y, inner_radius)
+        return tuple(o - i for o, i in zip(outer, inner))
+
+# -----------------------------------------------------------------
+
+def aperture_statistics(sums, squares, counts):
+
+    """
+    This function returns the mean and standard deviation of the valid pixels in each aperture
+    :param sums:
+    :param squares:
+    :param counts:
+    :return:
+    """
+
+    with np.errstate(invalid="ignore", divide="ignore"):
+        means = sums / counts
+        variances = np.maximum(squares / counts - means**2, 0.0)
+    return means, np.sqrt(variances)
+
+# -----------------------------------------------------------------
+
+def nan_fractions(counts, nans):
+
+    """
+    This function ...
+    :param counts:
+    :param nans:
+    :return:
+    """
+
+    total = counts + nans
+    with np.errstate(invalid="ignore", divide="ignore"): fractions = nans / total
+    fractions[counts == 0] = 1.0
+    return fractions
+
+# -----------------------------------------------------------------
+
+def draw_elliptical_positions(ncandidates, center_x, center_y, axial_ratio, angle, min_radius, max_radius, random=None):
+
+    """
+    This function draws random positions around a galaxy, at a uniformly distributed 'major-axis relative' radius
+    between the minimum and maximum radius and with a uniformly distributed angle, as in
+    ExactApertureNoiseCalculator.generate_apertures_pts
+    :param ncandidates:
+    :param center_x:
+    :param center_y:
+    :param axial_ratio:
+    :param angle: the position angle in degrees
+    :param min_radius:
+    :param max_radius:
+    :param random: a numpy RandomState (np.random is used if None)
+    :return:
+    """
+
+    if random is None: random = np.random
+
+    theta = 360.0 * random.random_sample(ncandidates)
+    normalized_radius = random.uniform(min_radius, max_radius, ncandidates)
+
+    # Radius of the ellipse in the direction theta, relative to the major axis
+    unrotated = np.radians(theta - angle)
+    b = 1. / axial_ratio
+    radius_at_angle = b / np.sqrt(np.sin(unrotated)**2 + b**2 * np.cos(unrotated)**2)
+    radius = radius_at_angle * normalized_radius
+
+    y = center_y + radius * np.cos(np.radians(theta))
+    x = center_x + radius * np.sin(np.radians(theta))
+    return x, y
+
+# -----------------------------------------------------------------
+
+def min_separation_for_overlap(max_overlap_fraction):
+
+    """
+    This function returns the minimal distance between two circles of radius one for which their overlap area is
+    smaller than the given fraction of the circle area
+    :param max_overlap_fraction:
+    :return:
+    """
+
+    def overlap(d): return (2. * math.acos(d / 2.) - 0.5 * d * math.sqrt(4. - d**2)) / math.pi
+
+    if max_overlap_fraction <= 0: return 2.0
+    if max_overlap_fraction >= 1: return 0.0
+
+    # Bisection (the overlap decreases monotonically with distance)
+    low, high = 0.0, 2.0
+    for _ in range(60):
+        middle = 0.5 * (low + high)
+        if overlap(middle) > max_overlap_fraction: low = middle
+        else: high = middle
+    return high
+
+# -----------------------------------------------------------------
+
+def select_separated(x, y, min_distance, accepted_x=None, accepted_y=None, limit=None):
+
+    """
+    This function selects, in order, the positions that lie further than the minimal distance from all previously
+    accepted and selected positions
+    :param x:
+    :param y:
+    :param min_distance:
+    :param accepted_x:
+    :param accepted_y:
+    :param limit: maximum number of positions to select
+    :return: indices of the selected positions
+    """
+
+    from scipy.spatial import cKDTree
+
+    candidates = np.arange(len(x))
+    points = np.column_stack((x, y))
+
+    # Reject candidates that are too close to already accepted positions
+    if accepted_x is not None and len(accepted_x) > 0 and min_distance > 0:
+        tree = cKDTree(np.column_stack((accepted_x, accepted_y)))
+        distances = tree.query(points, k=1)[0]
+        candidates = candidates[distances >= min_distance]
+
+    if len(candidates) == 0 or min_distance <= 0: return candidates[:limit]
+
+    # Find close pairs among the candidates
+    tree = cKDTree(points[candidates])
+    neighbours = tree.query_ball_point(points[candidates], r=min_distance)
+
+    # Greedy selection in order
+    rejected = np.zeros(len(candidates), dtype=bool)
+    selected = []
+    for index in range(len(candidates)):
+        if rejected[index]: continue
+        selected.append(candidates[index])
+        if limit is not None and len(selected) == limit: break
+        rejected[neighbours[index]] = True
+
+    return np.array(selected, dtype=int)
+
+# -----------------------------------------------------------------
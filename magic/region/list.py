@@ -1891,23 +1891,20 @@ class PixelRegionList(RegionList):
 
     # -----------------------------------------------------------------
 
-    def to_mask(self, x_size, y_size):
+    def to_mask(self, x_size, y_size, cache=True):
 
         """
         This function ...
         :param x_size:
         :param y_size:
+        :param cache: reuse the rasterized shapes of previous calls
         :return:
         """
 
-        # Create empty mask
-        mask = Mask.empty(x_size, y_size)
+        from .rasterization import rasterize
 
-        # Add each shape to the mask
-        for shape in self: mask += Mask.from_shape(shape, x_size, y_size)
-
-        # Return the mask
-        return mask
+        # Add each shape to the mask, evaluated within its bounding box
+        return Mask(rasterize(self, x_size, y_size, cache=cache))
 
     # -----------------------------------------------------------------
 
@@ -0,0 +1,221 @@
+#!/usr/bin/env python
+# -*- coding: utf8 -*-
+# *****************************************************************
+# **       PTS -- Python Toolkit for working with SKIRT          **
+# **       © Astronomical Observatory, Ghent University          **
+# *****************************************************************
+
+## \package pts.magic.region.rasterization Contains functions for rasterizing pixel regions into masks, evaluating
+#  the overlap of each shape only within its bounding box, and a cache for the rasterized shapes.
+
+# -----------------------------------------------------------------
+
+# Ensure Python 3 functionality
+from __future__ import absolute_import, division, print_function
+
+# Import standard modules
+import math
+import numpy as np
+from collections import OrderedDict
+
+# Import the relevant PTS classes and modules
+from ..basics.coordinate import PixelCoordinate
+from .circle import PixelCircleRegion
+from .ellipse import PixelEllipseRegion
+from .rectangle import PixelRectangleRegion
+
+# -----------------------------------------------------------------
+
+def get_outer_radius(shape):
+
+    """
+    This function returns the radius of a circle around the center that contains the complete shape, or None if
+    this is not a shape for which the mask can be evaluated within a bounding box
+    :param shape:
+    :return:
+    """
+
+    if isinstance(shape, PixelCircleRegion): return shape.radius
+    elif isinstance(shape, PixelEllipseRegion): return max(shape.radius.x, shape.radius.y)
+    elif isinstance(shape, PixelRectangleRegion): return math.sqrt(shape.radius.x**2 + shape.radius.y**2)
+    else: return None
+
+# -----------------------------------------------------------------
+
+def get_pixel_bounds(shape, x_size, y_size):
+
+    """
+    This function returns the pixel ranges (x_min, x_max, y_min, y_max) that contain the shape, limited to the image
+    :param shape:
+    :param x_size:
+    :param y_size:
+    :return:
+    """
+
+    radius = get_outer_radius(shape)
+    center = shape.center
+
+    x_min = max(int(math.floor(center.x - radius)) - 1, 0)
+    x_max = min(int(math.ceil(center.x + radius)) + 1, x_size)
+    y_min = max(int(math.floor(center.y - radius)) - 1, 0)
+    y_max = min(int(math.ceil(center.y + radius)) + 1, y_size)
+
+    return x_min, x_max, y_min, y_max
+
+# -----------------------------------------------------------------
+
+def get_mask_data(mask):
+
+    """
+    This function returns the boolean array of a mask (of the basics or the core Mask class)
+    :param mask:
+    :return:
+    """
+
+    if isinstance(mask, np.ndarray): return np.asarray(mask, dtype=bool)
+    else: return np.asarray(mask.data, dtype=bool)
+
+# -----------------------------------------------------------------
+
+def get_geometry_key(shape):
+
+    """
+    This function ...
+    :param shape:
+    :return:
+    """
+
+    center = shape.center
+    if isinstance(shape, PixelCircleRegion): radius = (float(shape.radius),)
+    else: radius = (float(shape.radius.x), float(shape.radius.y))
+    angle = float(shape.angle.to("deg").value) if getattr(shape, "angle", None) is not None else 0.0
+
+    return (type(shape).__name__, float(center.x), float(center.y), radius, angle)
+
+# -----------------------------------------------------------------
+
+def shape_cutout_mask(shape, x_size, y_size):
+
+    """
+    This function evaluates the mask of the shape only within its bounding box. Because the cutout starts at an
+    integer pixel, the result is identical to the corresponding part of shape.to_mask(x_size, y_size).
+    :param shape:
+    :param x_size:
+    :param y_size:
+    :return: x_min, y_min and the cutout mask data, or None if the shape is outside of the image
+    """
+
+    # Get the bounds
+    x_min, x_max, y_min, y_max = get_pixel_bounds(shape, x_size, y_size)
+    if x_min >= x_max or y_min >= y_max: return None
+
+    # Shift the shape to the cutout
+    shifted = shape - PixelCoordinate(x_min, y_min)
+
+    # Evaluate
+    data = get_mask_data(shifted.to_mask(x_max - x_min, y_max - y_min))
+    return x_min, y_min, data
+
+# -----------------------------------------------------------------
+
+class RasterizationCache(object):
+
+    """
+    This class keeps the rasterized cutouts of shapes, keyed on the shape geometry and the image shape, so that
+    masks for the same regions (e.g. for different filters) do not have to be evaluated again
+    """
+
+    def __init__(self, max_entries=100000):
+
+        """
+        The constructor ...
+        :param max_entries:
+        """
+
+        self.max_entries = max_entries
+        self.cutouts = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    # -----------------------------------------------------------------
+
+    def get(self, shape, x_size, y_size):
+
+        """
+        This function ...
+        :param shape:
+        :param x_size:
+        :param y_size:
+        :return:
+        """
+
+        key = (get_geometry_key(shape), x_size, y_size)
+
+        # Get from the cache
+        if key in self.cutouts:
+            self.hits += 1
+            self.cutouts[key] = cutout = self.cutouts.pop(key)
+            return cutout
+
+        # Evaluate
+        self.misses += 1
+        cutout = shape_cutout_mask(shape, x_size, y_size)
+        self.cutouts[key] = cutout
+        while len(self.cutouts) > self.max_entries: self.cutouts.popitem(last=False)
+
+        # Return
+        return cutout
+
+    # -----------------------------------------------------------------
+
+    def clear(self):
+
+        """
+        This function ...
+        :return:
+        """
+
+        self.cutouts.clear()
+
+# -----------------------------------------------------------------
+
+# The default cache
+rasterization_cache = RasterizationCache()
+
+# -----------------------------------------------------------------
+
+def rasterize(shapes, x_size, y_size, cache=True):
+
+    """
+    This function creates the union of the masks of the shapes, as a boolean array. Circles, ellipses and rectangles
+    are evaluated only within their bounding box, other shapes over the whole image.
+    :param shapes:
+    :param x_size:
+    :param y_size:
+    :param cache:
+    :return:
+    """
+
+    data = np.zeros((y_size, x_size), dtype=bool)
+
+    # Loop over the shapes
+    for shape in shapes:
+
+        # Evaluate the complete mask
+        if get_outer_radius(shape) is None:
+            data |= get_mask_data(shape.to_mask(x_size, y_size))
+            continue
+
+        # Evaluate the cutout
+        if cache: cutout = rasterization_cache.get(shape, x_size, y_size)
+        else: cutout = shape_cutout_mask(shape, x_size, y_size)
+        if cutout is None: continue
+
+        # Add the cutout
+        x_min, y_min, cutout_data = cutout
+        data[y_min:y_min+cutout_data.shape[0], x_min:x_min+cutout_data.shape[1]] |= cutout_data
+
+    # Return the data
+    return data
+
+# -----------------------------------------------------------------
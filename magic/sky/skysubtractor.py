@@ -28,7 +28,7 @@ from ..core.frame import Frame
 from ..basics.mask import Mask
 from ..region.composite import PixelCompositeRegion
 from ..region.list import PixelRegionList, SkyRegionList
-from ..tools import plotting, statistics, fitting, plotting
+from ..tools import plotting, statistics, fitting, plotting, interpolation
 from ...core.basics.configurable import Configurable
 from ...core.basics.log import log
 from ..core.mask import Mask as newMask
@@ -36,6 +36,7 @@ from ...core.basics.map import Map
 from ...core.basics.configuration import save_mapping
 from ...core.basics.distribution import Distribution
 from ...core.plot.distribution import DistributionPlotter
+from ...core.tools import time
 from pts.core.tools.utils import lazyproperty
 from ..region.list import load_as_pixel_region_list
 
@@ -108,6 +109,7 @@ class SkySubtractor(Configurable):
         self.phot_sky = None
         self.phot_rms = None
         self.phot_boundaries = None
+        self.phot_box_shape = None
 
     # -----------------------------------------------------------------
 
@@ -485,16 +487,21 @@ class SkySubtractor(Configurable):
         sigma_clip = None
         # bkg_estimator = MedianBackground()
         bkg_estimator = SExtractorBackground()
+        self.phot_box_shape = box_shape
         try:
-            bkg = Background2D(cutout, box_shape, filter_size=filter_size, sigma_clip=sigma_clip,
-                               bkg_estimator=bkg_estimator, mask=mask_cutout, filter_threshold=None, #exclude_mesh_method="threshold", (option does not exist anymore)
-                               exclude_percentile=self.config.estimation.photutils.exclude_mesh_percentile) # used to be exclude_mesh_percentile
+            with time.elapsed_timer() as elapsed:
+                bkg = Background2D(cutout, box_shape, filter_size=filter_size, sigma_clip=sigma_clip,
+                                   bkg_estimator=bkg_estimator, mask=mask_cutout, filter_threshold=None, #exclude_mesh_method="threshold", (option does not exist anymore)
+                                   exclude_percentile=self.config.estimation.photutils.exclude_mesh_percentile) # used to be exclude_mesh_percentile
         except ValueError:
 
             plotting.plot_box(cutout)
             plotting.plot_mask(mask_cutout, title="mask")
             raise RuntimeError("Sky subtraction is not possible for this image")
 
+        # Debugging
+        log.debug("Estimating the photutils background took " + str(elapsed()) + " seconds")
+
         # Keep the background 2D object
         self.photutils_bkg = bkg
 
@@ -551,7 +558,7 @@ class SkySubtractor(Configurable):
         elif self.config.estimation.photutils.sky_interpolation_method == "polynomial": self.sky = self._interpolate_polynomial(background)
 
         # IDW (photutils default)
-        elif self.config.estimation.photutils.sky_interpolation_method == "idw": self.sky = self._interpolate_idw(background)
+        elif self.config.estimation.photutils.sky_interpolation_method == "idw": self.sky = self._interpolate_idw(background, self.phot_background_mesh)
 
         # Invalid
         else: raise ValueError("Invalid interpolation method")
@@ -579,7 +586,7 @@ class SkySubtractor(Configurable):
         elif self.config.estimation.photutils.noise_interpolation_method == "polynomial": self.noise = self._interpolate_polynomial(background_rms)
 
         # IDW (photutils default)
-        elif self.config.estimation.photutils.noise_interpolation_method == "idw": self.noise = background_rms
+        elif self.config.estimation.photutils.noise_interpolation_method == "idw": self.noise = self._interpolate_idw(background_rms, self.phot_background_rms_mesh)
 
         # Invalid
         else: raise ValueError("Invalid interpolation method")
@@ -682,15 +689,48 @@ class SkySubtractor(Configurable):
 
     # -----------------------------------------------------------------
 
-    def _interpolate_idw(self, frame):
+    def _interpolate_idw(self, frame, mesh):
 
         """
-        This function ...
+        This function interpolates the values of the photutils background meshes to the whole frame with inverse
+        distance weighting of the nearest mesh centers
+        :param frame:
+        :param mesh:
         :return:
         """
 
-        mean = np.nanmean(frame)
-        return frame.replace_nans(mean)
+        # Debugging
+        log.debug("Interpolating using inverse distance weighting ...")
+
+        # Determine the positions of the mesh centers in the frame
+        box_y, box_x = self.phot_box_shape
+        mesh_y, mesh_x = np.indices(mesh.shape)
+        x = self.phot_boundaries["x_min"] + (mesh_x + 0.5) * box_x - 0.5
+        y = self.phot_boundaries["y_min"] + (mesh_y + 0.5) * box_y - 0.5
+
+        # Interpolate
+        with time.elapsed_timer() as elapsed:
+            data = interpolation.idw_scattered(x.ravel(), y.ravel(), mesh.data.ravel(), tuple(frame.shape),
+                                               nneighbours=self.config.estimation.photutils.idw_neighbours,
+                                               power=self.config.estimation.photutils.idw_power,
+                                               coarse_factor=self.config.estimation.photutils.idw_coarse_factor)
+
+        # Debugging
+        log.debug("Inverse distance weighting interpolation took " + str(elapsed()) + " seconds")
+
+        # Make
+        new = frame.copy()
+
+        # Replace
+        if self.config.estimation.photutils.replace_all_interpolated: new._data = data
+        else: new[self.mask] = data[self.mask]
+
+        # Replace NaNs
+        nans = new.nans
+        new[nans] = data[nans]
+
+        # Return
+        return new
 
     # -----------------------------------------------------------------
 
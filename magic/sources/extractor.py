@@ -33,6 +33,7 @@ from ..region.list import load_as_pixel_region_list
 from ..region.point import PixelPointRegion
 from pts.core.tools.utils import lazyproperty
 from ..core.mask import Mask as newMask
+from ...core.tools.parallelization import ParallelTarget
 
 # -----------------------------------------------------------------
 
@@ -824,17 +825,13 @@ class SourceExtractor(Configurable):
         # Inform the user
         log.info("Interpolating the frame over the masked pixels ...")
 
-        nsources = len(self.sources)
-        count = 0
-
         # Set principal ellipse for the source extraction animation
         if self.animation is not None: self.animation.principal_shape = self.principal_shape
 
-        # Loop over all sources and remove them from the frame
-        for label, source in zip(self.labels, self.sources):
-
-            # Debugging
-            log.debug("Estimating background and replacing the frame pixels of source " + str(count+1) + " of " + str(nsources) + " ...")
+        # Determine which sources have to be removed and whether to sigma-clip
+        indices = []
+        sigma_clips = []
+        for index, source in enumerate(self.sources):
 
             # Check whether the source is in front of the principal galaxy
             #foreground = self.principal_mask.masks(source.center)
@@ -850,27 +847,33 @@ class SourceExtractor(Configurable):
             sigma_clip = self.config.sigma_clip if not foreground else False
 
             # Debugging
-            log.debug("Sigma-clipping enabled for estimating background gradient for this source" if sigma_clip else "Sigma-clipping disabled for estimating background gradient for this source")
+            log.debug("Sigma-clipping enabled for estimating background gradient for source " + str(index+1) if sigma_clip else "Sigma-clipping disabled for estimating background gradient for source " + str(index+1))
 
-            # If these pixels are already replaced by an overlapping source (e.g. saturation), skip this source,
-            # otherwise the area will be messed up
-            #current_mask_cutout = self.mask[source.y_slice, source.x_slice]
-            #if current_mask_cutout.covers(source.mask):
-            #    count += 1
-            #    continue
-            ## ==> this is now also done in create_mask
-
-            # Estimate the background
-            try:
-                source.estimate_background(self.config.interpolation_method, sigma_clip=sigma_clip)
-            except ValueError: # ValueError: zero-size array to reduction operation minimum which has no identity
-                # in: limits = (np.min(known_points), np.max(known_points)) [inpaint_biharmonic]
+            # Add
+            indices.append(index)
+            sigma_clips.append(sigma_clip)
+
+        # Estimate the backgrounds (every source has its own copy of the frame pixels, so this can be done in parallel)
+        backgrounds = self.estimate_backgrounds(indices, sigma_clips)
+
+        # Replace the pixels in the frame, in the original order of the sources (so that overlapping patches are
+        # merged as in the serial procedure)
+        for index, result in zip(indices, backgrounds):
+
+            source = self.sources[index]
+
+            # Debugging
+            log.debug("Replacing the frame pixels of source " + str(index+1) + " of " + str(self.nsources) + " ...")
+
+            # The background could not be estimated
+            # ValueError: zero-size array to reduction operation minimum which has no identity
+            # in: limits = (np.min(known_points), np.max(known_points)) [inpaint_biharmonic]
+            if result is None:
                 self.nfailed += 1
-                count += 1
                 continue
 
-            # Adapt the mask
-            #self.mask[source.y_slice, source.x_slice] += source.mask # this is now done beforehand, in the create_mask function
+            # Set the background and the (possibly adapted) source mask
+            source.background, source.mask = result
 
             # Add frame to the animation
             if self.animation is not None and (self.principal_mask is None or self.principal_mask.masks(source.center)) and self.animation.nframes <= 20:
@@ -882,13 +885,42 @@ class SourceExtractor(Configurable):
             # Increment
             self.nsuccess += 1
 
-            #if not sigma_clip:
-            #    # source.plot()
+    # -----------------------------------------------------------------
+
+    def estimate_backgrounds(self, indices, sigma_clips):
+
+        """
+        This function estimates the backgrounds of the sources with the given indices, divided over a number of
+        parallel processes
+        :param indices:
+        :param sigma_clips:
+        :return: a list with, for every source, the background and the source mask, or None if the estimation failed
+        """
+
+        # Divide the sources into contiguous chunks
+        nprocesses = max(min(self.config.nprocesses, len(indices)), 1)
+        boundaries = np.linspace(0, len(indices), nprocesses + 1).astype(int)
+
+        # Debugging
+        log.debug("Estimating the backgrounds of " + str(len(indices)) + " sources with " + str(nprocesses) + " process(es) ...")
+
+        # Launch
+        outputs = []
+        with ParallelTarget(estimate_source_backgrounds, nprocesses) as target:
+
+            for start, end in zip(boundaries[:-1], boundaries[1:]):
 
-            #    plotting.plot_removal(source.cutout, source.mask, source.background,
-            #                          self.frame[source.y_slice, source.x_slice])
+                chunk = [self.sources[index] for index in indices[start:end]]
+                outputs.append(target(chunk, sigma_clips[start:end], self.config.interpolation_method))
 
-            count += 1
+        # Gather the results, in order
+        backgrounds = []
+        for output in outputs:
+            output.request()
+            backgrounds.extend(output.output)
+
+        # Return
+        return backgrounds
 
     # -----------------------------------------------------------------
 
@@ -1039,3 +1071,32 @@ class SourceExtractor(Configurable):
         else: return None
 
 # -----------------------------------------------------------------
+
+def estimate_source_backgrounds(sources, sigma_clips, method):
+
+    """
+    This function estimates the background of each source
+    :param sources:
+    :param sigma_clips:
+    :param method:
+    :return:
+    """
+
+    results = []
+
+    # Loop over the sources
+    for source, sigma_clip in zip(sources, sigma_clips):
+
+        # Estimate the background
+        try: source.estimate_background(method, sigma_clip=sigma_clip)
+        except ValueError:
+            results.append(None)
+            continue
+
+        # Add the background and the mask (which can be adapted by the estimation)
+        results.append((source.background, source.mask))
+
+    # Return the results
+    return results
+
+# -----------------------------------------------------------------
@@ -28,9 +28,9 @@ from ..region.circle import PixelCircleRegion
 from ..region.ellipse import PixelEllipseRegion
 from ..core.frame import Frame
 from ..core.detection import Detection
-from ..tools import statistics, fitting
+from ..tools import statistics, fitting, batchfitting
 from ...core.basics.configurable import Configurable
-from ...core.tools import tables, arrays
+from ...core.tools import tables, arrays, time
 from ...core.tools import filesystem as fs
 from ...core.basics.log import log
 from ..tools import plotting
@@ -564,8 +564,13 @@ class PointSourceFinder(Configurable):
 
         # Inform the user
         log.info("Fitting PSF profiles to the point sources ...")
+
+        # Fit all Gaussians at once
+        if self.config.fitting.batch and self.config.fitting.model_names[0] == "Gaussian": remaining = self.fit_psf_batch()
+        else: remaining = None
+
         # Loop over all sources in the list
-        for source in self.sources:
+        for index, source in enumerate(self.sources):
 
             # Skip None
             if source is None: continue
@@ -573,6 +578,9 @@ class PointSourceFinder(Configurable):
             # If this star should be ignored, skip it
             if source.ignore: continue
 
+            # Already fitted in the batch
+            if remaining is not None and index not in remaining: continue
+
             # Check if the star has been detected
             if not source.has_detection and self.config.fitting.fit_if_undetected:
 
@@ -613,6 +621,98 @@ class PointSourceFinder(Configurable):
 
     # -----------------------------------------------------------------
 
+    def fit_psf_batch(self):
+
+        """
+        This function fits a symmetric Gaussian to the detections of all sources at once. The sources for which
+        the batched fit fails are fitted separately afterwards (with zooming in and the other model names).
+        :return: the indices of the sources that still have to be fitted
+        """
+
+        # Inform the user
+        log.info("Fitting Gaussians to the point sources in batch ...")
+
+        config = self.config.fitting
+        indices = []
+        detections = []
+        positions = []
+
+        # Loop over all sources
+        for index, source in enumerate(self.sources):
+
+            # Skip None and ignored sources
+            if source is None or source.ignore: continue
+
+            # Get the detection
+            if source.has_detection: detection = source.detection
+            elif config.fit_if_undetected:
+                ellipse = source.ellipse(self.frame.wcs, self.frame.average_pixelscale, config.initial_radius)
+                detection = Detection.from_ellipse(self.frame, ellipse, config.background_outer_factor)
+            else: continue
+
+            # Too small
+            if detection.cutout.xsize < config.minimum_pixels or detection.cutout.ysize < config.minimum_pixels: continue
+
+            # Get the position
+            if config.use_center_or_peak == "center": position = detection.center
+            elif config.use_center_or_peak == "peak": position = detection.peak
+            else: raise ValueError("Invalid option (should be 'center' or 'peak')")
+            if position is None: continue
+
+            # Estimate and subtract the background
+            if not detection.has_background: detection.estimate_background(config.background_est_method, config.sigma_clip_background)
+
+            indices.append(index)
+            detections.append(detection)
+            positions.append(detection.cutout.rel_position(position))
+
+        # Nothing to fit
+        remaining = set(index for index, source in enumerate(self.sources) if source is not None and not source.ignore)
+        if len(indices) == 0: return remaining
+
+        # Stack the background-subtracted cutouts
+        stack, valid = batchfitting.stack_cutouts([np.asarray(detection.subtracted) for detection in detections])
+
+        # Initial guesses, as in fit_2D_Gaussian
+        x_mean = np.array([position.x for position in positions])
+        y_mean = np.array([position.y for position in positions])
+        stddev = np.array([0.1 * detection.cutout.xsize for detection in detections])
+        rows = np.clip(np.round(y_mean).astype(int), 0, stack.shape[1] - 1)
+        columns = np.clip(np.round(x_mean).astype(int), 0, stack.shape[2] - 1)
+        nfits = np.arange(len(indices))
+        amplitude = np.where(valid[nfits, rows, columns], stack[nfits, rows, columns], 1.0)
+
+        # Fit
+        with time.elapsed_timer() as elapsed:
+            parameters, converged, niterations, chi2 = batchfitting.fit_gaussians(stack, valid, x_mean, y_mean, stddev, amplitude=amplitude)
+            seconds = elapsed()
+
+        # Set the models
+        nsuccess = 0
+        for i, index in enumerate(indices):
+
+            # Check the fit
+            if not converged[i] or parameters[i, 0] < 0: continue
+            offset = np.hypot(parameters[i, 1] - x_mean[i], parameters[i, 2] - y_mean[i])
+            if offset > config.max_model_offset: continue
+
+            # Set the model, in the coordinate frame of the image
+            source = self.sources[index]
+            source.detection = detections[i]
+            source.psf_model = batchfitting.to_model(parameters[i], detections[i].cutout.x_min, detections[i].cutout.y_min)
+            remaining.discard(index)
+            nsuccess += 1
+
+        # Inform the user
+        log.debug("Fitted " + str(len(indices)) + " Gaussians in " + str(seconds) + " seconds (" + str(seconds / len(indices) * 1000.) + " ms per source)")
+        log.debug("Converged: " + str(np.sum(converged)) + ", mean number of iterations: " + str(np.mean(niterations)) + ", succeeded: " + str(nsuccess))
+        log.debug(str(len(remaining)) + " sources will be fitted separately")
+
+        # Return the remaining sources
+        return remaining
+
+    # -----------------------------------------------------------------
+
     @property
     def nsources(self):
 
@@ -0,0 +1,199 @@
+#!/usr/bin/env python
+# -*- coding: utf8 -*-
+# *****************************************************************
+# **       PTS -- Python Toolkit for working with SKIRT          **
+# **       © Astronomical Observatory, Ghent University          **
+# *****************************************************************
+
+## \package pts.magic.tools.batchfitting Functions for fitting a symmetric 2D Gaussian to many cutouts at once:
+#  the cutouts are stacked into one padded 3D array and all fits are iterated together with a vectorised
+#  Levenberg-Marquardt procedure.
+
+# -----------------------------------------------------------------
+
+# Ensure Python 3 compatibility
+from __future__ import absolute_import, division, print_function
+
+# Import standard modules
+import numpy as np
+
+# Import astronomical modules
+from astropy.modeling import models
+
+# -----------------------------------------------------------------
+
+# The order of the parameters
+parameter_names = ["amplitude", "x_mean", "y_mean", "stddev"]
+
+# -----------------------------------------------------------------
+
+def stack_cutouts(cutouts, masks=None):
+
+    """
+    This function stacks the cutouts into one array, padded to the largest cutout. Padding, NaN and masked pixels
+    are marked as invalid.
+    :param cutouts: list of 2D arrays
+    :param masks: list of 2D boolean arrays (or None's) that mark pixels which should not be used
+    :return: the stack and the validity array, both of shape (ncutouts, ysize, xsize)
+    """
+
+    ysize = max(cutout.shape[0] for cutout in cutouts)
+    xsize = max(cutout.shape[1] for cutout in cutouts)
+
+    stack = np.zeros((len(cutouts), ysize, xsize), dtype=np.float64)
+    valid = np.zeros((len(cutouts), ysize, xsize), dtype=bool)
+
+    # Fill
+    for index, cutout in enumerate(cutouts):
+
+        ny, nx = cutout.shape
+        data = np.asarray(cutout, dtype=np.float64)
+        stack[index, :ny, :nx] = data
+        valid[index, :ny, :nx] = np.logical_not(np.isnan(data))
+        if masks is not None and masks[index] is not None: valid[index, :ny, :nx] &= np.logical_not(masks[index])
+
+    # Invalid pixels don't contribute
+    stack[np.logical_not(valid)] = 0.0
+
+    # Return
+    return stack, valid
+
+# -----------------------------------------------------------------
+
+def evaluate_gaussians(parameters, x, y):
+
+    """
+    This function evaluates the symmetric Gaussians with the given parameters on the grid
+    :param parameters: array of shape (n, 4)
+    :param x: the x coordinates of the pixels, of shape (ysize, xsize)
+    :param y: the y coordinates of the pixels, of shape (ysize, xsize)
+    :return: the Gaussians, the exponential factors and the distances squared, of shape (n, ysize, xsize)
+    """
+
+    amplitude, x_mean, y_mean, stddev = [parameters[:, index, np.newaxis, np.newaxis] for index in range(4)]
+    dx = x[np.newaxis] - x_mean
+    dy = y[np.newaxis] - y_mean
+    radius2 = dx**2 + dy**2
+    exponential = np.exp(-0.5 * radius2 / stddev**2)
+    return amplitude * exponential, exponential, dx, dy, radius2
+
+# -----------------------------------------------------------------
+
+def fit_gaussians(stack, valid, x_mean, y_mean, stddev, amplitude=None, fixed_center=False, max_center_offset=None,
+                  max_iterations=100, tolerance=1e-6, min_stddev=0.1):
+
+    """
+    This function fits a symmetric 2D Gaussian (with equal x and y standard deviation, as with fit_2D_Gaussian) to
+    every cutout in the stack, with a Levenberg-Marquardt procedure that is vectorised over the cutouts
+    :param stack: array of shape (n, ysize, xsize)
+    :param valid: boolean array of shape (n, ysize, xsize)
+    :param x_mean: initial x positions, relative to the cutouts
+    :param y_mean: initial y positions, relative to the cutouts
+    :param stddev: initial standard deviations
+    :param amplitude: initial amplitudes (the maximum of each cutout if None)
+    :param fixed_center:
+    :param max_center_offset: maximum offset of the center from the initial position
+    :param max_iterations:
+    :param tolerance: relative decrease of the chi squared below which a fit is considered converged
+    :param min_stddev:
+    :return: the parameters (n, 4), the convergence flags, the number of iterations and the chi squared per cutout
+    """
+
+    nfits, ysize, xsize = stack.shape
+    y, x = np.mgrid[:ysize, :xsize].astype(np.float64)
+    weights = valid.astype(np.float64)
+
+    # Initial parameters
+    if amplitude is None: amplitude = np.max(np.where(valid, stack, -np.inf).reshape(nfits, -1), axis=1)
+    parameters = np.column_stack((np.broadcast_to(amplitude, nfits), np.broadcast_to(x_mean, nfits),
+                                  np.broadcast_to(y_mean, nfits), np.broadcast_to(stddev, nfits))).astype(np.float64)
+    initial = parameters.copy()
+
+    # Parameters that are varied
+    free = np.ones(4, dtype=bool)
+    if fixed_center: free[1:3] = False
+
+    # Calculate the initial chi squared
+    model = evaluate_gaussians(parameters, x, y)[0]
+    chi2 = np.sum(weights * (stack - model)**2, axis=(1, 2))
+
+    # Initialize
+    damping = np.full(nfits, 1e-3)
+    active = np.ones(nfits, dtype=bool)
+    converged = np.zeros(nfits, dtype=bool)
+    niterations = np.zeros(nfits, dtype=int)
+
+    # Iterate
+    for _ in range(max_iterations):
+
+        indices = np.nonzero(active)[0]
+        if len(indices) == 0: break
+        niterations[indices] += 1
+
+        # Evaluate the model and the Jacobian for the active fits
+        current = parameters[indices]
+        model, exponential, dx, dy, radius2 = evaluate_gaussians(current, x, y)
+        stddev2 = current[:, 3, np.newaxis, np.newaxis]**2
+        jacobian = np.stack((exponential, model * dx / stddev2, model * dy / stddev2,
+                             model * radius2 / (stddev2 * current[:, 3, np.newaxis, np.newaxis])), axis=1)
+        jacobian = jacobian.reshape(len(indices), 4, -1)[:, free, :]
+        residuals = ((stack[indices] - model) * weights[indices]).reshape(len(indices), -1)
+        jw = jacobian * weights[indices].reshape(len(indices), 1, -1)
+
+        # Set up the damped normal equations
+        normal = np.einsum("nij,nkj->nik", jw, jacobian)
+        gradient = np.einsum("nij,nj->ni", jacobian, residuals)
+        diagonal = np.einsum("nii->ni", normal)
+        damped = normal + (damping[indices, np.newaxis] * np.maximum(diagonal, 1e-12))[:, :, np.newaxis] * np.eye(len(diagonal[0]))[np.newaxis]
+
+        # Solve
+        try: steps = np.linalg.solve(damped, gradient[:, :, np.newaxis])[:, :, 0]
+        except np.linalg.LinAlgError: steps = np.array([np.linalg.lstsq(matrix, vector, rcond=None)[0] for matrix, vector in zip(damped, gradient)])
+
+        # Determine the trial parameters
+        trial = current.copy()
+        trial[:, free] += steps
+        trial[:, 3] = np.maximum(np.abs(trial[:, 3]), min_stddev)
+        if max_center_offset is not None:
+            trial[:, 1] = np.clip(trial[:, 1], initial[indices, 1] - max_center_offset, initial[indices, 1] + max_center_offset)
+            trial[:, 2] = np.clip(trial[:, 2], initial[indices, 2] - max_center_offset, initial[indices, 2] + max_center_offset)
+
+        # Calculate the new chi squared
+        trial_model = evaluate_gaussians(trial, x, y)[0]
+        trial_chi2 = np.sum(weights[indices] * (stack[indices] - trial_model)**2, axis=(1, 2))
+
+        # Accept the steps that improve the fit
+        better = np.isfinite(trial_chi2) & (trial_chi2 <= chi2[indices])
+        improvement = np.where(better, chi2[indices] - trial_chi2, 0.0)
+        parameters[indices[better]] = trial[better]
+        damping[indices] = np.where(better, damping[indices] / 10., damping[indices] * 10.)
+
+        # Check convergence
+        done = better & (improvement <= tolerance * np.maximum(chi2[indices], 1e-300))
+        chi2[indices[better]] = trial_chi2[better]
+        converged[indices[done]] = True
+        active[indices[done]] = False
+
+        # Give up for fits that can't be improved anymore
+        active[indices[damping[indices] > 1e10]] = False
+
+    # Return
+    return parameters, converged, niterations, chi2
+
+# -----------------------------------------------------------------
+
+def to_model(parameters, x_shift=0.0, y_shift=0.0):
+
+    """
+    This function creates a Gaussian2D model from the fitted parameters, shifted to another coordinate frame
+    :param parameters:
+    :param x_shift:
+    :param y_shift:
+    :return:
+    """
+
+    amplitude, x_mean, y_mean, stddev = parameters
+    return models.Gaussian2D(amplitude=amplitude, x_mean=x_mean + x_shift, y_mean=y_mean + y_shift, x_stddev=stddev,
+                             y_stddev=stddev, theta=0.0)
+
+# -----------------------------------------------------------------
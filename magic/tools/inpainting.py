@@ -0,0 +1,378 @@
+#!/usr/bin/env python
+# -*- coding: utf8 -*-
+# *****************************************************************
+# **       PTS -- Python Toolkit for working with SKIRT          **
+# **       © Astronomical Observatory, Ghent University          **
+# *****************************************************************
+
+## \package pts.magic.tools.inpainting Vectorised functions for filling NaN (or masked) pixels in an image:
+#  neighbourhood averaging (the 'localmean' and 'idw' methods of replace_nans), normalized convolution with a kernel,
+#  a multigrid (pyramid) fill for large holes and inverse distance weighting based on a KD-tree.
+
+# -----------------------------------------------------------------
+
+# Ensure Python 3 functionality
+from __future__ import absolute_import, division, print_function
+
+# Import standard modules
+import numpy as np
+from scipy import ndimage
+
+# -----------------------------------------------------------------
+
+# The kernel of the 'idw' method of replace_nans
+idw_kernel = np.array([[0, 0.5, 0.5, 0.5, 0],
+                       [0.5, 0.75, 0.75, 0.75, 0.5],
+                       [0.5, 0.75, 1, 0.75, 0.5],
+                       [0.5, 0.75, 0.75, 0.5, 1],
+                       [0, 0.5, 0.5, 0.5, 0]])
+
+# -----------------------------------------------------------------
+
+methods = ["localmean", "idw", "normalized", "pyramid", "kdtree"]
+
+# -----------------------------------------------------------------
+
+def get_invalid(data, mask=None):
+
+    """
+    This function returns the mask of pixels that have to be filled
+    :param data:
+    :param mask:
+    :return:
+    """
+
+    invalid = np.isnan(data)
+    if mask is not None: invalid = np.logical_or(invalid, mask)
+    return invalid
+
+# -----------------------------------------------------------------
+
+def get_kernel_array(kernel):
+
+    """
+    This function ...
+    :param kernel: an array or an astropy kernel
+    :return:
+    """
+
+    if hasattr(kernel, "array"): return np.asarray(kernel.array, dtype="float64")
+    else: return np.asarray(kernel, dtype="float64")
+
+# -----------------------------------------------------------------
+
+def neighbourhood_fill(array, max_iter=5, tol=0.5, kernel_size=1, method="localmean"):
+
+    """
+    This function replaces the NaN elements in an array by a weighted sum of their non-NaN neighbours, divided by the
+    number of these neighbours, exactly as the original loops of replace_nans did. The neighbourhood does not include
+    the row and the column of the element itself, so the NaN elements of one row do not depend on each other: they
+    are updated at once, row after row, which keeps the in-place (Gauss-Seidel) updates of the original loops.
+    :param array:
+    :param max_iter:
+    :param tol:
+    :param kernel_size:
+    :param method: 'localmean' or 'idw'
+    :return:
+    """
+
+    # Create the kernel (the 'idw' weights are indexed from the corner of the 5x5 kernel, as in replace_nans)
+    size = 2 * kernel_size + 1
+    if method == "localmean": kernel = np.ones((size, size), dtype=np.float64)
+    elif method == "idw":
+        if size > idw_kernel.shape[0]: raise ValueError("The kernel size for the 'idw' method cannot be larger than " + str(idw_kernel.shape[0] // 2))
+        kernel = idw_kernel[:size, :size].copy()
+    else: raise ValueError("Method not valid. Should be one of 'localmean' and 'idw'")
+
+    # Exclude the central row and column
+    footprint = np.ones_like(kernel)
+    footprint[kernel_size, :] = 0.
+    footprint[:, kernel_size] = 0.
+    kernel *= footprint
+
+    # Initialize
+    filled = np.array(array, dtype=np.float64)
+    ny = filled.shape[0]
+    inans, jnans = np.nonzero(np.isnan(filled))
+    nan_rows = np.unique(inans)
+    row_starts = np.searchsorted(inans, nan_rows)
+    row_ends = np.searchsorted(inans, nan_rows, side="right")
+    replaced_old = np.zeros(len(inans), dtype=np.float64)
+    replaced_new = np.zeros_like(replaced_old)
+
+    # Make several passes until we reach convergence
+    for it in range(max_iter):
+
+        # Loop over the rows with NaN elements
+        for i, start, end in zip(nan_rows, row_starts, row_ends):
+
+            columns = jnans[start:end]
+
+            # Sum the weighted values and count the valid neighbours from the other rows of the neighbourhood
+            sums = np.zeros(len(columns), dtype=np.float64)
+            counts = np.zeros(len(columns), dtype=np.float64)
+            for offset in range(-kernel_size, kernel_size + 1):
+
+                row = i + offset
+                if offset == 0 or row < 0 or row >= ny: continue
+
+                valid = np.logical_not(np.isnan(filled[row]))
+                values = np.where(valid, filled[row], 0.0)
+                sums += ndimage.correlate1d(values, kernel[offset + kernel_size], mode="constant", cval=0.0)[columns]
+                counts += ndimage.correlate1d(valid.astype(np.float64), footprint[offset + kernel_size], mode="constant", cval=0.0)[columns]
+
+            # Set the new values (elements without valid neighbours become NaN and keep their previous replaced value)
+            has_neighbours = counts > 0
+            new_values = np.full(len(columns), np.nan)
+            new_values[has_neighbours] = sums[has_neighbours] / counts[has_neighbours]
+            filled[i, columns] = new_values
+            replaced_new[start:end][has_neighbours] = new_values[has_neighbours]
+
+        # Check if mean square difference between values of replaced elements is below the tolerance
+        if np.mean((replaced_new - replaced_old)**2) < tol: break
+        replaced_old[:] = replaced_new
+
+    # Return the filled array
+    return filled
+
+# -----------------------------------------------------------------
+
+def normalized_convolution(data, kernel, mask=None, min_weight=1e-8):
+
+    """
+    This function fills the invalid pixels with the convolution of the valid data divided by the convolution of the
+    valid pixel weights (normalized convolution), calculated with FFTs. Pixels outside the image do not contribute
+    (astropy's interpolate_replace_nans counts them as zeros, so the results differ near the edges). Invalid pixels
+    without valid pixels within the kernel footprint remain NaN.
+    :param data:
+    :param kernel:
+    :param mask:
+    :param min_weight: relative to the sum of the kernel
+    :return:
+    """
+
+    from scipy.signal import fftconvolve
+
+    # Get the kernel
+    kernel = get_kernel_array(kernel)
+
+    # Get the pixels to fill
+    invalid = get_invalid(data, mask)
+    result = np.array(data, dtype=np.float64)
+    if not np.any(invalid): return result
+
+    # Convolve the data and the weights
+    weights = np.logical_not(invalid).astype(np.float64)
+    values = np.where(invalid, 0.0, result)
+    numerator = fftconvolve(values, kernel, mode="same")[invalid]
+    denominator = fftconvolve(weights, kernel, mode="same")[invalid]
+
+    # Fill
+    fillable = denominator > min_weight * np.sum(kernel)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        result[invalid] = np.where(fillable, numerator / denominator, np.nan)
+
+    # Return the result
+    return result
+
+# -----------------------------------------------------------------
+
+def normalized_convolution_fill(data, kernel, mask=None, max_iterations=10, min_weight=1e-8):
+
+    """
+    This function repeats the normalized convolution until all invalid pixels are filled, or until the number of
+    remaining NaNs no longer decreases
+    :param data:
+    :param kernel:
+    :param mask:
+    :param max_iterations:
+    :param min_weight:
+    :return:
+    """
+
+    result = normalized_convolution(data, kernel, mask=mask, min_weight=min_weight)
+    nnans = np.sum(np.isnan(result))
+    niterations = 1
+
+    # Iterate
+    while nnans > 0 and (max_iterations is None or niterations < max_iterations):
+
+        result = normalized_convolution(result, kernel, min_weight=min_weight)
+        niterations += 1
+
+        previous_nnans = nnans
+        nnans = np.sum(np.isnan(result))
+        if nnans >= previous_nnans: break
+
+    # Return the result
+    return result
+
+# -----------------------------------------------------------------
+
+def downsample_sums(array):
+
+    """
+    This function sums the array over blocks of 2x2 pixels (padding with zeros if necessary)
+    :param array:
+    :return:
+    """
+
+    ny, nx = array.shape
+    padded = np.zeros((ny + ny % 2, nx + nx % 2), dtype=np.float64)
+    padded[:ny, :nx] = array
+    return padded.reshape(padded.shape[0] // 2, 2, padded.shape[1] // 2, 2).sum(axis=(1, 3))
+
+# -----------------------------------------------------------------
+
+def pyramid_fill(data, mask=None, min_size=4, smoothing_iterations=3):
+
+    """
+    This function fills the invalid pixels by recursively block-averaging the valid data to coarser resolutions,
+    until all holes are closed, and propagating the coarse values back into the holes. This fills large holes in a
+    number of steps that is logarithmic in the size of the holes.
+    :param data:
+    :param mask:
+    :param min_size:
+    :param smoothing_iterations: number of 3x3 averaging passes over the filled pixels at every level
+    :return:
+    """
+
+    # Get the pixels to fill
+    invalid = get_invalid(data, mask)
+    result = np.array(data, dtype=np.float64)
+    if not np.any(invalid): return result
+    if np.all(invalid): raise ValueError("There are no valid pixels")
+
+    # Create weighted values and weights
+    weights = np.logical_not(invalid).astype(np.float64)
+    values = np.where(invalid, 0.0, result)
+
+    # Fill
+    result[invalid] = _pyramid_level(values, weights, min_size, smoothing_iterations)[invalid]
+
+    # Return
+    return result
+
+# -----------------------------------------------------------------
+
+def _pyramid_level(values, weights, min_size, smoothing_iterations):
+
+    """
+    This function returns the completely filled image for one level of the pyramid
+    :param values: the sum of the valid values (times their weights) for each pixel
+    :param weights: the sum of the weights for each pixel
+    :param min_size:
+    :param smoothing_iterations:
+    :return:
+    """
+
+    holes = weights <= 0
+    with np.errstate(invalid="ignore", divide="ignore"): level = values / weights
+
+    # No holes
+    if not np.any(holes): return level
+
+    # Smallest level: fill with the mean
+    if min(values.shape) <= min_size:
+        level[holes] = np.sum(values) / np.sum(weights)
+        return level
+
+    # Fill the coarser level
+    coarse = _pyramid_level(downsample_sums(values), downsample_sums(weights), min_size, smoothing_iterations)
+
+    # Upsample into the holes
+    upsampled = np.repeat(np.repeat(coarse, 2, axis=0), 2, axis=1)[:values.shape[0], :values.shape[1]]
+    level[holes] = upsampled[holes]
+
+    # Smooth the filled pixels to remove the block structure
+    footprint = np.ones((3, 3), dtype=np.float64)
+    norm = ndimage.correlate(np.ones_like(level), footprint, mode="constant", cval=0.0)
+    for _ in range(smoothing_iterations):
+        smoothed = ndimage.correlate(level, footprint, mode="constant", cval=0.0) / norm
+        level[holes] = smoothed[holes]
+
+    # Return
+    return level
+
+# -----------------------------------------------------------------
+
+def kdtree_idw_fill(data, mask=None, nneighbours=8, power=2.0, boundary_only=True, chunk_size=1000000):
+
+    """
+    This function fills the invalid pixels by inverse distance weighting of the nearest valid pixels, found with a
+    KD-tree
+    :param data:
+    :param mask:
+    :param nneighbours:
+    :param power:
+    :param boundary_only: only use the valid pixels that border the holes (much smaller tree)
+    :param chunk_size: number of invalid pixels that are queried at once
+    :return:
+    """
+
+    from scipy.spatial import cKDTree
+
+    # Get the pixels to fill
+    invalid = get_invalid(data, mask)
+    result = np.array(data, dtype=np.float64)
+    if not np.any(invalid): return result
+
+    # Get the source pixels
+    valid = np.logical_not(invalid)
+    if boundary_only: sources = np.logical_and(valid, ndimage.binary_dilation(invalid, structure=np.ones((3, 3), dtype=bool)))
+    else: sources = valid
+    if not np.any(sources): raise ValueError("There are no valid pixels")
+
+    # Build the tree
+    source_y, source_x = np.nonzero(sources)
+    source_values = result[source_y, source_x]
+    tree = cKDTree(np.column_stack((source_x, source_y)))
+    k = min(nneighbours, len(source_values))
+
+    # Query in chunks
+    target_y, target_x = np.nonzero(invalid)
+    filled = np.empty(len(target_y), dtype=np.float64)
+    for start in range(0, len(target_y), chunk_size):
+
+        end = start + chunk_size
+        distances, indices = tree.query(np.column_stack((target_x[start:end], target_y[start:end])), k=k)
+        if k == 1:
+            distances = distances[:, np.newaxis]
+            indices = indices[:, np.newaxis]
+
+        # Weigh
+        weights = 1. / distances**power
+        filled[start:end] = np.sum(weights * source_values[indices], axis=1) / np.sum(weights, axis=1)
+
+    # Fill
+    result[target_y, target_x] = filled
+
+    # Return the result
+    return result
+
+# -----------------------------------------------------------------
+
+def inpaint(data, mask=None, method="pyramid", kernel=None, **kwargs):
+
+    """
+    This function fills the NaN and masked pixels of the data with the specified method
+    :param data:
+    :param mask:
+    :param method:
+    :param kernel: for the 'normalized' method
+    :param kwargs:
+    :return:
+    """
+
+    if method == "localmean" or method == "idw":
+        data = np.array(data, dtype=np.float64)
+        if mask is not None: data[mask] = np.nan
+        return neighbourhood_fill(data, method=method, **kwargs)
+    elif method == "normalized":
+        if kernel is None: raise ValueError("A kernel must be specified for normalized convolution")
+        return normalized_convolution_fill(data, kernel, mask=mask, **kwargs)
+    elif method == "pyramid": return pyramid_fill(data, mask=mask, **kwargs)
+    elif method == "kdtree": return kdtree_idw_fill(data, mask=mask, **kwargs)
+    else: raise ValueError("Invalid method: should be one of " + ", ".join(methods))
+
+# -----------------------------------------------------------------
@@ -55,10 +55,15 @@ def in_paint(data, mask, method="localmean"):
     This function ...
     :param data:
     :param mask:
-    :param method:
+    :param method: 'localmean', 'idw', 'pyramid' or 'kdtree'
     :return:
     """
 
+    # Multigrid or KD-tree fill
+    if method == "pyramid" or method == "kdtree":
+        from .inpainting import inpaint
+        return inpaint(data, mask=mask, method=method)
+
     # Fill the data with nans according to the mask
     #data_ma = np.ma.array(data.astype(float), mask=mask)
     #data_nans = data_ma.filled(np.NaN)
@@ -104,91 +109,106 @@ def replace_nans(array, max_iter, tol, kernel_size=1, method='localmean'):
     :return:
     """
 
-    # Initialize arrays
-    #filled = np.empty( [array.shape[0], array.shape[1]], dtype=np.float64)
+    from .inpainting import neighbourhood_fill
+
+    # The NaN elements of each row are updated at once (same results as the original element-by-element loops)
+    return neighbourhood_fill(array, max_iter, tol, kernel_size=kernel_size, method=method)
+
+# -----------------------------------------------------------------
 
-    filled = np.zeros_like(array)
-    kernel = np.empty( (2*kernel_size+1, 2*kernel_size+1), dtype=np.float64)
+def _idw_evaluate(tree, values, nneighbours, power, x, y):
 
-    # Indices where array is NaN
-    inans, jnans = np.nonzero( np.isnan(array) )
+    """
+    This function evaluates the inverse distance weighted interpolation at the given positions
+    :param tree:
+    :param values:
+    :param nneighbours:
+    :param power:
+    :param x:
+    :param y:
+    :return:
+    """
 
-    # Number of NaN elements
-    n_nans = len(inans)
+    distances, indices = tree.query(np.column_stack((x, y)), k=nneighbours)
+    if nneighbours == 1: return values[indices]
 
-    # Arrays which contain replaced values to check for convergence
-    replaced_new = np.zeros( n_nans, dtype=np.float64)
-    replaced_old = np.zeros( n_nans, dtype=np.float64)
+    # Calculate the weights, exact hits get all the weight
+    with np.errstate(divide="ignore"): weights = 1. / distances**power
+    hits = distances[:, 0] == 0
+    weights[hits] = 0.
+    weights[hits, 0] = 1.
 
-    # Depending on kernel type, fill kernel array
-    if method == 'localmean':
-        for i in range(2*kernel_size+1):
-            for j in range(2*kernel_size+1):
-                kernel[i,j] = 1.
+    # Return the weighted mean
+    return np.sum(weights * values[indices], axis=1) / np.sum(weights, axis=1)
 
-    elif method == 'idw':
-        kernel = np.array([[0, 0.5, 0.5, 0.5,0],
-                  [0.5,0.75,0.75,0.75,0.5],
-                  [0.5,0.75,1,0.75,0.5],
-                  [0.5,0.75,0.75,0.5,1],
-                  [0, 0.5, 0.5 ,0.5 ,0]])
-        #print kernel, 'kernel'
+# -----------------------------------------------------------------
+
+def idw_scattered(x, y, values, shape, nneighbours=8, power=2.0, block_size=1000000, coarse_factor=1):
+
+    """
+    This function interpolates scattered data points (e.g. the centers of sky apertures or background meshes) to
+    all pixels of an image with inverse distance weighting of the nearest data points, found with a KD-tree.
+    The pixels are evaluated in blocks of rows. For very large images, the interpolation can be evaluated on a grid
+    that is coarser by the given factor, and then upsampled with bicubic spline interpolation.
+    :param x: the x pixel coordinates of the data points
+    :param y: the y pixel coordinates of the data points
+    :param values: the values of the data points
+    :param shape: the (ny, nx) shape of the image
+    :param nneighbours: the number of nearest data points to use
+    :param power: the power of the inverse distance for the weights
+    :param block_size: the (approximate) number of pixels to evaluate at once
+    :param coarse_factor:
+    :return:
+    """
 
+    from scipy.spatial import cKDTree
+    from scipy.ndimage import map_coordinates
+
+    # Check the data points
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    values = np.asarray(values, dtype=np.float64)
+    valid = np.isfinite(values)
+    if not np.any(valid): raise ValueError("There are no valid data points")
+    x, y, values = x[valid], y[valid], values[valid]
+
+    # Build the tree
+    tree = cKDTree(np.column_stack((x, y)))
+    nneighbours = min(nneighbours, len(values))
+
+    # Determine the grid on which to evaluate
+    ny, nx = shape
+    if coarse_factor > 1:
+        ncx = int(np.ceil((nx - 1.) / coarse_factor)) + 1
+        ncy = int(np.ceil((ny - 1.) / coarse_factor)) + 1
+        grid_x = np.linspace(0, nx - 1, ncx)
+        grid_y = np.linspace(0, ny - 1, ncy)
     else:
-        raise ValueError("Method not valid. Should be one of 'localmean' and 'idw'")
-
-    # Fill new array with input elements
-    for i in range(array.shape[0]):
-        for j in range(array.shape[1]):
-            filled[i,j] = array[i,j]
-
-    # Make several passes
-    # until we reach convergence
-    for it in range(max_iter):
-
-        # for each NaN element
-        for k in range(n_nans):
-            i = inans[k]
-            j = jnans[k]
-
-            # Initialize to zero
-            filled[i,j] = 0.0
-            n = 0
-
-            # Loop over the kernel
-            for I in range(2*kernel_size+1):
-                for J in range(2*kernel_size+1):
-
-                    # if we are not out of the boundaries
-                    if i+I-kernel_size < array.shape[0] and i+I-kernel_size >= 0:
-                        if j+J-kernel_size < array.shape[1] and j+J-kernel_size >= 0:
-
-                            # if the neighbour element is not NaN itself.
-                            if filled[i+I-kernel_size, j+J-kernel_size] == filled[i+I-kernel_size, j+J-kernel_size] :
-
-                                # do not sum itself
-                                if I-kernel_size != 0 and J-kernel_size != 0:
-
-                                    # convolve kernel with original array
-                                    filled[i,j] = filled[i,j] + filled[i+I-kernel_size, j+J-kernel_size]*kernel[I, J]
-                                    n = n + 1
-
-            # Divide value by effective number of added elements
-            if n != 0:
-                filled[i,j] = filled[i,j] / n
-                replaced_new[k] = filled[i,j]
-            else:
-                filled[i,j] = np.nan
-
-        # Check if mean square difference between values of replaced
-        # elements is below a certain tolerance
-        if np.mean( (replaced_new-replaced_old)**2 ) < tol:
-            break
-        else:
-            for l in range(n_nans):
-                replaced_old[l] = replaced_new[l]
-
-    return filled
+        grid_x = np.arange(nx, dtype=np.float64)
+        grid_y = np.arange(ny, dtype=np.float64)
+
+    # Evaluate in blocks of rows
+    grid = np.empty((len(grid_y), len(grid_x)), dtype=np.float64)
+    nrows = max(1, block_size // len(grid_x))
+    for start in range(0, len(grid_y), nrows):
+        block_y, block_x = np.meshgrid(grid_y[start:start+nrows], grid_x, indexing="ij")
+        grid[start:start+nrows] = _idw_evaluate(tree, values, nneighbours, power, block_x.ravel(), block_y.ravel()).reshape(block_x.shape)
+
+    # Not coarse
+    if coarse_factor <= 1: return grid
+
+    # Upsample with bicubic interpolation, in blocks of rows
+    result = np.empty(shape, dtype=np.float64)
+    column_indices = np.arange(nx) * (len(grid_x) - 1.) / max(nx - 1., 1.)
+    nrows = max(1, block_size // nx)
+    for start in range(0, ny, nrows):
+        rows = np.arange(start, min(start + nrows, ny))
+        row_indices = rows * (len(grid_y) - 1.) / max(ny - 1., 1.)
+        coordinates_y, coordinates_x = np.meshgrid(row_indices, column_indices, indexing="ij")
+        result[rows] = map_coordinates(grid, [coordinates_y, coordinates_x], order=3, mode="nearest")
+
+    # Return the result
+    return result
 
 # -----------------------------------------------------------------
 
@@ -0,0 +1,192 @@
+#!/usr/bin/env python
+# -*- coding: utf8 -*-
+# *****************************************************************
+# **       PTS -- Python Toolkit for working with SKIRT          **
+# **       © Astronomical Observatory, Ghent University          **
+# *****************************************************************
+
+## \package pts.magic.tools.levelling Functions for levelling the backgrounds of overlapping tiles (before mosaicing):
+#  the mean values of the tiles are binned on a coarse grid of cells of the mosaic, the differences between all pairs
+#  of tiles are calculated over their common cells at once, and the offsets of all tiles are solved for in one
+#  sparse least-squares problem.
+
+# -----------------------------------------------------------------
+
+# Ensure Python 3 compatibility
+from __future__ import absolute_import, division, print_function
+
+# Import standard modules
+import numpy as np
+
+# -----------------------------------------------------------------
+
+def constant_level(values):
+
+    """
+    This function returns the constant that fits the values best in the least-squares sense, which is their mean
+    :param values:
+    :return:
+    """
+
+    values = np.asarray(values, dtype=np.float64)
+    return float(np.mean(values[np.isfinite(values)]))
+
+# -----------------------------------------------------------------
+
+def clip_mask(values, sigma_level=3.0, tolerance=0.005, max_iterations=50):
+
+    """
+    This function returns the mask of values that are kept after iterative sigma-clipping around the mean
+    :param values:
+    :param sigma_level:
+    :param tolerance: relative change of the standard deviation below which the clipping has converged
+    :param max_iterations:
+    :return:
+    """
+
+    keep = np.isfinite(values)
+    if not np.any(keep): return keep
+
+    # Iterate
+    sigma_old = np.std(values[keep])
+    for _ in range(max_iterations):
+
+        average = np.mean(values[keep])
+        keep &= np.abs(values - average) <= sigma_level * sigma_old
+
+        sigma_new = np.std(values[keep]) if np.any(keep) else 0.0
+        if sigma_old == 0 or abs(sigma_old - sigma_new) / sigma_old <= tolerance: break
+        sigma_old = sigma_new
+
+    # Return the mask
+    return keep
+
+# -----------------------------------------------------------------
+
+def cell_statistics(data, tile_wcs, target_wcs, target_shape, cell_size=16, stride=4, sigma_clip=True):
+
+    """
+    This function bins the pixel values of a tile in cells of the target (mosaic) grid. Only every stride'th
+    pixel (in both directions) is used.
+    :param data: the data of the tile
+    :param tile_wcs: the coordinate system of the tile (an astropy WCS or a CoordinateSystem)
+    :param target_wcs: the coordinate system of the mosaic
+    :param target_shape: the shape (ny, nx) of the mosaic
+    :param cell_size: the size of the cells, in pixels of the mosaic
+    :param stride:
+    :param sigma_clip: remove outliers (sources) before binning
+    :return: the sums and the number of values per cell (flattened)
+    """
+
+    ncells_y = int(np.ceil(target_shape[0] / cell_size))
+    ncells_x = int(np.ceil(target_shape[1] / cell_size))
+    ncells = ncells_y * ncells_x
+
+    # Get the values
+    y, x = np.mgrid[0:data.shape[0]:stride, 0:data.shape[1]:stride]
+    values = np.asarray(data, dtype=np.float64)[y, x]
+    keep = clip_mask(values) if sigma_clip else np.isfinite(values)
+
+    # Convert the pixel positions to the mosaic grid
+    ra, dec = tile_wcs.all_pix2world(x[keep], y[keep], 0)
+    target_x, target_y = target_wcs.all_world2pix(ra, dec, 0)
+    cell_x = np.floor(target_x / cell_size).astype(int)
+    cell_y = np.floor(target_y / cell_size).astype(int)
+    inside = (cell_x >= 0) & (cell_x < ncells_x) & (cell_y >= 0) & (cell_y < ncells_y)
+
+    # Bin
+    cells = cell_y[inside] * ncells_x + cell_x[inside]
+    sums = np.bincount(cells, weights=values[keep][inside], minlength=ncells)
+    counts = np.bincount(cells, minlength=ncells).astype(np.float64)
+
+    # Return
+    return sums, counts
+
+# -----------------------------------------------------------------
+
+def overlap_differences(sums, counts, min_count=1):
+
+    """
+    This function calculates, for every pair of tiles, the mean difference of their cell means over the cells they
+    have in common, and the number of those cells
+    :param sums: array of shape (ntiles, ncells)
+    :param counts: array of shape (ntiles, ncells)
+    :param min_count: the minimum number of values for a cell to be used
+    :return: the differences (tile i minus tile j) and the numbers of common cells, both of shape (ntiles, ntiles)
+    """
+
+    valid = counts >= min_count
+    with np.errstate(invalid="ignore", divide="ignore"): means = np.where(valid, sums / counts, 0.0)
+    valid = valid.astype(np.float64)
+
+    # Number of common cells and sums of the differences
+    nshared = np.dot(valid, valid.T)
+    summed = np.dot(means, valid.T) - np.dot(valid, means.T)
+
+    # Calculate the mean differences
+    with np.errstate(invalid="ignore", divide="ignore"): differences = np.where(nshared > 0, summed / nshared, 0.0)
+
+    # Return
+    return differences, nshared
+
+# -----------------------------------------------------------------
+
+def solve_offsets(differences, nshared, reference=0, levels=None, prior_weight=1e-3):
+
+    """
+    This function solves for the offsets that have to be added to the tiles so that the differences between
+    overlapping tiles vanish, in the least-squares sense, weighing each pair by the number of common cells. The
+    offset of the reference tile is zero.
+    :param differences:
+    :param nshared:
+    :param reference:
+    :param levels: the background levels of the individual tiles: tiles are also (weakly) pulled towards
+    offsets that equalize these levels, which fixes the offsets of tiles that don't overlap with the others
+    :param prior_weight: the weight of these equations, relative to the largest number of common cells
+    :return:
+    """
+
+    from scipy.sparse import coo_matrix
+    from scipy.sparse.linalg import lsqr
+
+    ntiles = differences.shape[0]
+
+    # The pairs
+    first, second = np.nonzero(np.triu(nshared, k=1) > 0)
+    weights = np.sqrt(nshared[first, second])
+    npairs = len(first)
+
+    # Equations for the pairs: o_i - o_j = -(m_i - m_j)
+    rows = [np.arange(npairs), np.arange(npairs)]
+    columns = [first, second]
+    values = [weights, -weights]
+    rhs = [-differences[first, second] * weights]
+    nequations = npairs
+
+    # Equations for the levels: o_i = level_ref - level_i
+    if levels is not None:
+
+        levels = np.asarray(levels, dtype=np.float64)
+        weight = prior_weight * np.sqrt(max(np.max(nshared), 1.))
+        rows.append(nequations + np.arange(ntiles))
+        columns.append(np.arange(ntiles))
+        values.append(np.full(ntiles, weight))
+        rhs.append((levels[reference] - levels) * weight)
+        nequations += ntiles
+
+    # Equation for the reference tile
+    weight = np.sqrt(max(np.max(nshared), 1.))
+    rows.append(np.array([nequations]))
+    columns.append(np.array([reference]))
+    values.append(np.array([weight]))
+    rhs.append(np.array([0.0]))
+    nequations += 1
+
+    # Solve
+    matrix = coo_matrix((np.concatenate(values), (np.concatenate(rows), np.concatenate(columns))), shape=(nequations, ntiles)).tocsr()
+    offsets = lsqr(matrix, np.concatenate(rhs), atol=1e-12, btol=1e-12, iter_lim=max(100, 10 * ntiles))[0]
+
+    # Return the offsets, relative to the reference tile
+    return offsets - offsets[reference]
+
+# -----------------------------------------------------------------
@@ -351,3 +351,139 @@ def mosaic(working_path, band, center, width_pixels):
     return swarp_result_path
 
 # -----------------------------------------------------------------
+
+def contribution_bounds(*arrays):
+
+    """
+    This function returns the bounding box (y_min, y_max, x_min, x_max) of the pixels where any of the arrays is
+    nonzero or not finite, i.e. the region where adding the arrays to a sum changes the sum
+    :param arrays:
+    :return: the bounds, or None if the arrays would not contribute anywhere
+    """
+
+    contributes = np.zeros(arrays[0].shape, dtype=bool)
+    for array in arrays:
+        array = np.asarray(array)
+        contributes |= (array != 0)
+        contributes |= np.logical_not(np.isfinite(array))
+
+    # Get the rows and columns
+    rows = np.nonzero(np.any(contributes, axis=1))[0]
+    if len(rows) == 0: return None
+    columns = np.nonzero(np.any(contributes, axis=0))[0]
+
+    # Return the bounds
+    return rows[0], rows[-1] + 1, columns[0], columns[-1] + 1
+
+# -----------------------------------------------------------------
+
+class MosaicAccumulator(object):
+
+    """
+    This class accumulates the weighted sum, the sum of the weights and the sum of the variances of a number of tiles
+    that are reprojected onto the same grid. The sums are kept in memory-mapped files, and each tile is only added
+    within its bounding box, so that the tiles can be processed one at a time.
+    """
+
+    def __init__(self, shape, path=None):
+
+        """
+        The constructor ...
+        :param shape: the shape (ny, nx) of the mosaic
+        :param path: the directory for the memory-mapped files (if None, the sums are kept in memory)
+        """
+
+        self.shape = tuple(shape)
+        self.path = path
+        self.ntiles = 0
+
+        # Create the sums
+        self.weighted = self._create("weighted")
+        self.weights = self._create("weights")
+        self.variance = self._create("variance")
+
+    # -----------------------------------------------------------------
+
+    def _create(self, name):
+
+        """
+        This function ...
+        :param name:
+        :return:
+        """
+
+        if self.path is None: return np.zeros(self.shape, dtype=np.float64)
+        else: return np.memmap(fs.join(self.path, name + ".accumulator"), dtype=np.float64, mode="w+", shape=self.shape)
+
+    # -----------------------------------------------------------------
+
+    def add(self, weighted, weights, variance=None, bounds=None):
+
+        """
+        This function adds a tile
+        :param weighted: the weighted values
+        :param weights: the weights
+        :param variance: the variances (times the squared weights)
+        :param bounds: (y_min, y_max, x_min, x_max) of the arrays within the mosaic (if None, the arrays have the
+        shape of the mosaic and only the region where they contribute is added)
+        :return:
+        """
+
+        # Determine the bounds
+        if bounds is None:
+
+            if variance is not None: bounds = contribution_bounds(weighted, weights, variance)
+            else: bounds = contribution_bounds(weighted, weights)
+            if bounds is None: return
+
+            y_min, y_max, x_min, x_max = bounds
+            weighted = np.asarray(weighted)[y_min:y_max, x_min:x_max]
+            weights = np.asarray(weights)[y_min:y_max, x_min:x_max]
+            if variance is not None: variance = np.asarray(variance)[y_min:y_max, x_min:x_max]
+
+        else: y_min, y_max, x_min, x_max = bounds
+
+        # Add
+        self.weighted[y_min:y_max, x_min:x_max] += weighted
+        self.weights[y_min:y_max, x_min:x_max] += weights
+        if variance is not None: self.variance[y_min:y_max, x_min:x_max] += variance
+        self.ntiles += 1
+
+    # -----------------------------------------------------------------
+
+    def finalize(self, block_size=1024):
+
+        """
+        This function returns the mosaic (the weighted mean) and its error map
+        :param block_size: number of rows that are calculated at once
+        :return:
+        """
+
+        mean = np.empty(self.shape, dtype=np.float64)
+        errors = np.empty(self.shape, dtype=np.float64)
+
+        # Loop over blocks of rows
+        with np.errstate(invalid="ignore", divide="ignore"):
+            for start in range(0, self.shape[0], block_size):
+                end = start + block_size
+                mean[start:end] = self.weighted[start:end] / self.weights[start:end]
+                errors[start:end] = np.sqrt(self.variance[start:end]) / self.weights[start:end]
+
+        # Return
+        return mean, errors
+
+    # -----------------------------------------------------------------
+
+    def remove(self):
+
+        """
+        This function removes the memory-mapped files
+        :return:
+        """
+
+        if self.path is None: return
+        self.weighted = self.weights = self.variance = None
+        for name in ["weighted", "weights", "variance"]:
+            fs.remove_file_if_present(fs.join(self.path, name + ".accumulator"))
+
+# -----------------------------------------------------------------
@@ -161,8 +161,23 @@ class AnalysisComponent(GalaxyModelingComponent):
 
     # -----------------------------------------------------------------
 
+    @property
+    def memory_budget(self):
+
+        """
+        This function returns the memory budget (in bytes) for the products of the model, from the 'memory_budget'
+        setting of the configuration (None if not defined or not set)
+        :return:
+        """
+
+        budget = self.config.get("memory_budget", None)
+        if budget is None: return None
+        return int(budget.to("byte").value)
+
+    # -----------------------------------------------------------------
+
     def get_run(self, run_name):
-        return self.context.get_run(run_name)
+        return self.context.get_run(run_name, memory_budget=self.memory_budget)
 
 # -----------------------------------------------------------------
 
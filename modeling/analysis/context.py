@@ -369,16 +369,17 @@ class AnalysisContext(object):
 
     # -----------------------------------------------------------------
 
-    def get_run(self, run_name):
+    def get_run(self, run_name, memory_budget=None):
 
         """
         This function ...
         :param run_name:
+        :param memory_budget: the memory budget (in bytes) for the products of the model
         :return:
         """
 
         info_path = fs.join(self.get_run_path(run_name), "info.dat")
-        return AnalysisRun.from_info(info_path, hubble_stage=self.hubble_stage)
+        return AnalysisRun.from_info(info_path, hubble_stage=self.hubble_stage, memory_budget=memory_budget)
 
     # -----------------------------------------------------------------
 
@@ -1299,13 +1299,14 @@ class AnalysisRun(AnalysisRunBase):
     This class ...
     """
 
-    def __init__(self, galaxy_name=None, info=None, hubble_stage=None):
+    def __init__(self, galaxy_name=None, info=None, hubble_stage=None, memory_budget=None):
 
         """
         The constructor ...
         :param galaxy_name:
         :param info:
         :param hubble_stage:
+        :param memory_budget: the memory budget (in bytes) for the products of the model (None means no limit)
         """
 
         # Set the analysis run info
@@ -1315,6 +1316,9 @@ class AnalysisRun(AnalysisRunBase):
         self.galaxy_name = galaxy_name
         self.hubble_stage = hubble_stage
 
+        # The memory budget for the products of the model
+        self.memory_budget = memory_budget
+
         ## Create directories
 
         # The directory for the model
@@ -1362,46 +1366,49 @@ class AnalysisRun(AnalysisRunBase):
     # -----------------------------------------------------------------
 
     @classmethod
-    def from_name(cls, modeling_path, name, hubble_stage=None):
+    def from_name(cls, modeling_path, name, hubble_stage=None, memory_budget=None):
 
         """
         This function ...
         :param modeling_path:
         :param name:
         :param hubble_stage:
+        :param memory_budget:
         :return:
         """
 
         analysis_path = fs.join(modeling_path, "analysis")
         run_path = fs.join(analysis_path, name)
-        return cls.from_path(run_path, hubble_stage=hubble_stage)
+        return cls.from_path(run_path, hubble_stage=hubble_stage, memory_budget=memory_budget)
 
     # -----------------------------------------------------------------
 
     @classmethod
-    def from_path(cls, path, hubble_stage=None):
+    def from_path(cls, path, hubble_stage=None, memory_budget=None):
 
         """
         This function ...
         :param path:
         :param hubble_stage:
+        :param memory_budget:
         :return:
         """
 
         # Determine the info path
         info_path = fs.join(path, info_filename)
         if not fs.is_file(info_path): raise IOError("Could not find the info file")
-        else: return cls.from_info(info_path, hubble_stage=hubble_stage)
+        else: return cls.from_info(info_path, hubble_stage=hubble_stage, memory_budget=memory_budget)
 
     # -----------------------------------------------------------------
 
     @classmethod
-    def from_info(cls, info_path, hubble_stage=None):
+    def from_info(cls, info_path, hubble_stage=None, memory_budget=None):
 
         """
         This function ...
         :param info_path:
         :param hubble_stage:
+        :param memory_budget:
         :return:
         """
 
@@ -1409,7 +1416,7 @@ class AnalysisRun(AnalysisRunBase):
         info = AnalysisRunInfo.from_file(info_path)
 
         # Create the instance
-        run = cls(info=info, hubble_stage=hubble_stage)
+        run = cls(info=info, hubble_stage=hubble_stage, memory_budget=memory_budget)
 
         # Set galaxy name
         modeling_path = fs.directory_of(fs.directory_of(run.info.path))
@@ -2296,7 +2303,7 @@ class AnalysisRun(AnalysisRunBase):
                        observed_unevolved_output_path=self.unevolved_output_path,
                        observed_extra_output_path=self.extra_output_path, center=self.galaxy_center,
                        galaxy_name=self.galaxy_name, hubble_stage=self.hubble_stage, earth_wcs=self.reference_wcs,
-                       truncation_ellipse=self.truncation_ellipse)
+                       truncation_ellipse=self.truncation_ellipse, memory_budget=self.memory_budget)
 
     # -----------------------------------------------------------------
 
@@ -17,8 +17,6 @@ import math
 import numpy as np
 from abc import ABCMeta, abstractmethod, abstractproperty
 from scipy.special import gammaincinv
-from scipy import ndimage
-import itertools
 import warnings
 
 # Import astronomical modules
@@ -43,6 +41,9 @@ from pts.core.tools.utils import lazyproperty
 
 default_truncation = 4.
 
+# The maximum number of points for which a deprojection model is evaluated at once
+default_chunk_size = 1000000
+
 # -----------------------------------------------------------------
 
 sersic = "sersic"
@@ -1890,6 +1891,72 @@ class DeprojectionModel3D(Model3D):
 
     # -----------------------------------------------------------------
 
+    def surface_density_array(self, x, y, unit="pc", chunk_size=default_chunk_size):
+
+        """
+        This function does the same as surface_density, but for arrays of coordinates (that can be broadcast against
+        each other). The result is calculated in chunks of at most chunk_size points.
+        :param x: x coordinates, in the specified unit
+        :param y: y coordinates, in the specified unit
+        :param unit:
+        :param chunk_size:
+        :return:
+        """
+
+        # Get properties as scalars (no units)
+        xmin_scalar = self.map_xmin.to(unit).value
+        ymin_scalar = self.map_ymin.to(unit).value
+        deltay_scalar = self.deltay.to(unit).value
+        data = self.map.data
+
+        # Define the function for one chunk
+        def chunk_surface_density(x, y):
+
+            # Project and rotate the x and y coordinates
+            x = self.project_array(x)
+            x, y = self.rotate_arrays(x, y)
+
+            # Find the corresponding pixels in the image
+            i = np.floor((x - xmin_scalar) / deltay_scalar).astype(int)
+            j = np.floor((y - ymin_scalar) / deltay_scalar).astype(int)
+            inside = (i >= 0) & (i < self.x_size) & (j >= 0) & (j < self.y_size)
+
+            # Gather the densities
+            densities = np.zeros(inside.shape)
+            densities[inside] = data[j[inside], i[inside]]
+            return densities
+
+        # Evaluate
+        return evaluate_in_chunks(chunk_surface_density, [x, y], chunk_size=chunk_size)
+
+    # -----------------------------------------------------------------
+
+    def density_array(self, x, y, z, unit="pc", chunk_size=default_chunk_size):
+
+        """
+        This function does the same as density, but for arrays of coordinates (that can be broadcast against each
+        other). The result is calculated in chunks of at most chunk_size points.
+        :param x: x coordinates, in the specified unit
+        :param y: y coordinates, in the specified unit
+        :param z: z coordinates, in the specified unit
+        :param unit:
+        :param chunk_size:
+        :return:
+        """
+
+        # Get properties as scalars (no units)
+        scale_height_scalar = self.scale_height.to(unit).value
+        normalization_scalar = self.density_normalization.to("1/" + unit + "3").value
+
+        # Define the function for one chunk
+        def chunk_density(x, y, z):
+            return self.surface_density_array(x, y, unit=unit, chunk_size=chunk_size) * np.exp(- np.abs(z) / scale_height_scalar) * normalization_scalar
+
+        # Evaluate
+        return evaluate_in_chunks(chunk_density, [x, y, z], chunk_size=chunk_size)
+
+    # -----------------------------------------------------------------
+
     @property
     def shape(self):
         return PixelShape(self.ysize, self.xsize)
@@ -1902,23 +1969,25 @@ class DeprojectionModel3D(Model3D):
 
     # -----------------------------------------------------------------
 
-    def surface_density_function(self, unit="pc", normalize=False):
+    def map_values(self, x, y, xmin_scalar, ymin_scalar, deltay_scalar, chunk_size=default_chunk_size):
 
         """
-        This function ...
-        :param unit:
-        :param normalize:
+        This function looks up the map values for arrays of coordinates as it is done for the density functions: the
+        projected and rotated coordinates are converted into indices of the flattened map, and points for which this
+        index falls outside of the map get a value of zero
+        :param x:
+        :param y:
+        :param xmin_scalar:
+        :param ymin_scalar:
+        :param deltay_scalar:
+        :param chunk_size:
         :return:
         """
 
-        # Get properties as scalars (no units)
-        xmin_scalar = self.map_xmin.to(unit).value
-        ymin_scalar = self.map_ymin.to(unit).value
-        deltay_scalar = self.deltay.to(unit).value
-        deltax_scalar = self.deltax.to(unit).value
+        data = np.ravel(self.map.data)
 
-        # Define the density function
-        def deprojection(x, y):
+        # Define the function for one chunk
+        def chunk_values(x, y):
 
             # Project and rotate coordinates
             x = self.project_array(x)
@@ -1927,27 +1996,42 @@ class DeprojectionModel3D(Model3D):
             # Determine the coordinate mapping
             x_mapping = ((x - xmin_scalar) / deltay_scalar - 0.5).astype(int)
             y_mapping = ((y - ymin_scalar) / deltay_scalar - 0.5).astype(int)
-
             xy = x_mapping + self.xsize * y_mapping
+            inside = (xy >= 0) & (xy < data.size)
 
-            nx = xy.shape[0]
-            ny = xy.shape[1]
+            # Gather the values
+            values = np.zeros(xy.shape)
+            values[inside] = data[xy[inside]]
+            return values
 
-            #xy = xy[:, :, 0]
+        # Evaluate
+        return evaluate_in_chunks(chunk_values, [x, y], chunk_size=chunk_size)
 
-            arrangement_x = range(self.xsize) * self.ysize
-            lists = [[value] * self.xsize for value in range(self.ysize)]
+    # -----------------------------------------------------------------
 
-            arrangement_y = list(itertools.chain.from_iterable(lists))
+    def surface_density_function(self, unit="pc", normalize=False, chunk_size=default_chunk_size):
 
-            xy_flattened = xy.flatten()
+        """
+        This function ...
+        :param unit:
+        :param normalize:
+        :param chunk_size:
+        :return:
+        """
 
-            x_mapping = [arrangement_x[k] if 0 <= k < self.npixels else -1 for k in xy_flattened]
-            y_mapping = [arrangement_y[k] if 0 <= k < self.npixels else -1 for k in xy_flattened]
-            mapping = [y_mapping, x_mapping]
+        # Get properties as scalars (no units)
+        xmin_scalar = self.map_xmin.to(unit).value
+        ymin_scalar = self.map_ymin.to(unit).value
+        deltay_scalar = self.deltay.to(unit).value
 
-            cval = 0.0
-            data = ndimage.map_coordinates(self.map.data, mapping, mode='constant', cval=cval)
+        # Define the density function
+        def deprojection(x, y):
+
+            # Get the map values
+            data = self.map_values(x, y, xmin_scalar, ymin_scalar, deltay_scalar, chunk_size=chunk_size)
+
+            nx = data.shape[0]
+            ny = data.shape[1]
 
             # Reshape into the
             deprojected = data.reshape((ny, nx))
@@ -1961,12 +2045,13 @@ class DeprojectionModel3D(Model3D):
 
     # -----------------------------------------------------------------
 
-    def density_function(self, unit="pc", normalize=False):
+    def density_function(self, unit="pc", normalize=False, chunk_size=default_chunk_size):
 
         """
         This function ...
         :param unit:
         :param normalize:
+        :param chunk_size:
         :return:
         """
 
@@ -1988,93 +2073,11 @@ class DeprojectionModel3D(Model3D):
             :return:
             """
 
-            # Project and rotate coordinates
-            x = self.project_array(x)
-            x, y = self.rotate_arrays(x, y)
-
-            #i_array = numbers.round_down_to_int((x - xmin_scalar) / deltay_scalar)
-            #j_array = numbers.round_down_to_int((y - ymin_scalar) / deltay_scalar)
-
-            # grid = mapping
-            #grid = np.array([yy1.reshape(outshape), xx1.reshape(outshape)])
-            # Use Scipy to create the new image
-            #data = scipy.ndimage.map_coordinates(frame, mapping, **kwargs)
-
-            # Determine the coordinate mapping
-            #x_mapping = (x - xmin_scalar) / deltay_scalar - 0.5
-            #y_mapping = (y - ymin_scalar) / deltay_scalar - 0.5
-            x_mapping = ((x - xmin_scalar) / deltay_scalar - 0.5).astype(int)
-            y_mapping = ((y - ymin_scalar) / deltay_scalar - 0.5).astype(int)
-
-            #x_mapping = x_mapping.flatten()
-            #y_mapping = y_mapping.flatten()
-
-            xy = x_mapping + self.xsize * y_mapping
-
-            #print("xy", xy)
-
-            #print("x_mapping", x_mapping)
-            #print("y_mapping", y_mapping)
-
-            #mapping = np.array([np.array([xi, yi]) for xi, yi in zip(x_mapping.flat, y_mapping.flat)])
-            #mapping = np.array([x_mapping, y_mapping])
-            #mapping = np.vstack((x_mapping,y_mapping))
+            # Get the map values in the plane (the x and y coordinates don't depend on z)
+            data = self.map_values(x[:, :, :1], y[:, :, :1], xmin_scalar, ymin_scalar, deltay_scalar, chunk_size=chunk_size)[:, :, 0]
 
-            #print("mapping", mapping)
-            #print(mapping.shape)
-
-            #print("output shape", mapping.shape[1:])
-            #print("input.ndim", self.map.data.ndim)
-
-            # output_shape = coordinates.shape[1:]
-            # input.ndim < 1 or len(output_shape) < 1:
-
-            #print(xy)
-            #print(xy.shape)
-
-            nx = xy.shape[0]
-            ny = xy.shape[1]
-            #nz = xy.shape[2]
-
-            #print(xy[:,:,0])
-            xy = xy[:, :, 0]
-            #print(xy)
-
-            arrangement_x = range(self.xsize) * self.ysize
-            lists = [[value] * self.xsize for value in range(self.ysize)]
-            #print(lists)
-            #arrangement_y = itertools.chain(*lists)
-            arrangement_y = list(itertools.chain.from_iterable(lists))
-
-            #print(xy.shape)
-
-            #print("output shape", xy.shape[1:])
-            #print("input.ndim", self.map.data.flatten().ndim)
-
-            # Create mapping
-            #mapping = [[arrangement_y[yi], arrangement_x[xi]] for xi, yi in xy]
-            #print("mapping", mapping)
-
-            #print([k for k in xy])
-
-            xy_flattened = xy.flatten()
-            #print(arrangement_x)
-            #print(arrangement_y.shape)
-            x_mapping = [arrangement_x[k] if 0<=k<self.npixels else -1 for k in xy_flattened]
-            y_mapping = [arrangement_y[k] if 0<=k<self.npixels else -1 for k in xy_flattened]
-            #mapping = [x_mapping, y_mapping]
-            mapping = [y_mapping, x_mapping]
-
-            #cval = float('nan')
-            cval = 0.0
-            data = ndimage.map_coordinates(self.map.data, mapping, mode='constant', cval=cval)
-            #data = ndimage.map_coordinates(self.map.data.flatten(), xy, mode="constant", cval=cval)
-
-            #nx = x.shape[2]
-            #ny = y.shape[1]
-
-            #print("nx", nx)
-            #print("")
+            nx = data.shape[0]
+            ny = data.shape[1]
 
             # Reshape into the
             deprojected = data.reshape((ny, nx, 1))
@@ -2092,6 +2095,36 @@ class DeprojectionModel3D(Model3D):
 
 # -----------------------------------------------------------------
 
+def evaluate_in_chunks(function, arrays, chunk_size=default_chunk_size):
+
+    """
+    This function evaluates a function of arrays (that are broadcast against each other), in chunks along the first
+    axis of the broadcast shape, so that the temporary arrays are limited to about chunk_size elements
+    :param function:
+    :param arrays:
+    :param chunk_size:
+    :return:
+    """
+
+    arrays = np.broadcast_arrays(*[np.asarray(array, dtype=np.float64) for array in arrays])
+    shape = arrays[0].shape
+
+    # Evaluate at once
+    if len(shape) == 0 or arrays[0].size <= chunk_size: return function(*arrays)
+
+    # Determine the number of rows per chunk
+    nrows = max(1, chunk_size // (arrays[0].size // shape[0]))
+
+    # Evaluate chunk per chunk
+    result = np.empty(shape)
+    for start in range(0, shape[0], nrows):
+        result[start:start+nrows] = function(*[array[start:start+nrows] for array in arrays])
+
+    # Return the result
+    return result
+
+# -----------------------------------------------------------------
+
 def intrinsic_z_flattening(qprime, inclination):
 
     """
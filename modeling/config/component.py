@@ -13,4 +13,7 @@ from pts.core.basics.configuration import ConfigurationDefinition
 # Create the configuration
 definition = ConfigurationDefinition(log_path="log", config_path="config", add_timestamp=True)
 
+# The memory budget for the products (maps, datacubes, SEDs) of the radiative transfer models
+definition.add_optional("memory_budget", "data_quantity", "memory budget for the products (maps, datacubes, SEDs) of the model (no limit by default)")
+
 # -----------------------------------------------------------------
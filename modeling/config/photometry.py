@@ -17,7 +17,7 @@ definition = definition.copy()
 definition.add_positional_optional("remote", "string", "remote host to use for the aperture correction calculation", choices=find_host_ids(schedulers=False))
 
 # Add option
-noise_methods = ["caapr", "pts"]
+noise_methods = ["caapr", "pts", "batch"]
 definition.add_optional("noise_method", "string", "method to use for the aperture noise calculation", choices=noise_methods, default="caapr")
 
 # -----------------------------------------------------------------
@@ -24,6 +24,7 @@ from pts.core.tools.utils import lazyproperty
 from ...core.basics.log import log
 from ...core.tools import nr
 from ...core.tools.introspection import skirt_main_version, has_skirt
+from .sedlibrary import TemplateLibrary, get_library
 
 # -----------------------------------------------------------------
 
@@ -130,146 +131,88 @@ def create_bruzual_charlot_sed(metallicity, age, mass=1.):
     :return:
     """
 
-    #seconds_in_year = 31557600.
-
-    #// find the appropriate SED from interpolating in the BC library
-
-    #// get the luminosities for arbitrary mass and for the appropriate Z and t
-    #setLuminosities(bc.luminosities(1., _metallicity, _age / Constants::year()));
-
-    # double M, double Z, double t, double z=0
-
-    # Load the data
-    _lambdav, _tv, _zv, j_dict = load_bruzual_charlot_data()
-
-    nlambda = 1221
-    nz = 6
-    nt = 221
-    hZ = 0.0
-
-    if metallicity <= _zv[0]: mL = mR = 0
-    elif metallicity >= _zv[nz-1]: mL = mR = nz-1
-    else:
-
-        mL = nr.locate_clip(_zv,metallicity)
-        mR = mL+1
-        #double ZL = _Zv[mL];
-        #double ZR = _Zv[mR];
-        zl = _zv[mL]
-        zr = _zv[mR]
-        #hZ = (Z-ZL)/(ZR-ZL);
-        hz = (metallicity-zl)/(zr-zl)
-
-    ht = 0.0
-
-    age_years = age.to("yr").value
+    if hasattr(mass, "unit"): mass_in_solar = mass.to("Msun").value
+    else: mass_in_solar = mass
 
-    #print(age, age_years)
+    # Get the luminosities
+    new_wavelengths, luminosities = bruzual_charlot_luminosities(metallicity, age.to("yr").value, mass_in_solar)
 
-    #tl = tr = None
-    #print(_tv[0])
-    #print(_tv[-1])
+    # Create the SED
+    sed = SED.from_arrays(new_wavelengths, luminosities[0], wavelength_unit="m", photometry_unit="W/micron") # ACTUALLY WHAT IS THE LUMINOSITY UNIT?
 
-    if age_years <= _tv[0]: pL = pR = 0
-    elif age_years >= _tv[nt-1]: pL = pR = nt - 1
-    else:
+    # Return the SED
+    return sed
 
-        #pL = NR::locate_clip(_tv,t);
-        pL = nr.locate_clip(_tv, age_years)
-        pR = pL + 1
-        #double tL = _tv[pL];
-        #double tR = _tv[pR];
-        tl = _tv[pL]
-        tr = _tv[pR]
-        #ht = (t-tL)/(tR-tL);
-        ht = (age_years - tl) / (tr - tl)
+# -----------------------------------------------------------------
 
-    #print(tl, tr, pL, pR, ht)
+def bruzual_charlot_luminosities(metallicities, ages, masses=1.):
 
-    #const Array& jLLv = _jvv(pL,mL);
-    #const Array& jLRv = _jvv(pL,mR);
-    #const Array& jRLv = _jvv(pR,mL);
-    #const Array& jRRv = _jvv(pR,mR);
+    """
+    This function calculates the Bruzual-Charlot SEDs for many combinations of parameters at once
+    :param metallicities:
+    :param ages: the ages, in years
+    :param masses: the masses, in solar masses
+    :return: the wavelengths (in meter) and the luminosities, of shape (nseds, nwavelengths)
+    """
 
-    #Array jv(Nlambda);
+    # Get the library
+    library = get_bruzual_charlot_library()
 
-    jv = [None] * nlambda
+    # Interpolate in age and metallicity (the values are clipped to the boundaries of the library)
+    jv = library.evaluate(ages, metallicities)
 
-    jLLv = j_dict[(pL, mL)]
-    jLRv = j_dict[(pL, mR)]
-    jRLv = j_dict[(pR, mL)]
-    jRRv = j_dict[(pR, mR)]
+    # Resample to a logarithmic wavelength grid (the spacing of the Bruzual-Charlot template wavelengths is weird),
+    # and convert emissivities to luminosities (i.e. multiply by the wavelength bins)
+    from ...core.basics.range import RealRange
+    nwavelength_points = int(round(library.nwavelengths * 1.5))
+    wavelength_range = RealRange(library.wavelengths[0], library.wavelengths[-1])
+    new_wavelengths = wavelength_range.log(nwavelength_points)
 
-    #for (int k=0; k<Nlambda; k++)
-    for k in range(nlambda):
+    from ...core.simulation.wavelengthgrid import WavelengthGrid
+    new_wavelength_grid = WavelengthGrid.from_wavelengths(new_wavelengths, unit="m")
 
-        jv[k] = (1.0-ht)*(1.0-hZ) * jLLv[k] + (1.0-ht)*hZ*jLRv[k] + ht*(1.0-hZ)*jRLv[k] + ht * hZ * jRRv[k]
+    # Interpolate Bruzual-Charlot j's to the new wavelength grid
+    new_jv = nr.resample_log_log_array(new_wavelengths, library.wavelengths, jv)
 
-    #// resample to the possibly redshifted simulation wavelength grid,
-    #// convert emissivities to luminosities (i.e. multiply by the wavelength bins),
-    #// multiply by the mass of the population (in solar masses),
-    #// and return the result
+    # Get the delta lambdas, in meter
+    deltas = new_wavelength_grid.deltas(unit="m", asarray=True)
 
-    #return NR::resample<NR::interpolate_loglog>(_lambdagrid->lambdav()*(1-z), _lambdav, jv)
-    #                                * _lambdagrid->dlambdav() * M;
+    # Create luminositites
+    luminosities = new_jv * deltas * np.atleast_1d(np.asarray(masses, dtype=np.float64))[:, np.newaxis]
 
     # Return
-    #return jv
-
-    #return NR::resample < NR::interpolateLogLog > (_lambdagrid->lambdav() * (1 - z), _lambdav, jv) * _lambdagrid->dlambdav() * M
-
-    # Array dlambdav(Nlambda);
-    #setWavelengthBins(lambdav, dlambdav);   // set the grid with temporary widths so that lambdamin/max work
-    #for (int ell=0; ell<Nlambda; ell++)
-    #{
-    #    dlambdav[ell] = lambdamax(ell)-lambdamin(ell);
-    #}
-
-    min_wavelength = _lambdav[0]
-    max_wavelength = _lambdav[-1]
-    #print(min_wavelength * 1e6, "micron", max_wavelength * 1e6, "micron")
-
-    from ...core.basics.range import RealRange
-    nwavelength_points = int(round(nlambda * 1.5))
-    wavelength_range = RealRange(min_wavelength, max_wavelength)
-    new_wavelengths = wavelength_range.log(nwavelength_points)
+    return new_wavelengths, luminosities
 
-    #dlambdas = []
-    #for index in range(nwavelength_points):
-    #    dlambda = lambdamax(wavelength_column, index) - lambdamin(wavelength_column, index)
-    #    dlambdas.append(dlambda)
+# -----------------------------------------------------------------
 
-    from ...core.simulation.wavelengthgrid import WavelengthGrid
-    new_wavelength_grid = WavelengthGrid.from_wavelengths(new_wavelengths, unit="m")
-    #new_wavelength_grid.plot()
-    #new_wavelength_grid.plot
+def get_bruzual_charlot_library():
 
-    # WEIRD SPACING OF BRUZUAL-CHARLOT TEMPLATE WAVELENGTHS!
-    #bc_wavelength_grid = WavelengthGrid.from_wavelengths(_lambdav, unit="m")
-    #bc_wavelength_grid.plot()
-    #bc_wavelength_grid.plot_logdeltas()
+    """
+    This function returns the Bruzual-Charlot library, which is loaded only once
+    :return:
+    """
 
-    # Interpolate Bruzual-Charlot j's to the new wavelength grid
-    new_jv = nr.resample_log_log(new_wavelengths, _lambdav, jv)
+    return get_library("bruzual_charlot", load_bruzual_charlot_library, source_path=chabrier_path)
 
-    # In micrometers
-    #wavelength_column = [wavelength_meter * 1e6 for wavelength_meter in _lambdav]
-    #wavelength_column =
+# -----------------------------------------------------------------
 
-    if hasattr(mass, "unit"): mass_in_solar = mass.to("Msun").value
-    else: mass_in_solar = mass
+def load_bruzual_charlot_library():
 
-    # Get the delta lambdas, in meter
-    deltas = new_wavelength_grid.deltas(unit="m", asarray=True)
+    """
+    This function loads the Bruzual-Charlot data files into a template library, with the age (in years) and the
+    metallicity as parameters
+    :return:
+    """
 
-    # Create luminositites
-    luminosity_column = np.array(new_jv) * deltas * mass_in_solar
+    # Load the data files
+    _lambdav, _tv, _zv, j_dict = load_bruzual_charlot_data()
 
-    # Create the SED
-    sed = SED.from_arrays(new_wavelengths, luminosity_column, wavelength_unit="m", photometry_unit="W/micron") # ACTUALLY WHAT IS THE LUMINOSITY UNIT?
+    # Create the array
+    data = np.empty((len(_tv), len(_zv), len(_lambdav)))
+    for (p, m), jv in j_dict.items(): data[p, m] = jv
 
-    # Return the SED
-    return sed
+    # Create the library
+    return TemplateLibrary(_lambdav, [_tv, _zv], data)
 
 # -----------------------------------------------------------------
 
@@ -21,8 +21,8 @@ from ...core.tools import introspection, tables
 from ...core.tools import filesystem as fs
 from ...core.units.parsing import parse_unit as u
 from ...core.tools.utils import lazyproperty
-from ...core.tools import nr
 from ...core.tools.introspection import skirt_main_version, has_skirt
+from .sedlibrary import TemplateLibrary, get_library
 
 # -----------------------------------------------------------------
 
@@ -236,115 +236,88 @@ def create_mappings_sed(metallicity, pressure, compactness, covering_factor, sfr
     # Add unit to SFR
     if not hasattr(sfr, "unit"): sfr = sfr * u("Msun/yr")
 
-    # Load the data files
-    lambdav, _Zrelv, _logCv, _logpv, j0_dict, j1_dict = load_mappings_data()
+    # Get the luminosities
+    wavelength_column, luminosities = mappings_luminosities(metallicity, pressure.to("K/cm3").value, compactness, covering_factor, sfr.to("Msun/yr").value)
+
+    # Create the SED
+    sed = SED.from_arrays(wavelength_column, luminosities[0], wavelength_unit="micron", photometry_unit="W/micron")
+
+    # Return the SED
+    return sed
+
+# -----------------------------------------------------------------
+
+def mappings_luminosities(metallicities, pressures, compactnesses, covering_factors, sfrs=1.0):
+
+    """
+    This function calculates the MAPPINGS SEDs for many combinations of parameters at once
+    :param metallicities: the (absolute) metallicities
+    :param pressures: the pressures, in K/cm3
+    :param compactnesses: the (logarithmic) compactnesses
+    :param covering_factors: the PDR covering factors
+    :param sfrs: the star formation rates, in Msun/yr
+    :return: the wavelengths (in micron) and the luminosities (in W/micron), of shape (nseds, nwavelengths)
+    """
+
+    # Get the library
+    library = get_mappings_library()
 
     # Convert the input parameters to the parameters that are assumed in MAPPINGS III.
     # - the metallicity is converted from an absolute value Z to a value Zrel relative to the
     #   sun, where Zsun = 0.0122 as in Asplund et al. (2005). The same value is used in the MAPPINGS III
     #   models of Groves et al. (2008).
-    # - the pressure is converted from the actual pressure in SI units (i.e. in Pa = N/m^2) to
-    #   log(p/k), with k Boltzmann's constant, and in units of K/cm^3
-
-    # Relative metallicity
-    rel_metallicity = metallicity / 0.0122
-
-    # Log(pressure)
-    # pressure_in_Kcm3 = (pressure / boltzman).to("K/cm3").value # in SKIRT, the pressure is in program units (=SI units)
-    pressure_in_Kcm3 = pressure.to("K/cm3").value
-    log_p = np.log10(pressure_in_Kcm3)
-
-    # Log(compactness)
-    log_c = compactness  # compactness is already logarithmic
-
-    # Covering factor
-    fPDR = covering_factor
-
-    # Ensure that the value of the parameters is within the boundaries of the parameter space
-    rel_metallicity = max(rel_metallicity, 0.05)
-    rel_metallicity = min(rel_metallicity, 2.0 - 1e-8)
-    log_c = max(log_c, 4.0)
-    log_c = min(log_c, 6.5 - 1e-8)
-    log_p = max(log_p, 4.0)
-    log_p = min(log_p, 8.0 - 1e-8)
-
-    # Show
-    #print("Log(p)", log_p)
-    #print("log(C)", log_c)
-    #print("fPDR", fPDR)
-    #print("rMetallicity", rel_metallicity)
-
-    # Find the appropriate SED from interpolating in the library
-    # i_ = find_nearest(np.array(_Zrelv), rel_metallicity)
-    i = nr.locate_clip(_Zrelv, rel_metallicity)
-    # if i_ != i: print(i_, i)
-    hZrel = (rel_metallicity - _Zrelv[i]) / (_Zrelv[i + 1] - _Zrelv[i])
-
-    # j_ = find_nearest(np.array(_logCv), log_c)
-    j = nr.locate_clip(_logCv, log_c)
-    # if j_ != j: print(j_, j)
-    hlogC = (log_c - _logCv[j]) / (_logCv[j + 1] - _logCv[j])
-
-    # k_ = find_nearest(np.array(_logpv), log_p)
-    k = nr.locate_clip(_logpv, log_p)
-    # if k_ != k: print(k_, k)
-    hlogp = (log_p - _logpv[k]) / (_logpv[k + 1] - _logpv[k])
-
-    j0LLLv = j0_dict[i, j, k]
-    j0RLLv = j0_dict[i + 1, j, k]
-    j0LRLv = j0_dict[i, j + 1, k]
-    j0RRLv = j0_dict[i + 1, j + 1, k]
-    j0LLRv = j0_dict[i, j, k + 1]
-    j0RLRv = j0_dict[i + 1, j, k + 1]
-    j0LRRv = j0_dict[i, j + 1, k + 1]
-    j0RRRv = j0_dict[i + 1, j + 1, k + 1]
-    j1LLLv = j1_dict[i, j, k]
-    j1RLLv = j1_dict[i + 1, j, k]
-    j1LRLv = j1_dict[i, j + 1, k]
-    j1RRLv = j1_dict[i + 1, j + 1, k]
-    j1LLRv = j1_dict[i, j, k + 1]
-    j1RLRv = j1_dict[i + 1, j, k + 1]
-    j1LRRv = j1_dict[i, j + 1, k + 1]
-    j1RRRv = j1_dict[i + 1, j + 1, k + 1]
-
-    # Initialize jv
-    jv = np.zeros(len(lambdav))
-
-    # Fill jv
-    for k in range(len(lambdav)):
-        j0 = (1.0 - hZrel) * (1.0 - hlogC) * (1.0 - hlogp) * j0LLLv[k] \
-             + hZrel * (1.0 - hlogC) * (1.0 - hlogp) * j0RLLv[k] \
-             + (1.0 - hZrel) * hlogC * (1.0 - hlogp) * j0LRLv[k] \
-             + hZrel * hlogC * (1.0 - hlogp) * j0RRLv[k] \
-             + (1.0 - hZrel) * (1.0 - hlogC) * hlogp * j0LLRv[k] \
-             + hZrel * (1.0 - hlogC) * hlogp * j0RLRv[k] \
-             + (1.0 - hZrel) * hlogC * hlogp * j0LRRv[k] \
-             + hZrel * hlogC * hlogp * j0RRRv[k]
-
-        j1 = (1.0 - hZrel) * (1.0 - hlogC) * (1.0 - hlogp) * j1LLLv[k] \
-             + hZrel * (1.0 - hlogC) * (1.0 - hlogp) * j1RLLv[k] \
-             + (1.0 - hZrel) * hlogC * (1.0 - hlogp) * j1LRLv[k] \
-             + hZrel * hlogC * (1.0 - hlogp) * j1RRLv[k] \
-             + (1.0 - hZrel) * (1.0 - hlogC) * hlogp * j1LLRv[k] \
-             + hZrel * (1.0 - hlogC) * hlogp * j1RLRv[k] \
-             + (1.0 - hZrel) * hlogC * hlogp * j1LRRv[k] \
-             + hZrel * hlogC * hlogp * j1RRRv[k]
-
-        jk = (1.0 - fPDR) * j0 + fPDR * j1
-        jv[k] = jk
-
-    # Get scalar SFR
-    sfr_scalar = sfr.to("Msun/yr").value
+    # - the pressure is converted to log(p/k), in units of K/cm^3
+    # - the compactness is already logarithmic
+    rel_metallicities = np.asarray(metallicities, dtype=np.float64) / 0.0122
+    log_p = np.log10(np.asarray(pressures, dtype=np.float64))
+    log_c = np.asarray(compactnesses, dtype=np.float64)
+
+    # Interpolate j0 and j1 in the library (the values are clipped to the boundaries of the parameter space)
+    j = library.evaluate(rel_metallicities, log_c, log_p)
+
+    # Combine with the covering factors
+    fPDR = np.atleast_1d(np.asarray(covering_factors, dtype=np.float64))[:, np.newaxis]
+    jv = (1.0 - fPDR) * j[:, 0, :] + fPDR * j[:, 1, :]
 
     # Set arrays
-    wavelength_column = np.array([wavelength_meter * 1e6 for wavelength_meter in lambdav])
-    luminosity_column = jv * sfr_scalar * 1e-6 # 1e-6 is to go from per meter to per micron
+    wavelengths = library.wavelengths * 1e6
+    luminosities = jv * np.atleast_1d(np.asarray(sfrs, dtype=np.float64))[:, np.newaxis] * 1e-6 # 1e-6 is to go from per meter to per micron
 
-    # Create the SED
-    sed = SED.from_arrays(wavelength_column, luminosity_column, wavelength_unit="micron", photometry_unit="W/micron")
+    # Return
+    return wavelengths, luminosities
 
-    # Return the SED
-    return sed
+# -----------------------------------------------------------------
+
+def get_mappings_library():
+
+    """
+    This function returns the MAPPINGS library, which is loaded only once
+    :return:
+    """
+
+    return get_library("mappings", load_mappings_library, source_path=mappings_path)
+
+# -----------------------------------------------------------------
+
+def load_mappings_library():
+
+    """
+    This function loads the MAPPINGS data files into a template library, with the relative metallicity,
+    the logarithm of the compactness and the logarithm of the pressure as parameters, and the j0 and j1 emissivities
+    as templates
+    :return:
+    """
+
+    # Load the data files
+    lambdav, _Zrelv, _logCv, _logpv, j0_dict, j1_dict = load_mappings_data()
+
+    # Create the array
+    data = np.empty((len(_Zrelv), len(_logCv), len(_logpv), 2, len(lambdav)))
+    for (i, j, k), j0 in j0_dict.items(): data[i, j, k, 0] = j0
+    for (i, j, k), j1 in j1_dict.items(): data[i, j, k, 1] = j1
+
+    # Create the library
+    return TemplateLibrary(lambdav, [_Zrelv, _logCv, _logpv], data)
 
 # -----------------------------------------------------------------
 
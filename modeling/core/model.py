@@ -21,7 +21,7 @@ from collections import OrderedDict
 # Import the relevant PTS classes and modules
 from ..core.mappings import Mappings
 from ...core.filter.filter import parse_filter
-from ...core.tools.utils import lazyproperty
+from ...core.tools.utils import lazyproperty, productproperty, ProductCache
 from ...core.tools import sequences
 from ..config.parameters import distance_name, ionizing_scaleheight_name, sfr_compactness_name, fuv_young_name
 from ..config.parameters import old_scaleheight_name, position_angle_name, dust_mass_name, fuv_ionizing_name
@@ -278,7 +278,7 @@ class RTModel(object):
                  observed_bulge_output_path=None, observed_disk_output_path=None, observed_old_output_path=None,
                  observed_young_output_path=None, observed_sfr_output_path=None, observed_unevolved_output_path=None,
                  observed_extra_output_path=None, parameters=None, center=None, galaxy_name=None, hubble_stage=None,
-                 redshift=None, earth_wcs=None, truncation_ellipse=None):
+                 redshift=None, earth_wcs=None, truncation_ellipse=None, memory_budget=None):
 
         """
         The constructor ...
@@ -302,9 +302,13 @@ class RTModel(object):
         :param hubble_stage: the Hubble stage classification of the galaxy
         :param redshift: the redshift of the galaxy
         :param earth_wcs: the celestial coordinate system of all simulated earth datacubes
+        :param memory_budget: the maximum (estimated) memory size of the products (maps, cubes, SEDs) in bytes
         :return:
         """
 
+        # The cache of the products, with the memory budget
+        self._product_cache = ProductCache(memory_budget, name="pts.modeling.core.model.RTModel")
+
         # Set wavelength grid
         self.wavelength_grid = wavelength_grid
 
@@ -363,6 +367,48 @@ class RTModel(object):
 
     # -----------------------------------------------------------------
 
+    @property
+    def memory_budget(self):
+        return self._product_cache.budget
+
+    # -----------------------------------------------------------------
+
+    @memory_budget.setter
+    def memory_budget(self, value):
+        self._product_cache.budget = value
+        self._product_cache.shrink()
+
+    # -----------------------------------------------------------------
+
+    @property
+    def product_cache_statistics(self):
+        return self._product_cache.statistics
+
+    # -----------------------------------------------------------------
+
+    def show_product_cache_statistics(self):
+
+        """
+        This function shows the hit, miss and eviction statistics of the product cache
+        :return:
+        """
+
+        log.info("Product cache statistics:")
+        for label, value in self.product_cache_statistics.items(): log.info(" - " + label + ": " + str(value))
+
+    # -----------------------------------------------------------------
+
+    def clear_products(self):
+
+        """
+        This function removes all cached products from memory (and the evicted products from disk)
+        :return:
+        """
+
+        self._product_cache.clear()
+
+    # -----------------------------------------------------------------
+
     @property
     def has_extra_component(self):
         return self.observed_extra_output_path is not None
@@ -522,7 +568,7 @@ class RTModel(object):
     # TOTAL SIMULATION INTRINSIC CUBES
     # -----------------------------------------------------------------
 
-    @lazyproperty
+    @productproperty
     def total_simulation_evolved_component_cubes(self):
         cubes = OrderedDict()
         if self.bulge_simulations.has_intrinsic_cube and self.disk_simulations.has_intrinsic_cube:
@@ -534,7 +580,7 @@ class RTModel(object):
 
     # -----------------------------------------------------------------
 
-    @lazyproperty
+    @productproperty
     def total_simulation_unevolved_component_cubes(self):
         cubes = OrderedDict()
         if self.young_simulations.has_intrinsic_cube and self.sfr_simulations.has_intrinsic_cube:
@@ -546,7 +592,7 @@ class RTModel(object):
 
     # -----------------------------------------------------------------
 
-    @lazyproperty
+    @productproperty
     def total_simulation_component_cubes(self):
         cubes =  OrderedDict(self.total_simulation_evolved_component_cubes.items() + self.total_simulation_unevolved_component_cubes.items())
         if self.has_extra_component:
@@ -556,7 +602,7 @@ class RTModel(object):
 
     # -----------------------------------------------------------------
 
-    @lazyproperty
+    @productproperty
     def total_simulation_evolved_component_cubes_faceon(self):
         cubes = OrderedDict()
         if self.bulge_simulations.has_intrinsic_cube_faceon and self.disk_simulations.has_intrinsic_cube_faceon:
@@ -568,7 +614,7 @@ class RTModel(object):
 
     # -----------------------------------------------------------------
 
-    @lazyproperty
+    @productproperty
     def total_simulation_unevolved_component_cubes_faceon(self):
         cubes = OrderedDict()
         if self.young_simulations.has_intrinsic_cube_faceon and self.sfr_simulations.has_intrinsic_cube_faceon:
@@ -580,7 +626,7 @@ class RTModel(object):
 
     # -----------------------------------------------------------------
 
-    @lazyproperty
+    @productproperty
     def total_simulation_component_cubes_faceon(self):
         cubes = OrderedDict(self.total_simulation_evolved_component_cubes_faceon.items() + self.total_simulation_unevolved_component_cubes_faceon.items())
         if self.has_extra_component:
@@ -590,7 +636,7 @@ class RTModel(object):
 
     # -----------------------------------------------------------------
 
-    @lazyproperty
+    @productproperty
     def total_simulation_evolved_component_cubes_edgeon(self):
         cubes = OrderedDict()
         if self.bulge_simulations.has_intrinsic_cube_edgeon and self.disk_simulations.has_intrinsic_cube_edgeon:
@@ -602,7 +648,7 @@ class RTModel(object):
 
     # -----------------------------------------------------------------
 
-    @lazyproperty
+    @productproperty
     def total_simulation_unevolved_component_cubes_edgeon(self):
         cubes = OrderedDict()
         if self.young_simulations.has_intrinsic_cube_edgeon and self.sfr_simulations.has_intrinsic_cube_edgeon:
@@ -614,7 +660,7 @@ class RTModel(object):
 
     # -----------------------------------------------------------------
 
-    @lazyproperty
+    @productproperty
     def total_simulation_component_cubes_edgeon(self):
         cubes = OrderedDict(self.total_simulation_evolved_component_cubes_edgeon.items() + self.total_simulation_unevolved_component_cubes_edgeon.items())
         if self.has_extra_component:
@@ -1049,7 +1095,7 @@ class RTModel(object):
     # OLD SIMULATION INTRINSIC CUBES
     # -----------------------------------------------------------------
 
-    @lazyproperty
+    @productproperty
     def old_simulation_component_cubes(self):
         cubes = OrderedDict()
         if self.bulge_simulations.has_intrinsic_cube and self.disk_simulations.has_intrinsic_cube:
@@ -1060,7 +1106,7 @@ class RTModel(object):
 
     # -----------------------------------------------------------------
 
-    @lazyproperty
+    @productproperty
     def old_simulation_component_cubes_faceon(self):
         cubes = OrderedDict()
         if self.bulge_simulations.has_intrinsic_cube_faceon and self.disk_simulations.has_intrinsic_cube_faceon:
@@ -1071,7 +1117,7 @@ class RTModel(object):
 
     # -----------------------------------------------------------------
 
-    @lazyproperty
+    @productproperty
     def old_simulation_component_cubes_edgeon(self):
         cubes = OrderedDict()
         if self.bulge_simulations.has_intrinsic_cube_edgeon and self.disk_simulations.has_intrinsic_cube_edgeon:
@@ -1508,7 +1554,7 @@ class RTModel(object):
     # UNEVOLVED SIMULATION INTRINSIC CUBES
     # -----------------------------------------------------------------
 
-    @lazyproperty
+    @productproperty
     def unevolved_simulation_component_cubes(self):
         cubes = OrderedDict()
         if self.young_simulations.has_intrinsic_cube and self.sfr_simulations.has_intrinsic_cube:
@@ -1519,7 +1565,7 @@ class RTModel(object):
 
     # -----------------------------------------------------------------
 
-    @lazyproperty
+    @productproperty
     def unevolved_simulation_component_cubes_faceon(self):
         cubes = OrderedDict()
         if self.young_simulations.has_intrinsic_cube_faceon and self.sfr_simulations.has_intrinsic_cube_faceon:
@@ -1530,7 +1576,7 @@ class RTModel(object):
 
     # -----------------------------------------------------------------
 
-    @lazyproperty
+    @productproperty
     def unevolved_simulation_component_cubes_edgeon(self):
         cubes = OrderedDict()
         if self.young_simulations.has_intrinsic_cube_edgeon and self.sfr_simulations.has_intrinsic_cube_edgeon:
@@ -1994,7 +2040,7 @@ class RTModel(object):
 
     # -----------------------------------------------------------------
 
-    @lazyproperty
+    @productproperty
     def mappings_sed(self):
         return SED.from_file(self.mappings_sed_path)
 
@@ -2021,7 +2067,7 @@ class RTModel(object):
 
     # -----------------------------------------------------------------
 
-    @lazyproperty
+    @productproperty
     def mappings_transparent_sed(self):
         return SED.from_file(self.mappings_transparent_sed_path)
 
@@ -2187,7 +2233,7 @@ class RTModel(object):
 
     # -----------------------------------------------------------------
 
-    @lazyproperty
+    @productproperty
     def unattenuated_mappings_sed(self):
         return correct_sed_for_attenuation(self.intrinsic_sfr_stellar_sed, self.attenuation_curve_sfr_internal)
         
@@ -2211,7 +2257,7 @@ class RTModel(object):
 
     # -----------------------------------------------------------------
 
-    @lazyproperty
+    @productproperty
     def normalized_mappings_sed(self):
         return SED.from_file(self.normalized_mappings_sed_path)
 
@@ -3374,19 +3420,19 @@ class RTModel(object):
 
     # -----------------------------------------------------------------
 
-    @lazyproperty
+    @productproperty
     def intrinsic_transparent_sfr_stellar_sed(self):
         return self.transparent_sfr_sed.extrapolated_from(self.extrapolate_mappings_from_wavelength, self.fit_mappings_from_wavelength, xlog=True, ylog=True)
 
     # -----------------------------------------------------------------
 
-    @lazyproperty
+    @productproperty
     def intrinsic_sfr_stellar_sed(self):
         return self.intrinsic_sfr_sed.extrapolated_from(self.extrapolate_mappings_from_wavelength, self.fit_mappings_from_wavelength, xlog=True, ylog=True)
 
     # -----------------------------------------------------------------
 
-    @lazyproperty
+    @productproperty
     def intrinsic_sfr_dust_sed(self):
         #from pts.core.plot.sed import plot_seds
         #plot_seds({"intrinsic": self.intrinsic_sfr_sed, "intrinsic_stellar": self.intrinsic_sfr_stellar_sed})
@@ -6131,7 +6177,7 @@ class RTModel(object):
 
     # -----------------------------------------------------------------
 
-    @lazyproperty
+    @productproperty
     def total_bolometric_luminosity_map_earth(self):
         return self.total_bolometric_luminosity_cube_earth.integrate()
 
@@ -6143,7 +6189,7 @@ class RTModel(object):
 
     # -----------------------------------------------------------------
 
-    @lazyproperty
+    @productproperty
     def total_bolometric_luminosity_map_faceon(self):
         return self.total_bolometric_luminosity_cube_faceon.integrate()
 
@@ -6155,7 +6201,7 @@ class RTModel(object):
 
     # -----------------------------------------------------------------
 
-    @lazyproperty
+    @productproperty
     def total_bolometric_luminosity_map_edgeon(self):
         return self.total_bolometric_luminosity_cube_edgeon.integrate()
 
@@ -6181,7 +6227,7 @@ class RTModel(object):
 
     # -----------------------------------------------------------------
 
-    @lazyproperty
+    @productproperty
     def total_intrinsic_stellar_luminosity_map_earth(self):
         return self.total_intrinsic_stellar_luminosity_cube_earth.integrate()
 
@@ -6193,7 +6239,7 @@ class RTModel(object):
 
     # -----------------------------------------------------------------
 
-    @lazyproperty
+    @productproperty
     def total_intrinsic_stellar_luminosity_map_faceon(self):
         return self.total_intrinsic_stellar_luminosity_cube_faceon.integrate()
 
@@ -6205,7 +6251,7 @@ class RTModel(object):
 
     # -----------------------------------------------------------------
 
-    @lazyproperty
+    @productproperty
     def total_intrinsic_stellar_luminosity_map_edgeon(self):
         return self.total_intrinsic_stellar_luminosity_cube_edgeon.integrate()
 
@@ -6231,7 +6277,7 @@ class RTModel(object):
 
     # -----------------------------------------------------------------
 
-    @lazyproperty
+    @productproperty
     def total_observed_stellar_luminosity_map_earth(self):
         return self.total_observed_stellar_luminosity_cube_earth.integrate()
 
@@ -6243,7 +6289,7 @@ class RTModel(object):
 
     # -----------------------------------------------------------------
 
-    @lazyproperty
+    @productproperty
     def total_observed_stellar_luminosity_map_faceon(self):
         return self.total_observed_stellar_luminosity_cube_faceon.integrate()
 
@@ -6255,7 +6301,7 @@ class RTModel(object):
 
     # -----------------------------------------------------------------
 
-    @lazyproperty
+    @productproperty
     def total_observed_stellar_luminosity_map_edgeon(self):
         return self.total_observed_stellar_luminosity_cube_edgeon.integrate()
 
@@ -6281,7 +6327,7 @@ class RTModel(object):
 
     # -----------------------------------------------------------------
 
-    @lazyproperty
+    @productproperty
     def total_diffuse_dust_luminosity_map_earth(self):
         return self.total_diffuse_dust_luminosity_cube_earth.integrate()
 
@@ -6293,7 +6339,7 @@ class RTModel(object):
 
     # -----------------------------------------------------------------
 
-    @lazyproperty
+    @productproperty
     def total_diffuse_dust_luminosity_map_faceon(self):
         return self.total_diffuse_dust_luminosity_cube_faceon.integrate()
 
@@ -6305,7 +6351,7 @@ class RTModel(object):
 
     # -----------------------------------------------------------------
 
-    @lazyproperty
+    @productproperty
     def total_diffuse_dust_luminosity_map_edgeon(self):
         return self.total_diffuse_dust_luminosity_cube_edgeon.integrate()
 
@@ -6331,7 +6377,7 @@ class RTModel(object):
 
     # -----------------------------------------------------------------
 
-    @lazyproperty
+    @productproperty
     def total_dust_luminosity_map_earth(self):
         return self.total_dust_luminosity_cube_earth.integrate()
 
@@ -6343,7 +6389,7 @@ class RTModel(object):
 
     # -----------------------------------------------------------------
 
-    @lazyproperty
+    @productproperty
     def total_dust_luminosity_map_faceon(self):
         return self.total_dust_luminosity_cube_faceon.integrate()
 
@@ -6355,7 +6401,7 @@ class RTModel(object):
 
     # -----------------------------------------------------------------
 
-    @lazyproperty
+    @productproperty
     def total_dust_luminosity_map_edgeon(self):
         return self.total_dust_luminosity_cube_edgeon.integrate()
 
@@ -6381,7 +6427,7 @@ class RTModel(object):
 
     # -----------------------------------------------------------------
 
-    @lazyproperty
+    @productproperty
     def total_scattered_stellar_luminosity_map_earth(self):
         return self.total_scattered_stellar_luminosity_cube_earth.integrate()
 
@@ -6393,7 +6439,7 @@ class RTModel(object):
 
     # -----------------------------------------------------------------
 
-    @lazyproperty
+    @productproperty
     def total_scattered_stellar_luminosity_map_faceon(self):
         return self.total_scattered_stellar_luminosity_cube_faceon.integrate()
 
@@ -6405,7 +6451,7 @@ class RTModel(object):
 
     # -----------------------------------------------------------------
 
-    @lazyproperty
+    @productproperty
     def total_scattered_stellar_luminosity_map_edgeon(self):
         return self.total_scattered_stellar_luminosity_cube_edgeon.integrate()
 
@@ -6431,7 +6477,7 @@ class RTModel(object):
 
     # -----------------------------------------------------------------
 
-    @lazyproperty
+    @productproperty
     def total_absorbed_diffuse_stellar_luminosity_map_earth(self):
         return self.total_absorbed_diffuse_stellar_luminosity_cube_earth.integrate()
 
@@ -6443,7 +6489,7 @@ class RTModel(object):
 
     # -----------------------------------------------------------------
 
-    @lazyproperty
+    @productproperty
     def total_absorbed_diffuse_stellar_luminosity_map_faceon(self):
         return self.total_absorbed_diffuse_stellar_luminosity_cube_faceon.integrate()
 
@@ -6455,7 +6501,7 @@ class RTModel(object):
 
     # -----------------------------------------------------------------
 
-    @lazyproperty
+    @productproperty
     def total_absorbed_diffuse_stellar_luminosity_map_edgeon(self):
         return self.total_absorbed_diffuse_stellar_luminosity_cube_edgeon.integrate()
 
@@ -6483,7 +6529,7 @@ class RTModel(object):
 
     # -----------------------------------------------------------------
 
-    @lazyproperty
+    @productproperty
     def total_fabs_diffuse_map_earth(self):
         return self.total_diffuse_dust_luminosity_map_earth / self.total_intrinsic_stellar_luminosity_map_earth
 
@@ -6495,7 +6541,7 @@ class RTModel(object):
 
     # -----------------------------------------------------------------
 
-    @lazyproperty
+    @productproperty
     def total_fabs_diffuse_map_faceon(self):
         return self.total_diffuse_dust_luminosity_map_faceon / self.total_intrinsic_stellar_luminosity_map_faceon
 
@@ -6507,7 +6553,7 @@ class RTModel(object):
 
     # -----------------------------------------------------------------
 
-    @lazyproperty
+    @productproperty
     def total_fabs_diffuse_map_edgeon(self):
         return self.total_diffuse_dust_luminosity_map_edgeon / self.total_intrinsic_stellar_luminosity_map_edgeon
 
@@ -6533,7 +6579,7 @@ class RTModel(object):
 
     # -----------------------------------------------------------------
 
-    @lazyproperty
+    @productproperty
     def total_fabs_map_earth(self):
         return self.total_dust_luminosity_map_earth / self.total_intrinsic_stellar_luminosity_map_earth
 
@@ -6545,7 +6591,7 @@ class RTModel(object):
 
     # -----------------------------------------------------------------
 
-    @lazyproperty
+    @productproperty
     def total_fabs_map_faceon(self):
         return self.total_dust_luminosity_map_faceon / self.total_intrinsic_stellar_luminosity_map_faceon
 
@@ -6557,7 +6603,7 @@ class RTModel(object):
 
     # -----------------------------------------------------------------
 
-    @lazyproperty
+    @productproperty
     def total_fabs_map_edgeon(self):
         return self.total_dust_luminosity_map_edgeon / self.total_intrinsic_stellar_luminosity_map_edgeon
 
@@ -6583,7 +6629,7 @@ class RTModel(object):
 
     # -----------------------------------------------------------------
 
-    @lazyproperty
+    @productproperty
     def total_attenuated_stellar_luminosity_map_earth(self):
         return self.total_attenuated_stellar_luminosity_cube_earth.integrate()
 
@@ -6595,7 +6641,7 @@ class RTModel(object):
 
     # -----------------------------------------------------------------
 
-    @lazyproperty
+    @productproperty
     def total_attenuated_stellar_luminosity_map_faceon(self):
         return self.total_attenuated_stellar_luminosity_cube_faceon.integrate()
 
@@ -6607,7 +6653,7 @@ class RTModel(object):
 
     # -----------------------------------------------------------------
 
-    @lazyproperty
+    @productproperty
     def total_attenuated_stellar_luminosity_map_edgeon(self):
         return self.total_attenuated_stellar_luminosity_cube_edgeon.integrate()
 
@@ -6633,7 +6679,7 @@ class RTModel(object):
 
     # -----------------------------------------------------------------
 
-    @lazyproperty
+    @productproperty
     def total_direct_stellar_luminosity_map_earth(self):
         return self.total_direct_stellar_luminosity_cube_earth.integrate()
 
@@ -6645,7 +6691,7 @@ class RTModel(object):
 
     # -----------------------------------------------------------------
 
-    @lazyproperty
+    @productproperty
     def total_direct_stellar_luminosity_map_faceon(self):
         return self.total_direct_stellar_luminosity_cube_faceon.integrate()
 
@@ -6657,7 +6703,7 @@ class RTModel(object):
 
     # -----------------------------------------------------------------
 
-    @lazyproperty
+    @productproperty
     def total_direct_stellar_luminosity_map_edgeon(self):
         return self.total_direct_stellar_luminosity_cube_edgeon.integrate()
 
@@ -6731,7 +6777,7 @@ class RTModel(object):
 
     # -----------------------------------------------------------------
 
-    @lazyproperty
+    @productproperty
     def intrinsic_fuv_luminosity_map_earth(self):
         return self.total_intrinsic_stellar_luminosity_cube_earth.get_frame_for_wavelength(self.fuv_wavelength, copy=True)
 
@@ -6743,7 +6789,7 @@ class RTModel(object):
 
     # -----------------------------------------------------------------
 
-    @lazyproperty
+    @productproperty
     def intrinsic_fuv_luminosity_map_faceon(self):
         return self.total_intrinsic_stellar_luminosity_cube_faceon.get_frame_for_wavelength(self.fuv_wavelength, copy=True)
 
@@ -6755,7 +6801,7 @@ class RTModel(object):
 
     # -----------------------------------------------------------------
 
-    @lazyproperty
+    @productproperty
     def intrinsic_fuv_luminosity_map_edgeon(self):
         return self.total_intrinsic_stellar_luminosity_cube_edgeon.get_frame_for_wavelength(self.fuv_wavelength, copy=True)
 
@@ -6805,7 +6851,7 @@ class RTModel(object):
 
     # -----------------------------------------------------------------
 
-    @lazyproperty
+    @productproperty
     def total_24um_luminosity_map_earth(self):
         return self.total_observed_luminosity_cube_earth.get_frame_for_wavelength(self.mips24_wavelength, copy=True)
 
@@ -6817,7 +6863,7 @@ class RTModel(object):
 
     # -----------------------------------------------------------------
 
-    @lazyproperty
+    @productproperty
     def total_24um_luminosity_map_faceon(self):
         return self.total_observed_luminosity_cube_faceon.get_frame_for_wavelength(self.mips24_wavelength, copy=True)
 
@@ -6829,7 +6875,7 @@ class RTModel(object):
 
     # -----------------------------------------------------------------
 
-    @lazyproperty
+    @productproperty
     def total_24um_luminosity_map_edgeon(self):
         return self.total_observed_luminosity_cube_edgeon.get_frame_for_wavelength(self.mips24_wavelength, copy=True)
 
@@ -6857,7 +6903,7 @@ class RTModel(object):
 
     # -----------------------------------------------------------------
 
-    @lazyproperty
+    @productproperty
     def total_star_formation_rate_map_earth_salim(self):
         return salim_fuv_to_sfr(self.intrinsic_fuv_luminosity_map_earth, distance=self.distance)
 
@@ -6871,7 +6917,7 @@ class RTModel(object):
     #     FACEON
     # -----------------------------------------------------------------
 
-    @lazyproperty
+    @productproperty
     def total_star_formation_rate_map_faceon_salim(self):
         return salim_fuv_to_sfr(self.intrinsic_fuv_luminosity_map_faceon, distance=self.distance)
 
@@ -6885,7 +6931,7 @@ class RTModel(object):
     #     EDGEON
     # -----------------------------------------------------------------
 
-    @lazyproperty
+    @productproperty
     def total_star_formation_rate_map_edgeon_salim(self):
         return salim_fuv_to_sfr(self.intrinsic_fuv_luminosity_map_edgeon, distance=self.distance)
 
@@ -6912,7 +6958,7 @@ class RTModel(object):
 
     # -----------------------------------------------------------------
 
-    @lazyproperty
+    @productproperty
     def total_star_formation_rate_map_earth_kennicutt(self):
         return kennicutt_fuv_to_sfr(self.intrinsic_fuv_luminosity_map_earth, distance=self.distance)
 
@@ -6926,7 +6972,7 @@ class RTModel(object):
     #     FACEON
     # -----------------------------------------------------------------
 
-    @lazyproperty
+    @productproperty
     def total_star_formation_rate_map_faceon_kennicutt(self):
         return kennicutt_fuv_to_sfr(self.intrinsic_fuv_luminosity_map_faceon, distance=self.distance)
 
@@ -6940,7 +6986,7 @@ class RTModel(object):
     #     EDGEON
     # -----------------------------------------------------------------
 
-    @lazyproperty
+    @productproperty
     def total_star_formation_rate_map_edgeon_kennicutt(self):
         return kennicutt_fuv_to_sfr(self.intrinsic_fuv_luminosity_map_edgeon, distance=self.distance)
 
@@ -6967,7 +7013,7 @@ class RTModel(object):
 
     # -----------------------------------------------------------------
 
-    @lazyproperty
+    @productproperty
     def total_star_formation_rate_map_earth_ke(self):
         return kennicutt_evans_fuv_to_sfr(self.intrinsic_fuv_luminosity_map_earth, distance=self.distance)
 
@@ -6981,7 +7027,7 @@ class RTModel(object):
     #     FACEON
     # -----------------------------------------------------------------
 
-    @lazyproperty
+    @productproperty
     def total_star_formation_rate_map_faceon_ke(self):
         return kennicutt_evans_fuv_to_sfr(self.intrinsic_fuv_luminosity_map_faceon, distance=self.distance)
 
@@ -6995,7 +7041,7 @@ class RTModel(object):
     #     EDGEON
     # -----------------------------------------------------------------
 
-    @lazyproperty
+    @productproperty
     def total_star_formation_rate_map_edgeon_ke(self):
         return kennicutt_evans_fuv_to_sfr(self.intrinsic_fuv_luminosity_map_edgeon, distance=self.distance)
 
@@ -7022,7 +7068,7 @@ class RTModel(object):
 
     # -----------------------------------------------------------------
 
-    @lazyproperty
+    @productproperty
     def total_star_formation_rate_map_earth_tir(self):
         return kennicutt_tir_to_sfr(self.total_dust_luminosity_map_earth, distance=self.distance)
 
@@ -7036,7 +7082,7 @@ class RTModel(object):
     #     FACEON
     # -----------------------------------------------------------------
 
-    @lazyproperty
+    @productproperty
     def total_star_formation_rate_map_faceon_tir(self):
         return kennicutt_tir_to_sfr(self.total_dust_luminosity_map_faceon, distance=self.distance)
 
@@ -7050,7 +7096,7 @@ class RTModel(object):
     #     EDGEON
     # -----------------------------------------------------------------
 
-    @lazyproperty
+    @productproperty
     def total_star_formation_rate_map_edgeon_tir(self):
         return kennicutt_tir_to_sfr(self.total_dust_luminosity_map_edgeon, distance=self.distance)
 
@@ -7077,7 +7123,7 @@ class RTModel(object):
 
     # -----------------------------------------------------------------
 
-    @lazyproperty
+    @productproperty
     def total_star_formation_rate_map_earth_24um(self):
         return calzetti_24um_to_sfr(self.total_24um_luminosity_map_earth, distance=self.distance)
 
@@ -7091,7 +7137,7 @@ class RTModel(object):
     #    FACEON
     # -----------------------------------------------------------------
 
-    @lazyproperty
+    @productproperty
     def total_star_formation_rate_map_faceon_24um(self):
         return calzetti_24um_to_sfr(self.total_24um_luminosity_map_faceon, distance=self.distance)
 
@@ -7105,7 +7151,7 @@ class RTModel(object):
     #     EDGEON
     # -----------------------------------------------------------------
 
-    @lazyproperty
+    @productproperty
     def total_star_formation_rate_map_edgeon_24um(self):
         return calzetti_24um_to_sfr(self.total_24um_luminosity_map_edgeon, distance=self.distance)
 
@@ -7131,7 +7177,7 @@ class RTModel(object):
 
     # -----------------------------------------------------------------
 
-    @lazyproperty
+    @productproperty
     def observed_i1_luminosity_map_earth(self):
         return self.total_bolometric_luminosity_cube_earth.get_frame_for_wavelength(self.i1_wavelength, copy=True)
 
@@ -7143,7 +7189,7 @@ class RTModel(object):
 
     # -----------------------------------------------------------------
 
-    @lazyproperty
+    @productproperty
     def observed_i1_luminosity_map_faceon(self):
         return self.total_bolometric_luminosity_cube_faceon.get_frame_for_wavelength(self.i1_wavelength, copy=True)
 
@@ -7155,7 +7201,7 @@ class RTModel(object):
 
     # -----------------------------------------------------------------
 
-    @lazyproperty
+    @productproperty
     def observed_i1_luminosity_map_edgeon(self):
         return self.total_bolometric_luminosity_cube_edgeon.get_frame_for_wavelength(self.i1_wavelength, copy=True)
 
@@ -7167,7 +7213,7 @@ class RTModel(object):
 
     # -----------------------------------------------------------------
 
-    @lazyproperty
+    @productproperty
     def observed_old_i1_luminosity_map_earth(self):
         return self.old_bolometric_luminosity_cube_earth.get_frame_for_wavelength(self.i1_wavelength, copy=True)
 
@@ -7179,7 +7225,7 @@ class RTModel(object):
 
     # -----------------------------------------------------------------
 
-    @lazyproperty
+    @productproperty
     def observed_old_i1_luminosity_map_faceon(self):
         return self.old_bolometric_luminosity_cube_faceon.get_frame_for_wavelength(self.i1_wavelength, copy=True)
 
@@ -7191,7 +7237,7 @@ class RTModel(object):
 
     # -----------------------------------------------------------------
 
-    @lazyproperty
+    @productproperty
     def observed_old_i1_luminosity_map_edgeon(self):
         return self.old_bolometric_luminosity_cube_edgeon.get_frame_for_wavelength(self.i1_wavelength, copy=True)
 
@@ -7218,7 +7264,7 @@ class RTModel(object):
 
     # -----------------------------------------------------------------
 
-    @lazyproperty
+    @productproperty
     def total_stellar_mass_map_earth(self):
         return oliver_stellar_mass(self.observed_i1_luminosity_map_earth, hubble_type=self.hubble_type, hubble_subtype=self.hubble_subtype, distance=self.distance)
 
@@ -7230,7 +7276,7 @@ class RTModel(object):
 
     # -----------------------------------------------------------------
 
-    @lazyproperty
+    @productproperty
     def total_stellar_mass_map_faceon(self):
         return oliver_stellar_mass(self.observed_i1_luminosity_map_faceon, hubble_type=self.hubble_type, hubble_subtype=self.hubble_subtype, distance=self.distance)
 
@@ -7242,7 +7288,7 @@ class RTModel(object):
 
     # -----------------------------------------------------------------
 
-    @lazyproperty
+    @productproperty
     def total_stellar_mass_map_edgeon(self):
         return oliver_stellar_mass(self.observed_i1_luminosity_map_edgeon, hubble_type=self.hubble_type, hubble_subtype=self.hubble_subtype, distance=self.distance)
 
@@ -7268,7 +7314,7 @@ class RTModel(object):
 
     # -----------------------------------------------------------------
 
-    @lazyproperty
+    @productproperty
     def old_stellar_mass_map_earth(self):
         return oliver_stellar_mass(self.observed_old_i1_luminosity_map_earth, hubble_type=self.hubble_type, hubble_subtype=self.hubble_subtype, distance=self.distance)
 
@@ -7280,7 +7326,7 @@ class RTModel(object):
 
     # -----------------------------------------------------------------
 
-    @lazyproperty
+    @productproperty
     def old_stellar_mass_map_faceon(self):
         return oliver_stellar_mass(self.observed_old_i1_luminosity_map_faceon, hubble_type=self.hubble_type, hubble_subtype=self.hubble_subtype, distance=self.distance)
 
@@ -7292,7 +7338,7 @@ class RTModel(object):
 
     # -----------------------------------------------------------------
 
-    @lazyproperty
+    @productproperty
     def old_stellar_mass_map_edgeon(self):
         return oliver_stellar_mass(self.observed_old_i1_luminosity_map_edgeon, hubble_type=self.hubble_type, hubble_subtype=self.hubble_subtype, distance=self.distance)
 
@@ -7320,7 +7366,7 @@ class RTModel(object):
 
     # -----------------------------------------------------------------
 
-    @lazyproperty
+    @productproperty
     def total_ssfr_map_earth_salim(self):
         return self.total_star_formation_rate_map_earth_salim / self.total_stellar_mass_map_earth
 
@@ -7334,7 +7380,7 @@ class RTModel(object):
     #     FACEON
     # -----------------------------------------------------------------
 
-    @lazyproperty
+    @productproperty
     def total_ssfr_map_faceon_salim(self):
         return self.total_star_formation_rate_map_faceon_salim / self.total_stellar_mass_map_faceon
 
@@ -7348,7 +7394,7 @@ class RTModel(object):
     #     EDGEON
     # -----------------------------------------------------------------
 
-    @lazyproperty
+    @productproperty
     def total_ssfr_map_edgeon_salim(self):
         return self.total_star_formation_rate_map_edgeon_salim / self.total_stellar_mass_map_edgeon
 
@@ -7375,7 +7421,7 @@ class RTModel(object):
 
     # -----------------------------------------------------------------
 
-    @lazyproperty
+    @productproperty
     def total_ssfr_map_earth_kennicutt(self):
         return self.total_star_formation_rate_map_earth_kennicutt / self.total_stellar_mass_map_earth
 
@@ -7389,7 +7435,7 @@ class RTModel(object):
     #     FACEON
     # -----------------------------------------------------------------
 
-    @lazyproperty
+    @productproperty
     def total_ssfr_map_faceon_kennicutt(self):
         return self.total_star_formation_rate_map_faceon_kennicutt / self.total_stellar_mass_map_faceon
 
@@ -7403,7 +7449,7 @@ class RTModel(object):
     #     EDGEON
     # -----------------------------------------------------------------
 
-    @lazyproperty
+    @productproperty
     def total_ssfr_map_edgeon_kennicutt(self):
         return self.total_star_formation_rate_map_edgeon_kennicutt / self.total_stellar_mass_map_edgeon
 
@@ -7430,7 +7476,7 @@ class RTModel(object):
 
     # -----------------------------------------------------------------
 
-    @lazyproperty
+    @productproperty
     def total_ssfr_map_earth_ke(self):
         return self.total_star_formation_rate_map_earth_ke / self.total_stellar_mass_map_earth
 
@@ -7444,7 +7490,7 @@ class RTModel(object):
     #     FACEON
     # -----------------------------------------------------------------
 
-    @lazyproperty
+    @productproperty
     def total_ssfr_map_faceon_ke(self):
         return self.total_star_formation_rate_map_faceon_ke / self.total_stellar_mass_map_faceon
 
@@ -7458,7 +7504,7 @@ class RTModel(object):
     #     EDGEON
     # -----------------------------------------------------------------
 
-    @lazyproperty
+    @productproperty
     def total_ssfr_map_edgeon_ke(self):
         return self.total_star_formation_rate_map_edgeon_ke / self.total_stellar_mass_map_edgeon
 
@@ -7478,19 +7524,19 @@ class RTModel(object):
 
     # -----------------------------------------------------------------
 
-    @lazyproperty
+    @productproperty
     def old_bulge_intrinsic_i1_luminosity_map_earth(self):
         return self.old_bulge_map_earth.normalized(to=self.intrinsic_i1_luminosity_old_bulge)
 
     # -----------------------------------------------------------------
 
-    @lazyproperty
+    @productproperty
     def old_bulge_intrinsic_i1_luminosity_map_faceon(self):
         return self.old_bulge_map_faceon.normalized(to=self.intrinsic_i1_luminosity_old_bulge)
 
     # -----------------------------------------------------------------
 
-    @lazyproperty
+    @productproperty
     def old_bulge_intrinsic_i1_luminosity_map_edgeon(self):
         return self.old_bulge_map_edgeon.normalized(to=self.intrinsic_i1_luminosity_old_bulge)
 
@@ -7526,19 +7572,19 @@ class RTModel(object):
 
     # -----------------------------------------------------------------
 
-    @lazyproperty
+    @productproperty
     def old_bulge_bolometric_luminosity_map_earth(self):
         return self.old_bulge_map_earth.normalized(to=self.intrinsic_i1_luminosity_old_bulge)
 
     # -----------------------------------------------------------------
 
-    @lazyproperty
+    @productproperty
     def old_bulge_bolometric_luminosity_map_faceon(self):
         return self.old_bulge_map_faceon.normalized(to=self.intrinsic_i1_luminosity_old_bulge)
 
     # -----------------------------------------------------------------
 
-    @lazyproperty
+    @productproperty
     def old_bulge_bolometric_luminosity_map_edgeon(self):
         return self.old_bulge_map_edgeon.normalized(to=self.intrinsic_i1_luminosity_old_bulge)
 
@@ -7580,7 +7626,7 @@ class RTModel(object):
 
     # -----------------------------------------------------------------
 
-    @lazyproperty
+    @productproperty
     def old_bulge_direct_stellar_luminosity_map_earth(self):
         return self.bulge_direct_stellar_luminosity_cube_earth.integrate()
 
@@ -7592,7 +7638,7 @@ class RTModel(object):
 
     # -----------------------------------------------------------------
 
-    @lazyproperty
+    @productproperty
     def old_bulge_direct_stellar_luminosity_map_faceon(self):
         return self.bulge_direct_stellar_luminosity_cube_faceon.integrate()
 
@@ -7604,7 +7650,7 @@ class RTModel(object):
 
     # -----------------------------------------------------------------
 
-    @lazyproperty
+    @productproperty
     def old_bulge_direct_stellar_luminosity_map_edgeon(self):
         return self.bulge_direct_stellar_luminosity_cube_edgeon.integrate()
 
@@ -7676,7 +7722,7 @@ class RTModel(object):
 
     # -----------------------------------------------------------------
 
-    @lazyproperty
+    @productproperty
     def old_bulge_i1_luminosity_map_earth(self):
         return self.bulge_observed_stellar_luminosity_cube_earth.get_frame_for_wavelength(self.i1_wavelength, copy=True)
 
@@ -7688,7 +7734,7 @@ class RTModel(object):
 
     # -----------------------------------------------------------------
 
-    @lazyproperty
+    @productproperty
     def old_bulge_i1_luminosity_map_faceon(self):
         return self.bulge_observed_stellar_luminosity_cube_faceon.get_frame_for_wavelength(self.i1_wavelength, copy=True)
 
@@ -7700,7 +7746,7 @@ class RTModel(object):
 
     # -----------------------------------------------------------------
 
-    @lazyproperty
+    @productproperty
     def old_bulge_i1_luminosity_map_edgeon(self):
         return self.bulge_observed_stellar_luminosity_cube_edgeon.get_frame_for_wavelength(self.i1_wavelength, copy=True)
 
@@ -7724,7 +7770,7 @@ class RTModel(object):
 
     # -----------------------------------------------------------------
 
-    @lazyproperty
+    @productproperty
     def old_bulge_dust_luminosity_map_earth(self):
         return self.bulge_dust_luminosity_cube_earth.integrate()
 
@@ -7736,7 +7782,7 @@ class RTModel(object):
 
     # -----------------------------------------------------------------
 
-    @lazyproperty
+    @productproperty
     def old_bulge_dust_luminosity_map_faceon(self):
         return self.bulge_dust_luminosity_cube_faceon.integrate()
 
@@ -7748,7 +7794,7 @@ class RTModel(object):
 
     # -----------------------------------------------------------------
 
-    @lazyproperty
+    @productproperty
     def old_bulge_dust_luminosity_map_edgeon(self):
         return self.bulge_dust_luminosity_cube_edgeon.integrate()
 
@@ -7774,7 +7820,7 @@ class RTModel(object):
 
     # -----------------------------------------------------------------
 
-    @lazyproperty
+    @productproperty
     def old_disk_map(self):
         return Frame.from_file(self.old_disk_map_path)
 
@@ -7830,19 +7876,19 @@ class RTModel(object):
 
     # -----------------------------------------------------------------
 
-    @lazyproperty
+    @productproperty
     def old_disk_intrinsic_i1_luminosity_map_earth(self):
         return self.old_disk_map_earth.normalized(to=self.intrinsic_i1_luminosity_old_disk)
 
     # -----------------------------------------------------------------
 
-    @lazyproperty
+    @productproperty
     def old_disk_intrinsic_i1_luminosity_map_faceon(self):
         return self.old_disk_map_faceon.normalized(to=self.intrinsic_i1_luminosity_old_disk)
 
     # -----------------------------------------------------------------
 
-    @lazyproperty
+    @productproperty
     def old_disk_intrinsic_i1_luminosity_map_edgeon(self):
         return self.old_disk_map_edgeon.normalized(to=self.intrinsic_i1_luminosity_old_disk)
 
@@ -7884,7 +7930,7 @@ class RTModel(object):
 
     # -----------------------------------------------------------------
 
-    @lazyproperty
+    @productproperty
     def old_disk_bolometric_luminosity_map_earth(self):
         return self.old_disk_map_earth.normalized(to=self.intrinsic_bolometric_luminosity_old_disk)
 
@@ -7896,7 +7942,7 @@ class RTModel(object):
 
     # -----------------------------------------------------------------
 
-    @lazyproperty
+    @productproperty
     def old_disk_bolometric_luminosity_map_faceon(self):
         return self.old_disk_map_faceon.normalized(to=self.intrinsic_bolometric_luminosity_old_disk)
 
@@ -7908,7 +7954,7 @@ class RTModel(object):
 
     # -----------------------------------------------------------------
 
-    @lazyproperty
+    @productproperty
     def old_disk_bolometric_luminosity_map_edgeon(self):
         return self.old_disk_map_edgeon.normalized(to=self.intrinsic_bolometric_luminosity_old_disk)
 
@@ -7932,7 +7978,7 @@ class RTModel(object):
 
     # -----------------------------------------------------------------
 
-    @lazyproperty
+    @productproperty
     def old_disk_direct_stellar_luminosity_map_earth(self):
         return self.disk_direct_stellar_luminosity_cube_earth.integrate()
 
@@ -7944,7 +7990,7 @@ class RTModel(object):
 
     # -----------------------------------------------------------------
 
-    @lazyproperty
+    @productproperty
     def old_disk_direct_stellar_luminosity_map_faceon(self):
         return self.disk_direct_stellar_luminosity_cube_faceon.integrate()
 
@@ -7956,7 +8002,7 @@ class RTModel(object):
 
     # -----------------------------------------------------------------
 
-    @lazyproperty
+    @productproperty
     def old_disk_direct_stellar_luminosity_map_edgeon(self):
         return self.disk_direct_stellar_luminosity_cube_edgeon.integrate()
 
@@ -7980,7 +8026,7 @@ class RTModel(object):
 
     # -----------------------------------------------------------------
 
-    @lazyproperty
+    @productproperty
     def old_disk_i1_luminosity_map_earth(self):
         return self.disk_observed_stellar_luminosity_cube_earth.get_frame_for_wavelength(self.i1_wavelength, copy=True)
 
@@ -7992,7 +8038,7 @@ class RTModel(object):
 
     # -----------------------------------------------------------------
 
-    @lazyproperty
+    @productproperty
     def old_disk_i1_luminosity_map_faceon(self):
         return self.disk_observed_stellar_luminosity_cube_faceon.get_frame_for_wavelength(self.i1_wavelength, copy=True)
 
@@ -8004,7 +8050,7 @@ class RTModel(object):
 
     # -----------------------------------------------------------------
 
-    @lazyproperty
+    @productproperty
     def old_disk_i1_luminosity_map_edgeon(self):
         return self.disk_observed_stellar_luminosity_cube_edgeon.get_frame_for_wavelength(self.i1_wavelength, copy=True)
 
@@ -8028,7 +8074,7 @@ class RTModel(object):
 
     # -----------------------------------------------------------------
 
-    @lazyproperty
+    @productproperty
     def old_disk_dust_luminosity_map_earth(self):
         return self.disk_dust_luminosity_cube_earth.integrate()
 
@@ -8040,7 +8086,7 @@ class RTModel(object):
 
     # -----------------------------------------------------------------
 
-    @lazyproperty
+    @productproperty
     def old_disk_dust_luminosity_map_faceon(self):
         return self.disk_dust_luminosity_cube_faceon.integrate()
 
@@ -8052,7 +8098,7 @@ class RTModel(object):
 
     # -----------------------------------------------------------------
 
-    @lazyproperty
+    @productproperty
     def old_disk_dust_luminosity_map_edgeon(self):
         return self.disk_dust_luminosity_cube_edgeon.integrate()
 
@@ -8078,7 +8124,7 @@ class RTModel(object):
 
     # -----------------------------------------------------------------
 
-    @lazyproperty
+    @productproperty
     def old_bolometric_luminosity_map_earth(self):
         return self.old_bulge_bolometric_luminosity_map_earth + self.old_disk_bolometric_luminosity_map_earth
 
@@ -8090,7 +8136,7 @@ class RTModel(object):
 
     # -----------------------------------------------------------------
 
-    @lazyproperty
+    @productproperty
     def old_bolometric_luminosity_map_faceon(self):
         return self.old_bulge_bolometric_luminosity_map_faceon + self.old_disk_bolometric_luminosity_map_faceon
 
@@ -8102,7 +8148,7 @@ class RTModel(object):
 
     # -----------------------------------------------------------------
 
-    @lazyproperty
+    @productproperty
     def old_bolometric_luminosity_map_edgeon(self):
         return self.old_bulge_bolometric_luminosity_map_edgeon + self.old_disk_bolometric_luminosity_map_edgeon
 
@@ -8126,7 +8172,7 @@ class RTModel(object):
 
     # -----------------------------------------------------------------
 
-    @lazyproperty
+    @productproperty
     def old_direct_stellar_luminosity_map_earth(self):
         return self.old_bulge_direct_stellar_luminosity_map_earth + self.old_disk_direct_stellar_luminosity_map_earth
 
@@ -8138,7 +8184,7 @@ class RTModel(object):
 
     # -----------------------------------------------------------------
 
-    @lazyproperty
+    @productproperty
     def old_direct_stellar_luminosity_map_faceon(self):
         return self.old_bulge_direct_stellar_luminosity_map_faceon + self.old_disk_direct_stellar_luminosity_map_faceon
 
@@ -8150,7 +8196,7 @@ class RTModel(object):
 
     # -----------------------------------------------------------------
 
-    @lazyproperty
+    @productproperty
     def old_direct_stellar_luminosity_map_edgeon(self):
         return self.old_bulge_direct_stellar_luminosity_map_edgeon + self.old_disk_direct_stellar_luminosity_map_edgeon
 
@@ -8222,7 +8268,7 @@ class RTModel(object):
 
     # -----------------------------------------------------------------
 
-    @lazyproperty
+    @productproperty
     def old_i1_luminosity_map_earth(self):
         return self.old_bulge_i1_luminosity_map_earth + self.old_disk_i1_luminosity_map_earth
 
@@ -8234,7 +8280,7 @@ class RTModel(object):
 
     # -----------------------------------------------------------------
 
-    @lazyproperty
+    @productproperty
     def old_i1_luminosity_map_faceon(self):
         return self.old_bulge_i1_luminosity_map_faceon + self.old_disk_i1_luminosity_map_faceon
 
@@ -8246,7 +8292,7 @@ class RTModel(object):
 
     # -----------------------------------------------------------------
 
-    @lazyproperty
+    @productproperty
     def old_i1_luminosity_map_edgeon(self):
         return self.old_bulge_i1_luminosity_map_edgeon + self.old_disk_i1_luminosity_map_edgeon
 
@@ -8270,7 +8316,7 @@ class RTModel(object):
 
     # -----------------------------------------------------------------
 
-    @lazyproperty
+    @productproperty
     def old_intrinsic_i1_luminosity_map_earth(self):
         return self.old_bulge_intrinsic_i1_luminosity_map_earth + self.old_disk_intrinsic_i1_luminosity_map_earth
 
@@ -8282,7 +8328,7 @@ class RTModel(object):
 
     # -----------------------------------------------------------------
 
-    @lazyproperty
+    @productproperty
     def old_intrinsic_i1_luminosity_map_faceon(self):
         return self.old_bulge_intrinsic_i1_luminosity_map_faceon + self.old_disk_intrinsic_i1_luminosity_map_faceon
 
@@ -8294,7 +8340,7 @@ class RTModel(object):
 
     # -----------------------------------------------------------------
 
-    @lazyproperty
+    @productproperty
     def old_intrinsic_i1_luminosity_map_edgeon(self):
         return self.old_bulge_intrinsic_i1_luminosity_map_edgeon + self.old_disk_intrinsic_i1_luminosity_map_edgeon
 
@@ -8318,7 +8364,7 @@ class RTModel(object):
 
     # -----------------------------------------------------------------
 
-    @lazyproperty
+    @productproperty
     def old_dust_luminosity_map_earth(self):
         return self.old_dust_luminosity_cube_earth.integrate()
 
@@ -8330,7 +8376,7 @@ class RTModel(object):
 
     # -----------------------------------------------------------------
 
-    @lazyproperty
+    @productproperty
     def old_dust_luminosity_map_faceon(self):
         return self.old_dust_luminosity_cube_faceon.integrate()
 
@@ -8342,7 +8388,7 @@ class RTModel(object):
 
     # -----------------------------------------------------------------
 
-    @lazyproperty
+    @productproperty
     def old_dust_luminosity_map_edgeon(self):
         return self.old_dust_luminosity_cube_edgeon.integrate()
 
@@ -8368,7 +8414,7 @@ class RTModel(object):
 
     # -----------------------------------------------------------------
 
-    @lazyproperty
+    @productproperty
     def young_map(self):
         return Frame.from_file(self.young_map_path)
 
@@ -8426,19 +8472,19 @@ class RTModel(object):
 
     # -----------------------------------------------------------------
 
-    @lazyproperty
+    @productproperty
     def young_intrinsic_fuv_luminosity_map_earth(self):
         return self.young_map_earth.normalized(to=self.intrinsic_fuv_luminosity_young)
 
     # -----------------------------------------------------------------
 
-    @lazyproperty
+    @productproperty
     def young_intrinsic_fuv_luminosity_map_faceon(self):
         return self.young_map_faceon.normalized(to=self.intrinsic_fuv_luminosity_young)
 
     # -----------------------------------------------------------------
 
-    @lazyproperty
+    @productproperty
     def young_intrinsic_fuv_luminosity_map_edgeon(self):
         return self.young_map_edgeon.normalized(to=self.intrinsic_fuv_luminosity_young)
 
@@ -8476,19 +8522,19 @@ class RTModel(object):
 
     # -----------------------------------------------------------------
 
-    @lazyproperty
+    @productproperty
     def young_bolometric_luminosity_map_earth(self):
         return self.young_map_earth.normalized(to=self.intrinsic_bolometric_luminosity_young)
 
     # -----------------------------------------------------------------
 
-    @lazyproperty
+    @productproperty
     def young_bolometric_luminosity_map_faceon(self):
         return self.young_map_faceon.normalized(to=self.intrinsic_bolometric_luminosity_young)
 
     # -----------------------------------------------------------------
 
-    @lazyproperty
+    @productproperty
     def young_bolometric_luminosity_map_edgeon(self):
         return self.young_map_edgeon.normalized(to=self.intrinsic_bolometric_luminosity_young)
 
@@ -8532,7 +8578,7 @@ class RTModel(object):
 
     # -----------------------------------------------------------------
 
-    @lazyproperty
+    @productproperty
     def young_direct_stellar_luminosity_map_earth(self):
         return self.young_direct_stellar_luminosity_cube_earth.integrate()
 
@@ -8544,7 +8590,7 @@ class RTModel(object):
 
     # -----------------------------------------------------------------
 
-    @lazyproperty
+    @productproperty
     def young_direct_stellar_luminosity_map_faceon(self):
         return self.young_direct_stellar_luminosity_cube_faceon.integrate()
 
@@ -8556,7 +8602,7 @@ class RTModel(object):
 
     # -----------------------------------------------------------------
 
-    @lazyproperty
+    @productproperty
     def young_direct_stellar_luminosity_map_edgeon(self):
         return self.young_direct_stellar_luminosity_cube_edgeon.integrate()
 
@@ -8582,7 +8628,7 @@ class RTModel(object):
 
     # -----------------------------------------------------------------
 
-    @lazyproperty
+    @productproperty
     def young_fuv_luminosity_map_earth(self):
         return self.young_observed_stellar_luminosity_cube_earth.get_frame_for_wavelength(self.fuv_wavelength, copy=True)
 
@@ -8594,7 +8640,7 @@ class RTModel(object):
 
     # -----------------------------------------------------------------
 
-    @lazyproperty
+    @productproperty
     def young_fuv_luminosity_map_faceon(self):
         return self.young_observed_stellar_luminosity_cube_faceon.get_frame_for_wavelength(self.fuv_wavelength, copy=True)
 
@@ -8606,7 +8652,7 @@ class RTModel(object):
 
     # -----------------------------------------------------------------
 
-    @lazyproperty
+    @productproperty
     def young_fuv_luminosity_map_edgeon(self):
         return self.young_observed_stellar_luminosity_cube_edgeon.get_frame_for_wavelength(self.fuv_wavelength, copy=True)
 
@@ -8630,7 +8676,7 @@ class RTModel(object):
 
     # -----------------------------------------------------------------
 
-    @lazyproperty
+    @productproperty
     def young_dust_luminosity_map_earth(self):
         return self.young_dust_luminosity_cube_earth.integrate()
 
@@ -8642,7 +8688,7 @@ class RTModel(object):
 
     # -----------------------------------------------------------------
 
-    @lazyproperty
+    @productproperty
     def young_dust_luminosity_map_faceon(self):
         return self.young_dust_luminosity_cube_faceon.integrate()
 
@@ -8654,7 +8700,7 @@ class RTModel(object):
 
     # -----------------------------------------------------------------
 
-    @lazyproperty
+    @productproperty
     def young_dust_luminosity_map_edgeon(self):
         return self.young_dust_luminosity_cube_edgeon.integrate()
 
@@ -8682,7 +8728,7 @@ class RTModel(object):
 
     # -----------------------------------------------------------------
 
-    @lazyproperty
+    @productproperty
     def young_star_formation_rate_map_earth_salim(self):
         return salim_fuv_to_sfr(self.young_intrinsic_fuv_luminosity_map_earth, distance=self.distance)
 
@@ -8696,7 +8742,7 @@ class RTModel(object):
     #     FACEON
     # -----------------------------------------------------------------
 
-    @lazyproperty
+    @productproperty
     def young_star_formation_rate_map_faceon_salim(self):
         return salim_fuv_to_sfr(self.young_intrinsic_fuv_luminosity_map_faceon, distance=self.distance)
 
@@ -8710,7 +8756,7 @@ class RTModel(object):
     #     EDGEON
     # -----------------------------------------------------------------
 
-    @lazyproperty
+    @productproperty
     def young_star_formation_rate_map_edgeon_salim(self):
         return salim_fuv_to_sfr(self.young_intrinsic_fuv_luminosity_map_edgeon, distance=self.distance)
 
@@ -8737,7 +8783,7 @@ class RTModel(object):
 
     # -----------------------------------------------------------------
 
-    @lazyproperty
+    @productproperty
     def young_star_formation_rate_map_earth_ke(self):
         return kennicutt_evans_fuv_to_sfr(self.young_intrinsic_fuv_luminosity_map_earth, distance=self.distance)
 
@@ -8751,7 +8797,7 @@ class RTModel(object):
     #     FACEON
     # -----------------------------------------------------------------
 
-    @lazyproperty
+    @productproperty
     def young_star_formation_rate_map_faceon_ke(self):
         return kennicutt_evans_fuv_to_sfr(self.young_intrinsic_fuv_luminosity_map_faceon, distance=self.distance)
 
@@ -8765,7 +8811,7 @@ class RTModel(object):
     #     EDGEON
     # -----------------------------------------------------------------
 
-    @lazyproperty
+    @productproperty
     def young_star_formation_rate_map_edgeon_ke(self):
         return kennicutt_evans_fuv_to_sfr(self.young_intrinsic_fuv_luminosity_map_edgeon, distance=self.distance)
 
@@ -8791,7 +8837,7 @@ class RTModel(object):
 
     # -----------------------------------------------------------------
 
-    @lazyproperty
+    @productproperty
     def sfr_map(self):
         return Frame.from_file(self.sfr_map_path)
 
@@ -8847,19 +8893,19 @@ class RTModel(object):
 
     # -----------------------------------------------------------------
 
-    @lazyproperty
+    @productproperty
     def sfr_intrinsic_fuv_luminosity_map_earth(self):
         return self.sfr_map_earth.normalized(to=self.intrinsic_fuv_luminosity_sfr)
 
     # -----------------------------------------------------------------
 
-    @lazyproperty
+    @productproperty
     def sfr_intrinsic_fuv_luminosity_map_faceon(self):
         return self.sfr_map_faceon.normalized(to=self.intrinsic_fuv_luminosity_sfr)
 
     # -----------------------------------------------------------------
 
-    @lazyproperty
+    @productproperty
     def sfr_intrinsinc_fuv_luminosity_map_edgeon(self):
         return self.sfr_map_edgeon.normalized(to=self.intrinsic_fuv_luminosity_sfr)
 
@@ -8895,19 +8941,19 @@ class RTModel(object):
 
     # -----------------------------------------------------------------
 
-    @lazyproperty
+    @productproperty
     def sfr_bolometric_luminosity_map_earth(self):
         return self.sfr_map_earth.normalized(to=self.intrinsic_bolometric_luminosity_sfr)
 
     # -----------------------------------------------------------------
 
-    @lazyproperty
+    @productproperty
     def sfr_bolometric_luminosity_map_faceon(self):
         return self.sfr_map_faceon.normalized(to=self.intrinsic_bolometric_luminosity_sfr)
 
     # -----------------------------------------------------------------
 
-    @lazyproperty
+    @productproperty
     def sfr_bolometric_luminosity_map_edgeon(self):
         return self.sfr_map_edgeon.normalized(to=self.intrinsic_bolometric_luminosity_sfr)
 
@@ -8949,7 +8995,7 @@ class RTModel(object):
 
     # -----------------------------------------------------------------
 
-    @lazyproperty
+    @productproperty
     def sfr_direct_stellar_luminosity_map_earth(self):
         return self.sfr_direct_stellar_luminosity_cube_earth.integrate()
 
@@ -8961,7 +9007,7 @@ class RTModel(object):
 
     # -----------------------------------------------------------------
 
-    @lazyproperty
+    @productproperty
     def sfr_direct_stellar_luminosity_map_faceon(self):
         return self.sfr_direct_stellar_luminosity_cube_faceon.integrate()
 
@@ -8973,7 +9019,7 @@ class RTModel(object):
 
     # -----------------------------------------------------------------
 
-    @lazyproperty
+    @productproperty
     def sfr_direct_stellar_luminosity_map_edgeon(self):
         return self.sfr_direct_stellar_luminosity_cube_edgeon.integrate()
 
@@ -8997,7 +9043,7 @@ class RTModel(object):
 
     # -----------------------------------------------------------------
 
-    @lazyproperty
+    @productproperty
     def sfr_fuv_luminosity_map_earth(self):
         return self.sfr_observed_stellar_luminosity_cube_earth.get_frame_for_wavelength(self.fuv_wavelength, copy=True)
 
@@ -9009,7 +9055,7 @@ class RTModel(object):
 
     # -----------------------------------------------------------------
 
-    @lazyproperty
+    @productproperty
     def sfr_fuv_luminosity_map_faceon(self):
         return self.sfr_observed_stellar_luminosity_cube_faceon.get_frame_for_wavelength(self.fuv_wavelength, copy=True)
 
@@ -9021,7 +9067,7 @@ class RTModel(object):
 
     # -----------------------------------------------------------------
 
-    @lazyproperty
+    @productproperty
     def sfr_fuv_luminosity_map_edgeon(self):
         return self.sfr_observed_stellar_luminosity_cube_edgeon.get_frame_for_wavelength(self.fuv_wavelength, copy=True)
 
@@ -9039,19 +9085,19 @@ class RTModel(object):
 
     # -----------------------------------------------------------------
 
-    @lazyproperty
+    @productproperty
     def star_formation_rate_map_earth(self):
         return self.sfr_map_earth.normalized(to=self.sfr)
 
     # -----------------------------------------------------------------
 
-    @lazyproperty
+    @productproperty
     def star_formation_rate_map_faceon(self):
         return self.sfr_map_faceon.normalized(to=self.sfr)
 
     # -----------------------------------------------------------------
 
-    @lazyproperty
+    @productproperty
     def star_formation_rate_map_edgeon(self):
         return self.sfr_map_edgeon.normalized(to=self.sfr)
 
@@ -9087,19 +9133,19 @@ class RTModel(object):
 
     # -----------------------------------------------------------------
 
-    @lazyproperty
+    @productproperty
     def sfr_dust_mass_map_earth(self):
         return self.sfr_map_earth.normalized(to=self.sfr_dust_mass)
 
     # -----------------------------------------------------------------
 
-    @lazyproperty
+    @productproperty
     def sfr_dust_mass_map_faceon(self):
         return self.sfr_map_faceon.normalized(to=self.sfr_dust_mass)
 
     # -----------------------------------------------------------------
 
-    @lazyproperty
+    @productproperty
     def sfr_dust_mass_map_edgeon(self):
         return self.sfr_map_edgeon.normalized(to=self.sfr_dust_mass)
 
@@ -9135,19 +9181,19 @@ class RTModel(object):
 
     # -----------------------------------------------------------------
 
-    @lazyproperty
+    @productproperty
     def sfr_stellar_luminosity_map_earth(self):
         return self.sfr_map_earth.normalized(to=self.intrinsic_stellar_luminosity_sfr)
 
     # -----------------------------------------------------------------
 
-    @lazyproperty
+    @productproperty
     def sfr_stellar_luminosity_map_faceon(self):
         return self.sfr_map_faceon.normalized(to=self.intrinsic_stellar_luminosity_sfr)
 
     # -----------------------------------------------------------------
 
-    @lazyproperty
+    @productproperty
     def sfr_stellar_luminosity_map_edgeon(self):
         return self.sfr_map_edgeon.normalized(to=self.intrinsic_stellar_luminosity_sfr)
 
@@ -9183,19 +9229,19 @@ class RTModel(object):
 
     # -----------------------------------------------------------------
 
-    @lazyproperty
+    @productproperty
     def sfr_intrinsic_dust_luminosity_map_earth(self):
         return self.sfr_map_earth.normalized(to=self.intrinsic_dust_luminosity_sfr)
 
     # -----------------------------------------------------------------
 
-    @lazyproperty
+    @productproperty
     def sfr_intrinsic_dust_luminosity_map_faceon(self):
         return self.sfr_map_faceon.normalized(to=self.intrinsic_dust_luminosity_sfr)
 
     # -----------------------------------------------------------------
 
-    @lazyproperty
+    @productproperty
     def sfr_intrinsic_dust_luminosity_map_edgeon(self):
         return self.sfr_map_edgeon.normalized(to=self.intrinsic_dust_luminosity_sfr)
 
@@ -9237,7 +9283,7 @@ class RTModel(object):
 
     # -----------------------------------------------------------------
 
-    @lazyproperty
+    @productproperty
     def sfr_dust_luminosity_map_earth(self):
         return self.sfr_dust_luminosity_cube_earth.integrate()
 
@@ -9249,7 +9295,7 @@ class RTModel(object):
 
     # -----------------------------------------------------------------
 
-    @lazyproperty
+    @productproperty
     def sfr_dust_luminosity_map_faceon(self):
         return self.sfr_dust_luminosity_cube_faceon.integrate()
 
@@ -9261,7 +9307,7 @@ class RTModel(object):
 
     # -----------------------------------------------------------------
 
-    @lazyproperty
+    @productproperty
     def sfr_dust_luminosity_map_edgeon(self):
         return self.sfr_dust_luminosity_cube_edgeon.integrate()
 
@@ -9287,7 +9333,7 @@ class RTModel(object):
 
     # -----------------------------------------------------------------
 
-    @lazyproperty
+    @productproperty
     def unevolved_intrinsic_fuv_luminosity_map_earth(self):
 
         """
@@ -9314,7 +9360,7 @@ class RTModel(object):
 
     # -----------------------------------------------------------------
 
-    @lazyproperty
+    @productproperty
     def unevolved_intrinsic_fuv_luminosity_map_faceon(self):
 
         """
@@ -9337,7 +9383,7 @@ class RTModel(object):
 
     # -----------------------------------------------------------------
 
-    @lazyproperty
+    @productproperty
     def unevolved_intrinsic_fuv_luminosity_map_edgeon(self):
 
         """
@@ -9372,7 +9418,7 @@ class RTModel(object):
 
     # -----------------------------------------------------------------
 
-    @lazyproperty
+    @productproperty
     def unevolved_star_formation_rate_map_earth(self):
         return salim_fuv_to_sfr(self.unevolved_intrinsic_fuv_luminosity_map_earth, distance=self.distance)
 
@@ -9384,7 +9430,7 @@ class RTModel(object):
 
     # -----------------------------------------------------------------
 
-    @lazyproperty
+    @productproperty
     def unevolved_star_formation_rate_map_faceon(self):
         return salim_fuv_to_sfr(self.unevolved_intrinsic_fuv_luminosity_map_faceon, distance=self.distance)
 
@@ -9396,7 +9442,7 @@ class RTModel(object):
 
     # -----------------------------------------------------------------
 
-    @lazyproperty
+    @productproperty
     def unevolved_star_formation_rate_map_edgeon(self):
         return salim_fuv_to_sfr(self.unevolved_intrinsic_fuv_luminosity_map_edgeon, distance=self.distance)
 
@@ -9420,7 +9466,7 @@ class RTModel(object):
 
     # -----------------------------------------------------------------
 
-    @lazyproperty
+    @productproperty
     def unevolved_bolometric_luminosity_map_earth(self):
 
         """
@@ -9441,7 +9487,7 @@ class RTModel(object):
 
     # -----------------------------------------------------------------
 
-    @lazyproperty
+    @productproperty
     def unevolved_bolometric_luminosity_map_faceon(self):
 
         """
@@ -9458,7 +9504,7 @@ class RTModel(object):
 
     # -----------------------------------------------------------------
 
-    @lazyproperty
+    @productproperty
     def unevolved_bolometric_luminosity_map_edgeon(self):
 
         """
@@ -9511,7 +9557,7 @@ class RTModel(object):
 
     # -----------------------------------------------------------------
 
-    @lazyproperty
+    @productproperty
     def unevolved_direct_stellar_luminosity_map_earth(self):
         return self.unevolved_direct_stellar_luminosity_cube_earth.integrate()
 
@@ -9523,7 +9569,7 @@ class RTModel(object):
 
     # -----------------------------------------------------------------
 
-    @lazyproperty
+    @productproperty
     def unevolved_direct_stellar_luminosity_map_faceon(self):
         return self.unevolved_direct_stellar_luminosity_cube_faceon.integrate()
 
@@ -9535,7 +9581,7 @@ class RTModel(object):
 
     # -----------------------------------------------------------------
 
-    @lazyproperty
+    @productproperty
     def unevolved_direct_stellar_luminosity_map_edgeon(self):
         return self.unevolved_direct_stellar_luminosity_cube_edgeon.integrate()
 
@@ -9553,7 +9599,7 @@ class RTModel(object):
 
     # -----------------------------------------------------------------
 
-    @lazyproperty
+    @productproperty
     def unevolved_fuv_luminosity_map_earth(self):
         return self.unevolved_observed_stellar_luminosity_cube_earth.get_frame_for_wavelength(self.fuv_wavelength, copy=True)
 
@@ -9565,7 +9611,7 @@ class RTModel(object):
 
     # -----------------------------------------------------------------
 
-    @lazyproperty
+    @productproperty
     def unevolved_fuv_luminosity_map_faceon(self):
         return self.unevolved_observed_stellar_luminosity_cube_faceon.get_frame_for_wavelength(self.fuv_wavelength, copy=True)
 
@@ -9577,7 +9623,7 @@ class RTModel(object):
 
     # -----------------------------------------------------------------
 
-    @lazyproperty
+    @productproperty
     def unevolved_fuv_luminosity_map_edgeon(self):
         return self.unevolved_observed_stellar_luminosity_cube_edgeon.get_frame_for_wavelength(self.fuv_wavelength, copy=True)
 
@@ -9601,7 +9647,7 @@ class RTModel(object):
 
     # -----------------------------------------------------------------
 
-    @lazyproperty
+    @productproperty
     def unevolved_dust_luminosity_map_earth(self):
         return self.unevolved_dust_luminosity_cube_earth.integrate()
 
@@ -9613,7 +9659,7 @@ class RTModel(object):
 
     # -----------------------------------------------------------------
 
-    @lazyproperty
+    @productproperty
     def unevolved_dust_luminosity_map_faceon(self):
         return self.unevolved_dust_luminosity_cube_faceon.integrate()
 
@@ -9625,7 +9671,7 @@ class RTModel(object):
 
     # -----------------------------------------------------------------
 
-    @lazyproperty
+    @productproperty
     def unevolved_dust_luminosity_map_edgeon(self):
         return self.unevolved_dust_luminosity_cube_edgeon.integrate()
 
@@ -9651,7 +9697,7 @@ class RTModel(object):
 
     # -----------------------------------------------------------------
 
-    @lazyproperty
+    @productproperty
     def dust_map(self):
         return Frame.from_file(self.dust_map_path)
 
@@ -9689,19 +9735,19 @@ class RTModel(object):
 
     # -----------------------------------------------------------------
 
-    @lazyproperty
+    @productproperty
     def diffuse_dust_mass_map_earth(self):
         return self.dust_map_earth.normalized(to=self.diffuse_dust_mass)
 
     # -----------------------------------------------------------------
 
-    @lazyproperty
+    @productproperty
     def diffuse_dust_mass_map_faceon(self):
         return self.dust_map_faceon.normalized(to=self.diffuse_dust_mass)
 
     # -----------------------------------------------------------------
 
-    @lazyproperty
+    @productproperty
     def diffuse_dust_mass_map_edgeon(self):
         return self.dust_map_edgeon.normalized(to=self.diffuse_dust_mass)
 
@@ -9749,7 +9795,7 @@ class RTModel(object):
 
     # -----------------------------------------------------------------
 
-    @lazyproperty
+    @productproperty
     def dust_mass_map_earth(self):
 
         """
@@ -9770,7 +9816,7 @@ class RTModel(object):
 
     # -----------------------------------------------------------------
 
-    @lazyproperty
+    @productproperty
     def dust_mass_map_faceon(self):
 
         """
@@ -9787,7 +9833,7 @@ class RTModel(object):
 
     # -----------------------------------------------------------------
 
-    @lazyproperty
+    @productproperty
     def dust_mass_map_edgeon(self):
 
         """
@@ -10548,7 +10594,7 @@ class RTModel(object):
     # -----------------------------------------------------------------
     # -----------------------------------------------------------------
 
-    @lazyproperty
+    @productproperty
     def old_bulge_component_sed(self):
 
         """
@@ -10576,7 +10622,7 @@ class RTModel(object):
     # -----------------------------------------------------------------
     # -----------------------------------------------------------------
 
-    @lazyproperty
+    @productproperty
     def old_disk_component_sed(self):
 
         """
@@ -10604,7 +10650,7 @@ class RTModel(object):
     # -----------------------------------------------------------------
     # -----------------------------------------------------------------
 
-    @lazyproperty
+    @productproperty
     def young_component_sed(self):
 
         """
@@ -10632,7 +10678,7 @@ class RTModel(object):
     # -----------------------------------------------------------------
     # -----------------------------------------------------------------
 
-    @lazyproperty
+    @productproperty
     def sfr_component_sed(self):
 
         """
@@ -10660,7 +10706,7 @@ class RTModel(object):
     # -----------------------------------------------------------------
     # -----------------------------------------------------------------
 
-    @lazyproperty
+    @productproperty
     def transparent_sfr_component_sed(self):
 
         """
@@ -10688,7 +10734,7 @@ class RTModel(object):
     # -----------------------------------------------------------------
     # -----------------------------------------------------------------
 
-    @lazyproperty
+    @productproperty
     def extra_component_sed(self):
 
         """
@@ -10751,7 +10797,7 @@ class RTModel(object):
 
     # -----------------------------------------------------------------
 
-    @lazyproperty
+    @productproperty
     def diffuse_dust_sed(self):
         return self.dust_sed - self.intrinsic_dust_sed_sfr
 
@@ -12014,13 +12060,13 @@ class RTModel(object):
 
     # -----------------------------------------------------------------
 
-    @lazyproperty
+    @productproperty
     def component_maps(self):
         return self.component_maps_earth
 
     # -----------------------------------------------------------------
 
-    @lazyproperty
+    @productproperty
     def component_maps_earth(self):
         maps = OrderedDict()
         maps[bulge_simulation_name] = self.old_bulge_map_earth
@@ -12032,7 +12078,7 @@ class RTModel(object):
 
     # -----------------------------------------------------------------
 
-    @lazyproperty
+    @productproperty
     def component_maps_faceon(self):
         maps = OrderedDict()
         maps[bulge_simulation_name] = self.old_bulge_map_faceon
@@ -12044,7 +12090,7 @@ class RTModel(object):
 
     # -----------------------------------------------------------------
 
-    @lazyproperty
+    @productproperty
     def component_maps_edgeon(self):
         maps = OrderedDict()
         maps[bulge_simulation_name] = self.old_bulge_map_edgeon
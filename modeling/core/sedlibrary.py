@@ -0,0 +1,255 @@
+#!/usr/bin/env python
+# -*- coding: utf8 -*-
+# *****************************************************************
+# **       PTS -- Python Toolkit for working with SKIRT          **
+# **       © Astronomical Observatory, Ghent University          **
+# *****************************************************************
+
+## \package pts.modeling.core.sedlibrary Contains the TemplateLibrary class, which holds a library of SED templates
+#  on a regular grid of parameters as one contiguous array, and functions to load such libraries only once per process
+#  (optionally from a binary cache file in the PTS user directory).
+
+# -----------------------------------------------------------------
+
+# Ensure Python 3 compatibility
+from __future__ import absolute_import, division, print_function
+
+# Import standard modules
+import os
+import itertools
+import numpy as np
+
+# Import the relevant PTS classes and modules
+from ...core.tools import introspection
+from ...core.tools import filesystem as fs
+from ...core.basics.log import log
+
+# -----------------------------------------------------------------
+
+# The libraries that have already been loaded in this process, by name
+_libraries = dict()
+
+# -----------------------------------------------------------------
+
+class TemplateLibrary(object):
+
+    """
+    This class represents a library of templates defined on a regular grid of parameters. The templates are stored in
+    one contiguous array, with the parameter axes first and the wavelengths last, so that templates for many
+    combinations of parameter values can be interpolated at once.
+    """
+
+    def __init__(self, wavelengths, axes, data):
+
+        """
+        The constructor ...
+        :param wavelengths: the wavelengths of the templates
+        :param axes: the grid values of the parameters, one (increasing) array per parameter
+        :param data: array of shape (n_1, ..., n_k, ..., nwavelengths) with the templates
+        """
+
+        self.wavelengths = np.ascontiguousarray(wavelengths, dtype=np.float64)
+        self.axes = [np.ascontiguousarray(axis, dtype=np.float64) for axis in axes]
+        self.data = np.ascontiguousarray(data, dtype=np.float64)
+
+        # Check
+        for axis in self.axes:
+            if len(axis) < 2: raise ValueError("Every parameter should have at least two grid values")
+        if self.data.shape[:self.nparameters] != tuple(len(axis) for axis in self.axes): raise ValueError("The shape of the data does not correspond to the parameter axes")
+        if self.data.shape[-1] != self.nwavelengths: raise ValueError("The number of wavelengths does not correspond to the data")
+
+    # -----------------------------------------------------------------
+
+    @classmethod
+    def from_file(cls, path):
+
+        """
+        This function ...
+        :param path:
+        :return:
+        """
+
+        with np.load(path) as contents:
+
+            naxes = int(contents["naxes"])
+            axes = [contents["axis" + str(index)] for index in range(naxes)]
+            return cls(contents["wavelengths"], axes, contents["data"])
+
+    # -----------------------------------------------------------------
+
+    def saveto(self, path):
+
+        """
+        This function ...
+        :param path:
+        :return:
+        """
+
+        arrays = dict(("axis" + str(index), axis) for index, axis in enumerate(self.axes))
+        with open(path, "wb") as fh: np.savez(fh, wavelengths=self.wavelengths, data=self.data, naxes=self.nparameters, **arrays)
+
+    # -----------------------------------------------------------------
+
+    @property
+    def nparameters(self):
+
+        """
+        This function ...
+        :return:
+        """
+
+        return len(self.axes)
+
+    # -----------------------------------------------------------------
+
+    @property
+    def nwavelengths(self):
+
+        """
+        This function ...
+        :return:
+        """
+
+        return len(self.wavelengths)
+
+    # -----------------------------------------------------------------
+
+    def locate(self, index, values):
+
+        """
+        This function returns, for each value, the index of the grid cell along the specified parameter axis and the
+        fractional position within that cell. Values outside of the grid are clipped to its edges.
+        :param index: the index of the parameter
+        :param values: array of parameter values
+        :return:
+        """
+
+        axis = self.axes[index]
+        values = np.clip(values, axis[0], axis[-1])
+
+        # Same as nr.locate_clip
+        indices = np.clip(np.searchsorted(axis, values, side="right") - 1, 0, len(axis) - 2)
+        fractions = (values - axis[indices]) / (axis[indices + 1] - axis[indices])
+
+        # Return
+        return indices, fractions
+
+    # -----------------------------------------------------------------
+
+    def evaluate(self, *values):
+
+        """
+        This function interpolates the templates (multilinearly) for many combinations of parameter values at once
+        :param values: one array (or scalar) of values per parameter, all of the same length
+        :return: array of shape (npoints, ..., nwavelengths)
+        """
+
+        if len(values) != self.nparameters: raise ValueError("Expected values for " + str(self.nparameters) + " parameters")
+        values = np.broadcast_arrays(*[np.atleast_1d(np.asarray(parameter_values, dtype=np.float64)) for parameter_values in values])
+        npoints = len(values[0])
+
+        # Locate the points in the grid
+        located = [self.locate(index, parameter_values) for index, parameter_values in enumerate(values)]
+
+        # Add the contributions of all corners of the grid cells (with the parameter axes flattened)
+        grid_shape = self.data.shape[:self.nparameters]
+        template_shape = self.data.shape[self.nparameters:]
+        templates = self.data.reshape((-1, int(np.prod(template_shape))))
+        result = np.zeros((npoints, templates.shape[1]))
+        contribution = np.empty_like(result)
+        for corner in itertools.product((0, 1), repeat=self.nparameters):
+
+            weights = np.ones(npoints)
+            indices = []
+            for offset, (parameter_indices, fractions) in zip(corner, located):
+
+                indices.append(parameter_indices + offset)
+                weights *= fractions if offset else 1.0 - fractions
+
+            np.take(templates, np.ravel_multi_index(indices, grid_shape), axis=0, out=contribution)
+            contribution *= weights[:, np.newaxis]
+            result += contribution
+
+        # Return the templates
+        return result.reshape((npoints,) + template_shape)
+
+# -----------------------------------------------------------------
+
+def cache_path(name):
+
+    """
+    This function returns the path of the binary cache file for the library with the specified name
+    :param name:
+    :return:
+    """
+
+    cache_dir_path = fs.create_directory_in(introspection.pts_user_dir, "templates")
+    return fs.join(cache_dir_path, name + ".npz")
+
+# -----------------------------------------------------------------
+
+def modification_time(path):
+
+    """
+    This function returns the latest modification time of the file, or of the files in the directory
+    :param path:
+    :return:
+    """
+
+    if not os.path.isdir(path): return os.path.getmtime(path)
+    times = [os.path.getmtime(os.path.join(path, name)) for name in os.listdir(path)]
+    return max(times + [os.path.getmtime(path)])
+
+# -----------------------------------------------------------------
+
+def get_library(name, loader, source_path=None, cache=True):
+
+    """
+    This function returns the library with the specified name. The library is only loaded once per process: it is
+    read from its binary cache file if that is up to date with the source files, and otherwise it is created with the
+    loader function (and the cache file is written).
+    :param name:
+    :param loader: function that creates the TemplateLibrary from the original files
+    :param source_path: the path of the original file or directory, used to check whether the cache is out of date
+    :param cache: use the binary cache file
+    :return:
+    """
+
+    # Already loaded
+    if name in _libraries: return _libraries[name]
+
+    path = cache_path(name) if cache else None
+    if path is not None and fs.is_file(path) and (source_path is None or not os.path.exists(source_path) or modification_time(source_path) <= os.path.getmtime(path)):
+
+        # Inform the user
+        log.debug("Loading the " + name + " template library from '" + path + "' ...")
+
+        # Load
+        library = TemplateLibrary.from_file(path)
+
+    else:
+
+        # Create the library
+        library = loader()
+
+        # Write the cache file
+        if path is not None:
+            log.debug("Writing the " + name + " template library to '" + path + "' ...")
+            library.saveto(path)
+
+    # Keep and return the library
+    _libraries[name] = library
+    return library
+
+# -----------------------------------------------------------------
+
+def clear_libraries():
+
+    """
+    This function removes the loaded libraries from memory
+    :return:
+    """
+
+    _libraries.clear()
+
+# -----------------------------------------------------------------
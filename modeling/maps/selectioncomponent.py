@@ -19,7 +19,7 @@ from abc import ABCMeta
 
 # Import the relevant PTS classes and modules
 from .component import MapMakingComponent
-from ...core.basics.log import log
+from ...core.basics.log import log, LazyString
 from ...magic.core.mask import intersection
 from ...magic.core.alpha import product
 from ...core.tools import sequences
@@ -718,7 +718,7 @@ class MapsSelectionComponent(MapMakingComponent):
             if levels in maps: continue
 
             # Debugging
-            log.debug("Clipping the map for sigma levels [" + tostr(levels) + "] ...")
+            log.debug("Clipping the map for sigma levels [%s] ...", LazyString(tostr, levels))
 
             # Get the mask
             mask = masks[levels]
@@ -1189,7 +1189,7 @@ class MapsSelectionComponent(MapMakingComponent):
                 continue
 
             # Debugging
-            log.debug("Making clip mask for sigma levels [" + tostr(levels_dict) + "] ...")
+            log.debug("Making clip mask for sigma levels [%s] ...", LazyString(tostr, levels_dict))
 
             masks = []
 